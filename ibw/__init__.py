@@ -1,3 +1,5 @@
+import logging
+
 from . import clientportal
 from . import client_base
 from . import client_utils
@@ -5,3 +7,11 @@ from . import authorization
 from . import accounts 
 from . import order
 from . import market
+from . import transport
+from . import request_log
+from . import exceptions
+from . import resilience
+from . import response_cache
+
+# The library never configures logging itself, see `request_log.enable_request_logging`.
+logging.getLogger(__name__).addHandler(logging.NullHandler())
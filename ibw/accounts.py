@@ -1,12 +1,16 @@
 from typing import Dict
 
 from . import client_base
+from . import client_utils
+from . import transport as ib_transport
 
 
 class IBAccounts(client_base.IBBase):
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, transport: ib_transport.IBTransport = None,
+                 transport_config: ib_transport.TransportConfig = None,
+                 host: str = None, port: int = client_utils.DEFAULT_GATEWAY_PORT) -> None:
+        super().__init__(transport=transport, transport_config=transport_config, host=host, port=port)
 
     def server_accounts(self):
         """
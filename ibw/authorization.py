@@ -8,20 +8,25 @@ import textwrap
 from typing import Dict
 
 from . import client_base
+from . import client_utils
 from . import clientportal
+from . import transport as ib_transport
 
-logging.basicConfig(
-    filename='app.log',
-    format='%(levelname)s - %(name)s - %(message)s',
-    level=logging.DEBUG
-)
+logger = logging.getLogger(__name__)
 
 
 class IBClient(client_base.IBBase):
 
-    def __init__(self, username: str, account: str, client_gateway_path: str = None) -> None:
+    def __init__(self, username: str, account: str, client_gateway_path: str = None,
+                 transport: ib_transport.IBTransport = None,
+                 transport_config: ib_transport.TransportConfig = None,
+                 host: str = None, port: int = client_utils.DEFAULT_GATEWAY_PORT) -> None:
         """Initalizes a new instance of the IBClient Object.
 
+        Creating a client doesn't touch the network or the disk, the gateway
+        host is looked up on the first request and the Client Portal Gateway
+        is only downloaded by `provision_gateway()`.
+
         Arguments:
         ----
         username {str} -- Your IB account username for either your paper or regular account.
@@ -32,6 +37,17 @@ class IBClient(client_base.IBBase):
         ----
         password {str} -- Your IB account password for either your paper or regular account. (default:{""})
 
+        transport {IBTransport} -- The transport to send requests through, by default the
+            one shared by every client of the gateway. (default: {None})
+
+        transport_config {TransportConfig} -- The pool configuration used when the shared
+            transport is created. (default: {None})
+
+        host {str} -- The gateway host, looked up from this machine's host name
+            on first use if `None`. (default: {None})
+
+        port {int} -- The gateway port. (default: {5000})
+
         Usage:
         ----
             >>> ib_paper_session = IBClient(
@@ -42,18 +58,19 @@ class IBClient(client_base.IBBase):
             >>> ib_regular_session = IBClient(
                 username='IB_REGULAR_USERNAME',
                 account='IB_REGULAR_ACCOUNT',
+                host='127.0.0.1'
             )
             >>> ib_regular_session
         """
 
-        super().__init__()
+        super().__init__(transport=transport, transport_config=transport_config, host=host, port=port)
 
         self.account = account
         self.username = username
         self.client_portal_client = clientportal.ClientPortal()
 
         self._operating_system = sys.platform
-        self.session_state_path: pathlib.Path = pathlib.Path(__file__).parent.joinpath('server_session.json').resolve()
+        self.session_state_path: pathlib.Path = pathlib.Path(__file__).parent.joinpath('server_session.json')
         self.authenticated = False
         self.server_process = None
 
@@ -62,32 +79,45 @@ class IBClient(client_base.IBBase):
             # Grab the Client Portal Path.
             self.client_portal_folder: pathlib.Path = pathlib.Path(__file__).parents[1].joinpath(
                 'resources/clientportal.beta.gw'
-            ).resolve()
-
-            # See if it exists.
-            if not self.client_portal_folder.exists():
-                print("The Client Portal Gateway doesn't exist. You need to download it before using the Library.")
+            )
 
         else:
 
             self.client_portal_folder = client_gateway_path
 
-            # Log the initial Info.
-        logging.info(textwrap.dedent('''
-	    =================
-	    Initialize Client:
-	    =================
-	    Server Process: {serv_proc}
-	    Operating System: {op_sys}
-	    Session State Path: {state_path}
-	    Client Portal Folder: {client_path}
-	    ''').format(
-            serv_proc=self.server_process,
-            op_sys=self._operating_system,
-            state_path=self.session_state_path,
-            client_path=self.client_portal_folder
-        )
-        )
+        # Log the initial Info.
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(textwrap.dedent('''
+            =================
+            Initialize Client:
+            =================
+            Server Process: {serv_proc}
+            Operating System: {op_sys}
+            Session State Path: {state_path}
+            Client Portal Folder: {client_path}
+            ''').format(
+                serv_proc=self.server_process,
+                op_sys=self._operating_system,
+                state_path=self.session_state_path,
+                client_path=self.client_portal_folder
+            )
+            )
+
+    def provision_gateway(self) -> pathlib.Path:
+        """Downloads and extracts the Client Portal Gateway if it's missing.
+
+        Returns:
+        ----
+        {pathlib.Path} -- The Client Portal Gateway folder.
+        """
+
+        client_portal_folder = pathlib.Path(self.client_portal_folder)
+
+        if not client_portal_folder.exists():
+            print("The Client Portal Gateway doesn't exist, downloading the Client Portal file...")
+            self.client_portal_client.download_and_extract()
+
+        return client_portal_folder
 
     def create_session(self, set_server=True) -> bool:
         """Creates a new session.
@@ -125,7 +155,7 @@ class IBClient(client_base.IBBase):
         auth_response = self.is_authenticated()
 
         # Log the initial Info.
-        logging.info(textwrap.dedent('''
+        logger.info(textwrap.dedent('''
         =================
         Create Session:
         =================
@@ -154,6 +184,9 @@ class IBClient(client_base.IBBase):
         str: The Server Process ID.
         """
 
+        # The gateway has to be on disk before it can run.
+        self.provision_gateway()
+
         IB_WEB_API_PROC = ["sh", r"bin/run.sh", r"root/conf.yaml"]
         self.server_process = subprocess.Popen(
             args=IB_WEB_API_PROC,
@@ -183,7 +216,7 @@ class IBClient(client_base.IBBase):
             accounts = server_account_content['accounts']
             if self.account in accounts:
                 # Log the response.
-                logging.debug(textwrap.dedent('''
+                logger.debug(textwrap.dedent('''
                 =================
                 Set Server:
                 =================
@@ -217,8 +250,7 @@ class IBClient(client_base.IBBase):
         bool -- `True` if it was connected.
         """
 
-        logging.debug('Running Client Folder at: {file_path}'.format(
-            file_path=self.client_portal_folder))
+        logger.debug('Running Client Folder at: %s', self.client_portal_folder)
 
         print('PID: ', self._start_server())
 
@@ -267,7 +299,7 @@ class IBClient(client_base.IBBase):
             auth_response = self.is_authenticated(check=True)
 
             # Log the Auth Response.
-            logging.debug('Check User Auth Inital: {auth_resp}'.format(
+            logger.debug('Check User Auth Inital: {auth_resp}'.format(
                 auth_resp=auth_response
             )
             )
@@ -293,7 +325,7 @@ class IBClient(client_base.IBBase):
                         self.authenticated = True
 
                         # Log the response.
-                        logging.debug('Had to do Server Account Request: {auth_resp}'.format(
+                        logger.debug('Had to do Server Account Request: {auth_resp}'.format(
                             auth_resp=serv_resp
                         )
                         )
@@ -301,7 +333,7 @@ class IBClient(client_base.IBBase):
                 except:
                     pass
 
-                logging.debug(
+                logger.debug(
                     '''
                     Validate Response: {valid_resp}
                     Reauth Response: {reauth_resp}
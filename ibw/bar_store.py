@@ -0,0 +1,447 @@
+import datetime
+import json
+import os
+import pathlib
+import re
+import threading
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from .history import Bars
+from .history import HistoryDownloader
+from .history import parse_duration
+from .history import to_timestamp
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# The version of the layout of a series, stored in its `meta.json`.
+FORMAT_VERSION = 1
+
+# The column files of a series, with their little-endian dtypes.
+COLUMNS = (
+    ('time', '<i8'),
+    ('open', '<f8'),
+    ('high', '<f8'),
+    ('low', '<f8'),
+    ('close', '<f8'),
+    ('volume', '<f8')
+)
+
+_COLUMN_NAMES = {name for name, _ in COLUMNS}
+
+Range = Tuple[int, int]
+
+
+def merge_ranges(ranges: List[Range]) -> List[Range]:
+    """Sorts ranges and merges the ones that overlap or touch.
+
+    Arguments:
+    ----
+    ranges {List[Tuple[int, int]]} -- The `[start, end)` ranges.
+
+    Returns:
+    ----
+    {List[Tuple[int, int]]} -- The merged ranges.
+    """
+
+    merged = []
+
+    for start, end in sorted(ranges):
+        if end <= start:
+            continue
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+
+    return merged
+
+
+def subtract_ranges(start: int, end: int, ranges: List[Range]) -> List[Range]:
+    """Returns the parts of `[start, end)` that the merged `ranges` don't cover."""
+
+    missing = []
+
+    for covered_start, covered_end in ranges:
+        if covered_end <= start:
+            continue
+        if covered_start >= end:
+            break
+        if covered_start > start:
+            missing.append((start, covered_start))
+        start = max(start, covered_end)
+
+    if start < end:
+        missing.append((start, end))
+
+    return missing
+
+
+class BarStore():
+
+    def __init__(self, root: Union[str, pathlib.Path], client=None, downloader: HistoryDownloader = None) -> None:
+        """Initalizes a new instance of the BarStore Object.
+
+        Keeps the bars of contracts on disk, one series per contract and bar
+        size, so history is only downloaded once. Each series is a folder
+        with one file of raw little-endian values per column and a
+        `meta.json` holding the number of bars and the time ranges already
+        downloaded. Reads memory-map the column files, so loading years of
+        bars copies nothing and sends no request.
+
+        `get` only downloads the parts of a range that aren't covered yet:
+        the tail after the last download, and the gaps a failed or
+        interrupted download left. Bars after the last stored bar are
+        appended to the files, older bars rewrite the series into a new
+        generation of column files, which `meta.json` switches to in one
+        atomic replace, so an interrupted rewrite leaves the series as it was.
+
+        Arguments:
+        ----
+        root {Union[str, pathlib.Path]} -- The folder of the store, created if missing.
+
+        Keyword Arguments:
+        ----
+        client {IBClient} -- The client used to download missing bars. (default: {None})
+
+        downloader {HistoryDownloader} -- The downloader used instead of one
+            created for `client`. (default: {None})
+
+        Usage:
+        ----
+            >>> store = BarStore(root='data/bars', client=ib_client)
+            >>> bars = store.get(conids=conids, bar='5min', start=datetime.datetime(2020, 1, 1))
+            >>> bars['265598'].close
+        """
+
+        if np is None:
+            raise ImportError('The bar store requires `numpy`, install it with `pip install numpy`.')
+
+        self.root = pathlib.Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+        if downloader is None and client is not None:
+            downloader = HistoryDownloader(client=client)
+
+        self.downloader = downloader
+
+        self._lock = threading.RLock()
+
+    def path(self, conid: str, bar: str) -> pathlib.Path:
+        """Returns the folder of a series."""
+
+        return self.root.joinpath(_safe_name(bar), _safe_name(conid))
+
+    def series(self) -> List[Tuple[str, str]]:
+        """Returns the contract ID and bar size of every stored series."""
+
+        found = []
+        for meta in sorted(self.root.glob('*/*/meta.json')):
+            content = json.loads(meta.read_text(encoding='utf-8'))
+            found.append((content['conid'], content['bar']))
+
+        return found
+
+    def coverage(self, conid: str, bar: str) -> List[Range]:
+        """Returns the downloaded ranges of a series, in milliseconds since the epoch."""
+
+        return [tuple(covered) for covered in self._meta(conid=conid, bar=bar)['coverage']]
+
+    def missing(self, conid: str, bar: str, start: Union[datetime.datetime, float],
+                end: Union[datetime.datetime, float] = None) -> List[Tuple[float, float]]:
+        """Returns the parts of a range that weren't downloaded yet.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        bar {str} -- The bar size.
+
+        start {Union[datetime.datetime, float]} -- The start of the range.
+
+        Keyword Arguments:
+        ----
+        end {Union[datetime.datetime, float]} -- The end of the range. (default: {now})
+
+        Returns:
+        ----
+        {List[Tuple[float, float]]} -- The missing ranges, in seconds since the epoch.
+        """
+
+        start_ms, end_ms = self._range(bar=bar, start=start, end=end)
+        gaps = subtract_ranges(start=start_ms, end=end_ms, ranges=self.coverage(conid=conid, bar=bar))
+
+        return [(gap_start / 1000.0, gap_end / 1000.0) for gap_start, gap_end in gaps]
+
+    def load(self, conid: str, bar: str, start: Union[datetime.datetime, float] = None,
+             end: Union[datetime.datetime, float] = None) -> Bars:
+        """Reads the stored bars of a contract, without sending any request.
+
+        The arrays are read-only memory maps of the column files.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        bar {str} -- The bar size.
+
+        Keyword Arguments:
+        ----
+        start {Union[datetime.datetime, float]} -- The first bar. (default: {the first stored})
+
+        end {Union[datetime.datetime, float]} -- The end of the range, excluded. (default: {the last stored})
+
+        Returns:
+        ----
+        {Bars} -- The bars.
+        """
+
+        conid = str(conid)
+
+        with self._lock:
+            meta = self._meta(conid=conid, bar=bar)
+            columns = self._map(conid=conid, bar=bar, count=meta['count'], generation=meta.get('generation', 0))
+
+        time = columns['time']
+        first = 0 if start is None else int(np.searchsorted(time, int(to_timestamp(start) * 1000), side='left'))
+        last = len(time) if end is None else int(np.searchsorted(time, int(to_timestamp(end) * 1000), side='left'))
+
+        return Bars(conid=conid, bar=bar, **{name: values[first:last] for name, values in columns.items()})
+
+    def get(self, conids: List[str], bar: str, start: Union[datetime.datetime, float] = None,
+            end: Union[datetime.datetime, float] = None, period: str = None,
+            outside_rth: bool = None) -> Dict[str, Bars]:
+        """Returns the bars of contracts, downloading only what's missing.
+
+        The end of the range is rounded down to a bar, so the bar still
+        being formed isn't stored.
+
+        Arguments:
+        ----
+        conids {List[str]} -- The contract IDs.
+
+        bar {str} -- The bar size, e.g. `5min`.
+
+        Keyword Arguments:
+        ----
+        start {Union[datetime.datetime, float]} -- The start of the range. (default: {None})
+
+        end {Union[datetime.datetime, float]} -- The end of the range. (default: {now})
+
+        period {str} -- The length of the range instead of `start`, e.g. `1y`. (default: {None})
+
+        outside_rth {bool} -- Include bars outside of regular trading hours. (default: {None})
+
+        Returns:
+        ----
+        {Dict[str, Bars]} -- The bars, by contract ID.
+        """
+
+        if start is None and period is None:
+            raise ValueError('Either a `start` or a `period` is required.')
+
+        if start is None:
+            end_seconds = to_timestamp(end) if end is not None else _now()
+            start = end_seconds - parse_duration(period)
+            end = end_seconds
+
+        start_ms, end_ms = self._range(bar=bar, start=start, end=end)
+        conids = [str(conid) for conid in conids]
+
+        with self._lock:
+            ranges = []
+            for conid in conids:
+                gaps = subtract_ranges(start=start_ms, end=end_ms, ranges=self.coverage(conid=conid, bar=bar))
+                ranges += [(conid, gap_start / 1000.0, gap_end / 1000.0) for gap_start, gap_end in gaps]
+
+            if ranges:
+                self._fill(ranges=ranges, bar=bar, outside_rth=outside_rth)
+
+        return {conid: self.load(conid=conid, bar=bar, start=start_ms / 1000.0, end=end_ms / 1000.0) for conid in conids}
+
+    def write(self, bars: Bars, start: Union[datetime.datetime, float] = None,
+              end: Union[datetime.datetime, float] = None) -> None:
+        """Stores bars and marks their range as downloaded.
+
+        Bars after the last stored bar are appended, the others are merged
+        into the series, replacing stored bars with the same time.
+
+        Arguments:
+        ----
+        bars {Bars} -- The bars.
+
+        Keyword Arguments:
+        ----
+        start {Union[datetime.datetime, float]} -- The start of the downloaded range. (default: {the first bar})
+
+        end {Union[datetime.datetime, float]} -- The end of the downloaded range. (default: {after the last bar})
+        """
+
+        conid, bar = str(bars.conid), bars.bar
+        bar_ms = parse_duration(bar) * 1000
+
+        with self._lock:
+            meta = self._meta(conid=conid, bar=bar)
+            count = meta['count']
+            committed = generation = meta.get('generation', 0)
+
+            if len(bars):
+                folder = self.path(conid=conid, bar=bar)
+                folder.mkdir(parents=True, exist_ok=True)
+
+                last = self._last_time(conid=conid, bar=bar, count=count, generation=generation)
+
+                if last is None or bars.time[0] > last:
+                    self._append(folder=folder, bars=bars, count=count, generation=generation)
+                    count += len(bars)
+                else:
+                    generation += 1
+                    count = self._rewrite(folder=folder, bars=bars, count=count, generation=generation)
+
+            covered = []
+            if start is not None or len(bars):
+                covered_start = int(to_timestamp(start) * 1000) if start is not None else int(bars.time[0])
+                covered_end = int(to_timestamp(end) * 1000) if end is not None else int(bars.time[-1]) + bar_ms
+                covered.append((covered_start, covered_end))
+
+            meta['count'] = count
+            meta['generation'] = generation
+            meta['coverage'] = [list(covered) for covered in merge_ranges(self.coverage(conid=conid, bar=bar) + covered)]
+
+            self._save_meta(conid=conid, bar=bar, meta=meta)
+
+            if generation != committed:
+                self._collect(folder=self.path(conid=conid, bar=bar), generation=generation)
+
+    def delete(self, conid: str, bar: str) -> None:
+        """Removes a series."""
+
+        folder = self.path(conid=conid, bar=bar)
+
+        with self._lock:
+            if folder.exists():
+                for child in folder.iterdir():
+                    child.unlink()
+                folder.rmdir()
+
+    def _fill(self, ranges: List[Tuple[str, float, float]], bar: str, outside_rth: bool) -> None:
+        """Downloads missing ranges and stores them.
+
+        A range is only marked as downloaded if every request of its
+        contract succeeded, so a failure is retried by the next `get`.
+        """
+
+        if self.downloader is None:
+            raise ValueError('The store has no client to download the missing bars with.')
+
+        failed_before = len(self.downloader.failures)
+        results = self.downloader.download_ranges(ranges=ranges, bar=bar, outside_rth=outside_rth)
+        failed = {conid for conid, _, _ in self.downloader.failures[failed_before:]}
+
+        for (conid, start, end), bars in zip(ranges, results):
+            if conid in failed:
+                self.write(bars=bars)
+            else:
+                self.write(bars=bars, start=start, end=end)
+
+    def _range(self, bar: str, start: Union[datetime.datetime, float],
+               end: Union[datetime.datetime, float]) -> Tuple[int, int]:
+        bar_ms = parse_duration(bar) * 1000
+
+        start_ms = int(to_timestamp(start) * 1000)
+        end_ms = int((to_timestamp(end) if end is not None else _now()) * 1000)
+
+        return start_ms, end_ms // bar_ms * bar_ms
+
+    def _meta(self, conid: str, bar: str) -> Dict:
+        path = self.path(conid=conid, bar=bar).joinpath('meta.json')
+
+        if not path.exists():
+            return {'version': FORMAT_VERSION, 'conid': str(conid), 'bar': bar, 'count': 0, 'coverage': []}
+
+        return json.loads(path.read_text(encoding='utf-8'))
+
+    def _save_meta(self, conid: str, bar: str, meta: Dict) -> None:
+        """Writes `meta.json` atomically, it's the commit point of a write."""
+
+        folder = self.path(conid=conid, bar=bar)
+        folder.mkdir(parents=True, exist_ok=True)
+
+        temporary = folder.joinpath('meta.json.tmp')
+        temporary.write_text(json.dumps(meta), encoding='utf-8')
+        os.replace(temporary, folder.joinpath('meta.json'))
+
+    def _map(self, conid: str, bar: str, count: int, generation: int) -> Dict[str, 'np.ndarray']:
+        folder = self.path(conid=conid, bar=bar)
+
+        if count == 0:
+            return {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS}
+
+        return {
+            name: np.memmap(_column_path(folder, name, generation), dtype=dtype, mode='r', shape=(count,))
+            for name, dtype in COLUMNS
+        }
+
+    def _last_time(self, conid: str, bar: str, count: int, generation: int) -> int:
+        if count == 0:
+            return None
+
+        return int(self._map(conid=conid, bar=bar, count=count, generation=generation)['time'][-1])
+
+    def _append(self, folder: pathlib.Path, bars: Bars, count: int, generation: int) -> None:
+        for name, dtype in COLUMNS:
+            with open(_column_path(folder, name, generation), 'ab') as file:
+                # Drop what an interrupted write left after the last committed bar.
+                file.truncate(count * np.dtype(dtype).itemsize)
+                file.write(np.ascontiguousarray(getattr(bars, name), dtype=dtype).tobytes())
+
+    def _rewrite(self, folder: pathlib.Path, bars: Bars, count: int, generation: int) -> int:
+        """Writes the merged series as the column files of `generation`.
+
+        Nothing refers to the new files until `meta.json` is saved with
+        their generation, so a failure leaves the committed series intact.
+        """
+
+        stored = self._map(conid=bars.conid, bar=bars.bar, count=count, generation=generation - 1)
+
+        # New bars come first so `np.unique` keeps them over stored ones.
+        time = np.concatenate([bars.time, stored['time']])
+        time, index = np.unique(time, return_index=True)
+
+        for name, dtype in COLUMNS:
+            values = np.concatenate([np.asarray(getattr(bars, name), dtype=dtype), stored[name]])[index]
+            values.astype(dtype).tofile(_column_path(folder, name, generation))
+
+        return len(time)
+
+    def _collect(self, folder: pathlib.Path, generation: int) -> None:
+        """Removes the column files of every other generation, left by older or failed rewrites."""
+
+        current = {_column_path(folder, name, generation).name for name, _ in COLUMNS}
+
+        for child in folder.iterdir():
+            if child.name not in current and child.name.split('.')[0] in _COLUMN_NAMES:
+                try:
+                    child.unlink()
+                except OSError:
+                    # Still mapped by a reader on platforms that lock mapped files.
+                    pass
+
+
+def _column_path(folder: pathlib.Path, name: str, generation: int) -> pathlib.Path:
+    """Returns the file of a column, the first generation keeps the bare column name."""
+
+    return folder.joinpath(name if generation == 0 else '{}.{}'.format(name, generation))
+
+
+def _safe_name(value: str) -> str:
+    return re.sub(r'[^0-9A-Za-z_.-]+', '_', str(value))
+
+
+def _now() -> float:
+    return datetime.datetime.now(tz=datetime.timezone.utc).timestamp()
@@ -18,7 +18,14 @@ from typing import List
 from typing import Dict
 
 from urllib3.exceptions import InsecureRequestWarning
+from ibw import client_utils
+from ibw import exceptions
+from ibw import field_decoders
+from ibw import json_codec
 from ibw.clientportal import ClientPortal
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+from ibw.transport import get_transport
 
 urllib3.disable_warnings(category=InsecureRequestWarning)
 # http = urllib3.PoolManager(cert_reqs='CERT_REQUIRED', ca_certs=certifi.where())
@@ -32,11 +39,7 @@ else:
     # Handle target environment that doesn't support HTTPS verification
     ssl._create_default_https_context = _create_unverified_https_context
 
-logging.basicConfig(
-    filename='app.log',
-    format='%(levelname)s - %(name)s - %(message)s',
-    level=logging.DEBUG
-)
+logger = logging.getLogger(__name__)
 
 
 def get_localhost_name_ip(): 
@@ -45,9 +48,15 @@ def get_localhost_name_ip():
 
 class IBClient():
 
-    def __init__(self, username: str, account: str, client_gateway_path: str = None, is_server_running: bool = True) -> None:
+    def __init__(self, username: str, account: str, client_gateway_path: str = None, is_server_running: bool = True,
+                 transport: IBTransport = None, transport_config: TransportConfig = None,
+                 host: str = None, port: int = client_utils.DEFAULT_GATEWAY_PORT) -> None:
         """Initalizes a new instance of the IBClient Object.
 
+        Creating a client doesn't touch the network, the gateway host is
+        looked up on the first request and the Client Portal Gateway is only
+        downloaded by `provision_gateway()`, or when `connect()` starts it.
+
         Arguments:
         ----
         username {str} -- Your IB account username for either your paper or regular account.
@@ -58,6 +67,17 @@ class IBClient():
         ----
         password {str} -- Your IB account password for either your paper or regular account. (default:{""})
 
+        transport {IBTransport} -- The transport to send requests through, by default the
+            one shared by every client of the gateway. (default: {None})
+
+        transport_config {TransportConfig} -- The pool configuration used when the shared
+            transport is created. (default: {None})
+
+        host {str} -- The gateway host, looked up from this machine's host name
+            on first use if `None`. (default: {None})
+
+        port {int} -- The gateway port. (default: {5000})
+
         Usage:
         ----
             >>> ib_paper_session = IBClient(
@@ -68,6 +88,7 @@ class IBClient():
             >>> ib_regular_session = IBClient(
                 username='IB_REGULAR_USERNAME',
                 account='IB_REGULAR_ACCOUNT',
+                host='127.0.0.1'
             )
             >>> ib_regular_session
         """
@@ -78,32 +99,26 @@ class IBClient():
 
         self.api_version = 'v1/'
         self._operating_system = sys.platform
-        self.session_state_path: pathlib.Path = pathlib.Path(__file__).parent.joinpath('server_session.json').resolve()
+        self.session_state_path: pathlib.Path = pathlib.Path(__file__).parent.joinpath('server_session.json')
         self.authenticated = False
         self._is_server_running = is_server_running
-        
-        # Define URL Components
-        self.localhost_ip = get_localhost_name_ip()        
-        ib_gateway_host = r"https://" + self.localhost_ip
-        ib_gateway_port = r"5000"
-        self.ib_gateway_path = ib_gateway_host + ":" + ib_gateway_port
+
+        # Define URL Components, the host is only looked up when first needed.
+        self.gateway = client_utils.GatewayAddress(host=host, port=port)
         self.backup_gateway_path = r"https://cdcdyn.interactivebrokers.com/portal.proxy"
-        self.login_gateway_path = self.ib_gateway_path + "/sso/Login?forwardTo=22&RL=1&ip2loc=on"
 
+        # Requests go through a pooled transport shared with every other
+        # client of the same gateway, unless one was given explicitly.
+        self._transport = transport
+        self._transport_config = transport_config
 
         if client_gateway_path is None:
 
             # Grab the Client Portal Path.
             self.client_portal_folder: pathlib.Path = pathlib.Path(__file__).parents[1].joinpath(
                 'resources/clientportal.beta.gw'
-            ).resolve()
-
-            # See if it exists.
-            if not self.client_portal_folder.exists():
-                print("The Client Portal Gateway doesn't exist. You need to download it before using the Library.")
-                print("Downloading the Client Portal file...")
-                self.client_portal_client.download_and_extract()
-                        
+            )
+
         else:
 
             self.client_portal_folder = client_gateway_path
@@ -114,24 +129,75 @@ class IBClient():
             self.server_process = self._server_state(action='load')
 
             # Log the initial Info.
-            logging.info(textwrap.dedent('''
-            =================
-            Initialize Client:
-            =================
-            Server Process: {serv_proc}
-            Operating System: {op_sys}
-            Session State Path: {state_path}
-            Client Portal Folder: {client_path}
-            ''').format(
-                    serv_proc=self.server_process,
-                    op_sys=self._operating_system,
-                    state_path=self.session_state_path,
-                    client_path=self.client_portal_folder
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(textwrap.dedent('''
+                =================
+                Initialize Client:
+                =================
+                Server Process: {serv_proc}
+                Operating System: {op_sys}
+                Session State Path: {state_path}
+                Client Portal Folder: {client_path}
+                ''').format(
+                        serv_proc=self.server_process,
+                        op_sys=self._operating_system,
+                        state_path=self.session_state_path,
+                        client_path=self.client_portal_folder
+                    )
                 )
-            )
         else:
             self.server_process = None
 
+    @property
+    def localhost_ip(self) -> str:
+        """The gateway host."""
+
+        return self.gateway.host
+
+    @property
+    def ib_gateway_path(self) -> str:
+        """The gateway root URL, e.g. `https://127.0.0.1:5000`."""
+
+        return self.gateway.path
+
+    @ib_gateway_path.setter
+    def ib_gateway_path(self, path: str) -> None:
+        self.gateway.path = path
+
+    @property
+    def login_gateway_path(self) -> str:
+        """The URL of the gateway's login page."""
+
+        return self.ib_gateway_path + "/sso/Login?forwardTo=22&RL=1&ip2loc=on"
+
+    def provision_gateway(self) -> pathlib.Path:
+        """Downloads and extracts the Client Portal Gateway if it's missing.
+
+        Returns:
+        ----
+        {pathlib.Path} -- The Client Portal Gateway folder.
+        """
+
+        client_portal_folder = pathlib.Path(self.client_portal_folder)
+
+        if not client_portal_folder.exists():
+            print("The Client Portal Gateway doesn't exist. You need to download it before using the Library.")
+            print("Downloading the Client Portal file...")
+            self.client_portal_client.download_and_extract()
+
+        return client_portal_folder
+
+    @property
+    def transport(self) -> IBTransport:
+        """The pooled transport used to talk to the gateway."""
+
+        if self._transport is None:
+            self._transport = get_transport(
+                gateway_path=self.ib_gateway_path,
+                config=self._transport_config
+            )
+
+        return self._transport
 
     def create_session(self, set_server=True) -> bool:
         """Creates a new session.
@@ -173,7 +239,7 @@ class IBClient():
         auth_response = self.is_authenticated()
 
         # Log the initial Info.
-        logging.info(textwrap.dedent('''
+        logger.info(textwrap.dedent('''
         =================
         Create Session:
         =================
@@ -217,7 +283,7 @@ class IBClient():
             if self.account in accounts:
 
                 # Log the response.
-                logging.debug(textwrap.dedent('''
+                logger.debug(textwrap.dedent('''
                 =================
                 Set Server:
                 =================
@@ -241,7 +307,7 @@ class IBClient():
             server_account_content = self.server_accounts()
 
             # Log the response.
-            logging.debug(textwrap.dedent('''
+            logger.debug(textwrap.dedent('''
             =================
             Set Server:
             =================
@@ -299,7 +365,7 @@ class IBClient():
         file_exists = self.session_state_path.exists()
 
         # Log the response.
-        logging.debug(textwrap.dedent('''
+        logger.debug(textwrap.dedent('''
         =================
         Server State:
         =================
@@ -372,7 +438,7 @@ class IBClient():
                     if str(process_id) in process:
 
                         # Log the response.
-                        logging.debug(textwrap.dedent('''
+                        logger.debug(textwrap.dedent('''
                             =================
                             Server Process:
                             =================
@@ -416,7 +482,7 @@ class IBClient():
                 auth_response = self.is_authenticated(check=True)
 
             # Log the Auth Response.
-            logging.debug('Check User Auth Inital: {auth_resp}'.format(
+            logger.debug('Check User Auth Inital: {auth_resp}'.format(
                     auth_resp=auth_response
                 )
             )
@@ -440,7 +506,7 @@ class IBClient():
                         self.authenticated = True
 
                         # Log the response.
-                        logging.debug('Had to do Server Account Request: {auth_resp}'.format(
+                        logger.debug('Had to do Server Account Request: {auth_resp}'.format(
                                 auth_resp=serv_resp
                             )
                         )
@@ -448,7 +514,7 @@ class IBClient():
                 except:
                     pass
 
-                logging.debug(
+                logger.debug(
                     '''
                     Validate Response: {valid_resp}
                     Reauth Response: {reauth_resp}
@@ -474,7 +540,7 @@ class IBClient():
         auth_response = self.is_authenticated(check=True)
 
         # Log the Auth response.
-        logging.debug('Check Non-User Auth Inital: {auth_resp}'.format(
+        logger.debug('Check Non-User Auth Inital: {auth_resp}'.format(
                 auth_resp=auth_response
             )
         )
@@ -523,11 +589,11 @@ class IBClient():
         bool -- `True` if it was connected.
         """
 
-        logging.debug('Running Client Folder at: {file_path}'.format(
-            file_path=self.client_portal_folder))
+        logger.debug('Running Client Folder at: %s', self.client_portal_folder)
 
         # If needed, start the server and save the State.
         if start_server:
+            self.provision_gateway()
             self._start_server()
             self._server_state(action='save')
 
@@ -626,7 +692,8 @@ class IBClient():
             ) + r'portal/' + endpoint
         )
 
-    def _make_request(self, endpoint: str, req_type: str, headers: str = 'json', params: dict = None, data: dict = None, json: dict = None) -> Dict:
+    def _make_request(self, endpoint: str, req_type: str, headers: str = 'json', params: dict = None, data: dict = None, json: dict = None,
+                      response_format: str = 'json') -> Dict:
         """Handles the request to the client.
 
         Handles all the requests made by the client and correctly organizes
@@ -644,6 +711,9 @@ class IBClient():
             could be parameters of a 'GET' request, or a data payload of a
             'POST' request.
 
+        response_format {str} -- How the response is returned, one of ['json','raw','lazy'].
+            `raw` returns the undecoded bytes and `lazy` a view parsed on first access.
+
         Returns:
         ----
         {Dict} -- A response dictionary.
@@ -652,53 +722,72 @@ class IBClient():
         # First build the url.
         url = self._build_url(endpoint=endpoint)
 
+        # Identical GETs in flight at the same time share one round trip.
+        key = client_utils.coalescing_key(
+            transport=self.transport,
+            url=url,
+            req_type=req_type,
+            headers=headers,
+            params=params,
+            response_format=response_format
+        )
+
         # Define the headers.
         headers = self._headers(mode=headers)
 
-        # Make the request.
-        if req_type == 'POST':
-            response = requests.post(url=url, headers=headers, params=params, json=json, verify=False)
-        elif req_type == 'GET':
-            response = requests.get(url=url, headers=headers, params=params, json=json, verify=False)
-        elif req_type == 'DELETE':
-            response = requests.delete(url=url, headers=headers, params=params, json=json, verify=False)
-
-        # grab the status code
-        status_code = response.status_code
-
-        # grab the response headers.
-        response_headers = response.headers
-        
+        def send_request():
+
+            # Make the request.
+            response = self.transport.request(
+                method=req_type,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json
+            )
+
+            return self._process_response(url=url, response=response, response_format=response_format)
+
+        if key is None:
+            return send_request()
+
+        return self.transport.single_flight.do(key=key, function=send_request)
+
+    def _process_response(self, url: str, response: requests.Response, response_format: str = 'json') -> Dict:
+        """Processes the response from the gateway.
+
+        Arguments:
+        ----
+        url {str} -- The URL the request was sent to.
+
+        response {requests.Response} -- The response object, or any object
+            exposing the same `ok`, `status_code`, `headers` and `content` members.
+
+        response_format {str} -- One of ['json','raw','lazy']. (default: {'json'})
+
+        Raises:
+        ----
+        IBHTTPError -- The typed error matching the status, carrying the
+            status code and the decoded body.
+
+        Returns:
+        ----
+        {Dict} -- A response dictionary.
+        """
+
         # Check to see if it was successful
         if response.ok:
-
-            if response_headers.get('Content-Type','null') == 'application/json;charset=utf-8':
-                data = response.json()
-            else:
-                data = response.json()
-
-            # Log it.
-            logging.debug('''
-            Response Text: {resp_text}
-            Response URL: {resp_url}
-            Response Code: {resp_code}
-            Response JSON: {resp_json}
-            Response Headers: {resp_headers}
-            '''.format(
-                    resp_text=response.text,
-                    resp_url=response.url,
-                    resp_code=status_code,
-                    resp_json=data,
-                    resp_headers=response_headers
-                )
+            return json_codec.decode_response(
+                content=response.content,
+                response_format=response_format
             )
 
-            return data
+        # Selecting the account that is already selected is rejected, which
+        # is harmless, so `update_server_account` returns `None` instead.
+        if response.status_code < 500 and urllib.parse.urlsplit(url).path.endswith('/portal/iserver/account'):
+            return None
 
-        # if it was a bad request print it out.
-        elif not response.ok and url != 'https://'+ self.localhost_ip + ':5000/v1/portal/iserver/account':
-            print(url)
-            raise requests.HTTPError()
+        raise exceptions.from_response(url=url, response=response)
 
     def _prepare_arguments_list(self, parameter_list: List[str]) -> str:
         """Prepares the arguments for the request.
@@ -845,7 +934,7 @@ class IBClient():
 
         return content
 
-    def _fundamentals_summary(self, conid: str) -> Dict:
+    def _fundamentals_summary(self, conid: str, response_format: str = 'json') -> Dict:
         """Grabs a financial summary of a company.
 
         Return a financial summary for specific Contract ID. The financial summary
@@ -855,6 +944,10 @@ class IBClient():
         ----        
         conid {str} -- The contract ID.
 
+        response_format {str} -- How the response is returned, one of ['json','raw','lazy'].
+            `raw` returns the undecoded bytes and `lazy` a view parsed on first access.
+            (default: {'json'})
+
         Returns:
         ----
         {Dict} -- The response dictionary.
@@ -865,12 +958,13 @@ class IBClient():
         req_type = 'GET'
         content = self._make_request(
             endpoint=endpoint,
-            req_type=req_type
+            req_type=req_type,
+            response_format=response_format
         )
 
         return content
 
-    def _fundamentals_financials(self, conid: str, financial_statement: str, period: str = 'annual') -> Dict:
+    def _fundamentals_financials(self, conid: str, financial_statement: str, period: str = 'annual', response_format: str = 'json') -> Dict:
         """Grabs fundamental financial data.
 
         Overview:
@@ -888,6 +982,10 @@ class IBClient():
         period (str, optional): The specific period you wish to see. 
             Possible values are ['annual','quarter']. Defaults to 'annual'.
 
+        response_format (str, optional): How the response is returned, one of
+            ['json','raw','lazy']. `raw` returns the undecoded bytes and `lazy` a view
+            parsed on first access. Defaults to 'json'.
+
         Returns:
         ----
         Dict: Financial data for the specified contract ID.
@@ -911,17 +1009,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _fundamentals_key_ratios(self, conid: str) -> Dict:
+    def _fundamentals_key_ratios(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
             NAME: conid
             DESC: The contract ID.
             TYPE: String
+
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
         """
 
         # Build the arguments.
@@ -935,17 +1039,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _fundamentals_dividends(self, conid: str) -> Dict:
+    def _fundamentals_dividends(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
         NAME: conid
         DESC: The contract ID.
         TYPE: String
+
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
         """
 
         # Build the arguments.
@@ -959,12 +1069,13 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _fundamentals_esg(self, conid: str) -> Dict:
+    def _fundamentals_esg(self, conid: str, response_format: str = 'json') -> Dict:
         """
             Returns analyst ratings for a specific conid.
 
@@ -972,6 +1083,11 @@ class IBClient():
             DESC: The contract ID.
             TYPE: String
 
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
         """
 
         # Build the arguments.
@@ -985,12 +1101,13 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _data_news(self, conid: str) -> Dict:
+    def _data_news(self, conid: str, response_format: str = 'json') -> Dict:
         """
             Return a financial summary for specific Contract ID. The financial summary
             includes key ratios and descriptive components of the Contract ID.
@@ -998,6 +1115,11 @@ class IBClient():
             NAME: conid
             DESC: The contract ID.
             TYPE: String
+
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
         """
 
         # Build the arguments.
@@ -1012,17 +1134,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _data_ratings(self, conid: str) -> Dict:
+    def _data_ratings(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
         NAME: conid
         DESC: The contract ID.
         TYPE: String
+
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
         """
 
         # Build the arguments.
@@ -1036,17 +1164,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _data_events(self, conid: str) -> Dict:
+    def _data_events(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
         NAME: conid
         DESC: The contract ID.
         TYPE: String
+
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
         """
 
         # Build the arguments.
@@ -1060,17 +1194,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _data_ownership(self, conid: str) -> Dict:
+    def _data_ownership(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
         NAME: conid
         DESC: The contract ID.
         TYPE: String
+
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
         """
 
         # Build the arguments.
@@ -1084,17 +1224,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _data_competitors(self, conid: str) -> Dict:
+    def _data_competitors(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
         NAME: conid
         DESC: The contract ID.
         TYPE: String
+
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
         """
 
         # Build the arguments.
@@ -1108,17 +1254,23 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def _data_analyst_forecast(self, conid: str) -> Dict:
+    def _data_analyst_forecast(self, conid: str, response_format: str = 'json') -> Dict:
         """Returns analyst ratings for a specific conid.
 
         NAME: conid
         DESC: The contract ID.
         TYPE: String
+
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
         """
 
         # Build the arguments.
@@ -1132,12 +1284,14 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
 
-    def market_data(self, conids: List[str], since: str, fields: List[str]) -> Dict:
+    def market_data(self, conids: List[str], since: str, fields: List[str], response_format: str = 'json',
+                    validate: bool = True, decode: bool = False) -> Dict:
         """
             Get Market Data for the given conid(s). The end-point will return by 
             default bid, ask, last, change, change pct, close, listing exchange. 
@@ -1158,6 +1312,23 @@ class IBClient():
             NAME: fields
             DESC: List of fields you wish to retrieve for each quote.
             TYPE: List<String>
+
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
+            NAME: validate
+            DESC: Check the fields against `ibw.fields` before sending the request, resolving
+                  names and raising a `ValueError` for a field that's neither a number nor a
+                  known name. Numeric fields missing from the registry are sent with a warning.
+                  Defaults to True.
+            TYPE: Boolean
+
+            NAME: decode
+            DESC: Convert the values of every field to numbers, by the type of the field, see
+                  `field_decoders.decode_message`. Only applies to the 'json' format. Defaults to False.
+            TYPE: Boolean
         """
 
         # define request components
@@ -1167,8 +1338,10 @@ class IBClient():
         # join the two list arguments so they are both a single string.
         conids_joined = self._prepare_arguments_list(parameter_list=conids)
 
-        if fields is not None:
-            fields_joined = ",".join(str(n) for n in fields)
+        if fields is not None and validate:
+            fields_joined = ",".join(field_decoders.validate_fields(fields=fields))
+        elif fields is not None:
+            fields_joined = ",".join(field_decoders.field_ids(fields=fields))
         else:
             fields_joined = ""
 
@@ -1188,12 +1361,17 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
+        if decode and response_format == 'json':
+            return field_decoders.decode_response(content=content)
+
         return content
 
-    def market_data_history(self, conid: str, period: str, bar: str) -> Dict:
+    def market_data_history(self, conid: str, period: str, bar: str, response_format: str = 'json',
+                            start_time: str = None, outside_rth: bool = None) -> Dict:
         """
             Get history of market Data for the given conid, length of data is controlled by period and 
             bar. e.g. 1y period with bar=1w returns 52 data points.
@@ -1212,6 +1390,20 @@ class IBClient():
             DESC: Specifies granularity of data. For example, if bar = '1h' the data will be at an hourly level.
                   Possible values are ['5min','1h','1w']
             TYPE: String
+
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
+            NAME: start_time
+            DESC: The UTC time the period looks back from, formatted as 'YYYYMMDD-HH:MM:SS'.
+                  Defaults to now.
+            TYPE: String
+
+            NAME: outside_rth
+            DESC: Set to `True` to include bars outside of regular trading hours.
+            TYPE: Boolean
         """
 
         # define request components
@@ -1223,10 +1415,17 @@ class IBClient():
             'bar': bar
         }
 
+        if start_time is not None:
+            params['startTime'] = start_time
+
+        if outside_rth is not None:
+            params['outsideRth'] = 'true' if outside_rth else 'false'
+
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
@@ -1335,7 +1534,7 @@ class IBClient():
 
         return content
 
-    def contracts_definitions(self, conids: List[str]) -> Dict:
+    def contracts_definitions(self, conids: List[str], response_format: str = 'json') -> Dict:
         """
             Returns a list of security definitions for the given conids.
 
@@ -1343,6 +1542,11 @@ class IBClient():
             DESC: A list of contract IDs you wish to get details for.
             TYPE: List<Integer>
 
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
             RTYPE: Dictionary
         """
 
@@ -1356,12 +1560,13 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            json=payload
+            json=payload,
+            response_format=response_format
         )
 
         return content
 
-    def futures_search(self, symbols: List[str]) -> Dict:
+    def futures_search(self, symbols: List[str], response_format: str = 'json') -> Dict:
         """
             Returns a list of non-expired future contracts for given symbol(s).
 
@@ -1369,6 +1574,11 @@ class IBClient():
             DESC: List of case-sensitive symbols separated by comma.
             TYPE: List<String>
 
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
             RTYPE: Dictionary
         """
 
@@ -1382,7 +1592,8 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
@@ -1410,6 +1621,104 @@ class IBClient():
 
         return content
 
+    def secdef_strikes(self, conid: str, month: str, sec_type: str = 'OPT', exchange: str = 'SMART') -> Dict:
+        """
+            Returns the strikes of the options or warrants of an underlying for a contract month.
+
+            NAME: conid
+            DESC: The contract ID of the underlying.
+            TYPE: String
+
+            NAME: month
+            DESC: The contract month, e.g. `JAN23`, from the `sections` of a symbol search.
+            TYPE: String
+
+            NAME: sec_type
+            DESC: The security type, one of ['OPT', 'WAR']. Defaults to 'OPT'.
+            TYPE: String
+
+            NAME: exchange
+            DESC: The exchange. Defaults to 'SMART'.
+            TYPE: String
+
+            RTYPE: Dictionary
+        """
+
+        # Define the request components.
+        endpoint = 'iserver/secdef/strikes'
+        req_type = 'GET'
+        params = {
+            'conid': conid,
+            'sectype': sec_type,
+            'month': month,
+            'exchange': exchange
+        }
+
+        content = self._make_request(
+            endpoint=endpoint,
+            req_type=req_type,
+            params=params
+        )
+
+        return content
+
+    def secdef_info(self, conid: str, month: str, strike: float = None, right: str = None,
+                    sec_type: str = 'OPT', exchange: str = 'SMART') -> List[Dict]:
+        """
+            Returns the derivative contracts of an underlying for a contract month,
+            strike and right, with their contract IDs and maturity dates.
+
+            NAME: conid
+            DESC: The contract ID of the underlying.
+            TYPE: String
+
+            NAME: month
+            DESC: The contract month, e.g. `JAN23`.
+            TYPE: String
+
+            NAME: strike
+            DESC: The strike, required for options and warrants.
+            TYPE: Float
+
+            NAME: right
+            DESC: The right, one of ['C', 'P'].
+            TYPE: String
+
+            NAME: sec_type
+            DESC: The security type, one of ['OPT', 'FOP', 'WAR']. Defaults to 'OPT'.
+            TYPE: String
+
+            NAME: exchange
+            DESC: The exchange. Defaults to 'SMART'.
+            TYPE: String
+
+            RTYPE: List<Dictionary>
+        """
+
+        # Define the request components.
+        endpoint = 'iserver/secdef/info'
+        req_type = 'GET'
+        params = {
+            'conid': conid,
+            'sectype': sec_type,
+            'month': month,
+            'exchange': exchange
+        }
+
+        if strike is not None:
+            params['strike'] = strike
+
+        if right is not None:
+            params['right'] = right
+
+        content = self._make_request(
+            endpoint=endpoint,
+            req_type=req_type,
+            params=params
+        )
+
+        return content
+
     def portfolio_accounts(self):
         """
             In non-tiered account structures, returns a list of accounts for which the 
@@ -1808,6 +2117,51 @@ class IBClient():
 
         return content
 
+    def suppress_questions(self, message_ids: List[str]) -> Dict:
+        """
+            Suppresses order reply questions for the rest of the session, so orders that would
+            ask them are submitted without a `place_order_reply` round trip.
+
+            NAME: message_ids
+            DESC: The `messageIds` of the questions, e.g. `['o163', 'o451']`.
+            TYPE: List<String>
+
+            RTYPE: Dictionary
+        """
+
+        # Define the request components.
+        endpoint = 'iserver/questions/suppress'
+        req_type = 'POST'
+        payload = {
+            'messageIds': message_ids
+        }
+
+        content = self._make_request(
+            endpoint=endpoint,
+            req_type=req_type,
+            json=payload
+        )
+
+        return content
+
+    def reset_suppressed_questions(self) -> Dict:
+        """
+            Asks every order reply question suppressed with `suppress_questions` again.
+
+            RTYPE: Dictionary
+        """
+
+        # Define the request components.
+        endpoint = 'iserver/questions/suppress/reset'
+        req_type = 'POST'
+
+        content = self._make_request(
+            endpoint=endpoint,
+            req_type=req_type
+        )
+
+        return content
+
     def modify_order(self, account_id: str, customer_order_id: str, order: dict) -> Dict:
         """
             Modifies an open order. The /iserver/accounts endpoint must first
@@ -1866,9 +2220,14 @@ class IBClient():
 
         return content
 
-    def get_scanners(self):
+    def get_scanners(self, response_format: str = 'json'):
         """Returns an object contains four lists contain all parameters for scanners.
 
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
+
         RTYPE Dictionary
         """
         # define request components
@@ -1876,12 +2235,13 @@ class IBClient():
         req_type = 'GET'
         content = self._make_request(
             endpoint=endpoint,
-            req_type=req_type
+            req_type=req_type,
+            response_format=response_format
         )
 
         return content
 
-    def run_scanner(self, instrument: str, scanner_type: str, location: str, size: str = '25', filters: List[dict] = None) -> Dict:
+    def run_scanner(self, instrument: str, scanner_type: str, location: str, size: str = '25', filters: List[dict] = None, response_format: str = 'json') -> Dict:
         """Run a scanner to get a list of contracts.
 
         NAME: instrument
@@ -1905,6 +2265,11 @@ class IBClient():
             for that filter.
         TYPE: List<Dictionaries>
 
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
+
         RTYPE Dictionary
         """
 
@@ -1922,7 +2287,8 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            json=payload
+            json=payload,
+            response_format=response_format
         )
 
         return content
@@ -2057,13 +2423,18 @@ class IBClient():
 
         return content
 
-    def mutual_funds_portfolios_and_fees(self, conid: str) -> Dict:
+    def mutual_funds_portfolios_and_fees(self, conid: str, response_format: str = 'json') -> Dict:
         """Grab the Fees and objectives for a specified mutual fund.
 
         NAME: conid
         DESC: The Contract ID for the mutual fund.
         TYPE: String
 
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
+
         RTYPE Dictionary
         """
 
@@ -2073,12 +2444,13 @@ class IBClient():
         req_type = 'GET'
         content = self._make_request(
             endpoint=endpoint,
-            req_type=req_type
+            req_type=req_type,
+            response_format=response_format
         )
 
         return content
 
-    def mutual_funds_performance(self, conid: str, risk_period: str, yield_period: str, statistic_period: str) -> Dict:
+    def mutual_funds_performance(self, conid: str, risk_period: str, yield_period: str, statistic_period: str, response_format: str = 'json') -> Dict:
         """Grab the Lip Rating for a specified mutual fund.
 
         NAME: conid
@@ -2100,6 +2472,11 @@ class IBClient():
                 possible values: ['6M', '1Y', '3Y', '5Y', '10Y']
         TYPE: String
 
+        NAME: response_format
+        DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+              the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+        TYPE: String
+
         RTYPE Dictionary
         """
 
@@ -2115,7 +2492,8 @@ class IBClient():
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
@@ -0,0 +1,184 @@
+import asyncio
+import functools
+from typing import Dict
+
+from ibw import client_utils
+from ibw.client import IBClient
+from ibw.transport import TransportConfig
+from ibw.transport_async import AsyncIBTransport
+
+
+class AsyncIBClient(IBClient):
+
+    def __init__(self, username: str, account: str, client_gateway_path: str = None,
+                 is_server_running: bool = True, transport: AsyncIBTransport = None,
+                 transport_config: TransportConfig = None, host: str = None,
+                 port: int = client_utils.DEFAULT_GATEWAY_PORT, max_concurrency: int = 100) -> None:
+        """Initalizes a new instance of the AsyncIBClient Object.
+
+        Exposes the same endpoints as `IBClient`, with the same names and
+        arguments, but every endpoint returns an awaitable. All requests run
+        on the calling event loop, through one pooled `aiohttp` session,
+        and at most `max_concurrency` of them are in flight at once.
+
+        The gateway session itself is shared by every client of the gateway,
+        `create_session()` sets it up without blocking the event loop.
+
+        Arguments:
+        ----
+        username {str} -- Your IB account username for either your paper or regular account.
+
+        account {str} -- Your IB account number for either your paper or regular account.
+
+        Keyword Arguments:
+        ----
+        transport {AsyncIBTransport} -- The transport to send requests through. (default: {None})
+
+        transport_config {TransportConfig} -- The pool configuration used when the
+            transport is created. (default: {None})
+
+        host {str} -- The gateway host, looked up from this machine's host name
+            on first use if `None`. (default: {None})
+
+        port {int} -- The gateway port. (default: {5000})
+
+        max_concurrency {int} -- The maximum number of requests in flight. (default: {100})
+
+        Usage:
+        ----
+            >>> async with AsyncIBClient(username='IB_USERNAME', account='IB_ACCOUNT') as ib_client:
+                    quotes = await asyncio.gather(
+                        *[ib_client.market_data(conids=[conid], since=None, fields=['31']) for conid in conids]
+                    )
+        """
+
+        self.max_concurrency = max_concurrency
+
+        super().__init__(
+            username=username,
+            account=account,
+            client_gateway_path=client_gateway_path,
+            is_server_running=is_server_running,
+            transport=transport,
+            transport_config=transport_config,
+            host=host,
+            port=port
+        )
+
+    @property
+    def transport(self) -> AsyncIBTransport:
+        """The asyncio transport used to talk to the gateway."""
+
+        if self._transport is None:
+            self._transport = AsyncIBTransport(
+                config=self._transport_config,
+                max_concurrency=self.max_concurrency
+            )
+
+        return self._transport
+
+    async def create_session(self, set_server=True) -> bool:
+        """Creates a new session.
+
+        Session set up is blocking and may prompt for a login, so it runs
+        `IBClient.create_session()` for the same user and gateway in the
+        default executor, keeping the event loop free.
+
+        Usage:
+        ----
+            >>> async with AsyncIBClient(username='IB_USERNAME', account='IB_ACCOUNT') as ib_client:
+                    await ib_client.create_session()
+
+        Returns:
+        ----
+        bool -- True if the session was created, False if wasn't created.
+        """
+
+        client = IBClient(
+            username=self.username,
+            account=self.account,
+            client_gateway_path=self.client_portal_folder,
+            is_server_running=self._is_server_running,
+            transport_config=self._transport_config
+        )
+        client.ib_gateway_path = self.ib_gateway_path
+        client.server_process = self.server_process
+
+        loop = asyncio.get_running_loop()
+        created = await loop.run_in_executor(None, functools.partial(client.create_session, set_server=set_server))
+
+        self.server_process = client.server_process
+        self.authenticated = client.authenticated
+
+        return created
+
+    async def _make_request(self, endpoint: str, req_type: str, headers: str = 'json', params: dict = None, data: dict = None, json: dict = None,
+                            response_format: str = 'json') -> Dict:
+        """Handles the request to the client.
+
+        The asyncio counterpart of `IBClient._make_request`. Because every
+        endpoint returns the result of this method, it makes each of them
+        return an awaitable.
+
+        Arguments:
+        ----
+        endpoint {str} -- The endpoint we wish to request.
+
+        req_type {str} --  Defines the type of request to be made. Can be one of four
+            possible values ['GET','POST','DELETE','PUT']
+
+        params {dict} -- Any arguments that are to be sent along in the request.
+
+        json {dict} -- The JSON payload of a 'POST' request.
+
+        response_format {str} -- How the response is returned, one of ['json','raw','lazy'].
+
+        Returns:
+        ----
+        {Dict} -- A response dictionary.
+        """
+
+        # First build the url.
+        url = self._build_url(endpoint=endpoint)
+
+        # Identical GETs in flight at the same time share one round trip.
+        key = client_utils.coalescing_key(
+            transport=self.transport,
+            url=url,
+            req_type=req_type,
+            headers=headers,
+            params=params,
+            response_format=response_format
+        )
+
+        # Define the headers.
+        headers = self._headers(mode=headers)
+
+        async def send_request():
+
+            # Make the request.
+            response = await self.transport.request(
+                method=req_type,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json
+            )
+
+            return self._process_response(url=url, response=response, response_format=response_format)
+
+        if key is None:
+            return await send_request()
+
+        return await self.transport.single_flight.do(key=key, function=send_request)
+
+    async def close(self) -> None:
+        """Closes the transport and every pooled connection."""
+
+        await self.transport.close()
+
+    async def __aenter__(self) -> 'AsyncIBClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
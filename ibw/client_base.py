@@ -7,29 +7,65 @@ import urllib3
 from urllib3.exceptions import InsecureRequestWarning
 
 from . import client_utils
+from . import exceptions
+from . import json_codec
+from . import transport as ib_transport
 
 urllib3.disable_warnings(category=InsecureRequestWarning)
 
-logging.basicConfig(
-    filename='app.log',
-    format='%(levelname)s - %(name)s - %(message)s',
-    level=logging.DEBUG
-)
+logger = logging.getLogger(__name__)
 
 
 class IBBase:
 
-    def __init__(self) -> None:
+    def __init__(self, transport: ib_transport.IBTransport = None,
+                 transport_config: ib_transport.TransportConfig = None,
+                 host: str = None, port: int = client_utils.DEFAULT_GATEWAY_PORT) -> None:
         self.api_version = 'v1/'
 
-        # Define URL Components
-        self.localhost_ip = client_utils.get_localhost_name_ip()
-        ib_gateway_host = r"https://" + self.localhost_ip
-        ib_gateway_port = r"5000"
-        self.ib_gateway_path = ib_gateway_host + ":" + ib_gateway_port
+        # Define URL Components, the host is only looked up when first needed.
+        self.gateway = client_utils.GatewayAddress(host=host, port=port)
         self.backup_gateway_path = r"https://cdcdyn.interactivebrokers.com/portal.proxy"
-        self.login_gateway_path = self.ib_gateway_path + "/sso/Login?forwardTo=22&RL=1&ip2loc=on"
-        
+
+        # Requests go through a pooled transport shared with every other
+        # client of the same gateway, unless one was given explicitly.
+        self._transport = transport
+        self._transport_config = transport_config
+
+    @property
+    def localhost_ip(self) -> str:
+        """The gateway host."""
+
+        return self.gateway.host
+
+    @property
+    def ib_gateway_path(self) -> str:
+        """The gateway root URL, e.g. `https://127.0.0.1:5000`."""
+
+        return self.gateway.path
+
+    @ib_gateway_path.setter
+    def ib_gateway_path(self, path: str) -> None:
+        self.gateway.path = path
+
+    @property
+    def login_gateway_path(self) -> str:
+        """The URL of the gateway's login page."""
+
+        return self.ib_gateway_path + "/sso/Login?forwardTo=22&RL=1&ip2loc=on"
+
+    @property
+    def transport(self) -> ib_transport.IBTransport:
+        """The pooled transport used to talk to the gateway."""
+
+        if self._transport is None:
+            self._transport = ib_transport.get_transport(
+                gateway_path=self.ib_gateway_path,
+                config=self._transport_config
+            )
+
+        return self._transport
+
     def symbol_search(self, symbol: str) -> Dict:
         """
             Performs a symbol search for a given symbol and returns 
@@ -103,7 +139,7 @@ class IBBase:
 
     def _make_request(self, endpoint: str, req_type: str,
                       headers: str = 'json', params: dict = None,
-                      json: dict = None) -> Dict:
+                      json: dict = None, response_format: str = 'json') -> Dict:
         """Handles the request to the client.
 
         Handles all the requests made by the client and correctly organizes
@@ -121,6 +157,9 @@ class IBBase:
             could be parameters of a 'GET' request, or a data payload of a
             'POST' request.
 
+        response_format {str} -- How the response is returned, one of ['json','raw','lazy'].
+            `raw` returns the undecoded bytes and `lazy` a view parsed on first access.
+
         Returns:
         ----
         {Dict} -- A response dictionary.
@@ -129,50 +168,67 @@ class IBBase:
         # First build the url.
         url = self._build_url(endpoint=endpoint)
 
+        # Identical GETs in flight at the same time share one round trip.
+        key = client_utils.coalescing_key(
+            transport=self.transport,
+            url=url,
+            req_type=req_type,
+            headers=headers,
+            params=params,
+            response_format=response_format
+        )
+
         # Define the headers.
         headers = self._headers(mode=headers)
 
-        # Make the request.
-        if req_type == 'POST':
-            response = requests.post(url=url, headers=headers, params=params, json=json, verify=False)
-        elif req_type == 'GET':
-            response = requests.get(url=url, headers=headers, params=params, json=json, verify=False)
-        elif req_type == 'DELETE':
-            response = requests.delete(url=url, headers=headers, params=params, json=json, verify=False)
+        def send_request():
 
-        # grab the status code
-        status_code = response.status_code
+            # Make the request.
+            response = self.transport.request(
+                method=req_type,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json
+            )
 
-        # grab the response headers.
-        response_headers = response.headers
+            return self._process_response(url=url, response=response, response_format=response_format)
+
+        if key is None:
+            return send_request()
+
+        return self.transport.single_flight.do(key=key, function=send_request)
+
+    def _process_response(self, url: str, response: requests.Response, response_format: str = 'json') -> Dict:
+        """Processes the response from the gateway.
+
+        Arguments:
+        ----
+        url {str} -- The URL the request was sent to.
+
+        response {requests.Response} -- The response object.
+
+        response_format {str} -- One of ['json','raw','lazy']. (default: {'json'})
+
+        Raises:
+        ----
+        IBHTTPError -- The typed error matching the status.
+
+        Returns:
+        ----
+        {Dict} -- A response dictionary.
+        """
 
         # Check to see if it was successful
         if response.ok:
-
-            if response_headers.get('Content-Type', 'null') == 'application/json;charset=utf-8':
-                data = response.json()
-            else:
-                data = response.json()
-
-            # Log it.
-            logging.debug('''
-            Response Text: {resp_text}
-            Response URL: {resp_url}
-            Response Code: {resp_code}
-            Response JSON: {resp_json}
-            Response Headers: {resp_headers}
-            '''.format(
-                resp_text=response.text,
-                resp_url=response.url,
-                resp_code=status_code,
-                resp_json=data,
-                resp_headers=response_headers
-            )
+            return json_codec.decode_response(
+                content=response.content,
+                response_format=response_format
             )
 
-            return data
+        # Selecting the account that is already selected is rejected, which
+        # is harmless, so `update_server_account` returns `None` instead.
+        if response.status_code < 500 and urllib.parse.urlsplit(url).path.endswith('/portal/iserver/account'):
+            return None
 
-        # if it was a bad request print it out.
-        elif not response.ok and url != 'https://' + self.localhost_ip + ':5000/v1/portal/iserver/account':
-            print(url)
-            raise requests.HTTPError()
+        raise exceptions.from_response(url=url, response=response)
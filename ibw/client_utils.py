@@ -1,6 +1,117 @@
+import functools
 import socket
 
+from . import single_flight
+
+DEFAULT_GATEWAY_PORT = 5000
+
+
 def get_localhost_name_ip():
     return socket.gethostbyname(socket.gethostname() + '.local')
-    
 
+
+@functools.lru_cache(maxsize=None)
+def resolve_localhost() -> str:
+    """Resolves the address of this machine, once per process.
+
+    The host name is tried first since it's normally answered from the hosts
+    file, then the `.local` name, which goes through mDNS and can take
+    seconds, and finally the loopback address.
+
+    Returns:
+    ----
+    {str} -- The IP address of this machine.
+    """
+
+    hostname = socket.gethostname()
+
+    for name in (hostname, hostname + '.local'):
+        try:
+            return socket.gethostbyname(name)
+        except OSError:
+            continue
+
+    return '127.0.0.1'
+
+
+def coalescing_key(transport, url: str, req_type: str, headers: str, params: dict, response_format: str) -> tuple:
+    """Returns the key identical requests share, `None` if the request can't be shared.
+
+    Only GET requests are shared, and only if the transport coalesces. Every
+    client builds its keys here, so the same GET is shared by all of them.
+
+    Arguments:
+    ----
+    transport {Union[IBTransport, AsyncIBTransport]} -- The transport sending the request.
+
+    url {str} -- The full URL of the request.
+
+    req_type {str} -- The HTTP method.
+
+    headers {str} -- The header mode, one of ['json','form'].
+
+    params {dict} -- The query string parameters.
+
+    response_format {str} -- How the response is returned.
+
+    Returns:
+    ----
+    {tuple} -- The key, or `None`.
+    """
+
+    if req_type != 'GET' or getattr(transport, 'single_flight', None) is None:
+        return None
+
+    return single_flight.request_key(
+        method=req_type,
+        url=url,
+        params=params,
+        extra=(headers, response_format)
+    )
+
+
+class GatewayAddress():
+
+    def __init__(self, host: str = None, port: int = DEFAULT_GATEWAY_PORT, scheme: str = 'https') -> None:
+        """Initalizes a new instance of the GatewayAddress Object.
+
+        Where the Client Portal Gateway listens. When no host is given it is
+        resolved the first time it's needed, not when the client is created,
+        and the lookup is shared by every client in the process.
+
+        Keyword Arguments:
+        ----
+        host {str} -- The gateway host, e.g. `localhost` or `127.0.0.1`. Looked
+            up from this machine's host name if `None`. (default: {None})
+
+        port {int} -- The gateway port. (default: {5000})
+
+        scheme {str} -- The URL scheme. (default: {'https'})
+        """
+
+        self._host = host
+        self.port = port
+        self.scheme = scheme
+        self._path = None
+
+    @property
+    def host(self) -> str:
+        """The gateway host, resolved on first access if it wasn't given."""
+
+        if self._host is None:
+            self._host = resolve_localhost()
+
+        return self._host
+
+    @property
+    def path(self) -> str:
+        """The gateway root URL, e.g. `https://127.0.0.1:5000`."""
+
+        if self._path is None:
+            return '{scheme}://{host}:{port}'.format(scheme=self.scheme, host=self.host, port=self.port)
+
+        return self._path
+
+    @path.setter
+    def path(self, path: str) -> None:
+        self._path = path
@@ -0,0 +1,581 @@
+import bisect
+import difflib
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from . import json_codec
+from .contract_resolver import BulkResolver
+
+logger = logging.getLogger(__name__)
+
+# The version of the layout of a saved master.
+FORMAT_VERSION = 1
+
+_FIELDS = (
+    'conid', 'symbol', 'sec_type', 'exchange', 'currency', 'name', 'description',
+    'underlying_conid', 'expiry', 'updated'
+)
+
+
+class Contract():
+
+    __slots__ = _FIELDS
+
+    def __init__(self, conid: int, symbol: str, sec_type: str = 'STK', exchange: str = None, currency: str = None,
+                 name: str = None, description: str = None, underlying_conid: int = None, expiry: str = None,
+                 updated: float = None) -> None:
+        """Initalizes a new instance of the Contract Object.
+
+        Arguments:
+        ----
+        conid {int} -- The contract ID.
+
+        symbol {str} -- The symbol, e.g. `AAPL`.
+
+        Keyword Arguments:
+        ----
+        sec_type {str} -- The security type, e.g. `STK` or `FUT`. (default: {'STK'})
+
+        exchange {str} -- The listing exchange. (default: {None})
+
+        currency {str} -- The currency. (default: {None})
+
+        name {str} -- The company or contract name. (default: {None})
+
+        description {str} -- The description the gateway sent. (default: {None})
+
+        underlying_conid {int} -- The underlying of a derivative. (default: {None})
+
+        expiry {str} -- The expiration date of a derivative, `YYYYMMDD`. (default: {None})
+
+        updated {float} -- When it was last received, in seconds since the epoch. (default: {now})
+        """
+
+        self.conid = int(conid)
+        self.symbol = symbol
+        self.sec_type = sec_type
+        self.exchange = exchange
+        self.currency = currency
+        self.name = name
+        self.description = description
+        self.underlying_conid = int(underlying_conid) if underlying_conid is not None else None
+        self.expiry = str(expiry) if expiry is not None else None
+        self.updated = updated if updated is not None else time.time()
+
+    def __repr__(self) -> str:
+        return '<Contract conid={} symbol={} sec_type={} exchange={}>'.format(
+            self.conid, self.symbol, self.sec_type, self.exchange
+        )
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Contract) and self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in _FIELDS}
+
+    @classmethod
+    def from_dict(cls, content: Dict) -> 'Contract':
+        return cls(**{field: content.get(field) for field in _FIELDS if field in content})
+
+
+class ContractMaster():
+
+    def __init__(self, client=None, path: Union[str, pathlib.Path] = None, autosave: bool = True,
+                 miss_ttl: float = 3600.0) -> None:
+        """Initalizes a new instance of the ContractMaster Object.
+
+        Answers symbol and contract ID lookups locally, from contracts
+        collected from the `iserver/secdef/search`, `trsrv/stocks`,
+        `trsrv/futures` and `trsrv/secdef` endpoints. Contracts are indexed
+        by symbol, security type and exchange for hash lookups, by sorted
+        symbols and names for prefix search, and by contract ID. A lookup
+        only goes to the gateway when the contract isn't known, and a symbol
+        the gateway doesn't know isn't asked for again for `miss_ttl` seconds.
+
+        Arguments:
+        ----
+        client {IBClient} -- The client used on a miss and to refresh. (default: {None})
+
+        Keyword Arguments:
+        ----
+        path {Union[str, pathlib.Path]} -- The JSON file the master is loaded
+            from and saved to. (default: {None})
+
+        autosave {bool} -- Save after contracts were received. (default: {True})
+
+        miss_ttl {float} -- The seconds a symbol the gateway didn't know is
+            answered as a miss without asking again. (default: {3600.0})
+
+        Usage:
+        ----
+            >>> master = ContractMaster(client=ib_client, path='data/contracts.json')
+            >>> master.refresh_stocks(symbols=['AAPL', 'MSFT'])
+            >>> master.resolve('AAPL').conid
+            >>> master.prefix('MS')
+        """
+
+        self.client = client
+        self.path = pathlib.Path(path) if path is not None else None
+        self.autosave = autosave
+        self.miss_ttl = miss_ttl
+
+        self._lock = threading.RLock()
+        self._by_conid: Dict[int, Contract] = {}
+        self._by_symbol: Dict[str, List[int]] = {}
+        self._misses: Dict[str, float] = {}
+
+        # Sorted `(key, conid)` pairs for prefix search, rebuilt lazily.
+        self._sorted_symbols: List[Tuple[str, int]] = None
+        self._sorted_names: List[Tuple[str, int]] = None
+
+        self.hits = 0
+        self.misses = 0
+        self.requests = 0
+
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._by_conid)
+
+    def __contains__(self, conid: Union[int, str]) -> bool:
+        return int(conid) in self._by_conid
+
+    def contracts(self) -> List[Contract]:
+        """Returns every known contract."""
+
+        with self._lock:
+            return list(self._by_conid.values())
+
+    def add(self, contracts: Iterable[Contract]) -> int:
+        """Adds or replaces contracts, by contract ID.
+
+        Returns:
+        ----
+        {int} -- The number of contracts added or replaced.
+        """
+
+        count = 0
+
+        with self._lock:
+            for contract in contracts:
+                previous = self._by_conid.get(contract.conid)
+                if previous is not None:
+                    self._unindex(previous)
+
+                self._by_conid[contract.conid] = contract
+                self._by_symbol.setdefault(_key(contract.symbol), []).append(contract.conid)
+                self._misses.pop(_key(contract.symbol), None)
+                count += 1
+
+            if count:
+                self._sorted_symbols = None
+                self._sorted_names = None
+
+        return count
+
+    def lookup(self, symbol: str, sec_type: str = None, exchange: str = None,
+               currency: str = None) -> List[Contract]:
+        """Returns the known contracts of a symbol, without any request.
+
+        Arguments:
+        ----
+        symbol {str} -- The symbol, case insensitive.
+
+        Keyword Arguments:
+        ----
+        sec_type {str} -- Only this security type, e.g. `STK`. (default: {None})
+
+        exchange {str} -- Only this exchange. (default: {None})
+
+        currency {str} -- Only this currency. (default: {None})
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts.
+        """
+
+        conids = self._by_symbol.get(_key(symbol))
+        if not conids:
+            return []
+
+        by_conid = self._by_conid
+        found = []
+
+        for conid in conids:
+            contract = by_conid[conid]
+            if sec_type is not None and contract.sec_type != sec_type:
+                continue
+            if exchange is not None and contract.exchange != exchange:
+                continue
+            if currency is not None and contract.currency != currency:
+                continue
+            found.append(contract)
+
+        return found
+
+    def contract(self, conid: Union[int, str], fetch: bool = True) -> Contract:
+        """Returns the contract of a contract ID, fetching its definition on a miss.
+
+        Arguments:
+        ----
+        conid {Union[int, str]} -- The contract ID.
+
+        Keyword Arguments:
+        ----
+        fetch {bool} -- Ask the gateway if it isn't known. (default: {True})
+
+        Returns:
+        ----
+        {Contract} -- The contract, `None` if it's unknown.
+        """
+
+        contract = self._by_conid.get(int(conid))
+
+        if contract is not None:
+            self.hits += 1
+            return contract
+
+        self.misses += 1
+
+        if fetch and self.client is not None:
+            self.refresh_definitions(conids=[conid])
+            return self._by_conid.get(int(conid))
+
+        return None
+
+    def resolve(self, symbol: str, sec_type: str = 'STK', exchange: str = None, currency: str = None,
+                fetch: bool = True) -> Contract:
+        """Returns the contract of a symbol, searching the gateway on a miss.
+
+        When several contracts match, the first one received is returned,
+        use `lookup` to get them all.
+
+        Arguments:
+        ----
+        symbol {str} -- The symbol, case insensitive.
+
+        Keyword Arguments:
+        ----
+        sec_type {str} -- The security type. (default: {'STK'})
+
+        exchange {str} -- The exchange. (default: {None})
+
+        currency {str} -- The currency. (default: {None})
+
+        fetch {bool} -- Search the gateway if it isn't known. (default: {True})
+
+        Returns:
+        ----
+        {Contract} -- The contract, `None` if the gateway doesn't know it either.
+        """
+
+        found = self.lookup(symbol=symbol, sec_type=sec_type, exchange=exchange, currency=currency)
+        if found:
+            self.hits += 1
+            return found[0]
+
+        self.misses += 1
+
+        if not fetch or self.client is None:
+            return None
+
+        key = _key(symbol)
+        missed = self._misses.get(key)
+        if missed is not None and time.time() - missed < self.miss_ttl:
+            return None
+
+        self.search(symbol=symbol)
+
+        found = self.lookup(symbol=symbol, sec_type=sec_type, exchange=exchange, currency=currency)
+        if not found:
+            with self._lock:
+                self._misses[key] = time.time()
+            return None
+
+        return found[0]
+
+    def prefix(self, text: str, limit: int = 20, names: bool = False) -> List[Contract]:
+        """Returns the contracts whose symbol, or name, starts with `text`.
+
+        Arguments:
+        ----
+        text {str} -- The prefix, case insensitive.
+
+        Keyword Arguments:
+        ----
+        limit {int} -- The most contracts returned. (default: {20})
+
+        names {bool} -- Search the names instead of the symbols. (default: {False})
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts, sorted by symbol or name.
+        """
+
+        keys = self._sorted_keys(names=names)
+        text = _key(text)
+
+        found = []
+        for index in range(bisect.bisect_left(keys, (text, -1)), len(keys)):
+            key, conid = keys[index]
+            if not key.startswith(text) or len(found) >= limit:
+                break
+            found.append(self._by_conid[conid])
+
+        return found
+
+    def fuzzy(self, text: str, limit: int = 10, cutoff: float = 0.6) -> List[Contract]:
+        """Returns the contracts whose symbol or name is closest to `text`.
+
+        Arguments:
+        ----
+        text {str} -- The text, e.g. a misspelled symbol or company name.
+
+        Keyword Arguments:
+        ----
+        limit {int} -- The most contracts returned. (default: {10})
+
+        cutoff {float} -- The lowest similarity, between 0 and 1. (default: {0.6})
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts, the closest first.
+        """
+
+        text = _key(text)
+        keys = {}
+
+        for key, conid in self._sorted_keys(names=False) + self._sorted_keys(names=True):
+            keys.setdefault(key, []).append(conid)
+
+        found = []
+        seen = set()
+
+        for key in difflib.get_close_matches(text, list(keys), n=limit, cutoff=cutoff):
+            for conid in keys[key]:
+                if conid not in seen:
+                    seen.add(conid)
+                    found.append(self._by_conid[conid])
+
+        return found[:limit]
+
+    def search(self, symbol: str, name: bool = False) -> List[Contract]:
+        """Searches the gateway with `iserver/secdef/search` and adds the results.
+
+        Arguments:
+        ----
+        symbol {str} -- The symbol, or company name.
+
+        Keyword Arguments:
+        ----
+        name {bool} -- Search by company name. (default: {False})
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts found.
+        """
+
+        payload = self._request(self.client.symbol_search, symbol)
+        contracts = []
+
+        for item in payload if isinstance(payload, list) else []:
+            if not isinstance(item, dict) or item.get('conid') is None:
+                continue
+
+            sections = [section.get('secType') for section in item.get('sections') or [] if isinstance(section, dict)]
+            sec_type = 'STK' if 'STK' in sections or not sections else sections[0]
+
+            contracts.append(Contract(
+                conid=item['conid'],
+                symbol=item.get('symbol') or symbol,
+                sec_type=sec_type,
+                exchange=item.get('description'),
+                name=item.get('companyName'),
+                description=item.get('companyHeader')
+            ))
+
+        return self._received(contracts)
+
+    def refresh_stocks(self, symbols: List[str]) -> List[Contract]:
+        """Adds the stocks of symbols with one `trsrv/stocks` request.
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts received.
+        """
+
+        payload = self._request(self.client.symbols_search_list, symbols)
+        contracts = []
+
+        for symbol, entries in (payload.items() if isinstance(payload, dict) else []):
+            for entry in entries or []:
+                for listing in entry.get('contracts') or []:
+                    contracts.append(Contract(
+                        conid=listing['conid'],
+                        symbol=symbol,
+                        sec_type=entry.get('assetClass') or 'STK',
+                        exchange=listing.get('exchange'),
+                        name=entry.get('name')
+                    ))
+
+        return self._received(contracts)
+
+    def refresh_futures(self, symbols: List[str]) -> List[Contract]:
+        """Adds the non-expired futures of symbols with one `trsrv/futures` request.
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts received.
+        """
+
+        payload = self._request(self.client.futures_search, symbols)
+        contracts = []
+
+        for symbol, entries in (payload.items() if isinstance(payload, dict) else []):
+            for entry in entries or []:
+                contracts.append(Contract(
+                    conid=entry['conid'],
+                    symbol=entry.get('symbol') or symbol,
+                    sec_type='FUT',
+                    underlying_conid=entry.get('underlyingConid'),
+                    expiry=entry.get('expirationDate')
+                ))
+
+        return self._received(contracts)
+
+    def refresh_definitions(self, conids: List[Union[int, str]] = None,
+                            max_age: float = None) -> List[Contract]:
+        """Fetches the definitions of contracts with `trsrv/secdef`, see `BulkResolver`.
+
+        Keyword Arguments:
+        ----
+        conids {List[Union[int, str]]} -- The contracts. (default: {the known
+            ones older than `max_age`})
+
+        max_age {float} -- With no `conids`, refresh the contracts received
+            more than this many seconds ago. (default: {None})
+
+        Returns:
+        ----
+        {List[Contract]} -- The contracts received.
+        """
+
+        if conids is None:
+            threshold = time.time() - (max_age or 0)
+            with self._lock:
+                conids = [contract.conid for contract in self._by_conid.values() if contract.updated <= threshold]
+
+        if self.client is None:
+            raise ValueError('The master has no client to ask the gateway with.')
+
+        resolver = BulkResolver(client=self.client)
+        contracts = []
+
+        for conid, item in resolver.iter_definitions(conids=conids):
+            previous = self._by_conid.get(conid)
+            contracts.append(Contract(
+                conid=conid,
+                symbol=item.get('ticker') or (previous.symbol if previous else None),
+                sec_type=item.get('assetClass') or (previous.sec_type if previous else 'STK'),
+                exchange=item.get('listingExchange') or (previous.exchange if previous else None),
+                currency=item.get('currency'),
+                name=item.get('name') or (previous.name if previous else None),
+                description=previous.description if previous else None,
+                underlying_conid=item.get('undConid') or (previous.underlying_conid if previous else None),
+                expiry=item.get('expiry') or (previous.expiry if previous else None)
+            ))
+
+        self.requests += resolver.requests
+
+        return self._received(contracts)
+
+    def save(self, path: Union[str, pathlib.Path] = None) -> None:
+        """Writes every contract to a JSON file, atomically."""
+
+        path = pathlib.Path(path) if path is not None else self.path
+        if path is None:
+            raise ValueError('The master has no path to save to.')
+
+        with self._lock:
+            content = {
+                'version': FORMAT_VERSION,
+                'contracts': [contract.to_dict() for contract in self._by_conid.values()]
+            }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + '.tmp')
+        temporary.write_text(json.dumps(content, separators=(',', ':')), encoding='utf-8')
+        os.replace(temporary, path)
+
+    def load(self, path: Union[str, pathlib.Path] = None) -> int:
+        """Adds the contracts of a file written by `save`.
+
+        Returns:
+        ----
+        {int} -- The number of contracts loaded.
+        """
+
+        path = pathlib.Path(path) if path is not None else self.path
+        content = json_codec.loads(path.read_bytes())
+
+        return self.add(Contract.from_dict(item) for item in content.get('contracts', []))
+
+    def stats(self) -> Dict:
+        """Returns the contracts known, and the lookups answered locally and not."""
+
+        return {'contracts': len(self._by_conid), 'hits': self.hits, 'misses': self.misses, 'requests': self.requests}
+
+    def _request(self, method, argument):
+        if self.client is None:
+            raise ValueError('The master has no client to ask the gateway with.')
+
+        self.requests += 1
+
+        return method(argument)
+
+    def _received(self, contracts: List[Contract]) -> List[Contract]:
+        self.add(contracts)
+
+        if contracts and self.autosave and self.path is not None:
+            self.save()
+
+        return contracts
+
+    def _unindex(self, contract: Contract) -> None:
+        conids = self._by_symbol.get(_key(contract.symbol))
+        if conids is None:
+            return
+
+        if contract.conid in conids:
+            conids.remove(contract.conid)
+        if not conids:
+            del self._by_symbol[_key(contract.symbol)]
+
+    def _sorted_keys(self, names: bool) -> List[Tuple[str, int]]:
+        with self._lock:
+            if names:
+                if self._sorted_names is None:
+                    self._sorted_names = sorted(
+                        (_key(contract.name), conid) for conid, contract in self._by_conid.items() if contract.name
+                    )
+                return self._sorted_names
+
+            if self._sorted_symbols is None:
+                self._sorted_symbols = sorted(
+                    (_key(contract.symbol), conid) for conid, contract in self._by_conid.items()
+                )
+            return self._sorted_symbols
+
+
+def _key(text: str) -> str:
+    return (text or '').strip().upper()
@@ -0,0 +1,307 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import AsyncIterator
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from .exceptions import IBAuthenticationError
+from .exceptions import IBClientError
+from .exceptions import IBRateLimitError
+from .exceptions import IBServerError
+
+logger = logging.getLogger(__name__)
+
+# The contracts per `trsrv/secdef` request, halved when the gateway rejects a chunk.
+DEFAULT_CHUNK_SIZE = 200
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def unique_conids(conids: List[Union[int, str]]) -> List[int]:
+    """Converts contract IDs to integers and drops duplicates, keeping their order."""
+
+    seen = set()
+    unique = []
+
+    for conid in conids:
+        conid = int(conid)
+        if conid not in seen:
+            seen.add(conid)
+            unique.append(conid)
+
+    return unique
+
+
+def chunk(values: List[int], size: int) -> List[List[int]]:
+    """Splits a list into lists of at most `size` values."""
+
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+def _should_split(error: Exception, size: int) -> bool:
+    """A rejected chunk of more than one contract may just be too large."""
+
+    if size <= 1 or isinstance(error, (IBAuthenticationError, IBRateLimitError)):
+        return False
+
+    return isinstance(error, (IBClientError, IBServerError))
+
+
+class BulkResolver():
+
+    def __init__(self, client, chunk_size: int = DEFAULT_CHUNK_SIZE, max_workers: int = DEFAULT_MAX_WORKERS) -> None:
+        """Initalizes a new instance of the BulkResolver Object.
+
+        Resolves thousands of contract IDs through `contracts_definitions`
+        and `contract_details`. Duplicates are dropped, definitions are
+        requested in chunks of `chunk_size` and details one contract per
+        request, at most `max_workers` requests at once. Every request goes
+        through the client's transport, so its rate limiter and retries
+        apply. A chunk the gateway rejects is split in half and retried,
+        down to single contracts, so an oversized request doesn't fail the
+        whole list.
+
+        Results can be collected in one dictionary, or streamed with the
+        `iter_` methods as each request completes.
+
+        Arguments:
+        ----
+        client {IBClient} -- The client, or an `AsyncIBClient` for the `_async` methods.
+
+        Keyword Arguments:
+        ----
+        chunk_size {int} -- The contracts per definitions request. (default: {200})
+
+        max_workers {int} -- The requests in flight at once. (default: {8})
+
+        Usage:
+        ----
+            >>> resolver = BulkResolver(client=ib_client)
+            >>> definitions = resolver.definitions(conids=conids)
+            >>> for conid, definition in resolver.iter_definitions(conids=conids):
+                    ...
+        """
+
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.splits = 0
+        self.errors = 0
+        self.failures: Dict[int, Exception] = {}
+
+    def definitions(self, conids: List[Union[int, str]]) -> Dict[int, Dict]:
+        """Returns the security definitions of contracts, by contract ID.
+
+        Arguments:
+        ----
+        conids {List[Union[int, str]]} -- The contract IDs, duplicates are allowed.
+
+        Returns:
+        ----
+        {Dict[int, Dict]} -- The definitions received. Contracts that failed
+            are in `failures`.
+        """
+
+        return dict(self.iter_definitions(conids=conids))
+
+    def iter_definitions(self, conids: List[Union[int, str]]) -> Iterator[Tuple[int, Dict]]:
+        """Yields `(conid, definition)` pairs as soon as each chunk arrives.
+
+        Arguments:
+        ----
+        conids {List[Union[int, str]]} -- The contract IDs.
+
+        Returns:
+        ----
+        {Iterator[Tuple[int, Dict]]} -- The definitions, in the order they arrive.
+        """
+
+        chunks = chunk(unique_conids(conids), self.chunk_size)
+
+        yield from self._iter_parallel(self._definitions_chunk, chunks)
+
+    def details(self, conids: List[Union[int, str]]) -> Dict[int, Dict]:
+        """Returns the details of contracts, by contract ID.
+
+        Arguments:
+        ----
+        conids {List[Union[int, str]]} -- The contract IDs, duplicates are allowed.
+
+        Returns:
+        ----
+        {Dict[int, Dict]} -- The details received.
+        """
+
+        return dict(self.iter_details(conids=conids))
+
+    def iter_details(self, conids: List[Union[int, str]]) -> Iterator[Tuple[int, Dict]]:
+        """Yields `(conid, details)` pairs as soon as each request completes."""
+
+        chunks = [[conid] for conid in unique_conids(conids)]
+
+        yield from self._iter_parallel(self._details_chunk, chunks)
+
+    async def definitions_async(self, conids: List[Union[int, str]]) -> Dict[int, Dict]:
+        """The asyncio counterpart of `definitions`, for an `AsyncIBClient`."""
+
+        return {conid: definition async for conid, definition in self.iter_definitions_async(conids=conids)}
+
+    async def iter_definitions_async(self, conids: List[Union[int, str]]) -> AsyncIterator[Tuple[int, Dict]]:
+        """The asyncio counterpart of `iter_definitions`, for an `AsyncIBClient`."""
+
+        chunks = chunk(unique_conids(conids), self.chunk_size)
+
+        async for pair in self._iter_async(self._definitions_chunk_async, chunks):
+            yield pair
+
+    async def details_async(self, conids: List[Union[int, str]]) -> Dict[int, Dict]:
+        """The asyncio counterpart of `details`, for an `AsyncIBClient`."""
+
+        chunks = [[conid] for conid in unique_conids(conids)]
+
+        return {conid: details async for conid, details in self._iter_async(self._details_chunk_async, chunks)}
+
+    def stats(self) -> Dict:
+        """Returns the requests sent, the chunks split and the contracts that failed."""
+
+        with self._lock:
+            return {'requests': self.requests, 'splits': self.splits, 'errors': self.errors}
+
+    def _iter_parallel(self, request, chunks: List[List[int]]) -> Iterator[Tuple[int, Dict]]:
+        """Runs `request(chunk)` for every chunk, yielding results as they complete."""
+
+        if not chunks:
+            return
+
+        seen = set()
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix='ibw-resolver') as executor:
+            pending = {executor.submit(request, conids) for conids in chunks}
+
+            try:
+                while pending:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+
+                    for future in done:
+                        results, retry = future.result()
+                        pending |= {executor.submit(request, conids) for conids in retry}
+
+                        for conid, result in results:
+                            if conid not in seen:
+                                seen.add(conid)
+                                yield conid, result
+            finally:
+                # The caller stopped iterating, don't send the chunks not started yet.
+                for future in pending:
+                    future.cancel()
+
+    async def _iter_async(self, request, chunks: List[List[int]]) -> AsyncIterator[Tuple[int, Dict]]:
+        semaphore = asyncio.Semaphore(max(1, self.max_workers))
+        seen = set()
+
+        async def limited(conids: List[int]):
+            async with semaphore:
+                return await request(conids)
+
+        pending = {asyncio.ensure_future(limited(conids)) for conids in chunks}
+
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    results, retry = task.result()
+                    pending |= {asyncio.ensure_future(limited(conids)) for conids in retry}
+
+                    for conid, result in results:
+                        if conid not in seen:
+                            seen.add(conid)
+                            yield conid, result
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _definitions_chunk(self, conids: List[int]) -> Tuple[List[Tuple[int, Dict]], List[List[int]]]:
+        try:
+            payload = self.client.contracts_definitions(conids=conids)
+        except Exception as error:
+            return self._failed(conids=conids, error=error)
+
+        return self._received_definitions(conids=conids, payload=payload)
+
+    async def _definitions_chunk_async(self, conids: List[int]) -> Tuple[List[Tuple[int, Dict]], List[List[int]]]:
+        try:
+            payload = await self.client.contracts_definitions(conids=conids)
+        except Exception as error:
+            return self._failed(conids=conids, error=error)
+
+        return self._received_definitions(conids=conids, payload=payload)
+
+    def _details_chunk(self, conids: List[int]) -> Tuple[List[Tuple[int, Dict]], List[List[int]]]:
+        try:
+            payload = self.client.contract_details(conid=conids[0])
+        except Exception as error:
+            return self._failed(conids=conids, error=error)
+
+        self._count(requests=1)
+
+        return [(conids[0], payload)], []
+
+    async def _details_chunk_async(self, conids: List[int]) -> Tuple[List[Tuple[int, Dict]], List[List[int]]]:
+        try:
+            payload = await self.client.contract_details(conid=conids[0])
+        except Exception as error:
+            return self._failed(conids=conids, error=error)
+
+        self._count(requests=1)
+
+        return [(conids[0], payload)], []
+
+    def _received_definitions(self, conids: List[int], payload: Dict) -> Tuple[List[Tuple[int, Dict]], List[List[int]]]:
+        self._count(requests=1)
+
+        items = payload.get('secdef') if isinstance(payload, dict) else payload
+        requested = set(conids)
+        results = []
+
+        for item in items or []:
+            if isinstance(item, dict) and item.get('conid') is not None and int(item['conid']) in requested:
+                results.append((int(item['conid']), item))
+
+        return results, []
+
+    def _failed(self, conids: List[int], error: Exception) -> Tuple[List, List[List[int]]]:
+        """Splits a rejected chunk in half, or records its contracts as failed."""
+
+        self._count(requests=1)
+
+        if _should_split(error=error, size=len(conids)):
+            middle = len(conids) // 2
+            with self._lock:
+                self.splits += 1
+            logger.debug('Splitting a chunk of %s contracts the gateway rejected.', len(conids))
+            return [], [conids[:middle], conids[middle:]]
+
+        logger.warning('Resolving %s contracts failed: %s', len(conids), error)
+
+        with self._lock:
+            self.errors += len(conids)
+            for conid in conids:
+                self.failures[conid] = error
+
+        return [], []
+
+    def _count(self, requests: int = 0) -> None:
+        with self._lock:
+            self.requests += requests
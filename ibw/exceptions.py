@@ -0,0 +1,158 @@
+import email.utils
+import time
+from typing import Any
+
+import requests
+
+from . import json_codec
+
+
+class IBHTTPError(requests.HTTPError):
+
+    def __init__(self, message: str, status_code: int = None, body: Any = None,
+                 url: str = None, response: requests.Response = None) -> None:
+        """Initalizes a new instance of the IBHTTPError Object.
+
+        The base class of every error raised for a failed gateway request.
+        It subclasses `requests.HTTPError`, so existing `except` clauses
+        keep working.
+
+        Arguments:
+        ----
+        message {str} -- A description of the error.
+
+        Keyword Arguments:
+        ----
+        status_code {int} -- The HTTP status code, `None` if no response
+            arrived. (default: {None})
+
+        body {Any} -- The decoded response body, or its text if it isn't
+            JSON. (default: {None})
+
+        url {str} -- The URL of the request. (default: {None})
+
+        response {requests.Response} -- The response object. (default: {None})
+        """
+
+        super().__init__(message, response=response)
+
+        self.status_code = status_code
+        self.body = body
+        self.url = url
+
+
+class IBClientError(IBHTTPError):
+    """The gateway rejected the request, a 4xx status."""
+
+
+class IBAuthenticationError(IBClientError):
+    """The session isn't authenticated, a 401 status."""
+
+
+class IBRateLimitError(IBClientError):
+
+    def __init__(self, message: str, retry_after: float = None, **kwargs) -> None:
+        """The gateway throttled the request, a 429 status.
+
+        Arguments:
+        ----
+        message {str} -- A description of the error.
+
+        Keyword Arguments:
+        ----
+        retry_after {float} -- The seconds the gateway asked to wait, if it
+            sent a `Retry-After` header. (default: {None})
+        """
+
+        super().__init__(message, **kwargs)
+        self.retry_after = retry_after
+
+
+class IBServerError(IBHTTPError):
+    """The gateway failed to handle the request, a 5xx status."""
+
+
+class IBConnectionError(IBHTTPError):
+    """The request didn't reach the gateway, or no response arrived, once the retries were used up."""
+
+
+class IBCircuitOpenError(IBHTTPError):
+    """The gateway is considered unhealthy and the request wasn't sent."""
+
+
+def parse_retry_after(value: str) -> float:
+    """Parses a `Retry-After` header.
+
+    Arguments:
+    ----
+    value {str} -- The header value, either seconds or an HTTP date.
+
+    Returns:
+    ----
+    {float} -- The seconds to wait, `None` if the value can't be parsed.
+    """
+
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    return max(retry_at.timestamp() - time.time(), 0.0)
+
+
+def from_response(url: str, response: requests.Response) -> IBHTTPError:
+    """Builds the typed error matching a failed response.
+
+    Arguments:
+    ----
+    url {str} -- The URL of the request.
+
+    response {requests.Response} -- The failed response, or any object with
+        the same `status_code`, `headers` and `content` members.
+
+    Returns:
+    ----
+    {IBHTTPError} -- The error to raise.
+    """
+
+    status_code = response.status_code
+
+    # Error pages aren't always JSON, and decoders raise their own types.
+    try:
+        body = json_codec.loads(response.content)
+    except Exception:
+        body = response.content.decode('utf-8', errors='replace')
+
+    message = '{status} error for url: {url}'.format(status=status_code, url=url)
+    if isinstance(body, dict) and body.get('error'):
+        message = '{message}, {error}'.format(message=message, error=body['error'])
+
+    kwargs = {
+        'status_code': status_code,
+        'body': body,
+        'url': url,
+        'response': response if isinstance(response, requests.Response) else None
+    }
+
+    if status_code == 429:
+        return IBRateLimitError(
+            message,
+            retry_after=parse_retry_after(response.headers.get('Retry-After')),
+            **kwargs
+        )
+    elif status_code == 401:
+        return IBAuthenticationError(message, **kwargs)
+    elif 400 <= status_code < 500:
+        return IBClientError(message, **kwargs)
+    elif status_code >= 500:
+        return IBServerError(message, **kwargs)
+
+    return IBHTTPError(message, **kwargs)
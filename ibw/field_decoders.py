@@ -0,0 +1,249 @@
+import inspect
+import logging
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Union
+
+from .fields import FIELD_INFO
+from .fields import Field
+from .fields import FieldType
+from .quote_table import FLAG_HALTED
+from .quote_table import FLAG_PRIOR_CLOSE
+
+logger = logging.getLogger(__name__)
+
+_MULTIPLIERS = {'K': 1e3, 'M': 1e6, 'B': 1e9}
+_PRICE_FLAGS = {'C': FLAG_PRIOR_CLOSE, 'H': FLAG_HALTED}
+
+
+def decode_text(value: Any) -> Any:
+    return value
+
+
+def decode_integer(value: Any) -> Any:
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return value
+
+
+def decode_number(value: Any) -> Any:
+    """Decodes a number, leaving the value as it is if it isn't one."""
+
+    if not isinstance(value, str):
+        return value
+
+    try:
+        return float(value.replace(',', ''))
+    except ValueError:
+        pass
+
+    # Some fields mix formats, fall back on the other number decoders.
+    stripped = value.strip()
+    if stripped[:1] in _PRICE_FLAGS:
+        return decode_price(value)
+    if stripped[-1:] == '%':
+        return decode_percent(value)
+    if stripped[-1:] in _MULTIPLIERS:
+        return decode_size(value)
+
+    return value
+
+
+def decode_price(value: Any) -> Any:
+    """Decodes a price, dropping the `C` (prior close) or `H` (halted) prefix."""
+
+    if not isinstance(value, str):
+        return value
+
+    stripped = value.lstrip('CH')
+
+    try:
+        return float(stripped.replace(',', ''))
+    except ValueError:
+        return value
+
+
+def decode_percent(value: Any) -> Any:
+    """Decodes a percentage like `1.25%` to `1.25`."""
+
+    if not isinstance(value, str):
+        return value
+
+    try:
+        return float(value.rstrip('%').replace(',', ''))
+    except ValueError:
+        return value
+
+
+def decode_size(value: Any) -> Any:
+    """Decodes a size or volume like `1.2K` or `3.45M`."""
+
+    if not isinstance(value, str):
+        return value
+
+    value = value.replace(',', '')
+    multiplier = _MULTIPLIERS.get(value[-1:])
+
+    try:
+        if multiplier is not None:
+            return float(value[:-1]) * multiplier
+        return float(value)
+    except ValueError:
+        return value
+
+
+TYPE_DECODERS: Dict[FieldType, Callable[[Any], Any]] = {
+    FieldType.TEXT: decode_text,
+    FieldType.INTEGER: decode_integer,
+    FieldType.NUMBER: decode_number,
+    FieldType.PRICE: decode_price,
+    FieldType.PERCENT: decode_percent,
+    FieldType.SIZE: decode_size
+}
+
+# fix tag -> decoder, resolved once so decoding a message is a dictionary lookup per field.
+DECODERS: Dict[str, Callable[[Any], Any]] = {
+    fix_tag: TYPE_DECODERS[info[1]] for fix_tag, info in FIELD_INFO.items()
+}
+
+# fix tag -> member name, e.g. `'31'` -> `'LAST'`.
+NAMES: Dict[str, str] = {member.value: member.name for member in Field}
+
+
+def field_ids(fields: List[Union[Field, int, str]]) -> List[str]:
+    """Converts `Field` members, numbers or strings to fix tags.
+
+    Arguments:
+    ----
+    fields {List[Union[Field, int, str]]} -- The fields, e.g. `[Field.LAST, 84, '86']`.
+
+    Returns:
+    ----
+    {List[str]} -- The fix tags, e.g. `['31', '84', '86']`.
+    """
+
+    return [field.value if isinstance(field, Field) else str(field) for field in fields]
+
+
+def validate_fields(fields: List[Union[Field, int, str]]) -> List[str]:
+    """Checks requested fields against the registry, before any request is sent.
+
+    Names, like `'LAST'`, are resolved to their fix tags. Numeric tags the
+    registry doesn't know are sent as they are, with a warning, since the
+    gateway adds fields the registry may not list yet.
+
+    Arguments:
+    ----
+    fields {List[Union[Field, int, str]]} -- The fields.
+
+    Raises:
+    ----
+    ValueError: If a field is neither a number nor the name of a `Field` member.
+
+    Returns:
+    ----
+    {List[str]} -- The fix tags.
+    """
+
+    tags = []
+    unresolved = []
+    unlisted = []
+
+    for tag in field_ids(fields):
+        if tag in FIELD_INFO:
+            tags.append(tag)
+        elif tag.isdigit():
+            tags.append(tag)
+            unlisted.append(tag)
+        elif tag.upper() in Field.__members__:
+            tags.append(Field[tag.upper()].value)
+        else:
+            unresolved.append(tag)
+
+    if unresolved:
+        raise ValueError(
+            'Unknown market data fields: {}. See `ibw.fields.Field` for the valid fields.'.format(', '.join(unresolved))
+        )
+
+    if unlisted:
+        logger.warning('Market data fields missing from `ibw.fields`, sent as they are: %s', ', '.join(unlisted))
+
+    return tags
+
+
+def decode_message(message: Dict, names: bool = False) -> Dict:
+    """Decodes the fields of a snapshot item or a streaming tick, in one pass.
+
+    Every known field is converted by the decoder of its type, other keys,
+    like `conid` or `_updated`, are kept as they are. Prices sent with a
+    `C` or `H` prefix are flagged in `_flags`, by fix tag, with
+    `quote_table.FLAG_PRIOR_CLOSE` or `quote_table.FLAG_HALTED`.
+
+    Arguments:
+    ----
+    message {Dict} -- The item or tick.
+
+    Keyword Arguments:
+    ----
+    names {bool} -- Key the fields by their name, e.g. `LAST`, instead of
+        their fix tag. (default: {False})
+
+    Returns:
+    ----
+    {Dict} -- The decoded message.
+    """
+
+    decoded = {}
+    flags = None
+    decoders = DECODERS
+
+    for key, value in message.items():
+        decoder = decoders.get(key)
+
+        if decoder is None:
+            decoded[key] = value
+            continue
+
+        if decoder is decode_price and isinstance(value, str) and value[:1] in _PRICE_FLAGS:
+            if flags is None:
+                flags = {}
+            flags[key] = _PRICE_FLAGS[value[:1]]
+
+        decoded[NAMES[key] if names else key] = decoder(value)
+
+    if flags is not None:
+        decoded['_flags'] = flags
+
+    return decoded
+
+
+def decode_response(content: Any, names: bool = False) -> Any:
+    """Decodes every item of a snapshot response.
+
+    Arguments:
+    ----
+    content {Any} -- The response of `market_data`, or an awaitable of it
+        with the `AsyncIBClient`.
+
+    Keyword Arguments:
+    ----
+    names {bool} -- Key the fields by their name. (default: {False})
+
+    Returns:
+    ----
+    {Any} -- The decoded items, or an awaitable of them.
+    """
+
+    if inspect.isawaitable(content):
+        async def decode_when_done():
+            return decode_response(content=await content, names=names)
+
+        return decode_when_done()
+
+    if not isinstance(content, list):
+        return content
+
+    return [decode_message(message=item, names=names) if isinstance(item, dict) else item for item in content]
@@ -0,0 +1,845 @@
+"""The market data fields of the snapshot and streaming endpoints.
+
+This file is generated by `resources/generate_fields.py` from
+`samples/responses/sample_column_ids.jsonc`, do not edit it by hand.
+"""
+
+import enum
+from typing import Dict
+from typing import Tuple
+
+
+class FieldType(enum.Enum):
+    """How the values of a field are sent."""
+
+    TEXT = 'text'
+    INTEGER = 'integer'
+    NUMBER = 'number'
+    PRICE = 'price'
+    PERCENT = 'percent'
+    SIZE = 'size'
+
+
+class Field(str, enum.Enum):
+    """The market data fields, the value of each member is its fix tag."""
+
+    LAST = '31'
+    INSTRUMENT = '55'
+    TEXT = '58'
+    HIGH = '70'
+    LOW = '71'
+    MARKET_VALUE = '73'
+    AVG_PRICE = '74'
+    UNREALIZED_PNL_RAW = '75'
+    POSITION = '76'
+    UNREALIZED_PL = '77'
+    DAILY_PL = '78'
+    REALIZED_PL = '79'
+    UNREALIZED_PL_PCT = '80'
+    CHANGE = '82'
+    PCT_CHANGE = '83'
+    BID = '84'
+    ASK_SIZE = '85'
+    ASK = '86'
+    VOLUME = '87'
+    BID_SIZE = '88'
+    EXCHANGE = '6004'
+    CONID = '6008'
+    ASSET_CLASS = '6070'
+    MONTHS = '6072'
+    REGULAR_EXPIRY = '6073'
+    MARKER = '6119'
+    UNDERLYING_CONID = '6457'
+    SERVICE_PARAMS = '6508'
+    MARKET_DATA_AVAILABILITY = '6509'
+    COMPANY_NAME = '7051'
+    ASK_EXCH_CODES = '7057'
+    LAST_EXCH_CODES = '7058'
+    LAST_SIZE = '7059'
+    BID_EXCH_CODES = '7068'
+    TOTAL_BENEFITS = '7080'
+    OPTIMAL_ACTION = '7081'
+    VWAP = '7083'
+    IMPLIED_VOL_HIST_VOLUME_PERC = '7084'
+    PUT_CALL_INTEREST = '7085'
+    OPTION_PUT_CALL_VOLUME = '7086'
+    HISTORICAL_VOL_PERCENT = '7087'
+    HISTORIC_VOL_CLOSE_PCT = '7088'
+    OPTION_VOLUME = '7089'
+    CONID_EXCHANGE = '7094'
+    CAN_BE_TRADED = '7184'
+    IV_RANK52 = '7195'
+    IV_RANK26 = '7196'
+    IV_RANK13 = '7197'
+    IV_PERCNTL52 = '7198'
+    IV_PERCNTL26 = '7199'
+    IV_PERCNTL13 = '7200'
+    IV_HIGH52 = '7201'
+    IV_HIGH26 = '7202'
+    IV_HIGH13 = '7203'
+    IV_LOW52 = '7204'
+    IV_LOW26 = '7205'
+    IV_LOW13 = '7206'
+    HV_RANK52 = '7207'
+    HV_RANK26 = '7208'
+    HV_RANK13 = '7209'
+    HV_PERCNTL52 = '7210'
+    HV_PERCNTL26 = '7211'
+    HV_PERCNTL13 = '7212'
+    CONTRACT_DESCRIPTION = '7219'
+    CONTRACT_DESCRIPTION_2 = '7220'
+    LISTING_EXCHANGE = '7221'
+    DAYS_TO_LTD = '7242'
+    HV_HIGH52 = '7245'
+    HV_HIGH26 = '7246'
+    HV_HIGH13 = '7247'
+    HV_LOW52 = '7248'
+    HV_LOW26 = '7249'
+    HV_LOW13 = '7263'
+    ESG_COMBINED_SCORE = '7264'
+    ESG_RESOURCE_USE_SCORE = '7265'
+    ESG_EMISSIONS_SCORE = '7266'
+    ESG_ENV_INNOVATION_SCORE = '7267'
+    ESG_WORKFORCE_SCORE = '7268'
+    ESG_HUMAN_RIGHTS_SCORE = '7269'
+    ESG_PRODUCT_RESPONSIBILITY_SCORE = '7271'
+    ESG_MANAGEMENT_SCORE = '7272'
+    ESG_SHAREHOLDERS_SCORE = '7273'
+    ESG_CSR_STRATEGY_SCORE = '7274'
+    ESG_CONTROVERSIES_SCORE = '7275'
+    ESG_SCORE = '7276'
+    ESG_COMMUNITY_SCORE = '7277'
+    INDUSTRY = '7280'
+    CATEGORY = '7281'
+    AVG_DAILY_VOLUME = '7282'
+    OPTION_IMPLIED_VOL_PCT = '7283'
+    HISTORICAL_VOL_30D_PCT = '7284'
+    PUT_CALL_VOLUME = '7285'
+    DIV_AMT = '7286'
+    DIV_YIELD = '7287'
+    DIV_DATE = '7288'
+    MKT_CAP = '7289'
+    PE = '7290'
+    EPS = '7291'
+    COST_BASIS = '7292'
+    HIGH_52_WEEK = '7293'
+    LOW_52_WEEK = '7294'
+    OPEN = '7295'
+    CLOSE = '7296'
+    DELTA = '7308'
+    GAMMA = '7309'
+    THETA = '7310'
+    VEGA = '7311'
+    PRICE_2_BOOK_LATEST = '7322'
+    PRICE_2_SALES_LATEST = '7323'
+    ROE_WGT_AVG_LATEST = '7324'
+    SPS_GRWTH_3YR_LATEST = '7325'
+    LT_DEBT_2_SE = '7326'
+    EPS_GRWTH_1YR = '7327'
+    EPS_GRWTH_3YR = '7328'
+    EPS_GRWTH_5YR = '7329'
+    PRICE_2_SALES = '7330'
+    PRICE_2_BOOK = '7331'
+    PRICE_2_EARNINGS = '7332'
+    ROA_3YR = '7333'
+    AVG_RETURN_1YR = '7334'
+    BULL_BETA_1YR = '7335'
+    COVAR_1YR = '7336'
+    MIN_INIT_PUR = '7349'
+    SEC_YIELD_7D = '7352'
+    SEC_YIELD_7D_DATE = '7353'
+    ESG_ENVIRONMENTAL_PILLAR_SCORE = '7370'
+    ESG_SOCIAL_PILLAR_SCORE = '7371'
+    ESG_CORPORATE_GOVERNANCE_PILLAR_SCORE = '7372'
+    FORWARD_P_E = '7389'
+    FIVE_YR_EPS_GROWTH_FIELD = '7390'
+    ALTAR_SCORE = '7391'
+    ASSET_TURNOVER_RATIO = '7392'
+    BETA_VS_SNP_500 = '7393'
+    DEVELOPED_MARKET_EXPOSURE = '7394'
+    EMERGING_MARKET_EXPOSURE = '7395'
+    FWD_DIVIDEND_YIELD = '7396'
+    FWD_PRICE_CF = '7397'
+    ALTAVISTA_LEVERAGE = '7398'
+    LONG_TERM_GROWTH = '7399'
+    ALTAVISTA_PAYOUT = '7400'
+    SHORT_INTEREST = '7401'
+    MONTH_EPS_CHANGE = '7402'
+    THREE_MONTH_EPS_CHANGE = '7403'
+    FUND_FAMILY = '7408'
+    ASSET_UNIV = '7409'
+    FUND_CATEG = '7410'
+    CLASSIFICATION = '7411'
+    SCHEME = '7412'
+    FUND_TYPE = '7413'
+    TOT_NET_ASST = '7414'
+    BM_INDEX = '7417'
+    OBJ_TYPE = '7418'
+    CLOSED = '7419'
+    CLSD_NEW_INV = '7420'
+    CLSD_NEW_MONEY = '7421'
+    FUND_STATUS = '7422'
+    EXCH_SELL_ELIG = '7423'
+    FD_MKT_CAP_FOCUS = '7424'
+    FD_GEO_FOC = '7425'
+    ELIG_COUNTRIES = '7426'
+    SUBSEQ_MIN_PUR = '7427'
+    INIT_MIN_WRP_PURCH = '7428'
+    SUBSEQ_MIN_WRP_PUR = '7429'
+    INIT_MIN_IRA_PURCH = '7430'
+    SUB_MIN_IRA_PURCH = '7431'
+    LOAD_TYPE = '7432'
+    SHRT_TRM_REDEMP = '7433'
+    MGMT_FEE = '7434'
+    TOT_EXP_RATIO = '7435'
+    FIELD_12B1_FEES = '7436'
+    NO_TX_FEES_FUNDS = '7437'
+    TOT_NET_EXP = '7438'
+    STRAT_FOF_INTERNAL = '7439'
+    STRAT_FOF_EXTERNAL = '7440'
+    STRAT_INDEX_TRK = '7441'
+    STRAT_BOND_DOM_ISS = '7442'
+    STRAT_HEDGED = '7443'
+    STRAT_LEVERAGED = '7444'
+    STRAT_NET_100 = '7445'
+    STRAT_ETHICAL = '7446'
+    STRAT_TOTAL_RETURN = '7447'
+    STRAT_MGR_OF_MGR_FD = '7448'
+    STRAT_ISLAMIC = '7449'
+    STRAT_FOF_UNAFFILIATED = '7450'
+    STRAT_FOF_AFFILIATED = '7451'
+    STRAT_FOF_ACTIVE = '7452'
+    STRAT_FOF_PASSIVE = '7453'
+    STRAT_FD_OF_HEDGE_FDS = '7454'
+    STRAT_FOF_BLENDED = '7455'
+    STRAT_FUND_OF_ETFS = '7456'
+    STRAT_FD_OF_FDS = '7457'
+    STRAT_SOCIAL_CRIT = '7458'
+    STRAT_INTRVL_HYBRID = '7459'
+    STRAT_INDX_REPL_METHOD = '7460'
+    STRAT_ACTIVLY_MNG_ETF = '7461'
+    STRAT_GREEN = '7462'
+    STRAT_ALT_ENRGY = '7463'
+    STRAT_MANAGED_VOL = '7464'
+    STRAT_WATER = '7465'
+    STRAT_FD_OF_REITS = '7466'
+    LDR_TOT_RET_SCR_ALL = '7467'
+    LDR_CONSIS_RET_SCR_ALL = '7468'
+    LDR_PRESERV_SCR_ALL = '7469'
+    LDR_TAX_EFF_SCR_ALL = '7470'
+    LDR_EXP_SCR_ALL = '7471'
+    LDR_TOT_RET_SCR_3YR = '7472'
+    LDR_CONSIS_RET_SCR_3YR = '7473'
+    LDR_PRESERV_SCR_3YR = '7474'
+    LDR_TAX_EFF_SCR_3YR = '7475'
+    LDR_EXP_SCR_3YR = '7476'
+    LDR_TOT_RET_SCR_5YR = '7477'
+    LDR_CONSIS_RET_SCR_5YR = '7478'
+    LDR_PRESERV_SCR_5YR = '7479'
+    LDR_TAX_EFF_SCR_5YR = '7480'
+    LDR_EXP_SCR_5YR = '7481'
+    LDR_TOT_RET_SCR_10YR = '7482'
+    LDR_CONSIS_RET_SCR_10YR = '7483'
+    LDR_PRESERV_SCR_10YR = '7484'
+    LDR_TAX_EFF_SCR_10YR = '7485'
+    LDR_EXP_SCR_10YR = '7486'
+    DIST_YLD_1YR = '7487'
+    GRWTH_CUM = '7488'
+    GRWTH_ANN_3YR = '7489'
+    GRWTH_ANN_5YR = '7490'
+    GRWTH_ANN_10YR = '7491'
+    YIELD_1YR = '7493'
+    PROJ_YIELD = '7494'
+    RSQ_ADJ_1YR = '7496'
+    ALPHA_1YR = '7497'
+    AVG_LOSS_1YR = '7498'
+    CORREL_1YR = '7504'
+    DOWN_DEV_1YR = '7505'
+    INFO_RATIO_1YR = '7506'
+    MAX_GAIN_1YR = '7507'
+    MAX_LOSS_1YR = '7508'
+    MAX_DRAW_1YR = '7509'
+    POS_PERIODS_1YR = '7510'
+    RSQ_1YR = '7511'
+    SRRI_1YR = '7513'
+    SEMI_DEV_1YR = '7514'
+    SEMI_VAR_1YR = '7515'
+    SHARPE_1YR = '7516'
+    SORTINO_1YR = '7517'
+    STD_DEV_1YR = '7518'
+    TRACKING_ERR_1YR = '7519'
+    CURRENCY = '7534'
+    MULTIPLIER = '7538'
+    ROA_1YR = '7552'
+    ROE_1YR = '7553'
+    ROE_3YR = '7554'
+    ROI_1YR = '7555'
+    ROI_3YR = '7556'
+    SALES_2_TOTAL_ASSETS = '7557'
+    SPS_GRWTH_1YR = '7558'
+    SPS_GRWTH_3YR = '7559'
+    TOT_ASSETS_2_TOT_EQ = '7560'
+    TOT_DEBT_2_TOT_CAP = '7561'
+    TOT_DEBT_2_TOT_EQ = '7562'
+    PRICE_2_CASH = '7563'
+    REL_STRENGTH = '7564'
+    RET_ON_CAPITAL = '7565'
+    RET_ON_CAPITAL_3YR = '7566'
+    COMP_ZSCORE = '7567'
+    PS_ZSCORE = '7568'
+    PE_ZSCORE = '7569'
+    PB_ZSCORE = '7570'
+    SPS_GRWTH_ZSCORE = '7571'
+    AVG_FIN_COMP_ZSCORE = '7572'
+    YIELD_ZSCORE = '7573'
+    ROE_ZSCORE = '7574'
+    WGT_FIN_COMP_ZSCORE = '7575'
+    YIELD_TO_MATURITY = '7576'
+    NOM_MATURITY = '7577'
+    EFF_MATURITY = '7578'
+    AVG_COUPON = '7579'
+    AVG_QUALITY = '7580'
+    CALC_AVG_QUALITY = '7581'
+    BEAR_BETA_1YR = '7582'
+    BETA_1YR = '7583'
+    RET_RISK_RATIO_1YR = '7584'
+    TREYNOR_1YR = '7585'
+    VAR_NORMAL_1YR = '7586'
+    VAR_NORMAL_ETL_1YR = '7587'
+    VAR_QUANTILE_1YR = '7588'
+    VAR_QUANTILE_ETL_1YR = '7589'
+    VARIANCE_1YR = '7590'
+    NUM_OF_SEC = '7591'
+    PAYOUT_RATIO = '7592'
+    PAYOUT_RATIO_5YR = '7593'
+    DPS_1YR = '7594'
+    DPS_3YR = '7595'
+    PRICE_2_DIV = '7596'
+    DIV_YIELD_WGT_AVG = '7597'
+    EBIT_2_INT = '7598'
+    MKT_CAP_AVG = '7599'
+    OP_CASH_FLOW_GRWTH_RATE_3YR = '7605'
+    OPT_VOL_CHANGE_PCT = '7607'
+    OPT_IMPL_VOL_PCT = '7608'
+    SALES_GRWTH_1YR = '7611'
+    CLOSING_IMPL_VOL_PCT = '7612'
+    OPT_IMPL_VOL_CHANGE = '7613'
+    SALES_GRWTH_3YR = '7618'
+    SALES_GRWTH_5YR = '7619'
+    PRICE_2_EARNINGS_LATEST = '7627'
+    MID = '7629'
+    TIME_VALUE_PCT = '7631'
+    IMPLIED_VOL_PERCENT = '7633'
+    UNDERLYING_PRICE = '7634'
+    MARK_PRICE = '7635'
+    SHORTABLE_SHARES = '7636'
+    FEE_RATE = '7637'
+    OPTION_OPEN_INTEREST = '7638'
+    PCT_MARKET_VALUE = '7639'
+    PORTFOLIO_DELTA = '7640'
+    PORTFOLIO_GAMMA = '7641'
+    PORTFOLIO_THETA = '7642'
+    PORTFOLIO_VEGA = '7643'
+    SHORTABLE = '7644'
+    ZACKS_RATING = '7645'
+    VALUENGINE_RATING = '7646'
+    FORDRESEARCH_RATING = '7647'
+    SADIF_RATING = '7648'
+    THESTREET_RATING = '7649'
+    VALIDEA_RATING = '7651'
+    MARKETGRADER_RATING = '7652'
+    ARGUS_RESEARCH_RATING = '7653'
+    NEW_CONSTRUCTS_RATING = '7654'
+    MORNINGSTAR_RATING = '7655'
+    RECOGNIA_LONG_TERM_TECH_EVENT_CLASS = '7656'
+    RECOGNIA_LONG_TERM_TECH_EVENT_DATE = '7657'
+    RECOGNIA_LONG_TERM_TECH_EVENT_NAME = '7658'
+    RECOGNIA_LONG_TERM_EVENT_SCORE = '7659'
+    RECOGNIA_LONG_TERM_TRADE_TYPE = '7660'
+    RECOGNIA_INT_TERM_TECH_EVENT_CLASS = '7661'
+    RECOGNIA_INT_TERM_TECH_EVENT_DATE = '7662'
+    RECOGNIA_INT_TERM_TECH_EVENT_NAME = '7663'
+    RECOGNIA_INT_TERM_EVENT_SCORE = '7664'
+    RECOGNIA_INT_TERM_TRADE_TYPE = '7665'
+    RECOGNIA_SHORT_TERM_TECH_EVENT_CLASS = '7666'
+    RECOGNIA_SHORT_TERM_TECH_EVENT_DATE = '7667'
+    RECOGNIA_SHORT_TERM_TECH_EVENT_NAME = '7668'
+    RECOGNIA_SHORT_TERM_EVENT_SCORE = '7669'
+    RECOGNIA_SHORT_TERM_TRADE_TYPE = '7670'
+    DIVIDENDS = '7671'
+    DIVIDENDS_TTM = '7672'
+    EMA_200 = '7674'
+    EMA_100 = '7675'
+    EMA_50 = '7676'
+    EMA_20 = '7677'
+    PRICE_VS_EMA200 = '7678'
+    PRICE_VS_EMA100 = '7679'
+    PRICE_VS_EMA20 = '7681'
+    CHANGE_SINCE_OPEN = '7682'
+    UPCOMING_EVENT = '7683'
+    UPCOMING_EVENT_DATE = '7684'
+    UPCOMING_ANALYST_MEETING = '7685'
+    UPCOMING_EARNINGS = '7686'
+    UPCOMING_MISC_EVENT = '7687'
+    RECENT_ANALYST_MEETING = '7688'
+    RECENT_EARNINGS = '7689'
+    RECENT_MISC_EVENT = '7690'
+    LIQUIDATE_LAST = '7693'
+    PERF_MAX_RETURN = '7694'
+    PERF_BREAK_EVEN = '7695'
+    RISK_INDEX_DELTA = '7696'
+    FUTURES_OPEN_INTEREST = '7697'
+    LAST_YIELD = '7698'
+    YIELD_BID = '7699'
+    PROBABILITY_MAX_RETURN = '7700'
+    PROBABILITY_MAX_LOSS = '7702'
+    PERF_PROFIT_PROBABILITY = '7703'
+    ORGANIZATION_TYPE = '7704'
+    DEBT_CLASS = '7705'
+    BOND_RATING = '7706'
+    STATE_CODE = '7707'
+    BOND_TYPE = '7708'
+    LAST_TRADING_DATE = '7714'
+    ISSUE_DATE = '7715'
+    PERF_RISK_RETURN = '7716'
+    RISK_BETA = '7718'
+    YIELD_ASK = '7720'
+    IN_THE_MONEY = '7722'
+    PRICE_VS_EMA50 = '7724'
+    PERF_MAX_RETURN_PROB = '7725'
+    PERF_MAX_LOSS = '7726'
+    PERF_MAX_LOSS_PROB = '7727'
+    SPREAD = '7728'
+    PRIOR_CLOSE = '7741'
+    VOLUME_LONG = '7762'
+    HAS_TRADING_PERMISSIONS = '7768'
+    REAL_CHANGE_SINCE_OPEN = '7771'
+    DAILY_PNL_RAW = '7920'
+    COST_BASIS_RAW = '7921'
+
+
+# fix tag -> (name, value type, groups)
+FIELD_INFO: Dict[str, Tuple[str, FieldType, Tuple[str, ...]]] = {
+    '31': ('Last', FieldType.PRICE, ('G4',)),
+    '55': ('Instrument', FieldType.TEXT, ('G-3',)),
+    '58': ('Text', FieldType.TEXT, ()),
+    '70': ('High', FieldType.PRICE, ('G5',)),
+    '71': ('Low', FieldType.PRICE, ('G5',)),
+    '73': ('Market Value', FieldType.SIZE, ('G2',)),
+    '74': ('Avg Price', FieldType.PRICE, ('G2',)),
+    '75': ('Unrealized P&L Raw', FieldType.NUMBER, ()),
+    '76': ('Position', FieldType.NUMBER, ('G2',)),
+    '77': ('Unrealized P&L', FieldType.NUMBER, ('G2',)),
+    '78': ('Daily P&L', FieldType.NUMBER, ('G2',)),
+    '79': ('Realized P&L', FieldType.NUMBER, ('G2',)),
+    '80': ('Unrealized P&L %', FieldType.PERCENT, ('G2',)),
+    '82': ('Change', FieldType.PRICE, ('G4',)),
+    '83': ('Change %', FieldType.PERCENT, ('G4',)),
+    '84': ('Bid', FieldType.PRICE, ('G4',)),
+    '85': ('Ask Size', FieldType.SIZE, ('G4',)),
+    '86': ('Ask', FieldType.PRICE, ('G4',)),
+    '87': ('Volume', FieldType.SIZE, ('G5',)),
+    '88': ('Bid Size', FieldType.SIZE, ('G4',)),
+    '6004': ('Exchange', FieldType.TEXT, ()),
+    '6008': ('Contract ID', FieldType.INTEGER, ()),
+    '6070': ('Asset Class', FieldType.TEXT, ('G-3',)),
+    '6072': ('Months', FieldType.TEXT, ()),
+    '6073': ('Regular Expiry', FieldType.TEXT, ()),
+    '6119': ('Marker for market data delivery method', FieldType.TEXT, ()),
+    '6457': ('Underlying Contract ID', FieldType.INTEGER, ()),
+    '6508': ('Service Params', FieldType.TEXT, ()),
+    '6509': ('Market Data Availability', FieldType.TEXT, ()),
+    '7051': ('Company Name', FieldType.TEXT, ()),
+    '7057': ('Ask Exch', FieldType.TEXT, ('G4',)),
+    '7058': ('Last Exch', FieldType.TEXT, ('G4',)),
+    '7059': ('Last Size', FieldType.SIZE, ('G4',)),
+    '7068': ('Bid Exch', FieldType.TEXT, ('G4',)),
+    '7080': ('Total Benefits', FieldType.NUMBER, ('G10022',)),
+    '7081': ('Optimal Action', FieldType.TEXT, ('G10022',)),
+    '7083': ('VWAP', FieldType.PRICE, ('G4',)),
+    '7084': ('Implied Vol./Hist. Vol %', FieldType.PERCENT, ('G8',)),
+    '7085': ('Put/Call Interest', FieldType.NUMBER, ('G8',)),
+    '7086': ('Put/Call Volume', FieldType.NUMBER, ()),
+    '7087': ('Hist. Vol. %', FieldType.PERCENT, ('G4',)),
+    '7088': ('Hist. Vol. Close %', FieldType.PERCENT, ('G4', 'G8')),
+    '7089': ('Opt. Volume', FieldType.SIZE, ('G8',)),
+    '7094': ('Contract ID and Exchange', FieldType.TEXT, ()),
+    '7184': ('Can Be Traded', FieldType.INTEGER, ()),
+    '7195': ('52 Week IV Rank', FieldType.NUMBER, ('G8',)),
+    '7196': ('26 Week IV Rank', FieldType.NUMBER, ('G8',)),
+    '7197': ('13 Week IV Rank', FieldType.NUMBER, ('G8',)),
+    '7198': ('52 Week IV Percentile', FieldType.NUMBER, ('G8',)),
+    '7199': ('26 Week IV Percentile', FieldType.NUMBER, ('G8',)),
+    '7200': ('13 Week IV Percentile', FieldType.NUMBER, ('G8',)),
+    '7201': ('52 Week IV High', FieldType.NUMBER, ('G8',)),
+    '7202': ('26 Week IV High', FieldType.NUMBER, ('G8',)),
+    '7203': ('13 Week IV High', FieldType.NUMBER, ('G8',)),
+    '7204': ('52 Week IV Low', FieldType.NUMBER, ('G8',)),
+    '7205': ('26 Week IV Low', FieldType.NUMBER, ('G8',)),
+    '7206': ('13 Week IV Low', FieldType.NUMBER, ('G8',)),
+    '7207': ('52 Week HV Rank', FieldType.NUMBER, ('G4',)),
+    '7208': ('26 Week HV Rank', FieldType.NUMBER, ('G4',)),
+    '7209': ('13 Week HV Rank', FieldType.NUMBER, ('G4',)),
+    '7210': ('52 Week HV Percentile', FieldType.NUMBER, ('G4',)),
+    '7211': ('26 Week HV Percentile', FieldType.NUMBER, ('G4',)),
+    '7212': ('13 Week HV Percentile', FieldType.NUMBER, ('G4',)),
+    '7219': ('Contract Description', FieldType.TEXT, ()),
+    '7220': ('Contract Description', FieldType.TEXT, ()),
+    '7221': ('Listing Exchange', FieldType.TEXT, ()),
+    '7242': ('Days to Last Trading Day', FieldType.NUMBER, ('G-3',)),
+    '7245': ('52 Week HV High', FieldType.NUMBER, ('G4',)),
+    '7246': ('26 Week HV High', FieldType.NUMBER, ('G4',)),
+    '7247': ('13 Week HV High', FieldType.NUMBER, ('G4',)),
+    '7248': ('52 Week HV Low', FieldType.NUMBER, ('G4',)),
+    '7249': ('26 Week HV Low', FieldType.NUMBER, ('G4',)),
+    '7263': ('13 Week HV Low', FieldType.NUMBER, ('G4',)),
+    '7264': ('ESG Combined Score', FieldType.NUMBER, ('G44',)),
+    '7265': ('Resource Use Score', FieldType.NUMBER, ('G45',)),
+    '7266': ('Emissions Score', FieldType.NUMBER, ('G45',)),
+    '7267': ('Environmental Innovation Score', FieldType.NUMBER, ('G45',)),
+    '7268': ('Workforce Score', FieldType.NUMBER, ('G45',)),
+    '7269': ('Human Rights Score', FieldType.NUMBER, ('G45',)),
+    '7271': ('Product Responsibility Score', FieldType.NUMBER, ('G45',)),
+    '7272': ('Management Score', FieldType.NUMBER, ('G45',)),
+    '7273': ('Shareholders Score', FieldType.NUMBER, ('G45',)),
+    '7274': ('CSR Strategy Score', FieldType.NUMBER, ('G45',)),
+    '7275': ('ESG Controversies Score', FieldType.NUMBER, ('G45',)),
+    '7276': ('ESG Score', FieldType.NUMBER, ('G44',)),
+    '7277': ('Community Score', FieldType.NUMBER, ('G45',)),
+    '7280': ('Industry', FieldType.TEXT, ('G-3',)),
+    '7281': ('Category', FieldType.TEXT, ('G-3',)),
+    '7282': ('Average Volume', FieldType.SIZE, ('G5',)),
+    '7283': ('Option Implied Vol. %', FieldType.PERCENT, ()),
+    '7284': ('Hist. Vol. (30d) %', FieldType.PERCENT, ()),
+    '7285': ('Put/Call Volume', FieldType.SIZE, ('G8',)),
+    '7286': ('Dividend Amount', FieldType.NUMBER, ('G14',)),
+    '7287': ('Dividend Yield %', FieldType.PERCENT, ('G14',)),
+    '7288': ('Dividend Date', FieldType.TEXT, ('G14',)),
+    '7289': ('Market Cap', FieldType.SIZE, ('G15',)),
+    '7290': ('P/E', FieldType.NUMBER, ('G15',)),
+    '7291': ('EPS', FieldType.NUMBER, ()),
+    '7292': ('Cost Basis', FieldType.SIZE, ('G2',)),
+    '7293': ('52 Week High', FieldType.PRICE, ('G5',)),
+    '7294': ('52 Week Low', FieldType.PRICE, ('G5',)),
+    '7295': ('Open', FieldType.PRICE, ('G4',)),
+    '7296': ('Prior Close', FieldType.PRICE, ('G4',)),
+    '7308': ('Delta', FieldType.NUMBER, ('G10',)),
+    '7309': ('Gamma', FieldType.NUMBER, ('G10',)),
+    '7310': ('Theta', FieldType.NUMBER, ('G10',)),
+    '7311': ('Vega', FieldType.NUMBER, ('G10',)),
+    '7322': ('Price/Book Ratio Latest', FieldType.NUMBER, ('G50',)),
+    '7323': ('Price/Sales Ratio Latest', FieldType.NUMBER, ('G50',)),
+    '7324': ('Return on Equity Weighted Average Latest', FieldType.NUMBER, ('G50',)),
+    '7325': ('Sales Per Share Growth 3Yr Latest', FieldType.NUMBER, ('G50',)),
+    '7326': ('LT Debt / Shareholders Equity', FieldType.NUMBER, ('G50',)),
+    '7327': ('EPS Growth 1yr', FieldType.NUMBER, ('G50',)),
+    '7328': ('EPS Growth 3yr', FieldType.NUMBER, ('G50',)),
+    '7329': ('EPS Growth 5yr', FieldType.NUMBER, ('G50',)),
+    '7330': ('Price/Sales', FieldType.NUMBER, ('G50',)),
+    '7331': ('Price/Book', FieldType.NUMBER, ('G50',)),
+    '7332': ('Price/Earnings', FieldType.TEXT, ('G50',)),
+    '7333': ('Return on Assets 3Yr', FieldType.NUMBER, ('G50',)),
+    '7334': ('Average Return 1Yr', FieldType.NUMBER, ('G50',)),
+    '7335': ('Bull Beta 1Yr', FieldType.NUMBER, ('G50',)),
+    '7336': ('CoVariance 1Yr', FieldType.NUMBER, ('G50',)),
+    '7349': ('Minimum Initial Purchase', FieldType.NUMBER, ('G48',)),
+    '7352': ('SEC Yield 7-Day', FieldType.NUMBER, ('G51',)),
+    '7353': ('SEC Yield 7-Day End Date', FieldType.TEXT, ('G51',)),
+    '7370': ('Environmental Score', FieldType.NUMBER, ('G46',)),
+    '7371': ('Social Score', FieldType.NUMBER, ('G46',)),
+    '7372': ('Corporate Governance Score', FieldType.NUMBER, ('G46',)),
+    '7389': ('Forward P/E', FieldType.NUMBER, ('G6', 'G15')),
+    '7390': ('Five Year EPS Growth', FieldType.NUMBER, ('G6',)),
+    '7391': ('Altar Score', FieldType.NUMBER, ('G6',)),
+    '7392': ('Asset Turnover Ratio', FieldType.NUMBER, ('G6',)),
+    '7393': ('Beta Vs S&P 500', FieldType.NUMBER, ('G6',)),
+    '7394': ('Developed Market Exposure', FieldType.NUMBER, ('G6',)),
+    '7395': ('Emerging Market Exposure', FieldType.NUMBER, ('G6',)),
+    '7396': ('Forward Dividend Yield', FieldType.NUMBER, ('G6',)),
+    '7397': ('Forward Price/Cash Flow', FieldType.NUMBER, ('G6',)),
+    '7398': ('Leverage', FieldType.NUMBER, ('G6',)),
+    '7399': ('Long Term Growth', FieldType.NUMBER, ('G6',)),
+    '7400': ('Payout', FieldType.NUMBER, ('G6',)),
+    '7401': ('Short Interest Ratio', FieldType.NUMBER, ('G6',)),
+    '7402': ('One Month EPS Change', FieldType.NUMBER, ('G6',)),
+    '7403': ('Three Month EPS Change', FieldType.NUMBER, ('G6',)),
+    '7408': ('Fund Family', FieldType.TEXT, ('G48',)),
+    '7409': ('Asset Universe', FieldType.TEXT, ('G51',)),
+    '7410': ('Fund Category', FieldType.TEXT, ('G48',)),
+    '7411': ('Classification', FieldType.TEXT, ('G51',)),
+    '7412': ('Scheme', FieldType.TEXT, ('G48',)),
+    '7413': ('Fund Type', FieldType.TEXT, ('G48',)),
+    '7414': ('Total Net Assets', FieldType.SIZE, ('G51',)),
+    '7417': ('Benchmark_Index', FieldType.TEXT, ('G51',)),
+    '7418': ('Objective Type', FieldType.TEXT, ('G51',)),
+    '7419': ('Closed', FieldType.TEXT, ('G51',)),
+    '7420': ('Closed for New Investment', FieldType.TEXT, ('G51',)),
+    '7421': ('Closed for New Money', FieldType.TEXT, ('G51',)),
+    '7422': ('Fund Status', FieldType.TEXT, ('G48',)),
+    '7423': ('Exchange Sell Eligible', FieldType.TEXT, ('G51',)),
+    '7424': ('Fund Market Capital Focus', FieldType.TEXT, ('G48',)),
+    '7425': ('Fund Geo Focus', FieldType.TEXT, ('G48',)),
+    '7426': ('Eligible Countries', FieldType.TEXT, ('G51',)),
+    '7427': ('Subsequent Minimum Purchase', FieldType.NUMBER, ('G51',)),
+    '7428': ('Initial Minimum Wrap Purchase', FieldType.NUMBER, ('G51',)),
+    '7429': ('Subsequent Minimum Wrap Purchase', FieldType.NUMBER, ('G51',)),
+    '7430': ('Initial Minimum IRA Purchase', FieldType.NUMBER, ('G51',)),
+    '7431': ('Subsequent Minimum IRA Purchase', FieldType.NUMBER, ('G51',)),
+    '7432': ('Load Type', FieldType.TEXT, ('G48',)),
+    '7433': ('Short Term Redemption', FieldType.NUMBER, ('G48',)),
+    '7434': ('Management Fee', FieldType.NUMBER, ('G51',)),
+    '7435': ('Total Expense Ratio', FieldType.NUMBER, ('G48',)),
+    '7436': ('12b-1 Fees', FieldType.NUMBER, ('G51',)),
+    '7437': ('No Transaction Fees funds at IBKR', FieldType.TEXT, ('G51',)),
+    '7438': ('Total Net Expenses', FieldType.NUMBER, ('G51',)),
+    '7439': ('Strategy Fund of Funds Internal', FieldType.TEXT, ('G49',)),
+    '7440': ('Strategy Fund of Funds External', FieldType.TEXT, ('G49',)),
+    '7441': ('Strategy Index Tracking', FieldType.TEXT, ('G49',)),
+    '7442': ('Strategy Bond Domestic Issued', FieldType.TEXT, ('G49',)),
+    '7443': ('Strategy Hedged', FieldType.TEXT, ('G49',)),
+    '7444': ('Strategy Leveraged', FieldType.TEXT, ('G49',)),
+    '7445': ('Strategy Net 100', FieldType.TEXT, ('G49',)),
+    '7446': ('Strategy Ethical', FieldType.TEXT, ('G49',)),
+    '7447': ('Strategy Total Return', FieldType.TEXT, ('G49',)),
+    '7448': ('Strategy Manager of Manager Funds', FieldType.TEXT, ('G49',)),
+    '7449': ('Strategy Islamic', FieldType.TEXT, ('G49',)),
+    '7450': ('Strategy Fund of Fund Unaffiliated', FieldType.TEXT, ('G49',)),
+    '7451': ('Strategy Fund of Fund Affiliated', FieldType.TEXT, ('G49',)),
+    '7452': ('Strategy Fund of Funds Active', FieldType.TEXT, ('G49',)),
+    '7453': ('Strategy Fund of Funds Passive', FieldType.TEXT, ('G49',)),
+    '7454': ('Strategy Fund of Hedge Funds', FieldType.TEXT, ('G49',)),
+    '7455': ('Strategy Fd of Fds-Blended', FieldType.TEXT, ('G49',)),
+    '7456': ('Strategy Fund of ETFs', FieldType.TEXT, ('G49',)),
+    '7457': ('Strategy Fund of Funds', FieldType.TEXT, ('G49',)),
+    '7458': ('Strategy Social Criteria', FieldType.TEXT, ('G49',)),
+    '7459': ('Strategy Interval Hybrid', FieldType.TEXT, ('G49',)),
+    '7460': ('Strategy Index Replication Method', FieldType.TEXT, ('G49',)),
+    '7461': ('Strategy Actively Managed ETFs', FieldType.TEXT, ('G49',)),
+    '7462': ('Strategy Green', FieldType.TEXT, ('G49',)),
+    '7463': ('Strategy Alternative Energy', FieldType.TEXT, ('G49',)),
+    '7464': ('Strategy Managed Volatility', FieldType.TEXT, ('G49',)),
+    '7465': ('Strategy Water', FieldType.TEXT, ('G49',)),
+    '7466': ('Strategy Fund of REITs', FieldType.TEXT, ('G49',)),
+    '7467': ('Lipper Leader Total Return Score Overall', FieldType.NUMBER, ('G49',)),
+    '7468': ('Lipper Leader Consistent Return Score Overall', FieldType.NUMBER, ('G49',)),
+    '7469': ('Lipper Leader Preservation Score Overall', FieldType.NUMBER, ('G49',)),
+    '7470': ('Lipper Leader Tax Efficiency Score Overall', FieldType.NUMBER, ('G49',)),
+    '7471': ('Lipper Leader Expense Score Overall', FieldType.NUMBER, ('G49',)),
+    '7472': ('Lipper Leader Total Return Score 3Yr', FieldType.NUMBER, ('G49',)),
+    '7473': ('Lipper Leader Consistent Return Score 3Yr', FieldType.NUMBER, ('G49',)),
+    '7474': ('Lipper Leader Preservation Score 3Yr', FieldType.NUMBER, ('G49',)),
+    '7475': ('Lipper Leader Tax Efficiency Score 3Yr', FieldType.NUMBER, ('G49',)),
+    '7476': ('Lipper Leader Expense Score 3Yr', FieldType.NUMBER, ('G49',)),
+    '7477': ('Lipper Leader Total Return Score 5Yr', FieldType.NUMBER, ('G49',)),
+    '7478': ('Lipper Leader Consistent Return Score 5Yr', FieldType.NUMBER, ('G49',)),
+    '7479': ('Lipper Leader Preservation Score 5Yr', FieldType.NUMBER, ('G49',)),
+    '7480': ('Lipper Leader Tax Efficiency Score 5Yr', FieldType.NUMBER, ('G49',)),
+    '7481': ('Lipper Leader Expense Score 5Yr', FieldType.NUMBER, ('G49',)),
+    '7482': ('Lipper Leader Total Return Score 10Yr', FieldType.NUMBER, ('G49',)),
+    '7483': ('Lipper Leader Consistent Return Score 10Yr', FieldType.NUMBER, ('G49',)),
+    '7484': ('Lipper Leader Preservation Score 10Yr', FieldType.NUMBER, ('G49',)),
+    '7485': ('Lipper Leader Tax Efficiency Score 10Yr', FieldType.NUMBER, ('G49',)),
+    '7486': ('Lipper Leader Expense Score 10Yr', FieldType.NUMBER, ('G49',)),
+    '7487': ('Distribution Yield 1Yr Value', FieldType.NUMBER, ('G51',)),
+    '7488': ('Percentage Growth Cumulative Value', FieldType.NUMBER, ('G51',)),
+    '7489': ('Annualized Performance 3Yr Value', FieldType.NUMBER, ('G48',)),
+    '7490': ('Annualized Performance 5Yr Value', FieldType.NUMBER, ('G48',)),
+    '7491': ('Annualized Performance 10Yr Value', FieldType.NUMBER, ('G48',)),
+    '7493': ('Yield 1Yr', FieldType.NUMBER, ('G48',)),
+    '7494': ('Projected Yield Value', FieldType.NUMBER, ('G48',)),
+    '7496': ('R-Squared Adjusted 1Yr', FieldType.NUMBER, ('G50',)),
+    '7497': ('Alpha 1Yr', FieldType.NUMBER, ('G50',)),
+    '7498': ('Average Loss 1Yr', FieldType.NUMBER, ('G50',)),
+    '7504': ('Correlation 1Yr', FieldType.NUMBER, ('G50',)),
+    '7505': ('Downside Deviation 1Yr', FieldType.NUMBER, ('G50',)),
+    '7506': ('Information Ratio 1Yr', FieldType.NUMBER, ('G50',)),
+    '7507': ('Max Gain 1Yr', FieldType.NUMBER, ('G50',)),
+    '7508': ('Max Loss 1Yr', FieldType.NUMBER, ('G50',)),
+    '7509': ('Max Drawdown 1Yr', FieldType.NUMBER, ('G50',)),
+    '7510': ('Positive Periods 1Yr', FieldType.NUMBER, ('G50',)),
+    '7511': ('R-Squared 1Yr', FieldType.NUMBER, ('G50',)),
+    '7513': ('Synthetic Risk and Reward Indicator 1Yr', FieldType.NUMBER, ('G50',)),
+    '7514': ('Semi Deviation 1Yr', FieldType.NUMBER, ('G50',)),
+    '7515': ('Semi Variance 1Yr', FieldType.NUMBER, ('G50',)),
+    '7516': ('Sharpe Ratio 1Yr', FieldType.NUMBER, ('G50',)),
+    '7517': ('Sortino Ratio 1Yr', FieldType.NUMBER, ('G50',)),
+    '7518': ('Standard Deviation 1Yr', FieldType.NUMBER, ('G50',)),
+    '7519': ('Tracking Error 1Yr', FieldType.NUMBER, ('G50',)),
+    '7534': ('Trading Currency', FieldType.TEXT, ('G-3',)),
+    '7538': ('Multiplier', FieldType.NUMBER, ('G-3',)),
+    '7552': ('Return on Assets 1Yr', FieldType.NUMBER, ('G50',)),
+    '7553': ('Return on Equity 1Yr', FieldType.NUMBER, ('G50',)),
+    '7554': ('Return on Equity 3Yr', FieldType.NUMBER, ('G50',)),
+    '7555': ('Return on Investment 1Yr', FieldType.NUMBER, ('G50',)),
+    '7556': ('Return on Investment 3Yr', FieldType.NUMBER, ('G50',)),
+    '7557': ('Sales to Total Assets', FieldType.NUMBER, ('G50',)),
+    '7558': ('Sales Per Share Growth 1 Year', FieldType.NUMBER, ('G50',)),
+    '7559': ('Sales Per Share Growth 3 Year', FieldType.NUMBER, ('G50',)),
+    '7560': ('Total Assets / Total Equity', FieldType.NUMBER, ('G50',)),
+    '7561': ('Total Debt / Total Capital', FieldType.NUMBER, ('G50',)),
+    '7562': ('Total Debt / Total Equity', FieldType.NUMBER, ('G50',)),
+    '7563': ('Price to Cash', FieldType.NUMBER, ('G50',)),
+    '7564': ('Relative Strength', FieldType.NUMBER, ('G50',)),
+    '7565': ('Return on Capital', FieldType.NUMBER, ('G50',)),
+    '7566': ('Return on Capital 3Yr', FieldType.NUMBER, ('G50',)),
+    '7567': ('Composite Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7568': ('Price/Sales Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7569': ('Price to Earnings Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7570': ('Price to Book Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7571': ('SPS Growth Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7572': ('Average Final Composite Z-Score', FieldType.NUMBER, ('G50',)),
+    '7573': ('Dividend Yield Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7574': ('Return on Equity Z-Score Latest', FieldType.NUMBER, ('G50',)),
+    '7575': ('Weighted Final Composite Z-Score', FieldType.NUMBER, ('G50',)),
+    '7576': ('Weighted Average YTM', FieldType.NUMBER, ('G48',)),
+    '7577': ('Nominal Maturity', FieldType.NUMBER, ('G51',)),
+    '7578': ('Effective Maturity', FieldType.NUMBER, ('G51',)),
+    '7579': ('Average Coupon', FieldType.NUMBER, ('G51',)),
+    '7580': ('Average Quality', FieldType.NUMBER, ('G48',)),
+    '7581': ('Calculated Average Quality', FieldType.NUMBER, ('G51',)),
+    '7582': ('Bear Beta 1Yr', FieldType.NUMBER, ('G50',)),
+    '7583': ('Beta 1Yr', FieldType.NUMBER, ('G50',)),
+    '7584': ('Return Risk Ratio 1Yr', FieldType.NUMBER, ('G50',)),
+    '7585': ('Treynor Ratio 1Yr', FieldType.NUMBER, ('G50',)),
+    '7586': ('Value At Risk Normal 1Yr', FieldType.NUMBER, ('G50',)),
+    '7587': ('Value At Risk Normal End Tail Loss 1Yr', FieldType.NUMBER, ('G50',)),
+    '7588': ('Value At Risk Quantile 1Yr', FieldType.NUMBER, ('G50',)),
+    '7589': ('Value At Risk Quantile End Tail Loss 1Yr', FieldType.NUMBER, ('G50',)),
+    '7590': ('Variance 1Yr', FieldType.NUMBER, ('G50',)),
+    '7591': ('Number of Securities', FieldType.NUMBER, ('G51',)),
+    '7592': ('Dividend Payout Ratio', FieldType.NUMBER, ('G51',)),
+    '7593': ('Dividend Payout Ratio 5yr', FieldType.NUMBER, ('G51',)),
+    '7594': ('Dividend Per Share 1Yr', FieldType.NUMBER, ('G51',)),
+    '7595': ('Dividend Per Share 3Yr', FieldType.NUMBER, ('G51',)),
+    '7596': ('Price to Dividend', FieldType.NUMBER, ('G51',)),
+    '7597': ('Dividend Yield Weighted Average', FieldType.NUMBER, ('G48',)),
+    '7598': ('EBIT to Interest', FieldType.NUMBER, ('G50',)),
+    '7599': ('Market Capitalisation Avg Latest', FieldType.SIZE, ('G50',)),
+    '7605': ('Operating Cash Flow Growth Rate 3yr', FieldType.NUMBER, ('G50',)),
+    '7607': ('Opt. Volume Change %', FieldType.PERCENT, ('G8',)),
+    '7608': ('Opt. Implied Volatility %', FieldType.PERCENT, ('G8',)),
+    '7611': ('Sales Growth 1Yr', FieldType.NUMBER, ('G50',)),
+    '7612': ('Closing Impl. Vol. %', FieldType.PERCENT, ('G8',)),
+    '7613': ('Opt. Imp. Vol. Change', FieldType.NUMBER, ('G8',)),
+    '7618': ('Sales Growth 3Yr', FieldType.NUMBER, ('G50',)),
+    '7619': ('Sales Growth 5Yr', FieldType.NUMBER, ('G50',)),
+    '7627': ('Price/Earnings Ratio Latest', FieldType.NUMBER, ('G50',)),
+    '7629': ('Mid', FieldType.PRICE, ('G4',)),
+    '7631': ('Time Value (%)', FieldType.PERCENT, ('G8',)),
+    '7633': ('Implied Vol. %', FieldType.PERCENT, ('G8',)),
+    '7634': ('Underlying Price', FieldType.PRICE, ('G4', 'G8')),
+    '7635': ('Mark', FieldType.PRICE, ('G4',)),
+    '7636': ('Shortable Shares', FieldType.SIZE, ('G33',)),
+    '7637': ('Fee rate', FieldType.NUMBER, ('G33',)),
+    '7638': ('Option Open Interest', FieldType.SIZE, ('G8',)),
+    '7639': ('% of Market Value', FieldType.PERCENT, ('G2',)),
+    '7640': ('Portfolio Delta', FieldType.NUMBER, ('G10',)),
+    '7641': ('Portfolio Gamma', FieldType.NUMBER, ('G10',)),
+    '7642': ('Portfolio Theta', FieldType.NUMBER, ('G10',)),
+    '7643': ('Portfolio Vega', FieldType.NUMBER, ('G10',)),
+    '7644': ('Shortable', FieldType.TEXT, ('G33',)),
+    '7645': ('Zacks Rating', FieldType.TEXT, ('G17',)),
+    '7646': ('ValuEngine Rating', FieldType.TEXT, ('G17',)),
+    '7647': ('Ford Research Rating', FieldType.TEXT, ('G17',)),
+    '7648': ('SADIF Analytics Rating', FieldType.TEXT, ('G17',)),
+    '7649': ('TheStreet Rating', FieldType.TEXT, ('G17',)),
+    '7651': ('Validea Rating', FieldType.TEXT, ('G17',)),
+    '7652': ('MarketGrader Rating', FieldType.TEXT, ('G17',)),
+    '7653': ('Argus Research Rating', FieldType.TEXT, ('G17',)),
+    '7654': ('New Constructs Rating', FieldType.TEXT, ('G17',)),
+    '7655': ('Morningstar Rating', FieldType.TEXT, ('G17',)),
+    '7656': ('Long Term Technical Event Class', FieldType.TEXT, ('G41',)),
+    '7657': ('Long Term Technical Event Date', FieldType.TEXT, ('G41',)),
+    '7658': ('Long Term Technical Event Name', FieldType.TEXT, ('G41',)),
+    '7659': ('Long Term Event Score', FieldType.NUMBER, ('G41',)),
+    '7660': ('Long Term Event Trade Type', FieldType.TEXT, ('G41',)),
+    '7661': ('Intermediate Term Technical Event Class', FieldType.TEXT, ('G41',)),
+    '7662': ('Intermediate Term Technical Event Date', FieldType.TEXT, ('G41',)),
+    '7663': ('Intermediate Term Technical Event Name', FieldType.TEXT, ('G41',)),
+    '7664': ('Intermediate Term Event Score', FieldType.NUMBER, ('G41',)),
+    '7665': ('Intermediate Term Event Trade Type', FieldType.TEXT, ('G41',)),
+    '7666': ('Short Term Technical Event Class', FieldType.TEXT, ('G41',)),
+    '7667': ('Short Term Technical Event Date', FieldType.TEXT, ('G41',)),
+    '7668': ('Short Term Technical Event Name', FieldType.TEXT, ('G41',)),
+    '7669': ('Short Term Event Score', FieldType.NUMBER, ('G41',)),
+    '7670': ('Short Term Event Trade Type', FieldType.TEXT, ('G41',)),
+    '7671': ('Dividends', FieldType.NUMBER, ('G14',)),
+    '7672': ('Dividends TTM', FieldType.NUMBER, ('G14',)),
+    '7674': ('EMA(200)', FieldType.PRICE, ('G40',)),
+    '7675': ('EMA(100)', FieldType.PRICE, ('G40',)),
+    '7676': ('EMA(50)', FieldType.PRICE, ('G40',)),
+    '7677': ('EMA(20)', FieldType.PRICE, ('G40',)),
+    '7678': ('Price/EMA(200)', FieldType.NUMBER, ('G40',)),
+    '7679': ('Price/EMA(100)', FieldType.NUMBER, ('G40',)),
+    '7681': ('Price/EMA(20)', FieldType.NUMBER, ('G40',)),
+    '7682': ('Change Since Open %', FieldType.PERCENT, ('G4',)),
+    '7683': ('Upcoming Event', FieldType.TEXT, ('G27',)),
+    '7684': ('Upcoming Event Date', FieldType.TEXT, ('G27',)),
+    '7685': ('Upcoming Analyst Meeting', FieldType.TEXT, ('G27',)),
+    '7686': ('Upcoming Earnings', FieldType.TEXT, ('G27',)),
+    '7687': ('Upcoming Misc Event', FieldType.TEXT, ('G27',)),
+    '7688': ('Recent Analyst Meeting', FieldType.TEXT, ('G27',)),
+    '7689': ('Recent Earnings', FieldType.TEXT, ('G27',)),
+    '7690': ('Recent Misc Event', FieldType.TEXT, ('G27',)),
+    '7693': ('Liquidate Last', FieldType.TEXT, ('G2',)),
+    '7694': ('Maximum Return', FieldType.NUMBER, ('G0',)),
+    '7695': ('Break Even', FieldType.NUMBER, ('G0',)),
+    '7696': ('SPX Delta', FieldType.NUMBER, ('G0',)),
+    '7697': ('Futures Open Interest', FieldType.SIZE, ('G7',)),
+    '7698': ('Last Yield', FieldType.NUMBER, ('G9',)),
+    '7699': ('Ask Yield', FieldType.NUMBER, ('G9',)),
+    '7700': ('Probability of Max Return', FieldType.NUMBER, ()),
+    '7702': ('Probability of Max Loss', FieldType.NUMBER, ()),
+    '7703': ('Profit Probability', FieldType.NUMBER, ('G0',)),
+    '7704': ('Organization Type', FieldType.TEXT, ('G9',)),
+    '7705': ('Debt Class', FieldType.TEXT, ('G9',)),
+    '7706': ('Ratings', FieldType.TEXT, ('G9',)),
+    '7707': ('State code', FieldType.TEXT, ('G9',)),
+    '7708': ('Bond Type', FieldType.TEXT, ('G9',)),
+    '7714': ('Last Trading Date', FieldType.TEXT, ('G9',)),
+    '7715': ('Issue Date', FieldType.TEXT, ('G9',)),
+    '7716': ('Return/Risk', FieldType.NUMBER, ('G0',)),
+    '7718': ('Beta', FieldType.NUMBER, ('G0',)),
+    '7720': ('Bid Yield', FieldType.NUMBER, ('G9',)),
+    '7722': ('In The Money', FieldType.TEXT, ('G8',)),
+    '7724': ('Price/EMA(50)', FieldType.NUMBER, ('G40',)),
+    '7725': ('Probability of Max Return', FieldType.NUMBER, ('G0',)),
+    '7726': ('Maximum Loss', FieldType.NUMBER, ('G0',)),
+    '7727': ('Probability of Max Loss', FieldType.NUMBER, ('G0',)),
+    '7728': ('Spread', FieldType.PRICE, ('G4',)),
+    '7741': ('Prior Close', FieldType.PRICE, ()),
+    '7762': ('Volume Long', FieldType.SIZE, ()),
+    '7768': ('Has Trading Permissions', FieldType.TEXT, ()),
+    '7771': ('Change Since Open', FieldType.PRICE, ('G4',)),
+    '7920': ('Daily P&L Raw', FieldType.NUMBER, ()),
+    '7921': ('Cost Basis Raw', FieldType.NUMBER, ())
+}
+
+# group id -> name
+GROUPS: Dict[str, str] = {
+    'G-3': 'Financial Instrument Description',
+    'G0': 'Columns',
+    'G10': 'Greeks',
+    'G10022': 'Option Exercise',
+    'G14': 'Dividends',
+    'G15': 'Fundamentals - Popular',
+    'G17': 'Fundamentals - Independent Ratings',
+    'G2': 'Position and P&L',
+    'G27': 'WSH Corporate Event Calendar',
+    'G33': 'Short Selling',
+    'G4': 'Prices',
+    'G40': 'Technical Indicator',
+    'G41': 'Technical Indicators by Recognia',
+    'G44': 'ESG - Combined Scores',
+    'G45': 'ESG - Category Scores',
+    'G46': 'ESG - Pillar Scores',
+    'G48': 'Funds - Popular',
+    'G49': 'Funds - Ratings & Strategy',
+    'G5': 'High/Low/Volume/History',
+    'G50': 'Funds - Ratios & Statistics',
+    'G51': 'Funds - Other',
+    'G6': 'ETFs',
+    'G7': 'Futures',
+    'G8': 'Options',
+    'G9': 'Bonds'
+}
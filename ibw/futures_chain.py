@@ -0,0 +1,467 @@
+import bisect
+import datetime
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+# The version of the layout of a saved chain.
+FORMAT_VERSION = 1
+
+# The seconds before a chain is searched again, once a day.
+DEFAULT_REFRESH_INTERVAL = 86400.0
+
+# The business days before the last trading day a position is rolled.
+DEFAULT_ROLL_DAYS = 5
+
+_FIELDS = ('conid', 'symbol', 'underlying_conid', 'expiry', 'last_trade')
+
+Day = Union[int, str, datetime.date, datetime.datetime]
+
+
+def to_day(value: Day = None) -> int:
+    """Converts a date to a `YYYYMMDD` integer, today in UTC by default.
+
+    Arguments:
+    ----
+    value {Union[int, str, datetime.date, datetime.datetime]} -- The date,
+        e.g. `20230317`, `'20230317'`, `'2023-03-17'` or a date. (default: {today})
+
+    Returns:
+    ----
+    {int} -- The date, e.g. `20230317`.
+    """
+
+    if value is None:
+        value = datetime.datetime.now(datetime.timezone.utc).date()
+
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.year * 10000 + value.month * 100 + value.day
+
+    return int(str(value).replace('-', '')[:8])
+
+
+def from_day(value: int) -> datetime.date:
+    """Converts a `YYYYMMDD` integer to a date."""
+
+    return datetime.date(value // 10000, value // 100 % 100, value % 100)
+
+
+def business_days_before(day: int, days: int) -> int:
+    """Returns the date `days` weekdays before a `YYYYMMDD` date."""
+
+    moment = from_day(day)
+
+    while days > 0:
+        moment -= datetime.timedelta(days=1)
+        if moment.weekday() < 5:
+            days -= 1
+
+    return to_day(moment)
+
+
+class FutureContract():
+
+    __slots__ = _FIELDS
+
+    def __init__(self, conid: int, symbol: str, expiry: Day, last_trade: Day = None,
+                 underlying_conid: int = None) -> None:
+        """Initalizes a new instance of the FutureContract Object.
+
+        Arguments:
+        ----
+        conid {int} -- The contract ID.
+
+        symbol {str} -- The underlying symbol, e.g. `ES`.
+
+        expiry {Union[int, str, datetime.date]} -- The expiration date.
+
+        Keyword Arguments:
+        ----
+        last_trade {Union[int, str, datetime.date]} -- The last trading day.
+            (default: {the expiration date})
+
+        underlying_conid {int} -- The contract ID of the underlying. (default: {None})
+        """
+
+        self.conid = int(conid)
+        self.symbol = symbol
+        self.expiry = to_day(expiry)
+        self.last_trade = to_day(last_trade) if last_trade is not None else self.expiry
+        self.underlying_conid = int(underlying_conid) if underlying_conid is not None else None
+
+    def __repr__(self) -> str:
+        return '<FutureContract conid={} symbol={} expiry={}>'.format(self.conid, self.symbol, self.expiry)
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, FutureContract) and self.to_dict() == other.to_dict()
+
+    def to_dict(self) -> Dict:
+        return {field: getattr(self, field) for field in _FIELDS}
+
+    @classmethod
+    def from_dict(cls, content: Dict) -> 'FutureContract':
+        return cls(**{field: content.get(field) for field in _FIELDS if field in content})
+
+
+class FuturesChain():
+
+    def __init__(self, client=None, path: Union[str, pathlib.Path] = None,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL, roll_days: int = DEFAULT_ROLL_DAYS) -> None:
+        """Initalizes a new instance of the FuturesChain Object.
+
+        Indexes the contracts `futures_search` returns, sorted by expiration
+        per underlying, so the front month, the next expiration after a date
+        and roll dates are answered with a binary search instead of scanning
+        the search results. A chain older than `refresh_interval` is searched
+        again the next time it's asked for, all the stale symbols of a query
+        in one request. Chains are saved to a JSON file.
+
+        Keyword Arguments:
+        ----
+        client {IBClient} -- The client used to search for chains. (default: {None})
+
+        path {Union[str, pathlib.Path]} -- The JSON file the chains are loaded
+            from and saved to. (default: {None})
+
+        refresh_interval {float} -- The seconds before a chain is searched
+            again. (default: {86400.0})
+
+        roll_days {int} -- The business days before the last trading day a
+            contract is rolled to the next one. (default: {5})
+
+        Usage:
+        ----
+            >>> chains = FuturesChain(client=ib_client, path='data/futures.json')
+            >>> chains.front('ES')
+            >>> chains.next_after('ES', '2023-06-01')
+            >>> chains.active('ES', on='2023-03-13')
+            >>> chains.roll_calendar('ES')
+        """
+
+        self.client = client
+        self.path = pathlib.Path(path) if path is not None else None
+        self.refresh_interval = refresh_interval
+        self.roll_days = roll_days
+
+        self._lock = threading.RLock()
+
+        # Contracts sorted by expiration, with their sort keys, per symbol.
+        self._chains: Dict[str, List[FutureContract]] = {}
+        self._expiries: Dict[str, List[int]] = {}
+        self._last_trades: Dict[str, List[int]] = {}
+        self._updated: Dict[str, float] = {}
+
+        self.requests = 0
+
+        if self.path is not None and self.path.exists():
+            self.load()
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._chains
+
+    def symbols(self) -> List[str]:
+        """Returns the symbols with a chain, sorted."""
+
+        with self._lock:
+            return sorted(self._chains)
+
+    def refresh(self, symbols: List[str]) -> Dict[str, List[FutureContract]]:
+        """Searches the chains of symbols again with one `trsrv/futures` request.
+
+        Arguments:
+        ----
+        symbols {List[str]} -- The underlying symbols, e.g. `['ES', 'NQ']`.
+
+        Returns:
+        ----
+        {Dict[str, List[FutureContract]]} -- The chains received, by symbol.
+        """
+
+        if self.client is None:
+            raise ValueError('The chain has no client to search with.')
+
+        symbols = list(dict.fromkeys(symbols))
+        if not symbols:
+            return {}
+
+        self.requests += 1
+        payload = self.client.futures_search(symbols=symbols)
+
+        chains = {}
+
+        for symbol in symbols:
+            entries = payload.get(symbol) if isinstance(payload, dict) else None
+            chains[symbol] = [
+                FutureContract(
+                    conid=entry['conid'],
+                    symbol=entry.get('symbol') or symbol,
+                    expiry=entry['expirationDate'],
+                    last_trade=entry.get('ltd'),
+                    underlying_conid=entry.get('underlyingConid')
+                )
+                for entry in entries or []
+            ]
+
+        self.add(chains)
+
+        if self.path is not None:
+            self.save()
+
+        return chains
+
+    def add(self, chains: Dict[str, List[FutureContract]], updated: float = None) -> None:
+        """Replaces the chains of symbols, sorting them by expiration."""
+
+        updated = updated if updated is not None else time.time()
+
+        with self._lock:
+            for symbol, contracts in chains.items():
+                ordered = sorted(contracts, key=lambda contract: (contract.expiry, contract.conid))
+                self._chains[symbol] = ordered
+                self._expiries[symbol] = [contract.expiry for contract in ordered]
+                self._last_trades[symbol] = [contract.last_trade for contract in ordered]
+                self._updated[symbol] = updated
+
+    def chain(self, symbol: str, on: Day = None) -> List[FutureContract]:
+        """Returns the contracts of a symbol still trading on a date, by expiration.
+
+        Arguments:
+        ----
+        symbol {str} -- The underlying symbol.
+
+        Keyword Arguments:
+        ----
+        on {Union[int, str, datetime.date]} -- The date. (default: {today})
+
+        Returns:
+        ----
+        {List[FutureContract]} -- The contracts whose last trading day isn't before `on`.
+        """
+
+        self._ensure([symbol])
+
+        with self._lock:
+            index = self._first_trading(symbol=symbol, day=to_day(on))
+            return self._chains.get(symbol, [])[index:]
+
+    def front(self, symbol: str, on: Day = None) -> FutureContract:
+        """Returns the nearest contract still trading on a date.
+
+        Arguments:
+        ----
+        symbol {str} -- The underlying symbol.
+
+        Keyword Arguments:
+        ----
+        on {Union[int, str, datetime.date]} -- The date. (default: {today})
+
+        Returns:
+        ----
+        {FutureContract} -- The front month, or `None` when none is left.
+        """
+
+        return self._at(symbol=symbol, offset=0, on=on)
+
+    def next_after(self, symbol: str, day: Day) -> FutureContract:
+        """Returns the first contract expiring strictly after a date.
+
+        Arguments:
+        ----
+        symbol {str} -- The underlying symbol.
+
+        day {Union[int, str, datetime.date]} -- The date.
+
+        Returns:
+        ----
+        {FutureContract} -- The contract, or `None` when none expires later.
+        """
+
+        self._ensure([symbol])
+
+        with self._lock:
+            index = bisect.bisect_right(self._expiries.get(symbol, []), to_day(day))
+            chain = self._chains.get(symbol, [])
+            return chain[index] if index < len(chain) else None
+
+    def roll_date(self, symbol: str, on: Day = None) -> int:
+        """Returns the date the front contract on a date is rolled, `YYYYMMDD`.
+
+        Arguments:
+        ----
+        symbol {str} -- The underlying symbol.
+
+        Keyword Arguments:
+        ----
+        on {Union[int, str, datetime.date]} -- The date. (default: {today})
+
+        Returns:
+        ----
+        {int} -- `roll_days` business days before the last trading day of the
+            front month, or `None` when no contract is left.
+        """
+
+        contract = self.front(symbol=symbol, on=on)
+        if contract is None:
+            return None
+
+        return business_days_before(contract.last_trade, self.roll_days)
+
+    def active(self, symbol: str, on: Day = None) -> FutureContract:
+        """Returns the contract to hold on a date: the front month, or the next
+        one from the front month's roll date on.
+
+        Arguments:
+        ----
+        symbol {str} -- The underlying symbol.
+
+        Keyword Arguments:
+        ----
+        on {Union[int, str, datetime.date]} -- The date. (default: {today})
+
+        Returns:
+        ----
+        {FutureContract} -- The contract, or `None` when none is left.
+        """
+
+        day = to_day(on)
+        front = self.front(symbol=symbol, on=day)
+
+        if front is not None and day >= business_days_before(front.last_trade, self.roll_days):
+            return self._at(symbol=symbol, offset=1, on=day)
+
+        return front
+
+    def roll_calendar(self, symbol: str, start: Day = None, end: Day = None) -> List[Tuple[int, FutureContract, FutureContract]]:
+        """Returns the rolls between consecutive contracts of a symbol.
+
+        Arguments:
+        ----
+        symbol {str} -- The underlying symbol.
+
+        Keyword Arguments:
+        ----
+        start {Union[int, str, datetime.date]} -- The first roll date kept. (default: {today})
+
+        end {Union[int, str, datetime.date]} -- The last roll date kept. (default: {None})
+
+        Returns:
+        ----
+        {List[Tuple[int, FutureContract, FutureContract]]} -- The `(roll_date,
+            from_contract, to_contract)` rolls, by date.
+        """
+
+        self._ensure([symbol])
+
+        start = to_day(start)
+        end = to_day(end) if end is not None else None
+
+        with self._lock:
+            chain = self._chains.get(symbol, [])
+
+        calendar = []
+
+        for current, following in zip(chain, chain[1:]):
+            day = business_days_before(current.last_trade, self.roll_days)
+            if day < start or (end is not None and day > end):
+                continue
+            calendar.append((day, current, following))
+
+        return calendar
+
+    def prefetch(self, symbols: List[str]) -> None:
+        """Searches the chains of symbols that are missing or stale, in one request."""
+
+        self._ensure(symbols)
+
+    def save(self, path: Union[str, pathlib.Path] = None) -> None:
+        """Writes every chain to a JSON file, atomically."""
+
+        path = pathlib.Path(path) if path is not None else self.path
+        if path is None:
+            raise ValueError('The chain has no path to save to.')
+
+        with self._lock:
+            content = {
+                'version': FORMAT_VERSION,
+                'chains': {
+                    symbol: {
+                        'updated': self._updated[symbol],
+                        'contracts': [contract.to_dict() for contract in contracts]
+                    }
+                    for symbol, contracts in self._chains.items()
+                }
+            }
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + '.tmp')
+        temporary.write_text(json.dumps(content, separators=(',', ':')), encoding='utf-8')
+        os.replace(temporary, path)
+
+    def load(self, path: Union[str, pathlib.Path] = None) -> int:
+        """Adds the chains of a file written by `save`, keeping when they were searched.
+
+        Returns:
+        ----
+        {int} -- The number of chains loaded.
+        """
+
+        path = pathlib.Path(path) if path is not None else self.path
+        content = json_codec.loads(path.read_bytes())
+        chains = content.get('chains', {})
+
+        for symbol, chain in chains.items():
+            self.add(
+                {symbol: [FutureContract.from_dict(item) for item in chain.get('contracts', [])]},
+                updated=chain.get('updated', 0.0)
+            )
+
+        return len(chains)
+
+    def stats(self) -> Dict:
+        """Returns the chains and contracts known, and the searches sent."""
+
+        with self._lock:
+            return {
+                'chains': len(self._chains),
+                'contracts': sum(len(chain) for chain in self._chains.values()),
+                'requests': self.requests
+            }
+
+    def _ensure(self, symbols: List[str]) -> None:
+        if self.client is None:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            stale = [
+                symbol for symbol in symbols
+                if now - self._updated.get(symbol, float('-inf')) >= self.refresh_interval
+            ]
+
+        if stale:
+            logger.debug('Searching the futures chains of %s.', stale)
+            self.refresh(stale)
+
+    def _first_trading(self, symbol: str, day: int) -> int:
+        # Last trading days rise with expirations, so they're searched too.
+        return bisect.bisect_left(self._last_trades.get(symbol, []), day)
+
+    def _at(self, symbol: str, offset: int, on: Day = None) -> FutureContract:
+        self._ensure([symbol])
+
+        with self._lock:
+            index = self._first_trading(symbol=symbol, day=to_day(on)) + offset
+            chain = self._chains.get(symbol, [])
+            return chain[index] if index < len(chain) else None
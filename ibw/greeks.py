@@ -0,0 +1,489 @@
+import math
+from typing import Dict
+from typing import Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+try:
+    from scipy.special import ndtr
+except ImportError:
+    ndtr = None
+
+from .options_chain import MISSING
+from .options_chain import OptionChain
+from .quote_table import QuoteTable
+
+# The models an option is priced with: on a spot price with a dividend
+# yield, or on a futures price.
+BLACK_SCHOLES = 'black_scholes'
+BLACK_76 = 'black76'
+MODELS = (BLACK_SCHOLES, BLACK_76)
+
+DAYS_PER_YEAR = 365.0
+
+# The bounds the implied volatility is searched between.
+MIN_VOLATILITY = 1e-4
+MAX_VOLATILITY = 5.0
+
+# Options expire at the 16:00 New York close, taken as 21:00 UTC.
+EXPIRY_HOUR_UTC = 21
+
+# The quote fields prices are taken from: bid, ask and last.
+BID = '84'
+ASK = '86'
+LAST = '31'
+
+Values = Union[float, 'np.ndarray']
+
+_SQRT_2 = math.sqrt(2.0)
+_SQRT_2PI = math.sqrt(2.0 * math.pi)
+
+
+def norm_cdf(x: Values) -> 'np.ndarray':
+    """The standard normal distribution function.
+
+    Uses `scipy` when it's installed, and otherwise the complementary
+    error function approximation of Numerical Recipes, accurate to about
+    1e-7, which is enough for prices and volatilities.
+    """
+
+    x = np.asarray(x, dtype=np.float64)
+
+    if ndtr is not None:
+        return ndtr(x)
+
+    z = np.abs(x) / _SQRT_2
+    t = 1.0 / (1.0 + 0.5 * z)
+    erfc = t * np.exp(
+        -z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 + t * (
+            -0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 + t * (
+                -0.82215223 + t * 0.17087277
+            ))))
+        ))))
+    )
+
+    return np.where(x >= 0, 1.0 - 0.5 * erfc, 0.5 * erfc)
+
+
+def norm_pdf(x: Values) -> 'np.ndarray':
+    """The standard normal density."""
+
+    x = np.asarray(x, dtype=np.float64)
+    return np.exp(-0.5 * x * x) / _SQRT_2PI
+
+
+def signs(right) -> 'np.ndarray':
+    """Converts rights, `C`, `Call`, `P` or `Put`, to `1.0` for calls and `-1.0` for puts."""
+
+    right = np.asarray(right)
+
+    if right.dtype.kind in 'biuf':
+        return np.where(right > 0, 1.0, -1.0)
+
+    first = np.char.upper(np.char.strip(right.astype(str)))
+    return np.where(np.char.startswith(first, 'C'), 1.0, -1.0)
+
+
+def year_fractions(expiries: Values, now: 'np.datetime64' = None) -> 'np.ndarray':
+    """Returns the years from now to `YYYYMMDD` expirations, as calendar days over 365.
+
+    Arguments:
+    ----
+    expiries {np.ndarray} -- The `YYYYMMDD` expirations.
+
+    Keyword Arguments:
+    ----
+    now {np.datetime64} -- The moment. (default: {now})
+
+    Returns:
+    ----
+    {np.ndarray} -- The years, negative once expired.
+    """
+
+    expiries = np.asarray(expiries, dtype=np.int64)
+    now = np.datetime64('now', 's') if now is None else np.datetime64(now, 's')
+
+    months = (expiries // 10000 - 1970) * 12 + expiries // 100 % 100 - 1
+    days = months.astype('datetime64[M]').astype('datetime64[D]') + (expiries % 100 - 1).astype('timedelta64[D]')
+    moments = days.astype('datetime64[s]') + np.timedelta64(EXPIRY_HOUR_UTC, 'h')
+
+    return (moments - now).astype(np.float64) / (DAYS_PER_YEAR * 86400.0)
+
+
+def _carry(underlying: Values, time: Values, rate: Values, dividend: Values, model: str):
+    """Returns the forward, the discount factor and the cost of carry."""
+
+    if model not in MODELS:
+        raise ValueError('The model is one of {}, not {}.'.format(MODELS, model))
+
+    underlying = np.asarray(underlying, dtype=np.float64)
+    time = np.asarray(time, dtype=np.float64)
+    rate = np.asarray(rate, dtype=np.float64)
+
+    if model == BLACK_76:
+        carry = np.zeros_like(rate)
+    else:
+        carry = rate - np.asarray(dividend, dtype=np.float64)
+
+    return underlying * np.exp(carry * time), np.exp(-rate * time), carry
+
+
+def _d1_d2(forward, strike, time, volatility):
+    deviation = volatility * np.sqrt(time)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = (np.log(forward / strike) + 0.5 * deviation * deviation) / deviation
+
+    return d1, d1 - deviation
+
+
+def price(underlying: Values, strike: Values, time: Values, volatility: Values, right,
+          rate: Values = 0.0, dividend: Values = 0.0, model: str = BLACK_SCHOLES) -> 'np.ndarray':
+    """Prices European options, every argument broadcast against the others.
+
+    Arguments:
+    ----
+    underlying {np.ndarray} -- The spot price, or the futures price with `black76`.
+
+    strike {np.ndarray} -- The strikes.
+
+    time {np.ndarray} -- The years to expiration.
+
+    volatility {np.ndarray} -- The annual volatilities, e.g. `0.2`.
+
+    right {np.ndarray} -- The rights, `C` or `P`, or `1` and `-1`.
+
+    Keyword Arguments:
+    ----
+    rate {np.ndarray} -- The continuously compounded risk free rate. (default: {0.0})
+
+    dividend {np.ndarray} -- The continuous dividend yield, with `black_scholes`. (default: {0.0})
+
+    model {str} -- `black_scholes` or `black76`. (default: {'black_scholes'})
+
+    Returns:
+    ----
+    {np.ndarray} -- The prices.
+    """
+
+    forward, discount, _ = _carry(underlying, time, rate, dividend, model)
+    strike = np.asarray(strike, dtype=np.float64)
+    sign = signs(right)
+
+    d1, d2 = _d1_d2(forward, strike, time, np.asarray(volatility, dtype=np.float64))
+
+    return discount * sign * (forward * norm_cdf(sign * d1) - strike * norm_cdf(sign * d2))
+
+
+def greeks(underlying: Values, strike: Values, time: Values, volatility: Values, right,
+           rate: Values = 0.0, dividend: Values = 0.0, model: str = BLACK_SCHOLES) -> Dict[str, 'np.ndarray']:
+    """Returns the price, delta, gamma, vega and theta of European options.
+
+    The arguments are those of `price`. Delta and gamma are with respect
+    to the underlying, vega to a volatility of `1.0` and theta to a year
+    passing, so divide vega by 100 for one volatility point and theta by
+    `DAYS_PER_YEAR` for one day.
+
+    Returns:
+    ----
+    {Dict[str, np.ndarray]} -- The `price`, `delta`, `gamma`, `vega` and `theta`.
+    """
+
+    underlying = np.asarray(underlying, dtype=np.float64)
+    strike = np.asarray(strike, dtype=np.float64)
+    time = np.asarray(time, dtype=np.float64)
+    volatility = np.asarray(volatility, dtype=np.float64)
+    rate = np.asarray(rate, dtype=np.float64)
+    sign = signs(right)
+
+    forward, discount, carry = _carry(underlying, time, rate, dividend, model)
+    d1, d2 = _d1_d2(forward, strike, time, volatility)
+
+    root = np.sqrt(time)
+    density = norm_pdf(d1)
+    near = norm_cdf(sign * d1)
+    far = norm_cdf(sign * d2)
+
+    # The forward over the underlying, `1` for a futures price.
+    growth = forward / underlying
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        return {
+            'price': discount * sign * (forward * near - strike * far),
+            'delta': discount * growth * sign * near,
+            'gamma': discount * growth * growth * density / (forward * volatility * root),
+            'vega': discount * forward * density * root,
+            'theta': (
+                -discount * forward * density * volatility / (2.0 * root)
+                - sign * rate * strike * discount * far
+                + sign * (rate - carry) * discount * forward * near
+            )
+        }
+
+
+def implied_volatility(option_price: Values, underlying: Values, strike: Values, time: Values, right,
+                       rate: Values = 0.0, dividend: Values = 0.0, model: str = BLACK_SCHOLES,
+                       tolerance: float = 1e-8, max_iterations: int = 50) -> 'np.ndarray':
+    """Solves the volatilities that reproduce option prices.
+
+    Every option is solved at once with Newton's method on vega, kept
+    inside a bracket that shrinks each iteration, and a bisection step is
+    taken where Newton would leave it. A price outside the no arbitrage
+    bounds, an expired option or a missing input gives `NaN`.
+
+    Arguments:
+    ----
+    option_price {np.ndarray} -- The option prices, e.g. mid prices.
+
+    The other arguments are those of `price`.
+
+    Keyword Arguments:
+    ----
+    tolerance {float} -- The largest volatility error accepted. (default: {1e-8})
+
+    max_iterations {int} -- The iterations before giving up. (default: {50})
+
+    Returns:
+    ----
+    {np.ndarray} -- The volatilities.
+    """
+
+    target = np.asarray(option_price, dtype=np.float64)
+    forward, discount, _ = _carry(underlying, time, rate, dividend, model)
+    strike = np.asarray(strike, dtype=np.float64)
+    time = np.asarray(time, dtype=np.float64)
+    sign = signs(right)
+
+    target, forward, discount, strike, time, sign = np.broadcast_arrays(target, forward, discount, strike, time, sign)
+    shape = target.shape
+
+    target, forward, discount, strike, time, sign = (
+        np.ravel(values).astype(np.float64) for values in (target, forward, discount, strike, time, sign)
+    )
+
+    intrinsic = discount * np.maximum(sign * (forward - strike), 0.0)
+    ceiling = discount * np.where(sign > 0, forward, strike)
+
+    with np.errstate(invalid='ignore'):
+        valid = (
+            np.isfinite(target) & np.isfinite(forward) & np.isfinite(strike) & (time > 0) & (strike > 0)
+            & (forward > 0) & (target > intrinsic) & (target < ceiling)
+        )
+
+    volatility = np.full(target.shape, np.nan)
+    index = np.flatnonzero(valid)
+
+    if index.size == 0:
+        return volatility.reshape(shape)
+
+    target, forward, discount, strike, time, sign = (
+        values[index] for values in (target, forward, discount, strike, time, sign)
+    )
+
+    low = np.full(index.size, MIN_VOLATILITY)
+    high = np.full(index.size, MAX_VOLATILITY)
+
+    # Start at the Brenner-Subrahmanyam approximation of an option at the money.
+    sigma = np.clip(target / (discount * forward) * math.sqrt(2.0 * math.pi) / np.sqrt(time), 0.05, 1.0)
+    active = np.arange(index.size)
+
+    for _ in range(max_iterations):
+        d1, d2 = _d1_d2(forward[active], strike[active], time[active], sigma[active])
+        error = discount[active] * sign[active] * (
+            forward[active] * norm_cdf(sign[active] * d1) - strike[active] * norm_cdf(sign[active] * d2)
+        ) - target[active]
+
+        vega = discount[active] * forward[active] * norm_pdf(d1) * np.sqrt(time[active])
+
+        active_high = np.where(error > 0, sigma[active], high[active])
+        active_low = np.where(error > 0, low[active], sigma[active])
+        high[active] = active_high
+        low[active] = active_low
+
+        # Converged when the volatility is within `tolerance`, by Newton's estimate or the bracket.
+        converged = (np.abs(error) <= vega * tolerance) | (active_high - active_low <= tolerance)
+
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            step = sigma[active] - error / vega
+
+        bisect = ~np.isfinite(step) | (step <= active_low) | (step >= active_high)
+        step = np.where(bisect, 0.5 * (active_low + active_high), step)
+
+        sigma[active] = np.where(converged, sigma[active], step)
+        active = active[~converged]
+
+        if active.size == 0:
+            break
+
+    volatility[index] = sigma
+    return volatility.reshape(shape)
+
+
+def quote_prices(table: QuoteTable, conids, fallback: bool = True) -> 'np.ndarray':
+    """Returns the mid prices of contracts in a quote table.
+
+    The mid price is the average of the bid and the ask when both are
+    positive and not crossed, and otherwise the last price if the table
+    has it and `fallback` is set.
+
+    Arguments:
+    ----
+    table {QuoteTable} -- A table with the bid, `84`, and ask, `86`, fields.
+
+    conids {np.ndarray} -- The contract IDs, any shape.
+
+    Keyword Arguments:
+    ----
+    fallback {bool} -- Use the last price, `31`, when there's no mid. (default: {True})
+
+    Returns:
+    ----
+    {np.ndarray} -- The prices, shaped like `conids`, `NaN` when unknown.
+    """
+
+    conids = np.asarray(conids)
+    fields = [BID, ASK] + ([LAST] if fallback and LAST in table.columns else [])
+
+    values = table.select(conids=[str(conid) for conid in conids.ravel().tolist()], fields=fields)
+    bid, ask = values[:, 0], values[:, 1]
+
+    with np.errstate(invalid='ignore'):
+        mid = np.where((bid > 0) & (ask >= bid), 0.5 * (bid + ask), np.nan)
+
+    if len(fields) == 3:
+        mid = np.where(np.isnan(mid), values[:, 2], mid)
+
+    return mid.reshape(conids.shape)
+
+
+class Surface():
+
+    def __init__(self, chain: OptionChain, underlying: float, time: 'np.ndarray', prices: 'np.ndarray',
+                 volatility: 'np.ndarray', values: Dict[str, 'np.ndarray']) -> None:
+        """Initalizes a new instance of the Surface Object.
+
+        The prices, implied volatilities and greeks of an option chain, as
+        arrays shaped like `chain.conids`, `(expiries, strikes, rights)`.
+        Options without a price or a volatility hold `NaN`.
+
+        Arguments:
+        ----
+        chain {OptionChain} -- The chain.
+
+        underlying {float} -- The underlying price used.
+
+        time {np.ndarray} -- The years to each expiration.
+
+        prices {np.ndarray} -- The option prices the volatilities were solved from.
+
+        volatility {np.ndarray} -- The implied volatilities.
+
+        values {Dict[str, np.ndarray]} -- The `delta`, `gamma`, `vega` and `theta`.
+        """
+
+        self.chain = chain
+        self.underlying = underlying
+        self.time = time
+        self.prices = prices
+        self.volatility = volatility
+        self.delta = values['delta']
+        self.gamma = values['gamma']
+        self.vega = values['vega']
+        self.theta = values['theta']
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """Returns one row per listed option, with its price, volatility and greeks."""
+
+        if pd is None:
+            raise ImportError('`to_frame` requires `pandas`, install it with `pip install pandas`.')
+
+        rows, columns, rights = np.nonzero(self.chain.conids != MISSING)
+
+        return pd.DataFrame({
+            'conid': self.chain.conids[rows, columns, rights],
+            'expiry': self.chain.expiries[rows],
+            'strike': self.chain.strikes[columns],
+            'right': np.asarray(self.chain.rights, dtype=object)[rights],
+            'price': self.prices[rows, columns, rights],
+            'volatility': self.volatility[rows, columns, rights],
+            'delta': self.delta[rows, columns, rights],
+            'gamma': self.gamma[rows, columns, rights],
+            'vega': self.vega[rows, columns, rights],
+            'theta': self.theta[rows, columns, rights]
+        })
+
+
+def surface(chain: OptionChain, underlying: float = None, prices: 'np.ndarray' = None, table: QuoteTable = None,
+            rate: float = 0.0, dividend: float = 0.0, model: str = BLACK_SCHOLES, now: 'np.datetime64' = None) -> Surface:
+    """Computes the implied volatilities and greeks of a whole option chain.
+
+    Prices come from `prices`, or from the mid prices of the chain's
+    options in a quote table, so no greek fields are asked from the
+    gateway. The volatilities are solved and the greeks computed in a few
+    vectorized passes over the chain.
+
+    Arguments:
+    ----
+    chain {OptionChain} -- The chain, e.g. from `OptionsChains.chain`.
+
+    Keyword Arguments:
+    ----
+    underlying {float} -- The underlying price. (default: {its mid in `table`})
+
+    prices {np.ndarray} -- The option prices, shaped like `chain.conids`.
+        (default: {the mids in `table`})
+
+    table {QuoteTable} -- The quotes of the underlying and the options. (default: {None})
+
+    rate {float} -- The continuously compounded risk free rate. (default: {0.0})
+
+    dividend {float} -- The continuous dividend yield. (default: {0.0})
+
+    model {str} -- `black_scholes`, or `black76` for options on futures. (default: {'black_scholes'})
+
+    now {np.datetime64} -- The moment the times to expiration start. (default: {now})
+
+    Returns:
+    ----
+    {Surface} -- The volatilities and greeks.
+
+    Usage:
+    ----
+        >>> table = QuoteTable(fields=['31', '84', '86'])
+        >>> table.update(ib_client.market_data(conids=conids, since=None, fields=['31', '84', '86']))
+        >>> result = surface(chain, table=table, rate=0.05)
+        >>> result.volatility[0, :, 0]
+    """
+
+    if underlying is None or prices is None:
+        if table is None:
+            raise ValueError('Pass the underlying and option prices, or a quote table to take them from.')
+
+        if underlying is None:
+            underlying = float(quote_prices(table, [chain.conid])[0])
+
+        if prices is None:
+            prices = quote_prices(table, chain.conids)
+            prices[chain.conids == MISSING] = np.nan
+
+    prices = np.asarray(prices, dtype=np.float64)
+
+    time = year_fractions(chain.expiries, now=now)
+    expiries = time[:, None, None]
+    strikes = chain.strikes[None, :, None]
+    rights = signs(list(chain.rights))[None, None, :]
+
+    volatility = implied_volatility(
+        prices, underlying, strikes, expiries, rights, rate=rate, dividend=dividend, model=model
+    )
+    values = greeks(underlying, strikes, expiries, volatility, rights, rate=rate, dividend=dividend, model=model)
+
+    return Surface(chain=chain, underlying=underlying, time=time, prices=prices, volatility=volatility, values=values)
@@ -0,0 +1,520 @@
+import asyncio
+import datetime
+import logging
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+# The gateway answers at most this many bars per history request.
+MAX_POINTS = 1000
+
+# The gateway runs at most this many history requests at once.
+MAX_CONCURRENT_REQUESTS = 5
+
+# The format of the `startTime` of the history endpoint, in UTC.
+START_TIME_FORMAT = '%Y%m%d-%H:%M:%S'
+
+_UNITS = {'min': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'm': 2592000, 'y': 31536000}
+
+# The period units a window is written in, with the longest period the gateway accepts.
+_PERIOD_UNITS = (('d', 86400, 1000), ('h', 3600, 8), ('min', 60, 30))
+
+_COLUMNS = (('open', 'o'), ('high', 'h'), ('low', 'l'), ('close', 'c'), ('volume', 'v'))
+
+
+def parse_duration(value: str) -> int:
+    """Converts a period or bar of the history endpoint to seconds.
+
+    Arguments:
+    ----
+    value {str} -- The duration, e.g. `5min`, `1h`, `1d`, `1w`, `1m` or `1y`.
+
+    Raises:
+    ----
+    ValueError: If the duration isn't valid.
+
+    Returns:
+    ----
+    {int} -- The seconds.
+    """
+
+    match = re.match(r'^(\d+)\s*(min|h|d|w|m|y)$', str(value).strip())
+    if not match or int(match.group(1)) <= 0:
+        raise ValueError('Invalid duration `{}`, expected e.g. `5min`, `1h`, `1d`, `1w`, `1m` or `1y`.'.format(value))
+
+    return int(match.group(1)) * _UNITS[match.group(2)]
+
+
+def format_start_time(moment: Union[datetime.datetime, float]) -> str:
+    """Formats a time as the `startTime` of the history endpoint.
+
+    Arguments:
+    ----
+    moment {Union[datetime.datetime, float]} -- A datetime, naive ones are
+        taken as UTC, or seconds since the epoch.
+
+    Returns:
+    ----
+    {str} -- The time, e.g. `20230101-16:00:00`.
+    """
+
+    return datetime.datetime.fromtimestamp(to_timestamp(moment), tz=datetime.timezone.utc).strftime(START_TIME_FORMAT)
+
+
+def windows(start: float, end: float, bar: str, max_points: int = MAX_POINTS) -> List[Tuple[str, str]]:
+    """Splits a time range into requests the gateway accepts.
+
+    Each window holds at most `max_points` bars and has a period the
+    gateway accepts. Windows are laid out backwards from `end`, as the
+    gateway looks back from the `startTime` of a request.
+
+    Arguments:
+    ----
+    start {float} -- The start of the range, in seconds since the epoch.
+
+    end {float} -- The end of the range, in seconds since the epoch.
+
+    bar {str} -- The bar size, e.g. `5min`.
+
+    Keyword Arguments:
+    ----
+    max_points {int} -- The bars per request. (default: {1000})
+
+    Returns:
+    ----
+    {List[Tuple[str, str]]} -- The `startTime` and `period` of each request,
+        the most recent first.
+    """
+
+    bar_seconds = parse_duration(bar)
+    longest = bar_seconds * max_points
+
+    for unit, unit_seconds, limit in _PERIOD_UNITS:
+        if longest >= unit_seconds or unit == 'min':
+            break
+
+    units = max(1, min(limit, int(longest // unit_seconds)))
+
+    requests = []
+    window_end = end
+
+    while window_end > start:
+        window_units = min(units, -(-int(window_end - start) // unit_seconds))
+        requests.append((format_start_time(window_end), '{}{}'.format(window_units, unit)))
+        window_end -= window_units * unit_seconds
+
+    return requests
+
+
+def to_timestamp(moment: Union[datetime.datetime, float]) -> float:
+    """Converts a datetime, naive ones are taken as UTC, to seconds since the epoch."""
+
+    if isinstance(moment, datetime.datetime):
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=datetime.timezone.utc)
+        return moment.timestamp()
+
+    return float(moment)
+
+
+class Bars():
+
+    def __init__(self, conid: str, bar: str, time: 'np.ndarray', open: 'np.ndarray', high: 'np.ndarray',
+                 low: 'np.ndarray', close: 'np.ndarray', volume: 'np.ndarray', vwap: 'np.ndarray' = None) -> None:
+        """Initalizes a new instance of the Bars Object.
+
+        Holds the bars of a contract as contiguous NumPy arrays, sorted by
+        time, one array per column.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        bar {str} -- The bar size, e.g. `5min`.
+
+        time {np.ndarray} -- The `int64` start of each bar, in milliseconds since the epoch.
+
+        open {np.ndarray} -- The `float64` open prices.
+
+        high {np.ndarray} -- The `float64` high prices.
+
+        low {np.ndarray} -- The `float64` low prices.
+
+        close {np.ndarray} -- The `float64` close prices.
+
+        volume {np.ndarray} -- The `float64` volumes.
+
+        Keyword Arguments:
+        ----
+        vwap {np.ndarray} -- The `float64` volume weighted average prices, set
+            on resampled bars. (default: {None})
+        """
+
+        self.conid = conid
+        self.bar = bar
+        self.time = time
+        self.open = open
+        self.high = high
+        self.low = low
+        self.close = close
+        self.volume = volume
+        self.vwap = vwap
+
+    def __len__(self) -> int:
+        return len(self.time)
+
+    def __repr__(self) -> str:
+        return '<Bars conid={} bar={} bars={}>'.format(self.conid, self.bar, len(self))
+
+    @classmethod
+    def from_responses(cls, conid: str, bar: str, responses: List[Dict], start: float = None,
+                       end: float = None) -> 'Bars':
+        """Stitches history responses into one series.
+
+        Bars are sorted by time, bars sent by two overlapping responses are
+        kept once, and bars outside of `[start, end)` are dropped.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        bar {str} -- The bar size.
+
+        responses {List[Dict]} -- The responses of `market_data_history`.
+
+        Keyword Arguments:
+        ----
+        start {float} -- The start of the range, in seconds since the epoch. (default: {None})
+
+        end {float} -- The end of the range, in seconds since the epoch. (default: {None})
+
+        Returns:
+        ----
+        {Bars} -- The bars.
+        """
+
+        if np is None:
+            raise ImportError('The history downloader requires `numpy`, install it with `pip install numpy`.')
+
+        data = []
+        for response in responses:
+            if isinstance(response, dict) and isinstance(response.get('data'), list):
+                data.extend(response['data'])
+
+        count = len(data)
+        time = np.fromiter((point.get('t', 0) for point in data), dtype=np.int64, count=count)
+        columns = {
+            name: np.fromiter((point.get(key, np.nan) for point in data), dtype=np.float64, count=count)
+            for name, key in _COLUMNS
+        }
+
+        # `np.unique` sorts the times and keeps the first bar of each.
+        time, index = np.unique(time, return_index=True)
+
+        keep = np.ones(len(time), dtype=bool)
+        if start is not None:
+            keep &= time >= int(start * 1000)
+        if end is not None:
+            keep &= time < int(end * 1000)
+
+        index = index[keep]
+
+        return cls(
+            conid=conid,
+            bar=bar,
+            time=np.ascontiguousarray(time[keep]),
+            **{name: np.ascontiguousarray(values[index]) for name, values in columns.items()}
+        )
+
+    @property
+    def datetimes(self) -> 'np.ndarray':
+        """The start of each bar as `datetime64[ms]`, in UTC."""
+
+        return self.time.astype('datetime64[ms]')
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """Returns the bars as a pandas DataFrame indexed by time, in UTC.
+
+        Returns:
+        ----
+        {pd.DataFrame} -- The open, high, low, close and volume columns, and
+            the vwap column of resampled bars.
+        """
+
+        if pd is None:
+            raise ImportError('`to_frame` requires `pandas`, install it with `pip install pandas`.')
+
+        data = {name: getattr(self, name) for name, _ in _COLUMNS}
+        if self.vwap is not None:
+            data['vwap'] = self.vwap
+
+        return pd.DataFrame(
+            data=data,
+            index=pd.DatetimeIndex(pd.to_datetime(self.time, unit='ms', utc=True), name='time')
+        )
+
+
+class HistoryDownloader():
+
+    def __init__(self, client, max_concurrent: int = MAX_CONCURRENT_REQUESTS, max_points: int = MAX_POINTS) -> None:
+        """Initalizes a new instance of the HistoryDownloader Object.
+
+        Downloads the bars of many contracts over long ranges through
+        `client.market_data_history`. A range is split into windows the
+        gateway accepts, the windows of every contract are requested
+        concurrently, at most `max_concurrent` at once as the gateway
+        rejects more parallel history requests, and the responses of a
+        contract are stitched into one `Bars`.
+
+        Arguments:
+        ----
+        client {IBClient} -- The client, or an `IBMarket`, used to request bars.
+
+        Keyword Arguments:
+        ----
+        max_concurrent {int} -- The history requests in flight at once. (default: {5})
+
+        max_points {int} -- The bars per request. (default: {1000})
+
+        Usage:
+        ----
+            >>> downloader = HistoryDownloader(client=ib_client)
+            >>> bars = downloader.download(conids=conids, bar='5min', period='1m')
+            >>> bars['265598'].close
+        """
+
+        if np is None:
+            raise ImportError('The history downloader requires `numpy`, install it with `pip install numpy`.')
+
+        self.client = client
+        self.max_concurrent = max_concurrent
+        self.max_points = max_points
+
+        self._lock = threading.Lock()
+
+        self.requests = 0
+        self.errors = 0
+        self.failures: List[Tuple[str, str, Exception]] = []
+
+    def plan(self, conids: List[str], bar: str, start: Union[datetime.datetime, float] = None,
+             end: Union[datetime.datetime, float] = None, period: str = None) -> List[Tuple[str, str, str]]:
+        """Returns the requests a download sends.
+
+        Arguments:
+        ----
+        conids {List[str]} -- The contract IDs.
+
+        bar {str} -- The bar size, e.g. `5min`, `1h` or `1d`.
+
+        Keyword Arguments:
+        ----
+        start {Union[datetime.datetime, float]} -- The start of the range. (default: {None})
+
+        end {Union[datetime.datetime, float]} -- The end of the range. (default: {now})
+
+        period {str} -- The length of the range instead of `start`, e.g. `1y`. (default: {None})
+
+        Returns:
+        ----
+        {List[Tuple[str, str, str]]} -- The contract ID, `startTime` and `period` of each request.
+        """
+
+        start, end = self._range(start=start, end=end, period=period)
+        requests = windows(start=start, end=end, bar=bar, max_points=self.max_points)
+
+        return [(str(conid), start_time, window) for conid in conids for start_time, window in requests]
+
+    def download(self, conids: List[str], bar: str, start: Union[datetime.datetime, float] = None,
+                 end: Union[datetime.datetime, float] = None, period: str = None,
+                 outside_rth: bool = None) -> Dict[str, Bars]:
+        """Downloads the bars of contracts.
+
+        A failed request is logged and added to `failures`, the other
+        windows of the contract are still returned.
+
+        Arguments:
+        ----
+        conids {List[str]} -- The contract IDs.
+
+        bar {str} -- The bar size, e.g. `5min`, `1h` or `1d`.
+
+        Keyword Arguments:
+        ----
+        start {Union[datetime.datetime, float]} -- The start of the range, a
+            datetime, naive ones are taken as UTC, or seconds since the epoch. (default: {None})
+
+        end {Union[datetime.datetime, float]} -- The end of the range. (default: {now})
+
+        period {str} -- The length of the range instead of `start`, e.g. `1y`. (default: {None})
+
+        outside_rth {bool} -- Include bars outside of regular trading hours. (default: {None})
+
+        Returns:
+        ----
+        {Dict[str, Bars]} -- The bars, by contract ID.
+        """
+
+        start, end = self._range(start=start, end=end, period=period)
+        ranges = [(str(conid), start, end) for conid in conids]
+
+        return {bars.conid: bars for bars in self.download_ranges(ranges=ranges, bar=bar, outside_rth=outside_rth)}
+
+    def download_ranges(self, ranges: List[Tuple[str, float, float]], bar: str,
+                        outside_rth: bool = None) -> List[Bars]:
+        """Downloads a different range of each contract, all at once.
+
+        Arguments:
+        ----
+        ranges {List[Tuple[str, float, float]]} -- The contract ID, start and
+            end of each range, in seconds since the epoch.
+
+        bar {str} -- The bar size.
+
+        Keyword Arguments:
+        ----
+        outside_rth {bool} -- Include bars outside of regular trading hours. (default: {None})
+
+        Returns:
+        ----
+        {List[Bars]} -- The bars of each range, in the same order.
+        """
+
+        requests = self._plan_ranges(ranges=ranges, bar=bar)
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_concurrent), thread_name_prefix='ibw-history') as executor:
+            futures = [
+                executor.submit(self._request, conid, start_time, window, bar, outside_rth)
+                for _, conid, start_time, window in requests
+            ]
+            responses = [(index, future.result()) for (index, _, _, _), future in zip(requests, futures)]
+
+        return self._stitch(ranges=ranges, bar=bar, responses=responses)
+
+    async def download_async(self, conids: List[str], bar: str, start: Union[datetime.datetime, float] = None,
+                             end: Union[datetime.datetime, float] = None, period: str = None,
+                             outside_rth: bool = None) -> Dict[str, Bars]:
+        """The asyncio counterpart of `download`, for an `AsyncIBClient`.
+
+        Returns:
+        ----
+        {Dict[str, Bars]} -- The bars, by contract ID.
+        """
+
+        start, end = self._range(start=start, end=end, period=period)
+        ranges = [(str(conid), start, end) for conid in conids]
+        results = await self.download_ranges_async(ranges=ranges, bar=bar, outside_rth=outside_rth)
+
+        return {bars.conid: bars for bars in results}
+
+    async def download_ranges_async(self, ranges: List[Tuple[str, float, float]], bar: str,
+                                    outside_rth: bool = None) -> List[Bars]:
+        """The asyncio counterpart of `download_ranges`, for an `AsyncIBClient`.
+
+        Returns:
+        ----
+        {List[Bars]} -- The bars of each range, in the same order.
+        """
+
+        semaphore = asyncio.Semaphore(max(1, self.max_concurrent))
+
+        async def request(index: int, conid: str, start_time: str, window: str) -> Tuple[int, Dict]:
+            async with semaphore:
+                try:
+                    response = await self.client.market_data_history(
+                        conid=conid, period=window, bar=bar, start_time=start_time, outside_rth=outside_rth
+                    )
+                except Exception as error:
+                    self._fail(conid=conid, start_time=start_time, error=error)
+                    return index, None
+
+            self._count(requests=1)
+            return index, response
+
+        requests = self._plan_ranges(ranges=ranges, bar=bar)
+        responses = await asyncio.gather(*[request(*arguments) for arguments in requests])
+
+        return self._stitch(ranges=ranges, bar=bar, responses=responses)
+
+    def stats(self) -> Dict:
+        """Returns the requests sent and the requests that failed."""
+
+        with self._lock:
+            return {'requests': self.requests, 'errors': self.errors}
+
+    def _range(self, start: Union[datetime.datetime, float], end: Union[datetime.datetime, float],
+               period: str) -> Tuple[float, float]:
+        end = to_timestamp(end) if end is not None else datetime.datetime.now(tz=datetime.timezone.utc).timestamp()
+
+        if start is not None:
+            start = to_timestamp(start)
+        elif period is not None:
+            start = end - parse_duration(period)
+        else:
+            raise ValueError('Either a `start` or a `period` is required.')
+
+        if start >= end:
+            raise ValueError('The start of the range must be before its end.')
+
+        return start, end
+
+    def _request(self, conid: str, start_time: str, window: str, bar: str, outside_rth: bool) -> Dict:
+        try:
+            response = self.client.market_data_history(
+                conid=conid, period=window, bar=bar, start_time=start_time, outside_rth=outside_rth
+            )
+        except Exception as error:
+            self._fail(conid=conid, start_time=start_time, error=error)
+            return None
+
+        self._count(requests=1)
+
+        return response
+
+    def _count(self, requests: int = 0, errors: int = 0) -> None:
+        with self._lock:
+            self.requests += requests
+            self.errors += errors
+
+    def _fail(self, conid: str, start_time: str, error: Exception) -> None:
+        logger.exception('A history request of %s at %s failed.', conid, start_time, exc_info=error)
+
+        with self._lock:
+            self.errors += 1
+            self.failures.append((conid, start_time, error))
+
+    def _plan_ranges(self, ranges: List[Tuple[str, float, float]], bar: str) -> List[Tuple[int, str, str, str]]:
+        """Returns the index of the range, contract ID, `startTime` and `period` of each request."""
+
+        return [
+            (index, str(conid), start_time, window)
+            for index, (conid, start, end) in enumerate(ranges)
+            for start_time, window in windows(start=start, end=end, bar=bar, max_points=self.max_points)
+        ]
+
+    def _stitch(self, ranges: List[Tuple[str, float, float]], bar: str,
+                responses: List[Tuple[int, Dict]]) -> List[Bars]:
+        grouped = [[] for _ in ranges]
+        for index, response in responses:
+            if response is not None:
+                grouped[index].append(response)
+
+        return [
+            Bars.from_responses(conid=str(conid), bar=bar, responses=range_responses, start=start, end=end)
+            for (conid, start, end), range_responses in zip(ranges, grouped)
+        ]
@@ -0,0 +1,207 @@
+import json
+from typing import Any
+from typing import Callable
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import simdjson
+except ImportError:
+    simdjson = None
+
+RESPONSE_FORMATS = ('json', 'raw', 'lazy')
+
+
+def _default_decoder() -> Callable[[bytes], Any]:
+    """Picks the fastest JSON decoder that is installed.
+
+    Returns:
+    ----
+    {Callable} -- A function turning `bytes` into Python objects.
+    """
+
+    if orjson is not None:
+        return orjson.loads
+
+    if msgspec is not None:
+        return msgspec.json.decode
+
+    return json.loads
+
+
+_decoder = _default_decoder()
+
+
+def set_decoder(decoder: Callable[[bytes], Any] = None) -> None:
+    """Sets the function used to decode every JSON response.
+
+    Keyword Arguments:
+    ----
+    decoder {Callable} -- A function accepting `bytes` and returning Python
+        objects, e.g. `orjson.loads`. Pass `None` to go back to the fastest
+        installed decoder. (default: {None})
+    """
+
+    global _decoder
+    _decoder = decoder or _default_decoder()
+
+
+def get_decoder() -> Callable[[bytes], Any]:
+    """Returns the function used to decode JSON responses."""
+
+    return _decoder
+
+
+def loads(content: bytes) -> Any:
+    """Decodes a JSON document with the configured decoder.
+
+    Arguments:
+    ----
+    content {bytes} -- The raw JSON document.
+
+    Returns:
+    ----
+    {Any} -- The decoded document.
+    """
+
+    return _decoder(content)
+
+
+class LazyJSON():
+
+    def __init__(self, content: bytes) -> None:
+        """Initalizes a new instance of the LazyJSON Object.
+
+        A read-only view over a JSON response that is only parsed when it
+        is first accessed. When `pysimdjson` is installed, the document is
+        parsed into a compact tape and only the values that are read become
+        Python objects; otherwise the whole document is decoded on first
+        access with the configured decoder.
+
+        Arguments:
+        ----
+        content {bytes} -- The raw JSON document.
+
+        Usage:
+        ----
+            >>> dividends = ib_client._fundamentals_dividends(conid='265598', response_format='lazy')
+            >>> dividends.at_pointer('/dividends/industry_average/dividend_yield')
+        """
+
+        self.raw = content
+        self._parser = None
+        self._document = None
+        self._parsed = False
+
+    def _root(self) -> Any:
+        """Parses the document the first time it is needed."""
+
+        if not self._parsed:
+            if simdjson is not None:
+                # A parser only holds one document, so each view owns one.
+                self._parser = simdjson.Parser()
+                self._document = self._parser.parse(self.raw)
+            else:
+                self._document = _decoder(self.raw)
+            self._parsed = True
+
+        return self._document
+
+    def __getitem__(self, key) -> Any:
+        return _materialize(self._root()[key])
+
+    def __contains__(self, key) -> bool:
+        return key in self._root()
+
+    def __len__(self) -> int:
+        return len(self._root())
+
+    def __iter__(self):
+        return iter(self.to_python())
+
+    def get(self, key, default: Any = None) -> Any:
+        """Returns the value of a key of the top level object."""
+
+        root = self._root()
+        if key in root:
+            return _materialize(root[key])
+        return default
+
+    def at_pointer(self, pointer: str) -> Any:
+        """Returns the value at a JSON pointer, e.g. `/data/0/c`.
+
+        Arguments:
+        ----
+        pointer {str} -- An RFC 6901 JSON pointer.
+
+        Returns:
+        ----
+        {Any} -- The value at the pointer.
+        """
+
+        root = self._root()
+
+        if simdjson is not None:
+            return _materialize(root.at_pointer(pointer))
+
+        value = root
+        for part in pointer.lstrip('/').split('/') if pointer else []:
+            part = part.replace('~1', '/').replace('~0', '~')
+            value = value[int(part)] if isinstance(value, list) else value[part]
+
+        return value
+
+    def to_python(self) -> Any:
+        """Decodes and returns the whole document."""
+
+        return _materialize(self._root())
+
+
+def _materialize(value: Any) -> Any:
+    """Turns `pysimdjson` proxies into plain Python objects."""
+
+    if simdjson is not None:
+        if isinstance(value, simdjson.Object):
+            return value.as_dict()
+        if isinstance(value, simdjson.Array):
+            return value.as_list()
+
+    return value
+
+
+def decode_response(content: bytes, response_format: str = 'json') -> Any:
+    """Decodes a response body in the requested format.
+
+    Arguments:
+    ----
+    content {bytes} -- The raw response body.
+
+    Keyword Arguments:
+    ----
+    response_format {str} -- One of ['json','raw','lazy']. `json` decodes
+        the whole body, `raw` returns the bytes untouched and `lazy` returns
+        a `LazyJSON` view. (default: {'json'})
+
+    Returns:
+    ----
+    {Any} -- The decoded body.
+    """
+
+    if response_format == 'json':
+        return _decoder(content)
+    elif response_format == 'raw':
+        return content
+    elif response_format == 'lazy':
+        return LazyJSON(content=content)
+
+    raise ValueError(
+        'Unknown response format {}, possible values are {}.'.format(response_format, list(RESPONSE_FORMATS))
+    )
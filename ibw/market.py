@@ -2,15 +2,21 @@ from typing import Dict
 from typing import List
 
 from . import client_base
+from . import client_utils
+from . import field_decoders
+from . import transport as ib_transport
 
 
 class IBMarket(client_base.IBBase):
 
-    def __init__(self) -> None:
-        super().__init__()
+    def __init__(self, transport: ib_transport.IBTransport = None,
+                 transport_config: ib_transport.TransportConfig = None,
+                 host: str = None, port: int = client_utils.DEFAULT_GATEWAY_PORT) -> None:
+        super().__init__(transport=transport, transport_config=transport_config, host=host, port=port)
 
 
-    def market_data(self, conids: List[str], since: str, fields: List[str]) -> Dict:
+    def market_data(self, conids: List[str], since: str, fields: List[str], response_format: str = 'json',
+                    validate: bool = True, decode: bool = False) -> Dict:
         """
             Get Market Data for the given conid(s). The end-point will return by
             default bid, ask, last, change, change pct, close, listing exchange.
@@ -31,6 +37,23 @@ class IBMarket(client_base.IBBase):
             NAME: fields
             DESC: List of fields you wish to retrieve for each quote.
             TYPE: List<String>
+
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
+            NAME: validate
+            DESC: Check the fields against `ibw.fields` before sending the request, resolving
+                  names and raising a `ValueError` for a field that's neither a number nor a
+                  known name. Numeric fields missing from the registry are sent with a warning.
+                  Defaults to True.
+            TYPE: Boolean
+
+            NAME: decode
+            DESC: Convert the values of every field to numbers, by the type of the field, see
+                  `field_decoders.decode_message`. Only applies to the 'json' format. Defaults to False.
+            TYPE: Boolean
         """
 
         # define request components
@@ -40,8 +63,10 @@ class IBMarket(client_base.IBBase):
         # join the two list arguments so they are both a single string.
         conids_joined = self._prepare_arguments_list(parameter_list=conids)
 
-        if fields is not None:
-            fields_joined = ",".join(str(n) for n in fields)
+        if fields is not None and validate:
+            fields_joined = ",".join(field_decoders.validate_fields(fields=fields))
+        elif fields is not None:
+            fields_joined = ",".join(field_decoders.field_ids(fields=fields))
         else:
             fields_joined = ""
 
@@ -61,12 +86,17 @@ class IBMarket(client_base.IBBase):
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
+        if decode and response_format == 'json':
+            return field_decoders.decode_response(content=content)
+
         return content
 
-    def market_data_history(self, conid: str, period: str, bar: str) -> Dict:
+    def market_data_history(self, conid: str, period: str, bar: str, response_format: str = 'json',
+                            start_time: str = None, outside_rth: bool = None) -> Dict:
         """
             Get history of market Data for the given conid, length of data is controlled by period and
             bar. e.g. 1y period with bar=1w returns 52 data points.
@@ -85,6 +115,20 @@ class IBMarket(client_base.IBBase):
             DESC: Specifies granularity of data. For example, if bar = '1h' the data will be at an hourly level.
                   Possible values are ['5min','1h','1w']
             TYPE: String
+
+            NAME: response_format
+            DESC: How the response is returned, one of ['json','raw','lazy']. `raw` returns
+                  the undecoded bytes and `lazy` a view parsed on first access. Defaults to 'json'.
+            TYPE: String
+
+            NAME: start_time
+            DESC: The UTC time the period looks back from, formatted as 'YYYYMMDD-HH:MM:SS'.
+                  Defaults to now.
+            TYPE: String
+
+            NAME: outside_rth
+            DESC: Set to `True` to include bars outside of regular trading hours.
+            TYPE: Boolean
         """
 
         # define request components
@@ -96,10 +140,17 @@ class IBMarket(client_base.IBBase):
             'bar': bar
         }
 
+        if start_time is not None:
+            params['startTime'] = start_time
+
+        if outside_rth is not None:
+            params['outsideRth'] = 'true' if outside_rth else 'false'
+
         content = self._make_request(
             endpoint=endpoint,
             req_type=req_type,
-            params=params
+            params=params,
+            response_format=response_format
         )
 
         return content
@@ -0,0 +1,604 @@
+import datetime
+import io
+import json
+import logging
+import os
+import pathlib
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+logger = logging.getLogger(__name__)
+
+# The version of the layout of a saved chain.
+FORMAT_VERSION = 1
+
+# The rights, in the order of the last axis of `OptionChain.conids`.
+RIGHTS = ('C', 'P')
+
+# The contract ID of an expiration, strike and right that isn't listed.
+MISSING = -1
+
+# The seconds before the strikes of a contract month are asked for again, once a day.
+DEFAULT_REFRESH_INTERVAL = 86400.0
+
+DEFAULT_MAX_WORKERS = 8
+
+_MONTHS = ('JAN', 'FEB', 'MAR', 'APR', 'MAY', 'JUN', 'JUL', 'AUG', 'SEP', 'OCT', 'NOV', 'DEC')
+
+
+def month_code(expiry: int) -> str:
+    """Returns the contract month of a `YYYYMMDD` expiration, e.g. `JAN23` for `20230120`."""
+
+    expiry = int(expiry)
+    return '{}{:02d}'.format(_MONTHS[expiry // 100 % 100 - 1], expiry // 10000 % 100)
+
+
+def normalize_right(right: str) -> str:
+    """Converts `C`, `Call`, `P` or `Put` to `C` or `P`."""
+
+    right = str(right).strip().upper()[:1]
+    if right not in RIGHTS:
+        raise ValueError('An option right is one of {}, not {}.'.format(RIGHTS, right))
+
+    return right
+
+
+def _month_number(month: str) -> int:
+    """Returns a contract month as `YYYYMM`, e.g. `202301` for `JAN23`."""
+
+    return 200000 + int(month[3:]) * 100 + _MONTHS.index(month[:3]) + 1
+
+
+def _today() -> int:
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return today.year * 10000 + today.month * 100 + today.day
+
+
+class OptionChain():
+
+    def __init__(self, conid: int, symbol: str, expiries: 'np.ndarray', strikes: 'np.ndarray',
+                 conids: 'np.ndarray', rights: Tuple[str, ...] = RIGHTS, months: Dict[str, float] = None) -> None:
+        """Initalizes a new instance of the OptionChain Object.
+
+        The options of one underlying, as a dense array of contract IDs
+        indexed by expiration, strike and right. Expirations and strikes are
+        sorted, so a contract or a range of them is found with a binary
+        search, and slicing returns views, not copies. An expiration, strike
+        and right that isn't listed holds `MISSING`.
+
+        Arguments:
+        ----
+        conid {int} -- The contract ID of the underlying.
+
+        symbol {str} -- The symbol of the underlying.
+
+        expiries {np.ndarray} -- The sorted `YYYYMMDD` expirations, int64.
+
+        strikes {np.ndarray} -- The sorted strikes, float64.
+
+        conids {np.ndarray} -- The contract IDs, int64, shaped `(expiries, strikes, rights)`.
+
+        Keyword Arguments:
+        ----
+        rights {Tuple[str, ...]} -- The rights of the last axis. (default: {('C', 'P')})
+
+        months {Dict[str, float]} -- When the strikes of each contract month
+            were last received, in seconds since the epoch. (default: {None})
+        """
+
+        if np is None:
+            raise ImportError('The options chain requires `numpy`, install it with `pip install numpy`.')
+
+        self.conid = int(conid)
+        self.symbol = symbol
+        self.expiries = expiries
+        self.strikes = strikes
+        self.conids = conids
+        self.rights = tuple(rights)
+        self.months = dict(months or {})
+
+    def __repr__(self) -> str:
+        return '<OptionChain symbol={} expiries={} strikes={} contracts={}>'.format(
+            self.symbol, len(self.expiries), len(self.strikes), len(self)
+        )
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self.conids != MISSING))
+
+    @classmethod
+    def from_contracts(cls, conid: int, symbol: str, contracts: Iterable[Tuple[int, float, str, int]],
+                       months: Dict[str, float] = None) -> 'OptionChain':
+        """Builds a chain from `(expiry, strike, right, conid)` tuples.
+
+        Arguments:
+        ----
+        conid {int} -- The contract ID of the underlying.
+
+        symbol {str} -- The symbol of the underlying.
+
+        contracts {Iterable[Tuple[int, float, str, int]]} -- The options.
+
+        Keyword Arguments:
+        ----
+        months {Dict[str, float]} -- When each contract month was received. (default: {None})
+
+        Returns:
+        ----
+        {OptionChain} -- The chain.
+        """
+
+        if np is None:
+            raise ImportError('The options chain requires `numpy`, install it with `pip install numpy`.')
+
+        contracts = list(contracts)
+
+        expiry = np.fromiter((contract[0] for contract in contracts), dtype=np.int64, count=len(contracts))
+        strike = np.fromiter((contract[1] for contract in contracts), dtype=np.float64, count=len(contracts))
+        right = np.fromiter((RIGHTS.index(contract[2]) for contract in contracts), dtype=np.int64, count=len(contracts))
+        ids = np.fromiter((contract[3] for contract in contracts), dtype=np.int64, count=len(contracts))
+
+        expiries, expiry_index = np.unique(expiry, return_inverse=True)
+        strikes, strike_index = np.unique(strike, return_inverse=True)
+
+        conids = np.full((len(expiries), len(strikes), len(RIGHTS)), MISSING, dtype=np.int64)
+        conids[expiry_index, strike_index, right] = ids
+
+        return cls(conid=conid, symbol=symbol, expiries=expiries, strikes=strikes, conids=conids, months=months)
+
+    def contract(self, expiry: int, strike: float, right: str) -> int:
+        """Returns the contract ID of an option.
+
+        Arguments:
+        ----
+        expiry {int} -- The `YYYYMMDD` expiration.
+
+        strike {float} -- The strike.
+
+        right {str} -- `C` or `P`.
+
+        Returns:
+        ----
+        {int} -- The contract ID, or `None` when the option isn't listed.
+        """
+
+        right = normalize_right(right)
+        if right not in self.rights:
+            return None
+
+        row = self._find(self.expiries, int(expiry))
+        column = self._find(self.strikes, float(strike))
+        if row is None or column is None:
+            return None
+
+        conid = int(self.conids[row, column, self.rights.index(right)])
+        return conid if conid != MISSING else None
+
+    def slice(self, start: int = None, end: int = None, low: float = None, high: float = None,
+              right: str = None) -> 'OptionChain':
+        """Returns the part of the chain between two expirations and two strikes.
+
+        Keyword Arguments:
+        ----
+        start {int} -- The first `YYYYMMDD` expiration kept. (default: {None})
+
+        end {int} -- The last expiration kept. (default: {None})
+
+        low {float} -- The lowest strike kept. (default: {None})
+
+        high {float} -- The highest strike kept. (default: {None})
+
+        right {str} -- Keep only calls, `C`, or puts, `P`. (default: {both})
+
+        Returns:
+        ----
+        {OptionChain} -- A chain sharing the arrays of this one.
+        """
+
+        first = np.searchsorted(self.expiries, start, side='left') if start is not None else 0
+        last = np.searchsorted(self.expiries, end, side='right') if end is not None else len(self.expiries)
+        bottom = np.searchsorted(self.strikes, low, side='left') if low is not None else 0
+        top = np.searchsorted(self.strikes, high, side='right') if high is not None else len(self.strikes)
+
+        rights = self.rights
+        columns = slice(None)
+
+        if right is not None:
+            right = normalize_right(right)
+            index = rights.index(right)
+            rights = (right,)
+            columns = slice(index, index + 1)
+
+        return OptionChain(
+            conid=self.conid,
+            symbol=self.symbol,
+            expiries=self.expiries[first:last],
+            strikes=self.strikes[bottom:top],
+            conids=self.conids[first:last, bottom:top, columns],
+            rights=rights,
+            months=self.months
+        )
+
+    def near(self, price: float, count: int = 10, **kwargs) -> 'OptionChain':
+        """Returns the `count` strikes closest to a price, see `slice` for the other filters."""
+
+        center = int(np.searchsorted(self.strikes, price))
+        bottom = max(0, min(center - count // 2, len(self.strikes) - count))
+        top = min(len(self.strikes), bottom + count)
+
+        if top <= bottom:
+            return self.slice(low=np.inf, **kwargs)
+
+        return self.slice(low=self.strikes[bottom], high=self.strikes[top - 1], **kwargs)
+
+    def contracts(self) -> List[Tuple[int, float, str, int]]:
+        """Returns the listed options as `(expiry, strike, right, conid)` tuples."""
+
+        rows, columns, rights = np.nonzero(self.conids != MISSING)
+
+        return [
+            (int(self.expiries[row]), float(self.strikes[column]), self.rights[right], int(self.conids[row, column, right]))
+            for row, column, right in zip(rows.tolist(), columns.tolist(), rights.tolist())
+        ]
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """Returns the listed options as a `DataFrame` with an expiry, strike, right and conid column."""
+
+        if pd is None:
+            raise ImportError('`to_frame` requires `pandas`, install it with `pip install pandas`.')
+
+        rows, columns, rights = np.nonzero(self.conids != MISSING)
+
+        return pd.DataFrame({
+            'expiry': self.expiries[rows],
+            'strike': self.strikes[columns],
+            'right': np.asarray(self.rights, dtype=object)[rights],
+            'conid': self.conids[rows, columns, rights]
+        })
+
+    @staticmethod
+    def _find(values: 'np.ndarray', value) -> int:
+        index = int(np.searchsorted(values, value))
+        return index if index < len(values) and values[index] == value else None
+
+
+class OptionsChains():
+
+    def __init__(self, client, root: Union[str, pathlib.Path] = None, max_workers: int = DEFAULT_MAX_WORKERS,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL, exchange: str = 'SMART') -> None:
+        """Initalizes a new instance of the OptionsChains Object.
+
+        Builds the option chains of underlyings. The contract months come
+        from `symbol_search`, the strikes of every month from
+        `secdef_strikes` and the contract IDs from one `secdef_info` per
+        month, strike and right. Months and strikes are expanded
+        concurrently, at most `max_workers` requests at once, through the
+        client's transport, so its rate limiter applies.
+
+        Chains are kept in memory and saved to one `.npz` file per
+        underlying in `root`. A chain is rebuilt incrementally: only the
+        months older than `refresh_interval` are asked for their strikes
+        again, only strikes that weren't known are looked up, and expired
+        months are dropped.
+
+        Arguments:
+        ----
+        client {IBClient} -- The client used to build chains.
+
+        Keyword Arguments:
+        ----
+        root {Union[str, pathlib.Path]} -- The folder chains are saved in. (default: {None})
+
+        max_workers {int} -- The requests in flight at once. (default: {8})
+
+        refresh_interval {float} -- The seconds before the strikes of a
+            month are asked for again. (default: {86400.0})
+
+        exchange {str} -- The exchange of the options. (default: {'SMART'})
+
+        Usage:
+        ----
+            >>> chains = OptionsChains(client=ib_client, root='data/options')
+            >>> chain = chains.chain('AAPL')
+            >>> chain.contract(expiry=20230120, strike=150, right='C')
+            >>> chain.near(price=152.0, count=10, right='P')
+        """
+
+        if np is None:
+            raise ImportError('The options chain requires `numpy`, install it with `pip install numpy`.')
+
+        self.client = client
+        self.root = pathlib.Path(root) if root is not None else None
+        self.max_workers = max_workers
+        self.refresh_interval = refresh_interval
+        self.exchange = exchange
+
+        self._lock = threading.Lock()
+        self._chains: Dict[str, OptionChain] = {}
+
+        self.requests = 0
+        self.errors = 0
+        self.failures: List[Tuple[str, Exception]] = []
+
+    def chain(self, symbol: str, months: List[str] = None, refresh: bool = False) -> OptionChain:
+        """Returns the option chain of an underlying, building only what's missing or stale.
+
+        Arguments:
+        ----
+        symbol {str} -- The symbol of the underlying, e.g. `AAPL`.
+
+        Keyword Arguments:
+        ----
+        months {List[str]} -- The contract months, e.g. `['JAN23']`. (default: {every listed month})
+
+        refresh {bool} -- Ask for the strikes of every month again. (default: {False})
+
+        Returns:
+        ----
+        {OptionChain} -- The chain.
+        """
+
+        symbol = symbol.upper()
+        cached = self._cached(symbol)
+
+        if cached is not None and not refresh:
+            if months is None and self._fresh(cached):
+                return cached
+            if months is not None and not self._stale(cached, [month.upper() for month in months]):
+                return cached
+
+        return self.build(symbol=symbol, months=months, refresh=refresh)
+
+    def build(self, symbol: str, months: List[str] = None, refresh: bool = False) -> OptionChain:
+        """Builds or updates the option chain of an underlying with the gateway.
+
+        Arguments:
+        ----
+        symbol {str} -- The symbol of the underlying.
+
+        Keyword Arguments:
+        ----
+        months {List[str]} -- The contract months. (default: {every listed month})
+
+        refresh {bool} -- Ask for the strikes of every month again. (default: {False})
+
+        Returns:
+        ----
+        {OptionChain} -- The chain.
+        """
+
+        symbol = symbol.upper()
+        cached = self._cached(symbol)
+        listed = None
+
+        if cached is not None and months is None and not refresh and self._fresh(cached):
+            # Every month is fresh, the listed months are only asked for again once one is stale.
+            conid = cached.conid
+            months = list(cached.months)
+        elif cached is not None and months is not None:
+            conid = cached.conid
+        else:
+            conid, listed = self._search(symbol)
+            months = months if months is not None else listed
+
+        months = [month.upper() for month in months]
+        stale = months if refresh or cached is None else self._stale(cached, months)
+
+        # Drop expired options, and the months the gateway no longer lists.
+        today = _today()
+        kept = [
+            contract for contract in (cached.contracts() if cached is not None else [])
+            if contract[0] >= today and (listed is None or month_code(contract[0]) in listed)
+        ]
+
+        strikes = self._parallel(lambda month: (month, self._strikes(conid, month)), stale)
+        received = {month: pairs for month, pairs in strikes if pairs is not None}
+
+        # Keep the known options of refreshed months that are still listed, look up the others.
+        known = {(month_code(expiry), strike, right) for expiry, strike, right, _ in kept}
+        kept = [
+            contract for contract in kept
+            if month_code(contract[0]) not in received or (contract[1], contract[2]) in received[month_code(contract[0])]
+        ]
+        lookups = [
+            (month, strike, right)
+            for month, pairs in received.items()
+            for strike, right in sorted(pairs)
+            if (month, strike, right) not in known
+        ]
+
+        results = self._parallel(lambda key: (key, self._info(conid, *key)), lookups)
+
+        complete = set(received)
+        contracts = kept
+
+        for (month, strike, right), items in results:
+            if items is None:
+                complete.discard(month)
+                continue
+
+            for item in items:
+                contracts.append((
+                    int(item['maturityDate']), float(item['strike']), normalize_right(item['right']), int(item['conid'])
+                ))
+
+        now = time.time()
+        updated = dict(cached.months) if cached is not None else {}
+        updated.update({month: now for month in complete})
+        updated = {
+            month: stamp for month, stamp in updated.items()
+            if _month_number(month) >= today // 100 and (listed is None or month in listed)
+        }
+
+        chain = OptionChain.from_contracts(conid=conid, symbol=symbol, contracts=contracts, months=updated)
+
+        with self._lock:
+            self._chains[symbol] = chain
+
+        if self.root is not None:
+            self.save(chain)
+
+        return chain
+
+    def save(self, chain: OptionChain) -> pathlib.Path:
+        """Writes a chain to `root/<SYMBOL>.npz`, atomically."""
+
+        if self.root is None:
+            raise ValueError('The chains have no root folder to save to.')
+
+        path = self.path(chain.symbol)
+        meta = {'version': FORMAT_VERSION, 'conid': chain.conid, 'symbol': chain.symbol, 'months': chain.months}
+
+        buffer = io.BytesIO()
+        np.savez(
+            buffer,
+            expiries=chain.expiries,
+            strikes=chain.strikes,
+            conids=np.ascontiguousarray(chain.conids),
+            meta=np.array(json.dumps(meta, separators=(',', ':')))
+        )
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temporary = path.with_name(path.name + '.tmp')
+        temporary.write_bytes(buffer.getvalue())
+        os.replace(temporary, path)
+
+        return path
+
+    def load(self, symbol: str) -> OptionChain:
+        """Reads the chain of an underlying written by `save`.
+
+        Returns:
+        ----
+        {OptionChain} -- The chain, or `None` when it was never saved.
+        """
+
+        if self.root is None or not self.path(symbol).exists():
+            return None
+
+        with np.load(self.path(symbol), allow_pickle=False) as content:
+            meta = json.loads(str(content['meta']))
+            return OptionChain(
+                conid=meta['conid'],
+                symbol=meta['symbol'],
+                expiries=content['expiries'],
+                strikes=content['strikes'],
+                conids=content['conids'],
+                months=meta.get('months')
+            )
+
+    def path(self, symbol: str) -> pathlib.Path:
+        """The file the chain of an underlying is saved to."""
+
+        return self.root.joinpath('{}.npz'.format(symbol.upper()))
+
+    def stats(self) -> Dict:
+        """Returns the chains and options in memory, the requests sent and the requests that failed."""
+
+        with self._lock:
+            return {
+                'chains': len(self._chains),
+                'contracts': sum(len(chain) for chain in self._chains.values()),
+                'requests': self.requests,
+                'errors': self.errors
+            }
+
+    def _cached(self, symbol: str) -> OptionChain:
+        with self._lock:
+            chain = self._chains.get(symbol)
+
+        if chain is None:
+            chain = self.load(symbol)
+            if chain is not None:
+                with self._lock:
+                    self._chains[symbol] = chain
+
+        return chain
+
+    def _fresh(self, chain: OptionChain) -> bool:
+        """Whether every month of a chain is fresh and none of its options expired."""
+
+        if not chain.months or self._stale(chain, list(chain.months)):
+            return False
+
+        return len(chain.expiries) == 0 or int(chain.expiries[0]) >= _today()
+
+    def _stale(self, chain: OptionChain, months: List[str]) -> List[str]:
+        now = time.time()
+        return [month for month in months if now - chain.months.get(month, float('-inf')) >= self.refresh_interval]
+
+    def _search(self, symbol: str) -> Tuple[int, List[str]]:
+        """Returns the contract ID of an underlying and its option months."""
+
+        self._count()
+        results = self.client.symbol_search(symbol=symbol)
+
+        for result in results if isinstance(results, list) else []:
+            for section in result.get('sections') or []:
+                if section.get('secType') == 'OPT':
+                    return int(result['conid']), [month for month in (section.get('months') or '').split(';') if month]
+
+        raise ValueError('The gateway lists no options for {}.'.format(symbol))
+
+    def _strikes(self, conid: int, month: str) -> set:
+        """Returns the `(strike, right)` pairs of a month, or `None` when the request failed."""
+
+        self._count()
+
+        try:
+            content = self.client.secdef_strikes(conid=conid, month=month, exchange=self.exchange)
+        except Exception as error:
+            self._fail(key=month, error=error)
+            return None
+
+        return {
+            (float(strike), right)
+            for right, name in (('C', 'call'), ('P', 'put'))
+            for strike in content.get(name) or []
+        }
+
+    def _info(self, conid: int, month: str, strike: float, right: str) -> List[Dict]:
+        """Returns the options of a month, strike and right, or `None` when the request failed."""
+
+        self._count()
+
+        try:
+            content = self.client.secdef_info(conid=conid, month=month, strike=strike, right=right, exchange=self.exchange)
+        except Exception as error:
+            self._fail(key='{} {:g} {}'.format(month, strike, right), error=error)
+            return None
+
+        return [item for item in content or [] if item.get('conid') is not None and item.get('maturityDate')]
+
+    def _parallel(self, function, items: List) -> List:
+        if not items:
+            return []
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix='ibw-options') as executor:
+            return list(executor.map(function, items))
+
+    def _fail(self, key: str, error: Exception) -> None:
+        logger.warning('An options chain request for %s failed: %s', key, error)
+
+        with self._lock:
+            self.errors += 1
+            self.failures.append((key, error))
+
+    def _count(self) -> None:
+        with self._lock:
+            self.requests += 1
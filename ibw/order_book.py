@@ -0,0 +1,344 @@
+import logging
+import threading
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+# The statuses of orders that no longer change.
+FINAL_STATUSES = ('Filled', 'Cancelled', 'ApiCancelled', 'Inactive')
+
+# The fields whose changes are reported to subscribers.
+TRACKED_FIELDS = ('status', 'filledQuantity', 'remainingQuantity', 'avgPrice', 'price', 'auxPrice')
+
+# The fields the client order ID is sent back in, by the polling endpoint and the `sor` topic.
+_COID_FIELDS = ('order_ref', 'cOID')
+
+# Tells a field that's missing from one that's `None`.
+_MISSING = object()
+
+
+class OrderEvent():
+
+    __slots__ = ('order_id', 'previous', 'status', 'changed', 'order')
+
+    def __init__(self, order_id: str, previous: str, status: str, changed: Tuple[str, ...], order: Dict) -> None:
+        """Initalizes a new instance of the OrderEvent Object.
+
+        A change of one order between two updates of an `OrderBook`.
+
+        Arguments:
+        ----
+        order_id {str} -- The order ID.
+
+        previous {str} -- The status before, `None` for an order seen for the first time.
+
+        status {str} -- The status now.
+
+        changed {Tuple[str, ...]} -- The tracked fields that changed.
+
+        order {Dict} -- The order, as the book holds it now.
+        """
+
+        self.order_id = order_id
+        self.previous = previous
+        self.status = status
+        self.changed = changed
+        self.order = order
+
+    def __repr__(self) -> str:
+        return '<OrderEvent order_id={} {} -> {} changed={}>'.format(self.order_id, self.previous, self.status, self.changed)
+
+    @property
+    def is_new(self) -> bool:
+        """Whether the order wasn't in the book before."""
+
+        return self.previous is None
+
+    @property
+    def is_transition(self) -> bool:
+        """Whether the status changed, e.g. from `Submitted` to `Filled`."""
+
+        return self.previous != self.status
+
+
+class OrderBook():
+
+    def __init__(self, client=None, fields: Iterable[str] = TRACKED_FIELDS) -> None:
+        """Initalizes a new instance of the OrderBook Object.
+
+        Keeps the live orders of the day from `get_live_orders` polls and
+        `sor` streaming updates, indexed by order ID, client order ID,
+        contract ID and status, so reads never touch the network. Each
+        update is diffed against the book: only the fields that differ are
+        merged, an order is reindexed only when its status, contract or
+        client order ID changed, and only the orders whose tracked fields
+        changed are reported to subscribers as `OrderEvent` objects.
+
+        Keyword Arguments:
+        ----
+        client {IBClient} -- The client polled by `poll`. (default: {None})
+
+        fields {Iterable[str]} -- The fields whose changes are reported.
+            (default: {TRACKED_FIELDS})
+
+        Usage:
+        ----
+            >>> book = OrderBook(client=ib_client)
+            >>> book.subscribe(print, statuses=['Filled'])
+            >>> book.poll()
+            >>> book.by_coid('my-order-1')
+            >>> book.with_status('Submitted', 'PreSubmitted')
+        """
+
+        self.client = client
+        self.fields = tuple(fields)
+
+        self._lock = threading.RLock()
+
+        self._orders: Dict[str, Dict] = {}
+        self._fingerprints: Dict[str, Tuple] = {}
+        self._by_coid: Dict[str, str] = {}
+        self._by_conid: Dict[str, Set[str]] = {}
+        self._by_status: Dict[str, Set[str]] = {}
+
+        self._subscribers: List[Tuple[Callable[[OrderEvent], Any], Set[str]]] = []
+
+        self.polls = 0
+        self.received = 0
+        self.unchanged = 0
+        self.events = 0
+
+    def __len__(self) -> int:
+        return len(self._orders)
+
+    def __contains__(self, order_id: Union[int, str]) -> bool:
+        return str(order_id) in self._orders
+
+    def subscribe(self, callback: Callable[[OrderEvent], Any], statuses: Iterable[str] = None) -> None:
+        """Calls `callback(event)` for every change of an order.
+
+        Arguments:
+        ----
+        callback {Callable[[OrderEvent], Any]} -- The subscriber.
+
+        Keyword Arguments:
+        ----
+        statuses {Iterable[str]} -- Only report orders moving to these
+            statuses, e.g. `['Filled', 'Cancelled']`. (default: {every change})
+        """
+
+        with self._lock:
+            self._subscribers.append((callback, set(statuses) if statuses is not None else None))
+
+    def unsubscribe(self, callback: Callable[[OrderEvent], Any]) -> None:
+        """Stops calling a subscriber."""
+
+        with self._lock:
+            self._subscribers = [(known, statuses) for known, statuses in self._subscribers if known != callback]
+
+    def poll(self) -> List[OrderEvent]:
+        """Polls `get_live_orders` once and applies the response.
+
+        Returns:
+        ----
+        {List[OrderEvent]} -- The changes.
+        """
+
+        if self.client is None:
+            raise ValueError('The book has no client to poll.')
+
+        self.polls += 1
+        return self.update(self.client.get_live_orders())
+
+    def on_message(self, message: Dict) -> None:
+        """Applies a `sor` message of a `MarketDataStream`, other topics are ignored.
+
+        Usage:
+        ----
+            >>> stream.add_message_callback(book.on_message)
+            >>> await stream.subscribe_orders()
+        """
+
+        if isinstance(message, dict) and message.get('topic') == 'sor':
+            self.update(message.get('args') or [])
+
+    def update(self, orders: Union[Dict, List[Dict]]) -> List[OrderEvent]:
+        """Merges orders into the book and reports the ones that changed.
+
+        Fields missing from an order keep their value, so the partial
+        updates of the `sor` topic are merged. Untracked fields, like a
+        client order ID arriving late, are merged too, without an event.
+
+        Arguments:
+        ----
+        orders {Union[Dict, List[Dict]]} -- A `get_live_orders` response, or a list of orders.
+
+        Returns:
+        ----
+        {List[OrderEvent]} -- The changes, in the order of `orders`.
+        """
+
+        if isinstance(orders, dict):
+            orders = orders.get('orders') or []
+
+        events = []
+
+        with self._lock:
+            for order in orders or []:
+                if not isinstance(order, dict) or order.get('orderId') is None:
+                    continue
+
+                self.received += 1
+                event = self._apply(order)
+
+                if event is None:
+                    self.unchanged += 1
+                else:
+                    events.append(event)
+
+            self.events += len(events)
+            subscribers = list(self._subscribers)
+
+        for event in events:
+            for callback, statuses in subscribers:
+                if statuses is None or event.status in statuses:
+                    self._call(callback, event)
+
+        return events
+
+    def get(self, order_id: Union[int, str]) -> Dict:
+        """Returns an order by order ID, `None` when it's unknown."""
+
+        return self._orders.get(str(order_id))
+
+    def by_coid(self, coid: str) -> Dict:
+        """Returns an order by the client order ID it was placed with, `None` when it's unknown."""
+
+        with self._lock:
+            order_id = self._by_coid.get(coid)
+            return self._orders.get(order_id) if order_id is not None else None
+
+    def for_conid(self, conid: Union[int, str]) -> List[Dict]:
+        """Returns the orders of a contract."""
+
+        with self._lock:
+            return [self._orders[order_id] for order_id in self._by_conid.get(str(conid), ())]
+
+    def with_status(self, *statuses: str) -> List[Dict]:
+        """Returns the orders in any of the statuses."""
+
+        with self._lock:
+            return [self._orders[order_id] for status in statuses for order_id in self._by_status.get(status, ())]
+
+    def open_orders(self) -> List[Dict]:
+        """Returns the orders that aren't filled, cancelled or inactive."""
+
+        with self._lock:
+            return [
+                self._orders[order_id]
+                for status, order_ids in self._by_status.items() if status not in FINAL_STATUSES
+                for order_id in order_ids
+            ]
+
+    def clear(self) -> None:
+        """Forgets every order, e.g. at the start of a new trading day."""
+
+        with self._lock:
+            self._orders.clear()
+            self._fingerprints.clear()
+            self._by_coid.clear()
+            self._by_conid.clear()
+            self._by_status.clear()
+
+    def stats(self) -> Dict:
+        """Returns the orders held, the orders received, how many were unchanged and the events."""
+
+        return {
+            'orders': len(self._orders),
+            'polls': self.polls,
+            'received': self.received,
+            'unchanged': self.unchanged,
+            'events': self.events
+        }
+
+    def _apply(self, update: Dict) -> OrderEvent:
+        """Merges one order, returning its event, or `None` when none of the tracked fields changed."""
+
+        order_id = str(update['orderId'])
+        current = self._orders.get(order_id)
+
+        if current is None:
+            order = dict(update)
+            self._orders[order_id] = order
+            self._fingerprints[order_id] = self._fingerprint(order)
+            self._index(order_id, order)
+            return OrderEvent(order_id=order_id, previous=None, status=order.get('status'), changed=self.fields, order=order)
+
+        before = self._fingerprints[order_id]
+
+        # Only what changed is merged, an identical poll costs one comparison per field.
+        changes = {key: value for key, value in update.items() if current.get(key, _MISSING) != value}
+        if not changes:
+            return None
+
+        previous = current.get('status')
+        conid = current.get('conid')
+        coids = [current.get(field) for field in _COID_FIELDS]
+
+        current.update(changes)
+
+        if (current.get('status') != previous or current.get('conid') != conid
+                or any(current.get(field) != coid for field, coid in zip(_COID_FIELDS, coids))):
+            self._unindex(order_id, status=previous, conid=conid, coids=coids)
+            self._index(order_id, current)
+
+        after = self._fingerprint(current)
+        if after == before:
+            return None
+
+        self._fingerprints[order_id] = after
+        changed = tuple(field for index, field in enumerate(self.fields) if before[index] != after[index])
+
+        return OrderEvent(order_id=order_id, previous=previous, status=current.get('status'), changed=changed, order=current)
+
+    def _fingerprint(self, order: Dict) -> Tuple:
+        return tuple(order.get(field) for field in self.fields)
+
+    def _index(self, order_id: str, order: Dict) -> None:
+        for field in _COID_FIELDS:
+            if order.get(field):
+                self._by_coid[order[field]] = order_id
+
+        if order.get('conid') is not None:
+            self._by_conid.setdefault(str(order['conid']), set()).add(order_id)
+
+        self._by_status.setdefault(order.get('status'), set()).add(order_id)
+
+    def _unindex(self, order_id: str, status: str, conid: Any, coids: List[str]) -> None:
+        for coid in coids:
+            if coid and self._by_coid.get(coid) == order_id:
+                del self._by_coid[coid]
+
+        if conid is not None:
+            self._by_conid.get(str(conid), set()).discard(order_id)
+
+        order_ids = self._by_status.get(status)
+        if order_ids is not None:
+            order_ids.discard(order_id)
+            if not order_ids:
+                del self._by_status[status]
+
+    def _call(self, callback: Callable[[OrderEvent], Any], event: OrderEvent) -> None:
+        """Calls a subscriber, logging its errors so one bad subscriber doesn't stop the others."""
+
+        try:
+            callback(event)
+        except Exception:
+            logger.exception('An order book subscriber failed.')
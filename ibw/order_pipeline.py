@@ -0,0 +1,425 @@
+import logging
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import wait
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+# The states of an order going through the pipeline.
+PENDING = 'pending'
+SUBMITTED = 'submitted'
+QUESTION = 'question'
+ACKNOWLEDGED = 'acknowledged'
+REJECTED = 'rejected'
+FAILED = 'failed'
+
+FINAL_STATES = (ACKNOWLEDGED, REJECTED, FAILED)
+
+# The questions answered for one order before it's given up on.
+DEFAULT_MAX_QUESTIONS = 10
+
+DEFAULT_MAX_WORKERS = 8
+
+
+def question_messages(question: Dict) -> List[str]:
+    """Returns the texts of a question, the gateway sends one string or a list of them."""
+
+    messages = question.get('message') or []
+
+    if isinstance(messages, str):
+        return [messages]
+
+    return list(messages)
+
+
+class ConfirmRules():
+
+    def __init__(self, default: bool = False, rules: List[Tuple[str, bool]] = None) -> None:
+        """Initalizes a new instance of the ConfirmRules Object.
+
+        Decides how the questions the gateway asks about an order are
+        answered. A rule is a regex matched against the message ID of a
+        question, e.g. `o163`, or its text, and the first rule matching
+        decides. A question with several messages is only confirmed when
+        every message is.
+
+        Keyword Arguments:
+        ----
+        default {bool} -- The answer to questions matching no rule. (default: {False})
+
+        rules {List[Tuple[str, bool]]} -- The `(pattern, confirm)` rules. (default: {None})
+
+        Usage:
+        ----
+            >>> rules = ConfirmRules(rules=[('^o163$', True), ('^o354$', True), ('margin', False)])
+        """
+
+        self.default = default
+        self.rules = [(re.compile(pattern), confirm) for pattern, confirm in (rules or [])]
+
+    def confirm_for(self, message_id: str, text: str = '') -> bool:
+        """Returns whether one message of a question is confirmed.
+
+        Arguments:
+        ----
+        message_id {str} -- The message ID, e.g. `o163`.
+
+        Keyword Arguments:
+        ----
+        text {str} -- The text of the message. (default: {''})
+
+        Returns:
+        ----
+        {bool} -- `True` to confirm.
+        """
+
+        for pattern, confirm in self.rules:
+            if pattern.search(message_id or '') or pattern.search(text or ''):
+                return confirm
+
+        return self.default
+
+    def confirm(self, question: Dict) -> bool:
+        """Returns whether a question of a `place_order` response is confirmed."""
+
+        message_ids = question.get('messageIds') or []
+        messages = question_messages(question)
+
+        pairs = [
+            (message_ids[index] if index < len(message_ids) else '', messages[index] if index < len(messages) else '')
+            for index in range(max(len(message_ids), len(messages), 1))
+        ]
+
+        return all(self.confirm_for(message_id, text) for message_id, text in pairs)
+
+
+class OrderTicket():
+
+    __slots__ = (
+        'order', 'state', 'order_ids', 'statuses', 'questions', 'error', 'submitted', 'acknowledged', 'round_trips'
+    )
+
+    def __init__(self, order: Union[Dict, List[Dict]]) -> None:
+        """Initalizes a new instance of the OrderTicket Object.
+
+        Tracks one submission through the pipeline: its state, the
+        questions answered, the order IDs the gateway gave and how long the
+        acknowledgement took.
+
+        Arguments:
+        ----
+        order {Union[Dict, List[Dict]]} -- An order, or a group of orders
+            submitted together, like a bracket.
+        """
+
+        self.order = order
+        self.state = PENDING
+        self.order_ids: List[str] = []
+        self.statuses: List[str] = []
+        self.questions: List[Tuple[List[str], bool]] = []
+        self.error = None
+        self.submitted: float = None
+        self.acknowledged: float = None
+        self.round_trips = 0
+
+    def __repr__(self) -> str:
+        return '<OrderTicket state={} order_ids={} questions={}>'.format(self.state, self.order_ids, len(self.questions))
+
+    @property
+    def done(self) -> bool:
+        """Whether the ticket reached a final state."""
+
+        return self.state in FINAL_STATES
+
+    @property
+    def time_to_ack(self) -> float:
+        """The seconds from submitting to the acknowledgement, `None` until acknowledged."""
+
+        if self.acknowledged is None or self.submitted is None:
+            return None
+
+        return self.acknowledged - self.submitted
+
+
+class OrderPipeline():
+
+    def __init__(self, client, account_id: str = None, rules: ConfirmRules = None, suppress: List[str] = None,
+                 suppress_confirmed: bool = False, max_workers: int = DEFAULT_MAX_WORKERS,
+                 max_questions: int = DEFAULT_MAX_QUESTIONS) -> None:
+        """Initalizes a new instance of the OrderPipeline Object.
+
+        Submits orders and drives the question and reply exchange of each
+        one as a state machine, `pending`, `submitted`, `question`, then
+        `acknowledged`, `rejected` or `failed`, answering every question
+        with `rules` instead of a caller's loop. Orders are submitted
+        concurrently, at most `max_workers` at once, so one order waiting on
+        a reply doesn't hold up the others.
+
+        Questions known to be harmless can be suppressed on the gateway when
+        the pipeline starts, so orders skip their round trips altogether.
+        With `suppress_confirmed`, every question the rules confirm is also
+        suppressed for the following orders.
+
+        Arguments:
+        ----
+        client {IBClient} -- The client orders are placed with.
+
+        Keyword Arguments:
+        ----
+        account_id {str} -- The account. (default: {the client's account})
+
+        rules {ConfirmRules} -- How questions are answered. (default: {decline every question})
+
+        suppress {List[str]} -- The message IDs suppressed on start, e.g.
+            `['o163', 'o354']`. (default: {None})
+
+        suppress_confirmed {bool} -- Suppress questions once the rules
+            confirmed them. (default: {False})
+
+        max_workers {int} -- The orders submitted at once. (default: {8})
+
+        max_questions {int} -- The questions answered for one order before
+            it's failed. (default: {10})
+
+        Usage:
+        ----
+            >>> pipeline = OrderPipeline(
+                    client=ib_client,
+                    rules=ConfirmRules(rules=[('^o163$', True)]),
+                    suppress=['o354']
+                )
+            >>> tickets = pipeline.submit_many(orders=orders)
+            >>> pipeline.stats()
+        """
+
+        self.client = client
+        self.account_id = account_id or client.account
+        self.rules = rules or ConfirmRules()
+        self.suppress = list(suppress or [])
+        self.suppress_confirmed = suppress_confirmed
+        self.max_workers = max_workers
+        self.max_questions = max_questions
+
+        self._lock = threading.Lock()
+        self._started = False
+
+        self.suppressed = set()
+        self.tickets: List[OrderTicket] = []
+
+    def start(self) -> None:
+        """Suppresses the questions of `suppress` on the gateway, once per pipeline."""
+
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+
+        if self.suppress:
+            self._suppress(self.suppress)
+
+    def submit(self, order: Union[Dict, List[Dict]]) -> OrderTicket:
+        """Submits an order and answers its questions until it's acknowledged or rejected.
+
+        Arguments:
+        ----
+        order {Union[Dict, List[Dict]]} -- An order, an `IBOrder`, or a list
+            of orders placed together with `place_orders`.
+
+        Returns:
+        ----
+        {OrderTicket} -- The ticket, in a final state.
+        """
+
+        return self._drive(self._tickets([order])[0])
+
+    def submit_many(self, orders: List[Union[Dict, List[Dict]]]) -> List[OrderTicket]:
+        """Submits orders concurrently.
+
+        Arguments:
+        ----
+        orders {List[Union[Dict, List[Dict]]]} -- The orders, or groups of orders.
+
+        Returns:
+        ----
+        {List[OrderTicket]} -- The tickets, in the order of `orders`.
+        """
+
+        tickets = self._tickets(orders)
+
+        for _ in self._run(tickets):
+            pass
+
+        return tickets
+
+    def iter_submit(self, orders: List[Union[Dict, List[Dict]]]) -> Iterator[OrderTicket]:
+        """Submits orders concurrently and yields each ticket as soon as it's final.
+
+        Arguments:
+        ----
+        orders {List[Union[Dict, List[Dict]]]} -- The orders, or groups of orders.
+
+        Returns:
+        ----
+        {Iterator[OrderTicket]} -- The tickets, in the order they finish.
+        """
+
+        yield from self._run(self._tickets(orders))
+
+    def stats(self) -> Dict:
+        """Returns the tickets by state, the questions answered and the acknowledgement latencies.
+
+        Returns:
+        ----
+        {Dict} -- The counts, and the `ack_p50`, `ack_p95` and `ack_max` seconds.
+        """
+
+        with self._lock:
+            tickets = list(self.tickets)
+
+        states = {state: 0 for state in (PENDING, SUBMITTED, QUESTION) + FINAL_STATES}
+        for ticket in tickets:
+            states[ticket.state] += 1
+
+        latencies = sorted(ticket.time_to_ack for ticket in tickets if ticket.time_to_ack is not None)
+
+        def percentile(fraction: float) -> float:
+            if not latencies:
+                return None
+            return latencies[min(len(latencies) - 1, int(fraction * len(latencies)))]
+
+        return {
+            'orders': len(tickets),
+            'states': states,
+            'questions': sum(len(ticket.questions) for ticket in tickets),
+            'round_trips': sum(ticket.round_trips for ticket in tickets),
+            'suppressed': sorted(self.suppressed),
+            'ack_p50': percentile(0.5),
+            'ack_p95': percentile(0.95),
+            'ack_max': latencies[-1] if latencies else None
+        }
+
+    def _tickets(self, orders: List[Union[Dict, List[Dict]]]) -> List[OrderTicket]:
+        self.start()
+
+        tickets = [OrderTicket(order=order) for order in orders]
+        with self._lock:
+            self.tickets.extend(tickets)
+
+        return tickets
+
+    def _run(self, tickets: List[OrderTicket]) -> Iterator[OrderTicket]:
+        if not tickets:
+            return
+
+        with ThreadPoolExecutor(max_workers=max(1, self.max_workers), thread_name_prefix='ibw-orders') as executor:
+            pending = {executor.submit(self._drive, ticket) for ticket in tickets}
+
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+    def _drive(self, ticket: OrderTicket) -> OrderTicket:
+        """Runs the state machine of one ticket until it's final."""
+
+        ticket.submitted = time.perf_counter()
+        ticket.state = SUBMITTED
+
+        try:
+            response = self._place(ticket)
+
+            while not ticket.done:
+                response = self._step(ticket, response)
+        except Exception as error:
+            logger.warning('Submitting an order failed: %s', error)
+            ticket.state = FAILED
+            ticket.error = error
+
+        return ticket
+
+    def _step(self, ticket: OrderTicket, response) -> Union[Dict, List[Dict]]:
+        """Moves a ticket on from one gateway response, returning the next response, if any."""
+
+        if isinstance(response, dict):
+            if response.get('error'):
+                ticket.state = REJECTED
+                ticket.error = response['error']
+                return None
+            response = [response]
+
+        items = [item for item in response or [] if isinstance(item, dict)]
+        question = next((item for item in items if item.get('id') and 'message' in item), None)
+
+        if question is not None:
+            ticket.state = QUESTION
+
+            if len(ticket.questions) >= self.max_questions:
+                ticket.state = FAILED
+                ticket.error = 'The gateway asked more than {} questions.'.format(self.max_questions)
+                return None
+
+            message_ids = list(question.get('messageIds') or [])
+            confirmed = self.rules.confirm(question)
+            ticket.questions.append((message_ids, confirmed))
+
+            if not confirmed:
+                self._reply(ticket, question['id'], False)
+                ticket.state = REJECTED
+                ticket.error = 'Declined: {}'.format(' '.join(question_messages(question)))
+                return None
+
+            if self.suppress_confirmed and message_ids:
+                self._suppress(message_ids)
+
+            return self._reply(ticket, question['id'], True)
+
+        accepted = [item for item in items if item.get('order_id') is not None]
+
+        if accepted:
+            ticket.order_ids = [str(item['order_id']) for item in accepted]
+            ticket.statuses = [item.get('order_status') for item in accepted]
+            ticket.acknowledged = time.perf_counter()
+            ticket.state = ACKNOWLEDGED
+            return None
+
+        ticket.state = REJECTED
+        ticket.error = next((item.get('error') for item in items if item.get('error')), None) or response
+        return None
+
+    def _place(self, ticket: OrderTicket):
+        ticket.round_trips += 1
+
+        if isinstance(ticket.order, list):
+            orders = [order if isinstance(order, dict) else order.create_order() for order in ticket.order]
+            return self.client.place_orders(account_id=self.account_id, orders={'orders': orders})
+
+        return self.client.place_order(account_id=self.account_id, order=ticket.order)
+
+    def _reply(self, ticket: OrderTicket, reply_id: str, confirmed: bool):
+        ticket.round_trips += 1
+        return self.client.place_order_reply(reply_id=reply_id, reply=confirmed)
+
+    def _suppress(self, message_ids: List[str]) -> None:
+        """Suppresses the messages not suppressed yet, each once even when workers race."""
+
+        with self._lock:
+            message_ids = [message_id for message_id in dict.fromkeys(message_ids) if message_id not in self.suppressed]
+            self.suppressed.update(message_ids)
+
+        if not message_ids:
+            return
+
+        try:
+            self.client.suppress_questions(message_ids=message_ids)
+        except Exception:
+            with self._lock:
+                self.suppressed.difference_update(message_ids)
+            raise
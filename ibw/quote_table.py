@@ -0,0 +1,310 @@
+import threading
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+# Flags of a parsed value, combined in a bitmask.
+FLAG_PRIOR_CLOSE = 1
+FLAG_HALTED = 2
+FLAG_MISSING = 4
+FLAG_INVALID = 8
+
+_PREFIXES = (('C', FLAG_PRIOR_CLOSE), ('H', FLAG_HALTED))
+_MULTIPLIERS = (('K', 1e3), ('M', 1e6), ('B', 1e9))
+
+
+def parse_prices(values: List[str]) -> Tuple['np.ndarray', 'np.ndarray']:
+    """Parses market data strings into numbers and flags, all at once.
+
+    The gateway sends prices as strings that can start with `C`, the price
+    is the prior close, or `H`, trading is halted, and sizes and volumes as
+    strings like `1.2K` or `3.45M`. Thousands separators are allowed.
+
+    Arguments:
+    ----
+    values {List[str]} -- The strings, `None` or `''` for a missing value.
+
+    Returns:
+    ----
+    {Tuple[np.ndarray, np.ndarray]} -- The `float64` values, `NaN` when
+        missing or invalid, and the `uint8` flags of each value.
+    """
+
+    if np is None:
+        raise ImportError('The quote table requires `numpy`, install it with `pip install numpy`.')
+
+    strings = np.array(['' if value is None else str(value) for value in values], dtype=str)
+    strings = np.char.strip(strings)
+    flags = np.zeros(strings.shape, dtype=np.uint8)
+
+    for prefix, flag in _PREFIXES:
+        prefixed = np.char.startswith(strings, prefix)
+        flags[prefixed] |= flag
+        strings = np.where(prefixed, np.char.lstrip(strings, prefix), strings)
+
+    scale = np.ones(strings.shape, dtype=np.float64)
+    for suffix, multiplier in _MULTIPLIERS:
+        suffixed = np.char.endswith(strings, suffix)
+        scale[suffixed] = multiplier
+        strings = np.where(suffixed, np.char.rstrip(strings, suffix), strings)
+
+    strings = np.char.replace(strings, ',', '')
+
+    missing = strings == ''
+    flags[missing] |= FLAG_MISSING
+    strings = np.where(missing, 'nan', strings)
+
+    try:
+        numbers = strings.astype(np.float64)
+    except ValueError:
+        # Only pay for a loop when a value isn't a number.
+        numbers = np.empty(strings.shape, dtype=np.float64)
+        for index, string in enumerate(strings.tolist()):
+            try:
+                numbers[index] = float(string)
+            except ValueError:
+                numbers[index] = np.nan
+                flags[index] |= FLAG_INVALID
+
+    return numbers * scale, flags
+
+
+def _field_id(field) -> str:
+    # Accepts `ibw.fields.Field` members, without importing them here.
+    return field.value if hasattr(field, 'value') else str(field)
+
+
+class QuoteTable():
+
+    def __init__(self, fields: List[str], capacity: int = 1024) -> None:
+        """Initalizes a new instance of the QuoteTable Object.
+
+        Holds the numeric market data fields of many contracts in
+        preallocated NumPy arrays, one row per contract and one column per
+        field, instead of one dictionary of strings per quote. Snapshots and
+        streaming ticks are parsed a column at a time, and a watchlist can
+        be read as arrays without creating a Python object per quote.
+
+        Each value also has flags, a bitmask of `FLAG_PRIOR_CLOSE`,
+        `FLAG_HALTED`, `FLAG_MISSING` and `FLAG_INVALID`. Missing values
+        are `NaN` until a first update arrives.
+
+        Arguments:
+        ----
+        fields {List[str]} -- The numeric fields, e.g. `['31', '84', '86']`.
+
+        Keyword Arguments:
+        ----
+        capacity {int} -- The rows allocated up front, doubled when
+            more contracts are added. (default: {1024})
+
+        Usage:
+        ----
+            >>> table = QuoteTable(fields=['31', '84', '86'])
+            >>> table.update(ib_client.market_data(conids=conids, since=None, fields=['31', '84', '86']))
+            >>> table.select(conids=conids, fields=['84', '86'])
+        """
+
+        if np is None:
+            raise ImportError('The quote table requires `numpy`, install it with `pip install numpy`.')
+
+        self.fields = [_field_id(field) for field in fields]
+        self.columns: Dict[str, int] = {field: column for column, field in enumerate(self.fields)}
+
+        self.lock = threading.Lock()
+
+        self.conids: List[str] = []
+        self.rows: Dict[str, int] = {}
+
+        self.values = np.full((capacity, len(self.fields)), np.nan, dtype=np.float64)
+        self.flags = np.full((capacity, len(self.fields)), FLAG_MISSING, dtype=np.uint8)
+        self.updated = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.conids)
+
+    def __contains__(self, conid: str) -> bool:
+        return str(conid) in self.rows
+
+    @property
+    def capacity(self) -> int:
+        """The rows allocated."""
+
+        return self.values.shape[0]
+
+    def row(self, conid: str) -> int:
+        """Returns the row of a contract, adding it if it's new.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        Returns:
+        ----
+        {int} -- The row index.
+        """
+
+        conid = str(conid)
+        row = self.rows.get(conid)
+
+        if row is None:
+            row = len(self.conids)
+            if row >= self.capacity:
+                self._grow(capacity=max(1, self.capacity) * 2)
+            self.rows[conid] = row
+            self.conids.append(conid)
+
+        return row
+
+    def update(self, quotes: List[Dict]) -> int:
+        """Parses and stores snapshot items or streaming ticks.
+
+        Only the fields present in a quote are changed, so partial updates
+        are merged.
+
+        Arguments:
+        ----
+        quotes {List[Dict]} -- The items of a `market_data` response, or ticks.
+
+        Returns:
+        ----
+        {int} -- The number of quotes stored.
+        """
+
+        with self.lock:
+            rows = []
+            present = {field: ([], []) for field in self.fields}
+
+            for quote in quotes:
+                if not isinstance(quote, dict) or 'conid' not in quote:
+                    continue
+
+                row = self.row(conid=quote['conid'])
+                rows.append(row)
+
+                updated = quote.get('_updated')
+                if updated is not None:
+                    self.updated[row] = max(self.updated[row], int(updated))
+
+                for field, (field_rows, strings) in present.items():
+                    value = quote.get(field)
+                    if value is not None:
+                        field_rows.append(row)
+                        strings.append(value)
+
+            for field, (field_rows, strings) in present.items():
+                if not field_rows:
+                    continue
+
+                numbers, flags = parse_prices(strings)
+                column = self.columns[field]
+                self.values[field_rows, column] = numbers
+                self.flags[field_rows, column] = flags
+
+        return len(rows)
+
+    def get(self, conid: str, field: str) -> float:
+        """Returns one value, `NaN` if it's missing."""
+
+        row = self.rows.get(str(conid))
+        if row is None:
+            return float('nan')
+
+        return float(self.values[row, self.columns[_field_id(field)]])
+
+    def column(self, field: str) -> 'np.ndarray':
+        """Returns a field of every contract, in the order of `conids`.
+
+        Arguments:
+        ----
+        field {str} -- The field.
+
+        Returns:
+        ----
+        {np.ndarray} -- A view of the table, it changes with later updates.
+        """
+
+        return self.values[:len(self.conids), self.columns[_field_id(field)]]
+
+    def indices(self, conids: List[str]) -> 'np.ndarray':
+        """Returns the rows of contracts, `-1` for unknown ones."""
+
+        rows = self.rows
+        return np.fromiter((rows.get(str(conid), -1) for conid in conids), dtype=np.int64, count=len(conids))
+
+    def select(self, conids: List[str] = None, fields: List[str] = None,
+               with_flags: bool = False) -> 'np.ndarray':
+        """Returns a copy of the values of contracts and fields.
+
+        Keyword Arguments:
+        ----
+        conids {List[str]} -- The contracts, one row each. Unknown contracts
+            get a row of `NaN`. (default: {every contract})
+
+        fields {List[str]} -- The fields, one column each. (default: {every field})
+
+        with_flags {bool} -- Also return the flags. (default: {False})
+
+        Returns:
+        ----
+        {np.ndarray} -- The values, or a tuple of the values and the flags.
+        """
+
+        columns = [self.columns[_field_id(field)] for field in (fields or self.fields)]
+
+        with self.lock:
+            if conids is None:
+                rows = np.arange(len(self.conids))
+                unknown = np.zeros(len(rows), dtype=bool)
+            else:
+                rows = self.indices(conids=conids)
+                unknown = rows < 0
+                rows = np.where(unknown, 0, rows)
+
+            values = self.values[np.ix_(rows, columns)]
+            flags = self.flags[np.ix_(rows, columns)]
+
+        values[unknown] = np.nan
+        flags[unknown] = FLAG_MISSING
+
+        if with_flags:
+            return values, flags
+
+        return values
+
+    def remove(self, conids: List[str]) -> None:
+        """Drops contracts, the last rows are moved into their place."""
+
+        with self.lock:
+            for conid in conids:
+                row = self.rows.pop(str(conid), None)
+                if row is None:
+                    continue
+
+                last = len(self.conids) - 1
+                if row != last:
+                    moved = self.conids[last]
+                    self.values[row] = self.values[last]
+                    self.flags[row] = self.flags[last]
+                    self.updated[row] = self.updated[last]
+                    self.conids[row] = moved
+                    self.rows[moved] = row
+
+                self.conids.pop()
+                self.values[last] = np.nan
+                self.flags[last] = FLAG_MISSING
+                self.updated[last] = 0
+
+    def _grow(self, capacity: int) -> None:
+        """Reallocates the arrays with more rows."""
+
+        extra = capacity - self.capacity
+
+        self.values = np.vstack([self.values, np.full((extra, len(self.fields)), np.nan, dtype=np.float64)])
+        self.flags = np.vstack([self.flags, np.full((extra, len(self.fields)), FLAG_MISSING, dtype=np.uint8)])
+        self.updated = np.concatenate([self.updated, np.zeros(extra, dtype=np.int64)])
@@ -0,0 +1,537 @@
+import asyncio
+import bisect
+import collections
+import itertools
+import re
+import threading
+import time
+import urllib.parse
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+# Lower values are served first.
+PRIORITY_ORDERS = 0
+PRIORITY_SESSION = 1
+PRIORITY_DEFAULT = 5
+PRIORITY_MARKET_DATA = 8
+PRIORITY_FUNDAMENTALS = 9
+
+
+class TokenBucket():
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        """Initalizes a new instance of the TokenBucket Object.
+
+        Arguments:
+        ----
+        rate {float} -- The number of tokens added per second.
+
+        Keyword Arguments:
+        ----
+        capacity {float} -- The largest burst allowed, defaults to one
+            second worth of tokens and never less than one. (default: {None})
+        """
+
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1.0)
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now: float) -> float:
+        """Returns the seconds until a token is available, `0.0` if one is."""
+
+        self._refill(now=now)
+
+        if self.tokens >= 1.0:
+            return 0.0
+
+        return (1.0 - self.tokens) / self.rate
+
+    def consume(self, now: float) -> None:
+        """Takes a token, `wait_time` must have returned `0.0`."""
+
+        self._refill(now=now)
+        self.tokens -= 1.0
+
+    def drain(self, now: float, seconds: float) -> None:
+        """Empties the bucket so the next token arrives after `seconds`."""
+
+        self._refill(now=now)
+        self.tokens = min(self.tokens, -seconds * self.rate + 1.0)
+
+
+class RateClass():
+
+    def __init__(self, name: str, rate: float = None, burst: float = None,
+                 max_concurrent: int = None, priority: int = PRIORITY_DEFAULT) -> None:
+        """Initalizes a new instance of the RateClass Object.
+
+        A group of endpoints sharing a rate limit and a priority.
+
+        Arguments:
+        ----
+        name {str} -- The name of the class.
+
+        Keyword Arguments:
+        ----
+        rate {float} -- The requests per second allowed for the class, `None`
+            if only the global limit applies. (default: {None})
+
+        burst {float} -- The largest burst allowed for the class. (default: {None})
+
+        max_concurrent {int} -- The most requests of the class in flight at
+            once, `None` for no limit. (default: {None})
+
+        priority {int} -- Lower values are served first. (default: {PRIORITY_DEFAULT})
+        """
+
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.max_concurrent = max_concurrent
+        self.priority = priority
+
+        self.bucket = TokenBucket(rate=rate, capacity=burst) if rate else None
+        self.active = 0
+
+
+def default_rate_classes() -> List[RateClass]:
+    """Returns the rate classes matching the gateway's documented limits."""
+
+    return [
+        RateClass(name='orders', priority=PRIORITY_ORDERS),
+        RateClass(name='session', priority=PRIORITY_SESSION),
+        RateClass(name='tickle', rate=1.0, priority=PRIORITY_SESSION),
+        RateClass(name='sso_validate', rate=1.0 / 60.0, priority=PRIORITY_SESSION),
+        RateClass(name='live_orders', rate=1.0 / 5.0, priority=PRIORITY_DEFAULT),
+        RateClass(name='trades', rate=1.0 / 5.0, priority=PRIORITY_DEFAULT),
+        RateClass(name='pnl', rate=1.0 / 5.0, priority=PRIORITY_DEFAULT),
+        RateClass(name='portfolio_accounts', rate=1.0 / 5.0, priority=PRIORITY_DEFAULT),
+        RateClass(name='fyi', rate=1.0, priority=PRIORITY_DEFAULT),
+        RateClass(name='snapshot', rate=10.0, priority=PRIORITY_MARKET_DATA),
+        RateClass(name='history', rate=5.0, max_concurrent=5, priority=PRIORITY_MARKET_DATA),
+        RateClass(name='scanner_params', rate=1.0 / 900.0, priority=PRIORITY_MARKET_DATA),
+        RateClass(name='scanner_run', rate=1.0, priority=PRIORITY_MARKET_DATA),
+        RateClass(name='fundamentals', priority=PRIORITY_FUNDAMENTALS),
+        RateClass(name='default', priority=PRIORITY_DEFAULT)
+    ]
+
+
+def default_rate_rules() -> List[Tuple[str, str, str]]:
+    """Returns the rules mapping endpoints to rate classes.
+
+    Each rule is a tuple of `(method, path regex, class name)`, where the
+    method can be `*`, and the first match wins. The path is relative to
+    `/v1/portal/`.
+    """
+
+    return [
+        ('POST', r'^iserver/account/[^/]+/orders?(/whatif)?$', 'orders'),
+        ('*', r'^iserver/account/[^/]+/order/[^/]+$', 'orders'),
+        ('POST', r'^iserver/reply/', 'orders'),
+        ('*', r'^iserver/questions/suppress', 'orders'),
+        ('GET', r'^iserver/account/orders$', 'live_orders'),
+        ('GET', r'^iserver/account/trades$', 'trades'),
+        ('GET', r'^iserver/account/pnl/', 'pnl'),
+        ('GET', r'^portfolio/(sub)?accounts$', 'portfolio_accounts'),
+        ('*', r'^iserver/marketdata/snapshot', 'snapshot'),
+        ('*', r'^iserver/marketdata/history', 'history'),
+        ('*', r'^iserver/scanner/params', 'scanner_params'),
+        ('*', r'^iserver/scanner/run', 'scanner_run'),
+        ('*', r'^(iserver/)?fundamentals/|^tws\.proxy/fundamentals/', 'fundamentals'),
+        ('*', r'^fyi/', 'fyi'),
+        ('*', r'^tickle$', 'tickle'),
+        ('*', r'^sso/validate$', 'sso_validate'),
+        ('*', r'^(iserver/auth/status|iserver/reauthenticate|logout)$', 'session')
+    ]
+
+
+class _Waiter():
+
+    __slots__ = ('key', 'rate_class', 'future', 'loop', 'granted')
+
+    def __init__(self, key: Tuple[int, int], rate_class: RateClass,
+                 future: asyncio.Future = None, loop: asyncio.AbstractEventLoop = None) -> None:
+        self.key = key
+        self.rate_class = rate_class
+
+        # Only set for `acquire_async`, resolved with the permit by `_dispatch`.
+        self.future = future
+        self.loop = loop
+        self.granted = False
+
+    def __lt__(self, other: '_Waiter') -> bool:
+        return self.key < other.key
+
+
+class RateLimiter():
+
+    def __init__(self, global_rate: float = 10.0, global_burst: float = None,
+                 classes: List[RateClass] = None, rules: List[Tuple[str, str, str]] = None) -> None:
+        """Initalizes a new instance of the RateLimiter Object.
+
+        A token bucket scheduler in front of the gateway. Every request
+        needs a token from the global bucket and, if its rate class has
+        one, from the class bucket. Waiting requests are served by priority
+        and then in arrival order, so an order placed during a burst of
+        snapshot polling jumps ahead of every queued market data and
+        fundamentals call.
+
+        Keyword Arguments:
+        ----
+        global_rate {float} -- The requests per second allowed across every
+            endpoint. (default: {10.0})
+
+        global_burst {float} -- The largest global burst. (default: {None})
+
+        classes {List[RateClass]} -- The rate classes, a class named
+            `default` must be included. (default: {default_rate_classes()})
+
+        rules {List[Tuple[str, str, str]]} -- The rules mapping endpoints to
+            classes. (default: {default_rate_rules()})
+
+        Usage:
+        ----
+            >>> limiter = RateLimiter(global_rate=50.0)
+            >>> permit = limiter.acquire(method='GET', url='https://localhost:5000/v1/portal/iserver/marketdata/snapshot')
+            >>> limiter.release(permit)
+        """
+
+        self.global_bucket = TokenBucket(rate=global_rate, capacity=global_burst)
+        self.classes: Dict[str, RateClass] = {
+            rate_class.name: rate_class for rate_class in (classes or default_rate_classes())
+        }
+        self.rules = [
+            (method, re.compile(pattern), self.classes[name])
+            for method, pattern, name in (rules if rules is not None else default_rate_rules())
+        ]
+
+        self._lock = threading.Lock()
+        self._condition = threading.Condition(self._lock)
+        self._waiters: List[_Waiter] = []
+        self._queues: Dict[str, collections.deque] = {}
+        self._sequence = itertools.count()
+
+        # Coroutines waiting per event loop, and the timer of each loop.
+        self._loops: Dict[asyncio.AbstractEventLoop, int] = {}
+        self._timers: Dict[asyncio.AbstractEventLoop, Tuple[float, asyncio.TimerHandle]] = {}
+        self._classified: Dict[Tuple[str, str], RateClass] = {}
+
+    def classify(self, method: str, url: str) -> RateClass:
+        """Returns the rate class of a request.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL, or the endpoint path.
+
+        Returns:
+        ----
+        {RateClass} -- The matching class, `default` if no rule matches.
+        """
+
+        path = urllib.parse.urlsplit(url).path
+        path = path.split('/portal/', 1)[-1].lstrip('/')
+
+        key = (method, path)
+        rate_class = self._classified.get(key)
+        if rate_class is not None:
+            return rate_class
+
+        rate_class = self.classes['default']
+        for rule_method, pattern, candidate in self.rules:
+            if (rule_method == '*' or rule_method == method) and pattern.search(path):
+                rate_class = candidate
+                break
+
+        # Paths embed conids and account ids, so keep the memo bounded.
+        if len(self._classified) > 4096:
+            self._classified.clear()
+        self._classified[key] = rate_class
+
+        return rate_class
+
+    def _try_acquire(self, waiter: _Waiter) -> float:
+        """Grants the waiter a permit if it is its turn, with the lock held.
+
+        Returns:
+        ----
+        {float} -- `0.0` if the permit was granted, otherwise the seconds to
+            wait before trying again.
+        """
+
+        now = time.monotonic()
+        rate_class = waiter.rate_class
+
+        class_wait = self._class_wait(rate_class=rate_class, now=now)
+        if class_wait > 0.0:
+            return class_wait
+
+        # Only a waiter that is ready for its own class competes for the
+        # global bucket, the most urgent of those goes first.
+        for other in self._waiters:
+            if other is waiter:
+                break
+            if self._class_wait(rate_class=other.rate_class, now=now) == 0.0:
+                return self.global_bucket.wait_time(now=now) or 0.001
+
+        global_wait = self.global_bucket.wait_time(now=now)
+        if global_wait > 0.0:
+            return global_wait
+
+        self._grant(waiter=waiter, now=now)
+
+        return 0.0
+
+    def _grant(self, waiter: _Waiter, now: float) -> None:
+        """Takes the waiter's tokens and removes it from the queue, with the lock held."""
+
+        rate_class = waiter.rate_class
+
+        self.global_bucket.consume(now=now)
+        if rate_class.bucket is not None:
+            rate_class.bucket.consume(now=now)
+        rate_class.active += 1
+
+        waiter.granted = True
+        self._remove(waiter=waiter)
+
+    def _remove(self, waiter: _Waiter) -> None:
+        self._waiters.remove(waiter)
+        self._queues[waiter.rate_class.name].remove(waiter)
+
+        if waiter.loop is not None:
+            self._loops[waiter.loop] -= 1
+            if not self._loops[waiter.loop]:
+                del self._loops[waiter.loop]
+
+    def _dispatch(self) -> None:
+        """Hands permits to the coroutines whose turn it is, with the lock held.
+
+        Only the head of each class queue can be next, so a call costs one
+        check per rate class however many requests are queued. Threads
+        waiting in `acquire` take their own permits once notified, the
+        coroutines behind them are dispatched again when they do. When no
+        permit can be handed out, every loop with waiting coroutines gets a
+        single timer for the next token instead.
+        """
+
+        now = time.monotonic()
+        next_wait = None
+
+        while True:
+            head = None
+
+            for name, queue in self._queues.items():
+                if not queue:
+                    continue
+
+                class_wait = self._class_wait(rate_class=queue[0].rate_class, now=now)
+                if class_wait > 0.0:
+                    next_wait = class_wait if next_wait is None else min(next_wait, class_wait)
+                elif head is None or queue[0].key < head.key:
+                    head = queue[0]
+
+            if head is None:
+                break
+
+            global_wait = self.global_bucket.wait_time(now=now)
+            if global_wait > 0.0:
+                next_wait = global_wait if next_wait is None else min(next_wait, global_wait)
+                break
+
+            if head.future is None:
+                self._condition.notify_all()
+                break
+
+            self._grant(waiter=head, now=now)
+            head.loop.call_soon_threadsafe(self._resolve, head)
+
+        if next_wait is not None:
+            for loop in list(self._loops):
+                self._schedule(loop=loop, deadline=now + next_wait)
+
+    @staticmethod
+    def _resolve(waiter: _Waiter) -> None:
+        # A waiter cancelled in the meantime gives its permit back in `acquire_async`.
+        if not waiter.future.done():
+            waiter.future.set_result(waiter.rate_class)
+
+    def _schedule(self, loop: asyncio.AbstractEventLoop, deadline: float) -> None:
+        """Makes sure `loop` dispatches again by `deadline`, with the lock held."""
+
+        if loop.is_closed():
+            return
+
+        timer = self._timers.get(loop)
+        if timer is not None and timer[0] <= deadline:
+            return
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is not loop:
+            # Timers can only be set from the loop's own thread.
+            loop.call_soon_threadsafe(self._on_timer, loop)
+            return
+
+        if timer is not None:
+            timer[1].cancel()
+
+        self._timers[loop] = (deadline, loop.call_later(max(deadline - time.monotonic(), 0.0), self._on_timer, loop))
+
+    def _on_timer(self, loop: asyncio.AbstractEventLoop) -> None:
+        with self._lock:
+            timer = self._timers.get(loop)
+            if timer is not None and timer[0] <= time.monotonic():
+                del self._timers[loop]
+            self._dispatch()
+
+    @staticmethod
+    def _class_wait(rate_class: RateClass, now: float) -> float:
+        if rate_class.max_concurrent is not None and rate_class.active >= rate_class.max_concurrent:
+            # Woken up by `release`.
+            return 1.0
+
+        if rate_class.bucket is not None:
+            return rate_class.bucket.wait_time(now=now)
+
+        return 0.0
+
+    def _enqueue(self, method: str, url: str, future: asyncio.Future = None,
+                 loop: asyncio.AbstractEventLoop = None) -> _Waiter:
+        rate_class = self.classify(method=method, url=url)
+        waiter = _Waiter(key=(rate_class.priority, next(self._sequence)), rate_class=rate_class, future=future, loop=loop)
+        bisect.insort(self._waiters, waiter)
+        self._queues.setdefault(rate_class.name, collections.deque()).append(waiter)
+
+        if loop is not None:
+            self._loops[loop] = self._loops.get(loop, 0) + 1
+
+        return waiter
+
+    def acquire(self, method: str, url: str) -> RateClass:
+        """Blocks until the request may be sent.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL of the request.
+
+        Returns:
+        ----
+        {RateClass} -- The permit, to be handed to `release` once the
+            response arrived.
+        """
+
+        with self._condition:
+            waiter = self._enqueue(method=method, url=url)
+            try:
+                while True:
+                    wait = self._try_acquire(waiter=waiter)
+                    if wait == 0.0:
+                        self._condition.notify_all()
+                        self._dispatch()
+                        return waiter.rate_class
+                    self._condition.wait(timeout=wait)
+            except BaseException:
+                if not waiter.granted:
+                    self._remove(waiter=waiter)
+                    self._condition.notify_all()
+                    self._dispatch()
+                raise
+
+    async def acquire_async(self, method: str, url: str) -> RateClass:
+        """The asyncio counterpart of `acquire`.
+
+        The coroutine waits on a future of its own, resolved when its turn
+        comes, so queued requests cost nothing until then.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL of the request.
+
+        Returns:
+        ----
+        {RateClass} -- The permit, to be handed to `release`.
+        """
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        with self._condition:
+            waiter = self._enqueue(method=method, url=url, future=future, loop=loop)
+            self._dispatch()
+
+        try:
+            return await future
+        except BaseException:
+            with self._condition:
+                if waiter.granted:
+                    # Granted, but cancelled before it could be used.
+                    waiter.rate_class.active -= 1
+                else:
+                    self._remove(waiter=waiter)
+                self._condition.notify_all()
+                self._dispatch()
+            raise
+
+    def release(self, permit: RateClass) -> None:
+        """Marks a request granted by `acquire` as finished.
+
+        Arguments:
+        ----
+        permit {RateClass} -- The permit returned by `acquire`.
+        """
+
+        with self._condition:
+            permit.active -= 1
+            self._condition.notify_all()
+            self._dispatch()
+
+    def penalize(self, method: str, url: str, seconds: float) -> None:
+        """Holds back a request's class after the gateway throttled it.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL of the request.
+
+        seconds {float} -- How long the class should wait.
+        """
+
+        rate_class = self.classify(method=method, url=url)
+        with self._condition:
+            now = time.monotonic()
+            if rate_class.bucket is not None:
+                rate_class.bucket.drain(now=now, seconds=seconds)
+            else:
+                self.global_bucket.drain(now=now, seconds=seconds)
+            self._dispatch()
+
+    def stats(self) -> Dict:
+        """Returns the queued requests and the requests in flight per class."""
+
+        with self._lock:
+            queued = {}
+            for waiter in self._waiters:
+                queued[waiter.rate_class.name] = queued.get(waiter.rate_class.name, 0) + 1
+
+            return {
+                'queued': queued,
+                'in_flight': {
+                    name: rate_class.active for name, rate_class in self.classes.items() if rate_class.active
+                }
+            }
@@ -0,0 +1,524 @@
+import bisect
+import json
+import logging
+import mmap
+import pathlib
+import struct
+import threading
+import time
+import zlib
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Union
+
+from . import json_codec
+
+logger = logging.getLogger(__name__)
+
+# The first bytes of a recording.
+MAGIC = b'IBWREC1\n'
+
+# The first bytes of a block.
+BLOCK_MAGIC = b'BLK1'
+
+# The kinds of records.
+KIND_SNAPSHOT = 1
+KIND_TICK = 2
+
+# magic, compressed length, records, first time, last time, contracts
+_BLOCK_HEADER = struct.Struct('<4sIIqqI')
+
+# time, contract, kind, payload length
+_RECORD_HEADER = struct.Struct('<qqBI')
+
+# Contracts without an ID, e.g. system messages, are recorded under this one.
+NO_CONID = -1
+
+
+class Record():
+
+    __slots__ = ('timestamp', 'conid', 'kind', 'message')
+
+    def __init__(self, timestamp: int, conid: int, kind: int, message: Dict) -> None:
+        """Initalizes a new instance of the Record Object.
+
+        Arguments:
+        ----
+        timestamp {int} -- When the message was received, in nanoseconds since the epoch.
+
+        conid {int} -- The contract ID, `-1` if the message has none.
+
+        kind {int} -- `KIND_SNAPSHOT` or `KIND_TICK`.
+
+        message {Dict} -- The snapshot item or tick, as received.
+        """
+
+        self.timestamp = timestamp
+        self.conid = conid
+        self.kind = kind
+        self.message = message
+
+    def __repr__(self) -> str:
+        return '<Record timestamp={} conid={} kind={}>'.format(self.timestamp, self.conid, self.kind)
+
+
+class MarketDataRecorder():
+
+    def __init__(self, path: Union[str, pathlib.Path], block_size: int = 1000, flush_interval: float = 1.0,
+                 compression_level: int = 1) -> None:
+        """Initalizes a new instance of the MarketDataRecorder Object.
+
+        Writes the snapshot items and streaming ticks of a session to an
+        append-only log, so the session can be replayed later. Records are
+        buffered and written in blocks, each block is compressed on its own
+        with `zlib` and starts with a header holding its time range and its
+        contracts, so a reader can skip blocks without decompressing them.
+        Opening an existing log appends to it, and a block cut short by a
+        crash is ignored by readers.
+
+        Arguments:
+        ----
+        path {Union[str, pathlib.Path]} -- The log file, e.g. one per trading day.
+
+        Keyword Arguments:
+        ----
+        block_size {int} -- The records buffered before a block is written. (default: {1000})
+
+        flush_interval {float} -- The most seconds a record stays buffered,
+            checked when a record is added. (default: {1.0})
+
+        compression_level {int} -- The `zlib` level, `1` is the fastest. (default: {1})
+
+        Usage:
+        ----
+            >>> recorder = MarketDataRecorder(path='recordings/20230103.ibwrec')
+            >>> recorder.record_snapshot(ib_client.market_data(conids=conids, since=None, fields=['31', '84', '86']))
+            >>> stream.add_callback(recorder.record_tick)
+            >>> recorder.close()
+        """
+
+        self.path = pathlib.Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self.block_size = block_size
+        self.flush_interval = flush_interval
+        self.compression_level = compression_level
+
+        self._lock = threading.Lock()
+        self._buffer: List[bytes] = []
+        self._conids = set()
+        self._first = None
+        self._last = None
+        self._flushed = time.monotonic()
+
+        self._file = open(self.path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+            self._file.flush()
+        else:
+            # Drop a block a crash cut short, readers would stop at it.
+            with RecordingReader(self.path) as reader:
+                valid = reader.valid_length
+            self._file.truncate(valid)
+
+        self.records = 0
+        self.blocks = 0
+        self.bytes_written = 0
+
+    def __enter__(self) -> 'MarketDataRecorder':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def record(self, message: Dict, kind: int = KIND_TICK, timestamp: int = None) -> None:
+        """Adds a message to the log.
+
+        Arguments:
+        ----
+        message {Dict} -- The snapshot item or tick.
+
+        Keyword Arguments:
+        ----
+        kind {int} -- `KIND_SNAPSHOT` or `KIND_TICK`. (default: {KIND_TICK})
+
+        timestamp {int} -- When it was received, in nanoseconds. (default: {now})
+        """
+
+        if timestamp is None:
+            timestamp = time.time_ns()
+
+        conid = _conid(message)
+        payload = json.dumps(message, separators=(',', ':')).encode('utf-8')
+
+        with self._lock:
+            if self._file is None:
+                raise ValueError('The recorder is closed.')
+
+            self._buffer.append(_RECORD_HEADER.pack(timestamp, conid, kind, len(payload)) + payload)
+            self._conids.add(conid)
+            self._first = timestamp if self._first is None else min(self._first, timestamp)
+            self._last = timestamp if self._last is None else max(self._last, timestamp)
+            self.records += 1
+
+            if len(self._buffer) >= self.block_size or time.monotonic() - self._flushed >= self.flush_interval:
+                self._write_block()
+
+    def record_snapshot(self, response: List[Dict], timestamp: int = None) -> List[Dict]:
+        """Adds every item of a `market_data` response, and returns the response."""
+
+        if timestamp is None:
+            timestamp = time.time_ns()
+
+        if isinstance(response, list):
+            for item in response:
+                if isinstance(item, dict):
+                    self.record(message=item, kind=KIND_SNAPSHOT, timestamp=timestamp)
+
+        return response
+
+    def record_tick(self, tick: Dict) -> None:
+        """Adds a streaming tick, it can be added as a `MarketDataStream` callback."""
+
+        self.record(message=tick, kind=KIND_TICK)
+
+    def flush(self) -> None:
+        """Writes the buffered records."""
+
+        with self._lock:
+            self._write_block()
+
+    def close(self) -> None:
+        """Writes the buffered records and closes the log."""
+
+        with self._lock:
+            if self._file is None:
+                return
+
+            self._write_block()
+            self._file.close()
+            self._file = None
+
+    def stats(self) -> Dict:
+        """Returns the records, blocks and compressed bytes written."""
+
+        return {'records': self.records, 'blocks': self.blocks, 'bytes': self.bytes_written}
+
+    def _write_block(self) -> None:
+        self._flushed = time.monotonic()
+
+        if not self._buffer:
+            return
+
+        conids = sorted(self._conids)
+        compressed = zlib.compress(b''.join(self._buffer), self.compression_level)
+
+        header = _BLOCK_HEADER.pack(
+            BLOCK_MAGIC, len(compressed), len(self._buffer), self._first, self._last, len(conids)
+        )
+        block = header + struct.pack('<{}q'.format(len(conids)), *conids) + compressed
+
+        self._file.write(block)
+        self._file.flush()
+
+        self.blocks += 1
+        self.bytes_written += len(block)
+
+        self._buffer = []
+        self._conids = set()
+        self._first = None
+        self._last = None
+
+
+class RecordingReader():
+
+    def __init__(self, path: Union[str, pathlib.Path]) -> None:
+        """Initalizes a new instance of the RecordingReader Object.
+
+        Memory-maps a log written by `MarketDataRecorder` and indexes its
+        blocks by time and contract, reading only the block headers. Records
+        are decompressed a block at a time, only for the blocks a query
+        needs.
+
+        Arguments:
+        ----
+        path {Union[str, pathlib.Path]} -- The log file.
+
+        Raises:
+        ----
+        ValueError: If the file isn't a recording.
+        """
+
+        self.path = pathlib.Path(path)
+
+        self._file = open(self.path, 'rb')
+        size = self.path.stat().st_size
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            self.close()
+            raise ValueError('`{}` is not a market data recording.'.format(self.path))
+
+        # offset, compressed length, records, first time, last time, contracts
+        self.blocks: List[tuple] = []
+        self.valid_length = len(MAGIC)
+
+        # The blocks by first time, the latest last time up to each of them,
+        # and the blocks of each contract, all as positions in `blocks`.
+        self._by_start: List[int] = []
+        self._starts: List[int] = []
+        self._reach: List[int] = []
+        self._by_conid: Dict[int, List[int]] = {}
+
+        self._index()
+
+    def __enter__(self) -> 'RecordingReader':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return sum(block[2] for block in self.blocks)
+
+    @property
+    def start(self) -> int:
+        """The time of the first record, in nanoseconds."""
+
+        return self._starts[0] if self._starts else None
+
+    @property
+    def end(self) -> int:
+        """The time of the last record, in nanoseconds."""
+
+        return self._reach[-1] if self._reach else None
+
+    def conids(self) -> List[int]:
+        """Returns every contract in the log."""
+
+        return sorted(conid for conid in self._by_conid if conid != NO_CONID)
+
+    def records(self, start: int = None, end: int = None, conids: List[Union[int, str]] = None,
+                kinds: List[int] = None) -> Iterator[Record]:
+        """Yields records in the order they were written.
+
+        The blocks to decompress are looked up in the block index, by
+        bisecting the block start times, or from the blocks of the wanted
+        contracts, so a query never walks every block header.
+
+        Keyword Arguments:
+        ----
+        start {int} -- The first time, in nanoseconds. (default: {None})
+
+        end {int} -- The end time, excluded, in nanoseconds. (default: {None})
+
+        conids {List[Union[int, str]]} -- Only these contracts. (default: {None})
+
+        kinds {List[int]} -- Only these kinds of records. (default: {None})
+
+        Returns:
+        ----
+        {Iterator[Record]} -- The records.
+        """
+
+        wanted = {int(conid) for conid in conids} if conids is not None else None
+        kinds = set(kinds) if kinds is not None else None
+        decode = json_codec.loads
+
+        for position in self._find(start=start, end=end, wanted=wanted):
+            offset, length = self.blocks[position][:2]
+
+            data = zlib.decompress(self._map[offset:offset + length])
+            position = 0
+
+            while position < len(data):
+                timestamp, conid, kind, size = _RECORD_HEADER.unpack_from(data, position)
+                position += _RECORD_HEADER.size
+                payload = data[position:position + size]
+                position += size
+
+                if start is not None and timestamp < start:
+                    continue
+                if end is not None and timestamp >= end:
+                    continue
+                if wanted is not None and conid not in wanted:
+                    continue
+                if kinds is not None and kind not in kinds:
+                    continue
+
+                yield Record(timestamp=timestamp, conid=conid, kind=kind, message=decode(payload))
+
+    def close(self) -> None:
+        """Unmaps and closes the log."""
+
+        if isinstance(self._map, mmap.mmap):
+            self._map.close()
+        self._map = b''
+        self._file.close()
+
+    def _find(self, start: int, end: int, wanted: set) -> List[int]:
+        """Returns the positions of the blocks a query needs, in the order they were written."""
+
+        if wanted is not None:
+            candidates = set()
+            for conid in wanted:
+                candidates.update(self._by_conid.get(conid, ()))
+        else:
+            # Blocks starting at or after `end` are past the query, and no block
+            # before the first one reaching `start` has records late enough.
+            low = bisect.bisect_left(self._reach, start) if start is not None else 0
+            high = bisect.bisect_left(self._starts, end) if end is not None else len(self._starts)
+            candidates = self._by_start[low:high]
+
+        found = []
+        for position in candidates:
+            _, _, _, first, last, _ = self.blocks[position]
+            if start is not None and last < start:
+                continue
+            if end is not None and first >= end:
+                continue
+            found.append(position)
+
+        found.sort()
+
+        return found
+
+    def _index(self) -> None:
+        self.blocks, self.valid_length = _scan(buffer=self._map, path=self.path)
+
+        # Blocks are written in time order unless timestamps were passed out of order.
+        self._by_start = sorted(range(len(self.blocks)), key=lambda position: self.blocks[position][3])
+        self._starts = [self.blocks[position][3] for position in self._by_start]
+
+        self._reach = []
+        for position in self._by_start:
+            last = self.blocks[position][4]
+            self._reach.append(max(last, self._reach[-1]) if self._reach else last)
+
+        self._by_conid = {}
+        for position, block in enumerate(self.blocks):
+            for conid in block[5]:
+                self._by_conid.setdefault(conid, []).append(position)
+
+
+def replay(reader: RecordingReader, callbacks: List[Callable[[Dict], Any]] = None, table=None,
+           speed: float = 1.0, start: int = None, end: int = None, conids: List[Union[int, str]] = None,
+           kinds: List[int] = None) -> Dict:
+    """Feeds a recording to callbacks or a quote table, at recorded pace or faster.
+
+    Records due at the same moment are handed to the table in one
+    `update`, so the table parses them a column at a time.
+
+    Arguments:
+    ----
+    reader {RecordingReader} -- The recording.
+
+    Keyword Arguments:
+    ----
+    callbacks {List[Callable]} -- Called with each message, like the
+        callbacks of `MarketDataStream`. (default: {None})
+
+    table {QuoteTable} -- Updated with the messages. (default: {None})
+
+    speed {float} -- `1.0` replays at the recorded pace, `10.0` ten times
+        faster, `None` or `0` as fast as possible. (default: {1.0})
+
+    start {int} -- The first time, in nanoseconds. (default: {None})
+
+    end {int} -- The end time, excluded, in nanoseconds. (default: {None})
+
+    conids {List[Union[int, str]]} -- Only these contracts. (default: {None})
+
+    kinds {List[int]} -- Only these kinds of records. (default: {None})
+
+    Returns:
+    ----
+    {Dict} -- The records replayed, the seconds it took and the records per second.
+    """
+
+    callbacks = callbacks or []
+    started = time.perf_counter()
+    origin = None
+    count = 0
+    batch = []
+
+    def deliver():
+        if table is not None and batch:
+            table.update(batch)
+        batch.clear()
+
+    for record in reader.records(start=start, end=end, conids=conids, kinds=kinds):
+        if origin is None:
+            origin = record.timestamp
+
+        if speed:
+            due = (record.timestamp - origin) / 1e9 / speed
+            wait = due - (time.perf_counter() - started)
+            if wait > 0:
+                deliver()
+                time.sleep(wait)
+
+        for callback in callbacks:
+            try:
+                callback(record.message)
+            except Exception:
+                logger.exception('A replay callback failed.')
+
+        batch.append(record.message)
+        if len(batch) >= 1000:
+            deliver()
+
+        count += 1
+
+    deliver()
+
+    elapsed = time.perf_counter() - started
+
+    return {
+        'records': count,
+        'seconds': elapsed,
+        'records_per_second': count / elapsed if elapsed > 0 else float('inf')
+    }
+
+
+def _conid(message: Dict) -> int:
+    conid = message.get('conid')
+
+    if conid is None:
+        topic = message.get('topic', '')
+        if topic.startswith('smd+'):
+            conid = topic.split('+')[1]
+
+    try:
+        return int(conid)
+    except (TypeError, ValueError):
+        return NO_CONID
+
+
+def _scan(buffer, path: pathlib.Path) -> tuple:
+    """Reads the block headers of a recording, returns the blocks and where the last whole one ends."""
+
+    blocks = []
+    offset = len(MAGIC)
+    size = len(buffer)
+
+    while offset + _BLOCK_HEADER.size <= size:
+        magic, length, count, first, last, conid_count = _BLOCK_HEADER.unpack_from(buffer, offset)
+        if magic != BLOCK_MAGIC:
+            logger.warning('The recording `%s` is corrupt after byte %s.', path, offset)
+            break
+
+        conids_offset = offset + _BLOCK_HEADER.size
+        data_offset = conids_offset + 8 * conid_count
+        if data_offset + length > size:
+            # The last block was cut short, e.g. by a crash.
+            break
+
+        conids = frozenset(struct.unpack_from('<{}q'.format(conid_count), buffer, conids_offset))
+        blocks.append((data_offset, length, count, first, last, conids))
+        offset = data_offset + length
+
+    return blocks, offset
@@ -0,0 +1,155 @@
+import atexit
+import logging
+import logging.handlers
+import queue
+import random
+import urllib.parse
+
+logger = logging.getLogger('ibw.requests')
+
+_listener = None
+_queue_handler = None
+_sample_rate = 1.0
+
+
+def log_request(method: str, url: str, status_code: int, elapsed: float, size: int) -> None:
+    """Records a single request made to the gateway.
+
+    Nothing is formatted unless the `ibw.requests` logger is enabled for
+    `DEBUG` and the request is picked by the sampler. The record carries
+    the endpoint, status, latency and size as attributes, the body is never
+    logged.
+
+    Arguments:
+    ----
+    method {str} -- The HTTP method.
+
+    url {str} -- The full URL of the request.
+
+    status_code {int} -- The HTTP status code, `0` if no response arrived.
+
+    elapsed {float} -- The time the request took, in seconds.
+
+    size {int} -- The size of the response body in bytes.
+    """
+
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+
+    if _sample_rate < 1.0 and random.random() >= _sample_rate:
+        return
+
+    endpoint = urllib.parse.urlsplit(url).path
+    latency_ms = elapsed * 1000.0
+
+    logger.debug(
+        '%s %s %s %.1fms %dB',
+        method,
+        endpoint,
+        status_code,
+        latency_ms,
+        size,
+        extra={
+            'method': method,
+            'endpoint': endpoint,
+            'status': status_code,
+            'latency_ms': latency_ms,
+            'size': size
+        }
+    )
+
+
+def set_sample_rate(sample_rate: float) -> None:
+    """Sets the fraction of requests that are logged.
+
+    Arguments:
+    ----
+    sample_rate {float} -- A value between `0.0` and `1.0`.
+    """
+
+    global _sample_rate
+
+    if not 0.0 <= sample_rate <= 1.0:
+        raise ValueError('The sample rate must be between 0.0 and 1.0.')
+
+    _sample_rate = sample_rate
+
+
+def enable_request_logging(filename: str = 'app.log', level: int = logging.DEBUG,
+                           sample_rate: float = 1.0, max_bytes: int = 10485760,
+                           backup_count: int = 5) -> logging.handlers.QueueListener:
+    """Writes the library's logs to a rotating file from a background thread.
+
+    The `ibw` loggers get a `QueueHandler`, so logging a request only puts
+    the record on a queue. A `QueueListener` thread formats the records and
+    writes them to disk. The root logger is left alone.
+
+    Keyword Arguments:
+    ----
+    filename {str} -- The log file. (default: {'app.log'})
+
+    level {int} -- The level of the `ibw` loggers. (default: {logging.DEBUG})
+
+    sample_rate {float} -- The fraction of requests that are logged. (default: {1.0})
+
+    max_bytes {int} -- The size at which the file is rotated. (default: {10485760})
+
+    backup_count {int} -- The number of rotated files to keep. (default: {5})
+
+    Usage:
+    ----
+        >>> from ibw import request_log
+        >>> request_log.enable_request_logging(filename='ibw.log', sample_rate=0.1)
+
+    Returns:
+    ----
+    {logging.handlers.QueueListener} -- The running listener.
+    """
+
+    global _listener
+    global _queue_handler
+
+    disable_request_logging()
+    set_sample_rate(sample_rate=sample_rate)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=filename,
+        maxBytes=max_bytes,
+        backupCount=backup_count
+    )
+    file_handler.setFormatter(
+        logging.Formatter('%(asctime)s - %(levelname)s - %(name)s - %(message)s')
+    )
+
+    log_queue = queue.SimpleQueue()
+    _queue_handler = logging.handlers.QueueHandler(log_queue)
+    _listener = logging.handlers.QueueListener(log_queue, file_handler)
+    _listener.start()
+
+    library_logger = logging.getLogger('ibw')
+    library_logger.addHandler(_queue_handler)
+    library_logger.setLevel(level)
+
+    return _listener
+
+
+def disable_request_logging() -> None:
+    """Stops the background listener and flushes the pending records."""
+
+    global _listener
+    global _queue_handler
+
+    if _listener is None:
+        return
+
+    logging.getLogger('ibw').removeHandler(_queue_handler)
+    _listener.stop()
+
+    for handler in _listener.handlers:
+        handler.close()
+
+    _listener = None
+    _queue_handler = None
+
+
+atexit.register(disable_request_logging)
@@ -0,0 +1,278 @@
+import re
+from typing import Dict
+from typing import List
+from typing import Union
+
+from .history import Bars
+from .history import parse_duration
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+# The epoch is a Thursday, weekly bars start on the Monday before it.
+WEEK_OFFSET = 4 * 86400
+
+FILL_RULES = ('none', 'ffill', 'zero')
+
+
+def bucket_times(time: 'np.ndarray', bar: str, offset: int = None) -> 'np.ndarray':
+    """Returns the start of the coarser bar each time falls in.
+
+    Arguments:
+    ----
+    time {np.ndarray} -- The `int64` times, in milliseconds since the epoch.
+
+    bar {str} -- The coarser bar size, e.g. `1h`, `1d`, `1w` or `1m`. Months
+        are calendar months, other sizes are fixed lengths.
+
+    Keyword Arguments:
+    ----
+    offset {int} -- Shifts the start of the bars, in seconds, e.g. to start
+        daily bars at a session open. (default: {Monday for weeks, else 0})
+
+    Returns:
+    ----
+    {np.ndarray} -- The `int64` start of the bar of each time.
+    """
+
+    if np is None:
+        raise ImportError('Resampling requires `numpy`, install it with `pip install numpy`.')
+
+    time = np.asarray(time, dtype=np.int64)
+    match = re.match(r'^(\d+)\s*m$', bar.strip())
+
+    if match:
+        months = int(match.group(1))
+        shifted = time - (offset or 0) * 1000
+        month = shifted.astype('datetime64[ms]').astype('datetime64[M]').astype(np.int64)
+        month = month // months * months
+        return month.astype('datetime64[M]').astype('datetime64[ms]').astype(np.int64) + (offset or 0) * 1000
+
+    if offset is None:
+        offset = WEEK_OFFSET if bar.strip().endswith('w') else 0
+
+    bar_ms = parse_duration(bar) * 1000
+    offset_ms = offset * 1000
+
+    return (time - offset_ms) // bar_ms * bar_ms + offset_ms
+
+
+def resample(bars: Bars, bar: str, offset: int = None) -> Bars:
+    """Derives coarser bars from finer ones, e.g. `1h` bars from `5min` bars.
+
+    Every output column is computed with one vectorized pass over the
+    input, so no request is sent and no Python loop runs per bar. The open
+    is the first open of a bucket, the high and low ignore missing values,
+    the volume is summed and the VWAP is the average of the typical price
+    `(high + low + close) / 3` of each bar, weighted by volume, or of the
+    input's VWAP when it has one. Buckets without bars are skipped.
+
+    Arguments:
+    ----
+    bars {Bars} -- The finer bars, sorted by time.
+
+    bar {str} -- The coarser bar size, e.g. `1h`, `1d`, `1w` or `1m`.
+
+    Keyword Arguments:
+    ----
+    offset {int} -- Shifts the start of the bars, in seconds. (default: {None})
+
+    Returns:
+    ----
+    {Bars} -- The coarser bars, with a `vwap` column.
+    """
+
+    keys = bucket_times(time=bars.time, bar=bar, offset=offset)
+
+    if len(keys) == 0:
+        empty = np.empty(0, dtype=np.float64)
+        return Bars(conid=bars.conid, bar=bar, time=np.empty(0, dtype=np.int64), open=empty, high=empty,
+                    low=empty, close=empty, volume=empty, vwap=empty)
+
+    starts = np.concatenate([[0], np.flatnonzero(keys[1:] != keys[:-1]) + 1])
+    ends = np.concatenate([starts[1:], [len(keys)]])
+
+    high = np.asarray(bars.high, dtype=np.float64)
+    low = np.asarray(bars.low, dtype=np.float64)
+    close = np.asarray(bars.close, dtype=np.float64)
+    volume = np.nan_to_num(np.asarray(bars.volume, dtype=np.float64))
+
+    if bars.vwap is not None:
+        price = np.asarray(bars.vwap, dtype=np.float64)
+    else:
+        price = (high + low + close) / 3.0
+
+    traded = np.add.reduceat(np.nan_to_num(price * volume), starts)
+    summed = np.add.reduceat(volume, starts)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        vwap = np.where(summed > 0, traded / summed, np.nan)
+
+    return Bars(
+        conid=bars.conid,
+        bar=bar,
+        time=keys[starts],
+        open=np.asarray(bars.open, dtype=np.float64)[starts],
+        high=np.fmax.reduceat(high, starts),
+        low=np.fmin.reduceat(low, starts),
+        close=close[ends - 1],
+        volume=summed,
+        vwap=vwap
+    )
+
+
+class Panel():
+
+    def __init__(self, index: 'np.ndarray', conids: List[str], field: str, values: 'np.ndarray') -> None:
+        """Initalizes a new instance of the Panel Object.
+
+        Holds one field of many contracts on a common time index, one row
+        per time and one column per contract.
+
+        Arguments:
+        ----
+        index {np.ndarray} -- The `datetime64[ms]` times, in UTC.
+
+        conids {List[str]} -- The contract of each column.
+
+        field {str} -- The field, e.g. `close`.
+
+        values {np.ndarray} -- The `float64` values, `NaN` where missing.
+        """
+
+        self.index = index
+        self.conids = conids
+        self.field = field
+        self.values = values
+        self.columns: Dict[str, int] = {conid: column for column, conid in enumerate(conids)}
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __repr__(self) -> str:
+        return '<Panel field={} times={} conids={}>'.format(self.field, len(self.index), len(self.conids))
+
+    def column(self, conid: str) -> 'np.ndarray':
+        """Returns the values of a contract, a view of the panel."""
+
+        return self.values[:, self.columns[str(conid)]]
+
+    def to_frame(self) -> 'pd.DataFrame':
+        """Returns the panel as a pandas DataFrame, one column per contract."""
+
+        if pd is None:
+            raise ImportError('`to_frame` requires `pandas`, install it with `pip install pandas`.')
+
+        return pd.DataFrame(
+            data=self.values,
+            index=pd.DatetimeIndex(pd.to_datetime(self.index.astype(np.int64), unit='ms', utc=True), name='time'),
+            columns=self.conids
+        )
+
+
+def align(series: Union[Dict[str, Bars], List[Bars]], field: str = 'close', how: str = 'outer',
+          fill: str = 'none', limit: int = None, index: 'np.ndarray' = None) -> Panel:
+    """Aligns a field of many contracts on a common time index.
+
+    Arguments:
+    ----
+    series {Union[Dict[str, Bars], List[Bars]]} -- The bars of each contract,
+        e.g. the result of `HistoryDownloader.download` or `BarStore.get`.
+
+    Keyword Arguments:
+    ----
+    field {str} -- The column to align, e.g. `close`, `volume` or `vwap`. (default: {'close'})
+
+    how {str} -- `outer` keeps every time of any contract, `inner` only the
+        times every contract has. (default: {'outer'})
+
+    fill {str} -- How a contract's missing times are filled: `none` leaves
+        `NaN`, `ffill` takes the last bar at or before each time and `zero`
+        puts `0`, e.g. for volumes. (default: {'none'})
+
+    limit {int} -- The most rows carried forward by `ffill`, counted from the
+        bar's own time. (default: {None})
+
+    index {np.ndarray} -- Aligns on these times instead, `datetime64` or
+        `int64` milliseconds. (default: {None})
+
+    Raises:
+    ----
+    ValueError: If `how` or `fill` isn't valid.
+
+    Returns:
+    ----
+    {Panel} -- The aligned values.
+    """
+
+    if np is None:
+        raise ImportError('Aligning requires `numpy`, install it with `pip install numpy`.')
+
+    if how not in ('outer', 'inner'):
+        raise ValueError('`how` must be `outer` or `inner`, not `{}`.'.format(how))
+
+    if fill not in FILL_RULES:
+        raise ValueError('`fill` must be one of {}, not `{}`.'.format(', '.join(FILL_RULES), fill))
+
+    if isinstance(series, dict):
+        series = list(series.values())
+
+    times = [np.asarray(bars.time, dtype=np.int64) for bars in series]
+
+    if index is not None:
+        index = np.asarray(index)
+        if np.issubdtype(index.dtype, np.datetime64):
+            index = index.astype('datetime64[ms]').astype(np.int64)
+        index = np.asarray(index, dtype=np.int64)
+    elif not times:
+        index = np.empty(0, dtype=np.int64)
+    elif how == 'outer':
+        index = np.unique(np.concatenate(times))
+    else:
+        index = times[0]
+        for time in times[1:]:
+            index = np.intersect1d(index, time, assume_unique=True)
+
+    values = np.full((len(index), len(series)), np.nan, dtype=np.float64)
+    rows = np.arange(len(index))
+
+    for column, (bars, time) in enumerate(zip(series, times)):
+        source = getattr(bars, field)
+        if source is None or len(time) == 0:
+            continue
+
+        if fill == 'ffill':
+            # As of lookup, the last bar at or before each row, -1 before the first bar.
+            positions = np.searchsorted(time, index, side='right') - 1
+            usable = positions >= 0
+
+            if limit is not None:
+                # Rows since the bar's own time, the first row after it counts as one.
+                exact = usable & (time[np.maximum(positions, 0)] == index)
+                changed = np.ones(len(index), dtype=bool)
+                changed[1:] = positions[1:] != positions[:-1]
+                start = np.maximum.accumulate(np.where(changed, rows, 0))
+                usable &= rows - start + np.where(exact[start], 0, 1) <= limit
+
+            values[usable, column] = np.asarray(source, dtype=np.float64)[positions[usable]]
+        else:
+            positions = np.minimum(np.searchsorted(time, index), len(time) - 1)
+            found = time[positions] == index
+
+            values[found, column] = np.asarray(source, dtype=np.float64)[positions[found]]
+            if fill == 'zero':
+                values[~found, column] = 0.0
+
+    return Panel(
+        index=index.astype('datetime64[ms]'),
+        conids=[str(bars.conid) for bars in series],
+        field=field,
+        values=values
+    )
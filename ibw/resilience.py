@@ -0,0 +1,258 @@
+import random
+import re
+import threading
+import time
+import urllib.parse
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from .exceptions import IBCircuitOpenError
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryPolicy():
+
+    def __init__(self, max_retries: int = 3, backoff_base: float = 0.25,
+                 backoff_max: float = 8.0, retry_statuses: Tuple[int] = RETRY_STATUSES,
+                 retry_methods: Tuple[str] = ('GET',), respect_retry_after: bool = True) -> None:
+        """Initalizes a new instance of the RetryPolicy Object.
+
+        Describes when a failed request is sent again and how long to wait
+        in between. The wait grows exponentially with "full jitter", a
+        random value between zero and the exponential delay, so clients
+        that failed together don't retry together.
+
+        Keyword Arguments:
+        ----
+        max_retries {int} -- The retries after the first attempt. (default: {3})
+
+        backoff_base {float} -- The delay cap of the first retry in seconds. (default: {0.25})
+
+        backoff_max {float} -- The largest delay in seconds. (default: {8.0})
+
+        retry_statuses {Tuple[int]} -- The statuses worth a retry.
+            (default: {(429, 500, 502, 503, 504)})
+
+        retry_methods {Tuple[str]} -- The methods that are safe to send twice. (default: {('GET',)})
+
+        respect_retry_after {bool} -- Wait at least as long as the gateway's
+            `Retry-After` header asks. (default: {True})
+        """
+
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.retry_statuses = retry_statuses
+        self.retry_methods = retry_methods
+        self.respect_retry_after = respect_retry_after
+
+    def should_retry(self, method: str, attempt: int, status_code: int = None) -> bool:
+        """Decides if a failed attempt is retried.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        attempt {int} -- The zero based attempt that failed.
+
+        Keyword Arguments:
+        ----
+        status_code {int} -- The status of the response, `None` if the
+            connection failed. (default: {None})
+
+        Returns:
+        ----
+        {bool} -- `True` if the request should be sent again.
+        """
+
+        if attempt >= self.max_retries or method not in self.retry_methods:
+            return False
+
+        return status_code is None or status_code in self.retry_statuses
+
+    def backoff(self, attempt: int, retry_after: float = None) -> float:
+        """Returns the seconds to wait before the next attempt.
+
+        Arguments:
+        ----
+        attempt {int} -- The zero based attempt that failed.
+
+        Keyword Arguments:
+        ----
+        retry_after {float} -- The gateway's `Retry-After`, if any. (default: {None})
+
+        Returns:
+        ----
+        {float} -- The delay in seconds.
+        """
+
+        delay = random.uniform(0.0, min(self.backoff_max, self.backoff_base * (2 ** attempt)))
+
+        if self.respect_retry_after and retry_after is not None:
+            delay = max(delay, retry_after)
+
+        return delay
+
+
+NO_RETRY = RetryPolicy(max_retries=0)
+
+
+def default_retry_rules() -> List[Tuple[str, str, RetryPolicy]]:
+    """Returns the per endpoint retry policies.
+
+    Each rule is a tuple of `(method, path regex, policy)`, where the method
+    can be `*`, and the first match wins. The path is relative to
+    `/v1/portal/`. Requests matching no rule use the default policy.
+    """
+
+    # These POST endpoints only read data, so they are safe to repeat.
+    read_only_post = RetryPolicy(retry_methods=('GET', 'POST'))
+
+    return [
+        ('*', r'^iserver/account/[^/]+/orders?$', NO_RETRY),
+        ('*', r'^iserver/account/[^/]+/order/', NO_RETRY),
+        ('*', r'^iserver/reply/', NO_RETRY),
+        ('POST', r'^iserver/secdef/search$', read_only_post),
+        ('POST', r'^trsrv/secdef$', read_only_post),
+        ('POST', r'^iserver/scanner/run$', read_only_post),
+        ('POST', r'^portfolio/allocation$', read_only_post),
+        ('POST', r'^tickle$', read_only_post)
+    ]
+
+
+class RetryRules():
+
+    def __init__(self, default: RetryPolicy = None, rules: List[Tuple[str, str, RetryPolicy]] = None) -> None:
+        """Initalizes a new instance of the RetryRules Object.
+
+        Keyword Arguments:
+        ----
+        default {RetryPolicy} -- The policy of endpoints matching no rule. (default: {RetryPolicy()})
+
+        rules {List[Tuple[str, str, RetryPolicy]]} -- The per endpoint
+            policies. (default: {default_retry_rules()})
+        """
+
+        self.default = default or RetryPolicy()
+        self.rules = [
+            (method, re.compile(pattern), policy)
+            for method, pattern, policy in (rules if rules is not None else default_retry_rules())
+        ]
+
+    def policy_for(self, method: str, url: str) -> RetryPolicy:
+        """Returns the policy of a request.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL, or the endpoint path.
+
+        Returns:
+        ----
+        {RetryPolicy} -- The matching policy.
+        """
+
+        path = urllib.parse.urlsplit(url).path
+        path = path.split('/portal/', 1)[-1].lstrip('/')
+
+        for rule_method, pattern, policy in self.rules:
+            if (rule_method == '*' or rule_method == method) and pattern.search(path):
+                return policy
+
+        return self.default
+
+
+class CircuitBreaker():
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold: int = 5, recovery_timeout: float = 30.0) -> None:
+        """Initalizes a new instance of the CircuitBreaker Object.
+
+        Counts consecutive gateway failures, server errors and connection
+        errors. Once `failure_threshold` is reached the breaker opens and
+        requests fail fast with `IBCircuitOpenError`. After
+        `recovery_timeout` a single trial request is let through, which
+        closes the breaker if it succeeds or opens it again if it doesn't.
+
+        Keyword Arguments:
+        ----
+        failure_threshold {int} -- The consecutive failures that open the breaker. (default: {5})
+
+        recovery_timeout {float} -- The seconds to wait before a trial request. (default: {30.0})
+        """
+
+        self.failure_threshold = failure_threshold
+        self.recovery_timeout = recovery_timeout
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+        self._lock = threading.Lock()
+
+    def before_request(self, url: str = None) -> None:
+        """Raises `IBCircuitOpenError` if the request must not be sent.
+
+        Keyword Arguments:
+        ----
+        url {str} -- The URL of the request, used in the error. (default: {None})
+        """
+
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+
+            if self.state == self.OPEN and time.monotonic() - self.opened_at >= self.recovery_timeout:
+                self.state = self.HALF_OPEN
+                self.trial_in_flight = False
+
+            if self.state == self.HALF_OPEN and not self.trial_in_flight:
+                self.trial_in_flight = True
+                return
+
+            retry_in = max(self.recovery_timeout - (time.monotonic() - self.opened_at), 0.0)
+
+        raise IBCircuitOpenError(
+            'The gateway is unhealthy, requests are paused for {:.1f} more seconds.'.format(retry_in),
+            url=url
+        )
+
+    def record_success(self) -> None:
+        """Records a request the gateway handled."""
+
+        with self._lock:
+            self.failures = 0
+            self.state = self.CLOSED
+            self.trial_in_flight = False
+
+    def record_failure(self) -> None:
+        """Records a server error or a connection error."""
+
+        with self._lock:
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+                self.trial_in_flight = False
+
+    def release_trial(self) -> None:
+        """Lets another trial through after one was abandoned, e.g. cancelled, without an outcome."""
+
+        with self._lock:
+            self.trial_in_flight = False
+
+    def stats(self) -> Dict:
+        """Returns the state of the breaker."""
+
+        with self._lock:
+            return {
+                'state': self.state,
+                'consecutive_failures': self.failures
+            }
@@ -0,0 +1,372 @@
+import atexit
+import base64
+import json
+import os
+import re
+import threading
+import time
+import urllib.parse
+from collections import OrderedDict
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from .single_flight import request_key
+
+DAY = 24 * 60 * 60.0
+HOUR = 60 * 60.0
+
+
+def default_cache_rules() -> List[Tuple[str, str, float]]:
+    """Returns the endpoints worth caching and for how long.
+
+    Each rule is a tuple of `(method, target regex, ttl in seconds)`, where
+    the method can be `*`, and the first match wins. The target is the path
+    relative to `/v1/portal/` followed by the sorted query string, e.g.
+    `fundamentals/landing/265598?widgets=dividends`, so rules can tell the
+    widgets of one endpoint apart. Requests matching no rule aren't cached.
+    """
+
+    return [
+        # Contract reference data.
+        ('GET', r'^iserver/contract/[^/]+/info$', DAY),
+        ('POST', r'^trsrv/secdef$', DAY),
+        ('POST', r'^iserver/secdef/search$', DAY),
+        ('GET', r'^trsrv/futures\?', DAY),
+        ('GET', r'^trsrv/stocks\?', DAY),
+
+        # Scanner parameters are also limited to one request per 15 minutes.
+        ('GET', r'^iserver/scanner/params$', DAY),
+
+        # Account metadata.
+        ('GET', r'^portfolio/[^/]+/meta$', HOUR),
+
+        # Fundamentals, only the slow moving widgets of the landing page.
+        ('GET', r'^iserver/fundamentals/[^/]+/summary$', DAY),
+        ('GET', r'^tws\.proxy/fundamentals/financials/', DAY),
+        ('GET', r'^fundamentals/landing/[^/?]+\?widgets=(key_ratios|dividends|esg)$', DAY),
+        ('GET', r'^fundamentals/mf_profile_and_fees/', DAY)
+    ]
+
+
+def _target(url: str, params) -> str:
+    """Returns the path relative to `/v1/portal/` with the sorted query string."""
+
+    path = urllib.parse.urlsplit(url).path
+    path = path.split('/portal/', 1)[-1].lstrip('/')
+
+    if params:
+        pairs = params.items() if isinstance(params, dict) else params
+        query = urllib.parse.urlencode(sorted((str(key), str(value)) for key, value in pairs))
+        if query:
+            path = path + '?' + query
+
+    return path
+
+
+class ResponseCache():
+
+    def __init__(self, rules: List[Tuple[str, str, float]] = None, max_entries: int = 4096,
+                 max_bytes: int = 64 * 1024 * 1024, path: str = None) -> None:
+        """Initalizes a new instance of the ResponseCache Object.
+
+        Keeps the successful responses of slow changing reference endpoints,
+        contract details, contract definitions, symbol searches, scanner
+        parameters, account metadata and fundamentals, so repeated lookups
+        skip the gateway. Entries expire after the TTL of their rule, and
+        the least recently used entries are evicted once the cache holds
+        `max_entries` responses or `max_bytes` of content.
+
+        Only the response body is kept, it is decoded again on every hit, so
+        callers are free to modify the results.
+
+        Keyword Arguments:
+        ----
+        rules {List[Tuple[str, str, float]]} -- The endpoints to cache and
+            their TTL. (default: {default_cache_rules()})
+
+        max_entries {int} -- The maximum number of responses kept. (default: {4096})
+
+        max_bytes {int} -- The maximum size of the kept bodies. (default: {64 MB})
+
+        path {str} -- A file the cache is loaded from, and saved to on exit,
+            so it survives restarts. (default: {None})
+
+        Usage:
+        ----
+            >>> ib_client = IBClient(
+                username='IB_USERNAME',
+                account='IB_ACCOUNT',
+                transport_config=TransportConfig(response_cache=ResponseCache(path='cache/responses.json'))
+            )
+        """
+
+        self.rules = [
+            (method, re.compile(pattern), ttl)
+            for method, pattern, ttl in (rules if rules is not None else default_cache_rules())
+        ]
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.path = path
+
+        # key -> [expires_at, target, content], least recently used first.
+        self._entries: OrderedDict = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        if self.path is not None:
+            self.load()
+            atexit.register(self.save)
+
+    def ttl_for(self, method: str, url: str, params: dict = None) -> float:
+        """Returns how long a response may be kept.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL, or the endpoint path.
+
+        Keyword Arguments:
+        ----
+        params {dict} -- The query string parameters. (default: {None})
+
+        Returns:
+        ----
+        {float} -- The TTL in seconds, `None` if the request isn't cached.
+        """
+
+        target = _target(url=url, params=params)
+
+        for rule_method, pattern, ttl in self.rules:
+            if (rule_method == '*' or rule_method == method) and pattern.search(target):
+                return ttl
+
+        return None
+
+    def key_for(self, method: str, url: str, params: dict = None, json: dict = None) -> Tuple:
+        """Returns the key of a request, `None` if it isn't cached.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        url {str} -- The full URL of the request.
+
+        Keyword Arguments:
+        ----
+        params {dict} -- The query string parameters. (default: {None})
+
+        json {dict} -- The JSON payload. (default: {None})
+
+        Returns:
+        ----
+        {Tuple} -- A hashable key.
+        """
+
+        if not self.ttl_for(method=method, url=url, params=params):
+            return None
+
+        body = None if json is None else _dumps(json)
+
+        return request_key(method=method, url=url, params=params, extra=(body,))
+
+    def get(self, key: Tuple) -> bytes:
+        """Returns the body kept for a key.
+
+        Arguments:
+        ----
+        key {Tuple} -- The key from `key_for`.
+
+        Returns:
+        ----
+        {bytes} -- The response body, `None` if it isn't cached or expired.
+        """
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is not None and entry[0] <= time.time():
+                self._remove(key)
+                self.expirations += 1
+                entry = None
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+            return entry[2]
+
+    def put(self, key: Tuple, content: bytes) -> None:
+        """Keeps the body of a successful response.
+
+        Arguments:
+        ----
+        key {Tuple} -- The key from `key_for`.
+
+        content {bytes} -- The response body.
+        """
+
+        method, url, params = key[0], key[1], key[2]
+
+        ttl = self.ttl_for(method=method, url=url, params=params)
+        if not ttl or len(content) > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = [time.time() + ttl, _target(url=url, params=params), content]
+            self._bytes += len(content)
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key: Tuple) -> None:
+        """Drops an entry, with the lock held."""
+
+        entry = self._entries.pop(key)
+        self._bytes -= len(entry[2])
+
+    def invalidate(self, pattern: str = None) -> int:
+        """Drops cached responses.
+
+        Keyword Arguments:
+        ----
+        pattern {str} -- A regex searched in the target of each entry, the
+            path relative to `/v1/portal/` and its sorted query string, e.g.
+            `^iserver/contract/265598/`. Drops everything if `None`. (default: {None})
+
+        Returns:
+        ----
+        {int} -- The number of responses dropped.
+        """
+
+        with self._lock:
+            if pattern is None:
+                keys = list(self._entries.keys())
+            else:
+                regex = re.compile(pattern)
+                keys = [key for key, entry in self._entries.items() if regex.search(entry[1])]
+
+            for key in keys:
+                self._remove(key)
+
+        return len(keys)
+
+    def clear(self) -> None:
+        """Drops every cached response."""
+
+        self.invalidate()
+
+    def save(self, path: str = None) -> None:
+        """Writes the unexpired responses to disk.
+
+        Keyword Arguments:
+        ----
+        path {str} -- The file to write. (default: {the cache's path})
+        """
+
+        path = path or self.path
+        if path is None:
+            return
+
+        now = time.time()
+
+        with self._lock:
+            entries = [
+                {
+                    'key': list(key[:2]) + [[list(pair) for pair in key[2]]] + list(key[3:]),
+                    'expires_at': entry[0],
+                    'target': entry[1],
+                    'content': base64.b64encode(entry[2]).decode('ascii')
+                }
+                for key, entry in self._entries.items() if entry[0] > now
+            ]
+
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+
+        # Write to a temporary file first so a crash never leaves half a cache.
+        temporary_path = path + '.tmp'
+        with open(temporary_path, 'w') as cache_file:
+            json.dump({'version': 1, 'entries': entries}, cache_file)
+        os.replace(temporary_path, path)
+
+    def load(self, path: str = None) -> int:
+        """Reads the responses saved by `save`.
+
+        Keyword Arguments:
+        ----
+        path {str} -- The file to read. (default: {the cache's path})
+
+        Returns:
+        ----
+        {int} -- The number of unexpired responses loaded.
+        """
+
+        path = path or self.path
+        if path is None or not os.path.exists(path):
+            return 0
+
+        try:
+            with open(path, 'r') as cache_file:
+                saved = json.load(cache_file)
+        except (OSError, ValueError):
+            return 0
+
+        now = time.time()
+        loaded = 0
+
+        with self._lock:
+            for item in saved.get('entries', []):
+                if item['expires_at'] <= now:
+                    continue
+
+                method, url, params = item['key'][0], item['key'][1], item['key'][2]
+                key = (method, url, tuple(tuple(pair) for pair in params)) + tuple(item['key'][3:])
+                content = base64.b64decode(item['content'])
+
+                if key in self._entries:
+                    self._remove(key)
+
+                self._entries[key] = [item['expires_at'], item['target'], content]
+                self._bytes += len(content)
+                loaded += 1
+
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+        return loaded
+
+    def stats(self) -> Dict:
+        """Returns the hits, misses, evictions and the size of the cache."""
+
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes
+            }
+
+
+def _dumps(payload) -> str:
+    """Serializes a JSON payload the same way whatever the order of its keys."""
+
+    return json.dumps(payload, sort_keys=True, separators=(',', ':'), default=str)
@@ -0,0 +1,195 @@
+import asyncio
+import threading
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import Tuple
+
+
+def request_key(method: str, url: str, params: dict = None, extra: Tuple = ()) -> Tuple:
+    """Builds the key identifying identical requests.
+
+    Arguments:
+    ----
+    method {str} -- The HTTP method.
+
+    url {str} -- The full URL of the request.
+
+    Keyword Arguments:
+    ----
+    params {dict} -- The query string parameters, their order doesn't
+        matter. (default: {None})
+
+    extra {Tuple} -- Anything else that changes the result, e.g. the
+        response format. (default: {()})
+
+    Returns:
+    ----
+    {Tuple} -- A hashable key.
+    """
+
+    params = tuple(sorted((str(key), str(value)) for key, value in (params or {}).items()))
+
+    return (method, url, params) + tuple(extra)
+
+
+class _Call():
+    """A call in flight and the callers waiting for it."""
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight():
+
+    def __init__(self) -> None:
+        """Initalizes a new instance of the SingleFlight Object.
+
+        Collapses identical calls running at the same time into one. The
+        first caller of a key runs the function, callers arriving while it
+        runs wait for it and receive the same result, or the same error.
+        Nothing is kept once the call returns, so this is not a cache.
+
+        Usage:
+        ----
+            >>> group = SingleFlight()
+            >>> group.do(key=('GET', url), function=lambda: fetch(url))
+        """
+
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        """Runs `function` unless an identical call is in flight.
+
+        Arguments:
+        ----
+        key {Hashable} -- Identifies identical calls.
+
+        function {Callable} -- The call to run.
+
+        Returns:
+        ----
+        {Any} -- The result of the function, shared by every caller of the
+            key, so treat it as read-only.
+        """
+
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self.coalesced += 1
+                leader = False
+            else:
+                call = _Call()
+                self._calls[key] = call
+                self.calls += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+
+        return call.result
+
+    def stats(self) -> Dict:
+        """Returns the calls made, the calls saved and the calls in flight."""
+
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'in_flight': len(self._calls)
+            }
+
+
+class AsyncSingleFlight():
+
+    def __init__(self) -> None:
+        """Initalizes a new instance of the AsyncSingleFlight Object.
+
+        The asyncio counterpart of `SingleFlight`. The shared call runs in
+        its own task, so cancelling one caller doesn't cancel the others;
+        the task is only cancelled when every caller has given up.
+        """
+
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+
+        self.calls = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, function: Callable[[], Awaitable]) -> Any:
+        """Awaits `function()` unless an identical call is in flight.
+
+        Arguments:
+        ----
+        key {Hashable} -- Identifies identical calls.
+
+        function {Callable} -- Returns the awaitable to run.
+
+        Returns:
+        ----
+        {Any} -- The result of the awaitable, shared by every caller of the
+            key, so treat it as read-only.
+        """
+
+        task = self._tasks.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(function())
+            self._tasks[key] = task
+            self._waiters[key] = 0
+            self.calls += 1
+            task.add_done_callback(lambda _: self._forget(key=key, task=task))
+        else:
+            self.coalesced += 1
+
+        self._waiters[key] += 1
+
+        try:
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if not task.done() and self._tasks.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0:
+                    task.cancel()
+            raise
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        """Drops a finished call so the next caller starts a new one."""
+
+        if self._tasks.get(key) is task:
+            del self._tasks[key]
+            del self._waiters[key]
+
+        # Retrieve the exception so asyncio doesn't log it as unhandled.
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> Dict:
+        """Returns the calls made, the calls saved and the calls in flight."""
+
+        return {
+            'calls': self.calls,
+            'coalesced': self.coalesced,
+            'in_flight': len(self._tasks)
+        }
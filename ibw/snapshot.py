@@ -0,0 +1,389 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from .field_decoders import field_ids
+
+logger = logging.getLogger(__name__)
+
+# The gateway answers at most this many contracts per snapshot request.
+DEFAULT_BATCH_SIZE = 100
+
+# Keys of a snapshot that describe the quote rather than hold a field.
+METADATA_KEYS = ('conid', 'conidEx', '_updated', 'server_id', '6119', '6509')
+
+
+def chunk(values: List[str], size: int) -> List[List[str]]:
+    """Splits a list into lists of at most `size` values."""
+
+    return [values[start:start + size] for start in range(0, len(values), size)]
+
+
+class SnapshotPoller():
+
+    def __init__(self, client, conids: List[str], fields: List[str], batch_size: int = DEFAULT_BATCH_SIZE,
+                 max_workers: int = 4, on_update: Callable[[str, Dict], None] = None) -> None:
+        """Initalizes a new instance of the SnapshotPoller Object.
+
+        Keeps the quotes of many contracts up to date by polling the
+        `iserver/marketdata/snapshot` endpoint through `client.market_data`.
+
+        The contracts are split in batches the gateway accepts and the
+        batches are requested concurrently. The first request of a contract
+        only starts its subscription, the gateway answers it without fields,
+        so contracts are primed first. After that each contract keeps the
+        `_updated` time of its last update as a cursor, and batches are
+        requested with `since` so the gateway only returns what changed.
+
+        Responses only hold the fields that changed, they are merged into
+        one quote per contract. A merge replaces the quote with a new
+        dictionary instead of changing it, so the quotes returned by `get`
+        and `quotes` are consistent and never change while they're read,
+        and reading them never waits on the network.
+
+        Arguments:
+        ----
+        client {IBClient} -- The client, or an `IBMarket`, used to request snapshots.
+
+        conids {List[str]} -- The contracts to poll.
+
+        fields {List[str]} -- The market data fields, e.g. `['31', '84', '86']`.
+
+        Keyword Arguments:
+        ----
+        batch_size {int} -- The contracts per request. (default: {100})
+
+        max_workers {int} -- The requests in flight at once. (default: {4})
+
+        on_update {Callable} -- Called with `(conid, quote)` after a quote changed. (default: {None})
+
+        Usage:
+        ----
+            >>> poller = SnapshotPoller(client=ib_client, conids=conids, fields=['31', '84', '86'])
+            >>> poller.prime()
+            >>> poller.start(interval=1.0)
+            >>> poller.get('265598')['31']
+        """
+
+        self.client = client
+        self.fields = field_ids(fields=fields)
+        self.batch_size = batch_size
+        self.max_workers = max_workers
+        self.on_update = on_update
+
+        self._lock = threading.Lock()
+        self._conids: List[str] = []
+        self._quotes: Dict[str, Dict] = {}
+        self._cursors: Dict[str, int] = {}
+        self._primed = set()
+
+        self._executor = None
+        self._thread = None
+        self._stopped = threading.Event()
+
+        self.polls = 0
+        self.requests = 0
+        self.updates = 0
+        self.errors = 0
+
+        self.add(conids=conids)
+
+    def add(self, conids: List[str]) -> None:
+        """Starts polling more contracts, they are primed on their next poll."""
+
+        with self._lock:
+            polled = set(self._conids)
+            for conid in conids:
+                conid = str(conid)
+                if conid not in polled:
+                    self._conids.append(conid)
+                    polled.add(conid)
+
+    def remove(self, conids: List[str]) -> None:
+        """Stops polling contracts and forgets their quotes."""
+
+        removed = {str(conid) for conid in conids}
+
+        with self._lock:
+            self._conids = [conid for conid in self._conids if conid not in removed]
+            for conid in removed:
+                self._quotes.pop(conid, None)
+                self._cursors.pop(conid, None)
+                self._primed.discard(conid)
+
+    @property
+    def conids(self) -> List[str]:
+        """The contracts polled."""
+
+        with self._lock:
+            return list(self._conids)
+
+    def get(self, conid: str) -> Dict:
+        """Returns the quote of a contract, `None` until it was received.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        Returns:
+        ----
+        {Dict} -- The merged fields, read-only.
+        """
+
+        return self._quotes.get(str(conid))
+
+    def quotes(self) -> Dict[str, Dict]:
+        """Returns every quote received, by contract ID."""
+
+        with self._lock:
+            return dict(self._quotes)
+
+    def is_primed(self, conid: str) -> bool:
+        """Returns `True` once the gateway sent fields for a contract."""
+
+        return str(conid) in self._primed
+
+    def prime(self, attempts: int = 5, delay: float = 0.5) -> List[str]:
+        """Starts the subscription of every contract that wasn't primed yet.
+
+        Requests the unprimed contracts until the gateway sends their fields,
+        at most `attempts` times and `delay` seconds apart.
+
+        Keyword Arguments:
+        ----
+        attempts {int} -- The rounds of requests. (default: {5})
+
+        delay {float} -- The seconds between two rounds. (default: {0.5})
+
+        Returns:
+        ----
+        {List[str]} -- The contracts still without fields.
+        """
+
+        for attempt in range(attempts):
+            unprimed = self._unprimed()
+            if not unprimed:
+                break
+
+            if attempt > 0:
+                time.sleep(delay)
+
+            self._request_all(batches=[(batch, None) for batch in chunk(unprimed, self.batch_size)])
+
+        return self._unprimed()
+
+    def poll(self) -> int:
+        """Requests every contract once and merges the responses.
+
+        Returns:
+        ----
+        {int} -- The number of quotes that changed.
+        """
+
+        self.polls += 1
+
+        return self._request_all(batches=self._batches())
+
+    async def poll_async(self) -> int:
+        """The asyncio counterpart of `poll`, for an `AsyncIBClient`.
+
+        Returns:
+        ----
+        {int} -- The number of quotes that changed.
+        """
+
+        self.polls += 1
+        semaphore = asyncio.Semaphore(self.max_workers)
+
+        async def request(conids: List[str], since: int) -> int:
+            async with semaphore:
+                try:
+                    response = await self.client.market_data(conids=conids, since=since, fields=self.fields)
+                except Exception:
+                    self._count(errors=1)
+                    logger.exception('A snapshot request failed.')
+                    return 0
+
+            self._count(requests=1)
+            return self.merge(response=response, requested=conids)
+
+        results = await asyncio.gather(*[request(conids, since) for conids, since in self._batches()])
+
+        return sum(results)
+
+    def start(self, interval: float = 1.0) -> None:
+        """Polls every `interval` seconds on a background thread."""
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), name='ibw-snapshot-poller', daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stops the background polling."""
+
+        self._stopped.set()
+
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    def merge(self, response: List[Dict], requested: List[str] = None) -> int:
+        """Merges a snapshot response into the quotes.
+
+        Arguments:
+        ----
+        response {List[Dict]} -- The response of `market_data`.
+
+        Keyword Arguments:
+        ----
+        requested {List[str]} -- The contracts of the request. (default: {None})
+
+        Returns:
+        ----
+        {int} -- The number of quotes that changed.
+        """
+
+        if not isinstance(response, list):
+            return 0
+
+        if requested is not None:
+            requested = set(requested)
+
+        changed = []
+
+        with self._lock:
+            for item in response:
+                if not isinstance(item, dict) or 'conid' not in item:
+                    continue
+
+                conid = str(item['conid'])
+                if requested is not None and conid not in requested:
+                    continue
+
+                # The gateway only sends the fields that changed since the cursor.
+                delta = {key: value for key, value in item.items() if key not in METADATA_KEYS}
+                updated = item.get('_updated')
+
+                if delta:
+                    self._primed.add(conid)
+
+                if updated is not None:
+                    self._cursors[conid] = max(self._cursors.get(conid, 0), int(updated))
+
+                quote = self._quotes.get(conid)
+                if quote is not None and not any(quote.get(key) != value for key, value in delta.items()):
+                    continue
+
+                if quote is None and not delta:
+                    continue
+
+                merged = dict(quote) if quote is not None else {'conid': conid}
+                merged.update(delta)
+                if updated is not None:
+                    merged['_updated'] = self._cursors[conid]
+
+                self._quotes[conid] = merged
+                changed.append((conid, merged))
+
+            self.updates += len(changed)
+
+        if self.on_update is not None:
+            for conid, quote in changed:
+                try:
+                    self.on_update(conid, quote)
+                except Exception:
+                    logger.exception('A snapshot callback failed.')
+
+        return len(changed)
+
+    def stats(self) -> Dict:
+        """Returns the polls, requests, updates and errors, and the contracts polled and primed."""
+
+        with self._lock:
+            return {
+                'conids': len(self._conids),
+                'primed': len(self._primed),
+                'quotes': len(self._quotes),
+                'polls': self.polls,
+                'requests': self.requests,
+                'updates': self.updates,
+                'errors': self.errors
+            }
+
+    def _unprimed(self) -> List[str]:
+        with self._lock:
+            return [conid for conid in self._conids if conid not in self._primed]
+
+    def _batches(self) -> List[Tuple[List[str], int]]:
+        """Groups the contracts into requests.
+
+        Contracts not primed yet are requested without a cursor, as the
+        gateway may not send their fields otherwise. The others
+        are sorted by cursor so each batch holds similar cursors, and a batch
+        is requested since its oldest one, so no update is missed.
+        """
+
+        with self._lock:
+            unprimed = [conid for conid in self._conids if conid not in self._primed]
+            cursors = sorted(
+                (self._cursors.get(conid, 0), conid) for conid in self._conids if conid in self._primed
+            )
+
+        batches = [(batch, None) for batch in chunk(unprimed, self.batch_size)]
+
+        for batch in chunk(cursors, self.batch_size):
+            batches.append(([conid for _, conid in batch], batch[0][0]))
+
+        return batches
+
+    def _request(self, conids: List[str], since: int) -> int:
+        try:
+            response = self.client.market_data(conids=conids, since=since, fields=self.fields)
+        except Exception:
+            self._count(errors=1)
+            logger.exception('A snapshot request failed.')
+            return 0
+
+        self._count(requests=1)
+
+        return self.merge(response=response, requested=conids)
+
+    def _count(self, requests: int = 0, errors: int = 0) -> None:
+        with self._lock:
+            self.requests += requests
+            self.errors += errors
+
+    def _request_all(self, batches: List[Tuple[List[str], int]]) -> int:
+        """Sends the batches concurrently and returns the quotes that changed."""
+
+        if not batches:
+            return 0
+
+        if len(batches) == 1 or self.max_workers <= 1:
+            return sum(self._request(conids, since) for conids, since in batches)
+
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='ibw-snapshot')
+
+        futures = [self._executor.submit(self._request, conids, since) for conids, since in batches]
+
+        return sum(future.result() for future in futures)
+
+    def _loop(self, interval: float) -> None:
+        while not self._stopped.is_set():
+            started = time.monotonic()
+            self.poll()
+            self._stopped.wait(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,511 @@
+import asyncio
+import inspect
+import json
+import logging
+import random
+import time
+import weakref
+from typing import Any
+from typing import AsyncIterator
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Set
+
+from . import field_decoders
+from . import json_codec
+from .client_utils import DEFAULT_GATEWAY_PORT
+from .client_utils import GatewayAddress
+from .transport import TransportConfig
+from .transport import _create_ssl_context
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+logger = logging.getLogger(__name__)
+
+# The gateway closes idle sockets, it expects a message at least every minute.
+DEFAULT_HEARTBEAT_INTERVAL = 55.0
+
+DEFAULT_FIELDS = ['31', '84', '86']
+
+
+def subscribe_message(conid: str, fields: List[str]) -> str:
+    """Builds the `smd` message subscribing to the market data of a contract.
+
+    Arguments:
+    ----
+    conid {str} -- The contract ID.
+
+    fields {List[str]} -- The market data fields, e.g. `['31', '84', '86']`.
+
+    Returns:
+    ----
+    {str} -- The message, e.g. `smd+265598+{"fields":["31","84","86"]}`.
+    """
+
+    return 'smd+{conid}+{arguments}'.format(
+        conid=conid,
+        arguments=json.dumps({'fields': field_decoders.field_ids(fields=fields)}, separators=(',', ':'))
+    )
+
+
+def unsubscribe_message(conid: str) -> str:
+    """Builds the `umd` message cancelling the market data of a contract."""
+
+    return 'umd+{conid}+{{}}'.format(conid=conid)
+
+
+# The messages starting and stopping the `sor` live order updates.
+ORDERS_SUBSCRIBE_MESSAGE = 'sor+{}'
+ORDERS_UNSUBSCRIBE_MESSAGE = 'uor+{}'
+
+
+class MarketDataStream():
+
+    def __init__(self, host: str = None, port: int = DEFAULT_GATEWAY_PORT, url: str = None,
+                 session: str = None, transport_config: TransportConfig = None,
+                 heartbeat_interval: float = DEFAULT_HEARTBEAT_INTERVAL,
+                 reconnect_delay: float = 1.0, max_reconnect_delay: float = 30.0,
+                 max_queue_size: int = 10000, decode: bool = False) -> None:
+        """Initalizes a new instance of the MarketDataStream Object.
+
+        Streams market data from the gateway's `/v1/api/ws` WebSocket, so
+        quotes are pushed as they change instead of being polled from the
+        snapshot endpoint. Subscriptions are `smd+conid` topics with a list
+        of fields; they are remembered and sent again whenever the socket
+        reconnects. A `tic` message keeps the socket alive.
+
+        Every tick is decoded and handed to the callbacks added with
+        `add_callback`, and to every `async for` loop over the stream. A
+        tick is the gateway's message, a dictionary with the `conid`, the
+        `_updated` timestamp and the fields that changed, plus `_received`,
+        the time it arrived.
+
+        Keyword Arguments:
+        ----
+        host {str} -- The gateway host, looked up from this machine's host name if `None`. (default: {None})
+
+        port {int} -- The gateway port. (default: {5000})
+
+        url {str} -- The full WebSocket URL, overrides the host and port. (default: {None})
+
+        session {str} -- The session ID returned by `tickle()`, sent when the
+            socket opens. Use `from_client` to fetch it. (default: {None})
+
+        transport_config {TransportConfig} -- Used for the TLS settings. (default: {None})
+
+        heartbeat_interval {float} -- Seconds between two `tic` messages. (default: {55.0})
+
+        reconnect_delay {float} -- The first wait before reconnecting, doubled
+            after each failed attempt. (default: {1.0})
+
+        max_reconnect_delay {float} -- The longest wait before reconnecting. (default: {30.0})
+
+        max_queue_size {int} -- The ticks kept for each `async for` loop that
+            falls behind, the oldest are dropped first. (default: {10000})
+
+        decode {bool} -- Convert the field values of every tick to numbers,
+            see `field_decoders.decode_message`. (default: {False})
+
+        Usage:
+        ----
+            >>> async with MarketDataStream.from_client(ib_client) as stream:
+                    await stream.subscribe(conids=['265598', '8314'], fields=['31', '84', '86'])
+                    async for tick in stream:
+                        print(tick['conid'], tick.get('31'))
+        """
+
+        if aiohttp is None:
+            raise ImportError(
+                'Streaming requires `aiohttp`, install it with `pip install aiohttp`.'
+            )
+
+        if url is None:
+            gateway = GatewayAddress(host=host, port=port, scheme='wss')
+            url = gateway.path + '/v1/api/ws'
+
+        self.url = url
+        self.session = session
+        self.transport_config = transport_config or TransportConfig()
+        self.heartbeat_interval = heartbeat_interval
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.max_queue_size = max_queue_size
+        self.decode = decode
+
+        # conid -> fields, sent again after every reconnect.
+        self.subscriptions: Dict[str, List[str]] = {}
+        self.order_updates = False
+
+        self.authenticated = None
+        self.connected = False
+
+        self._callbacks: List[Callable[[Dict], Any]] = []
+        self._message_callbacks: List[Callable[[Dict], Any]] = []
+        # Held weakly, so a loop left by `break` or a cancellation stops receiving ticks
+        # as soon as its iterator is gone.
+        self._queues: Set[asyncio.Queue] = weakref.WeakSet()
+
+        self._client_session = None
+        self._socket = None
+        self._task = None
+        self._connected_event = None
+        self._closing = False
+
+        self.messages = 0
+        self.ticks = 0
+        self.dropped = 0
+        self.reconnects = 0
+        self.heartbeats = 0
+
+    @classmethod
+    def from_client(cls, client, **kwargs) -> 'MarketDataStream':
+        """Creates a stream for the gateway of a client, with its session ID.
+
+        Arguments:
+        ----
+        client {IBClient} -- A client with an authenticated session.
+
+        Keyword Arguments:
+        ----
+        **kwargs -- The other arguments of `MarketDataStream`.
+
+        Returns:
+        ----
+        {MarketDataStream} -- The stream, not yet started.
+        """
+
+        if 'session' not in kwargs:
+            tickle = client.tickle()
+            kwargs['session'] = tickle.get('session') if isinstance(tickle, dict) else None
+
+        gateway = client.gateway
+        scheme = 'ws' if gateway.path.startswith('http:') else 'wss'
+        url = scheme + gateway.path[gateway.path.index(':'):] + '/v1/api/ws'
+
+        return cls(url=url, transport_config=client.transport.config, **kwargs)
+
+    def add_callback(self, callback: Callable[[Dict], Any]) -> None:
+        """Calls `callback(tick)` for every tick, it can be a coroutine function."""
+
+        self._callbacks.append(callback)
+
+    def remove_callback(self, callback: Callable[[Dict], Any]) -> None:
+        """Stops calling a callback added with `add_callback`."""
+
+        self._callbacks.remove(callback)
+
+    def add_message_callback(self, callback: Callable[[Dict], Any]) -> None:
+        """Calls `callback(message)` for every other message, e.g. `system` or `sts`."""
+
+        self._message_callbacks.append(callback)
+
+    async def subscribe(self, conids: List[str], fields: List[str] = None, validate: bool = True) -> None:
+        """Subscribes to the market data of contracts.
+
+        Subscribing again to a contract replaces its fields.
+
+        Arguments:
+        ----
+        conids {List[str]} -- The contract IDs.
+
+        Keyword Arguments:
+        ----
+        fields {List[str]} -- The market data fields. (default: {['31', '84', '86']})
+
+        validate {bool} -- Check the fields against `ibw.fields` first, see
+            `field_decoders.validate_fields`. (default: {True})
+        """
+
+        fields = fields or DEFAULT_FIELDS
+        fields = field_decoders.validate_fields(fields=fields) if validate else field_decoders.field_ids(fields=fields)
+
+        for conid in conids:
+            self.subscriptions[str(conid)] = fields
+            await self._send(subscribe_message(conid=conid, fields=fields))
+
+    async def unsubscribe(self, conids: List[str]) -> None:
+        """Cancels the market data of contracts.
+
+        Arguments:
+        ----
+        conids {List[str]} -- The contract IDs.
+        """
+
+        for conid in conids:
+            if self.subscriptions.pop(str(conid), None) is not None:
+                await self._send(unsubscribe_message(conid=conid))
+
+    async def subscribe_orders(self) -> None:
+        """Subscribes to the `sor` live order updates, handed to the message callbacks."""
+
+        self.order_updates = True
+        await self._send(ORDERS_SUBSCRIBE_MESSAGE)
+
+    async def unsubscribe_orders(self) -> None:
+        """Cancels the live order updates."""
+
+        if self.order_updates:
+            self.order_updates = False
+            await self._send(ORDERS_UNSUBSCRIBE_MESSAGE)
+
+    async def start(self) -> 'MarketDataStream':
+        """Connects in the background, reconnecting until `close` is called.
+
+        Returns:
+        ----
+        {MarketDataStream} -- The stream.
+        """
+
+        if self._task is None or self._task.done():
+            self._closing = False
+            self._connected_event = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+        return self
+
+    async def wait_connected(self, timeout: float = None) -> None:
+        """Waits until the socket is open and the subscriptions were sent."""
+
+        await asyncio.wait_for(self._connected_event.wait(), timeout=timeout)
+
+    async def close(self) -> None:
+        """Closes the socket and stops reconnecting."""
+
+        self._closing = True
+
+        if self._socket is not None:
+            await self._socket.close()
+
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+        if self._client_session is not None:
+            await self._client_session.close()
+            self._client_session = None
+
+        # Ends every `async for` loop.
+        for queue in list(self._queues):
+            self._offer(queue, None)
+
+    async def __aenter__(self) -> 'MarketDataStream':
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_value, traceback) -> None:
+        await self.close()
+
+    def __aiter__(self) -> AsyncIterator[Dict]:
+        return self.ticks_iterator()
+
+    def ticks_iterator(self) -> AsyncIterator[Dict]:
+        """Returns an iterator of the ticks received from now on, until the stream is closed.
+
+        The iterator stops receiving ticks once it's closed with `aclose`,
+        or once nothing refers to it anymore, e.g. after a `break`.
+        """
+
+        queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._queues.add(queue)
+
+        return _TickIterator(stream=self, queue=queue)
+
+    def stats(self) -> Dict:
+        """Returns the messages and ticks received, dropped ticks, reconnects and subscriptions."""
+
+        return {
+            'connected': self.connected,
+            'messages': self.messages,
+            'ticks': self.ticks,
+            'dropped': self.dropped,
+            'reconnects': self.reconnects,
+            'heartbeats': self.heartbeats,
+            'subscriptions': len(self.subscriptions)
+        }
+
+    async def _send(self, message: str) -> None:
+        """Sends a message if the socket is open, subscriptions are sent on connect otherwise."""
+
+        if self._socket is None or self._socket.closed:
+            return
+
+        try:
+            await self._socket.send_str(message)
+        except (aiohttp.ClientError, ConnectionError, RuntimeError) as error:
+            logger.debug('Could not send %s: %s', message, error)
+
+    async def _run(self) -> None:
+        """Keeps the socket open, reconnecting with a jittered backoff."""
+
+        if self._client_session is None or self._client_session.closed:
+            self._client_session = aiohttp.ClientSession()
+
+        ssl_context = _create_ssl_context(config=self.transport_config)
+        delay = self.reconnect_delay
+        connections = 0
+
+        while not self._closing:
+            try:
+                self._socket = await self._client_session.ws_connect(
+                    self.url,
+                    ssl=ssl_context,
+                    autoping=True,
+                    max_msg_size=0
+                )
+            except (aiohttp.ClientError, OSError, asyncio.TimeoutError) as error:
+                logger.debug('Could not connect to %s: %s', self.url, error)
+                await asyncio.sleep(random.uniform(0.0, delay))
+                delay = min(delay * 2.0, self.max_reconnect_delay)
+                continue
+
+            connections += 1
+            if connections > 1:
+                self.reconnects += 1
+
+            delay = self.reconnect_delay
+            heartbeat = asyncio.ensure_future(self._heartbeat())
+
+            try:
+                await self._on_connect()
+                await self._read()
+            finally:
+                heartbeat.cancel()
+                self.connected = False
+                self._connected_event.clear()
+                if not self._socket.closed:
+                    await self._socket.close()
+
+            if not self._closing:
+                logger.debug('The socket to %s closed, reconnecting.', self.url)
+                await asyncio.sleep(random.uniform(0.0, delay))
+
+    async def _on_connect(self) -> None:
+        """Sends the session and every subscription."""
+
+        if self.session is not None:
+            await self._send(json.dumps({'session': self.session}))
+
+        for conid, fields in list(self.subscriptions.items()):
+            await self._send(subscribe_message(conid=conid, fields=fields))
+
+        if self.order_updates:
+            await self._send(ORDERS_SUBSCRIBE_MESSAGE)
+
+        self.connected = True
+        self._connected_event.set()
+
+    async def _heartbeat(self) -> None:
+        """Sends a `tic` every `heartbeat_interval` seconds."""
+
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            await self._send('tic')
+            self.heartbeats += 1
+
+    async def _read(self) -> None:
+        """Reads messages until the socket closes."""
+
+        async for message in self._socket:
+            if message.type in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                await self._dispatch(message.data)
+            elif message.type == aiohttp.WSMsgType.ERROR:
+                logger.debug('WebSocket error: %s', self._socket.exception())
+                return
+
+    async def _dispatch(self, data: Any) -> None:
+        """Decodes a message and hands it to the callbacks and iterators."""
+
+        try:
+            message = json_codec.loads(data.encode('utf-8') if isinstance(data, str) else data)
+        except ValueError:
+            logger.debug('Ignoring a message that is not JSON: %r', data[:100])
+            return
+
+        if not isinstance(message, dict):
+            return
+
+        self.messages += 1
+        topic = message.get('topic', '')
+
+        if topic.startswith('smd+'):
+            self.ticks += 1
+
+            if self.decode:
+                message = field_decoders.decode_message(message=message)
+
+            message.setdefault('_received', time.time())
+
+            for queue in list(self._queues):
+                self._offer(queue, message)
+
+            for callback in list(self._callbacks):
+                await self._call(callback, message)
+
+            return
+
+        if topic == 'sts':
+            self.authenticated = message.get('args', {}).get('authenticated')
+
+        for callback in list(self._message_callbacks):
+            await self._call(callback, message)
+
+    async def _call(self, callback: Callable[[Dict], Any], message: Dict) -> None:
+        """Calls a callback, logging its errors so one bad callback doesn't stop the stream."""
+
+        try:
+            result = callback(message)
+            if inspect.isawaitable(result):
+                await result
+        except Exception:
+            logger.exception('A market data callback failed.')
+
+    def _offer(self, queue: asyncio.Queue, tick: Dict) -> None:
+        """Queues a tick, dropping the oldest one if the reader fell behind."""
+
+        if queue.full():
+            queue.get_nowait()
+            self.dropped += 1
+
+        queue.put_nowait(tick)
+
+
+class _TickIterator():
+    """An `async for` loop over a stream, its queue is registered as soon as it's created."""
+
+    def __init__(self, stream: MarketDataStream, queue: asyncio.Queue) -> None:
+        self.stream = stream
+        self.queue = queue
+
+    def __aiter__(self) -> '_TickIterator':
+        return self
+
+    async def __anext__(self) -> Dict:
+        try:
+            tick = await self.queue.get()
+        except asyncio.CancelledError:
+            # A cancelled task keeps its frames, and so this iterator, alive.
+            self.close()
+            raise
+
+        if tick is None:
+            self.close()
+            raise StopAsyncIteration
+
+        return tick
+
+    def close(self) -> None:
+        """Stops queueing ticks for this loop."""
+
+        self.stream._queues.discard(self.queue)
+
+    async def aclose(self) -> None:
+        """Stops queueing ticks for this loop, e.g. from `contextlib.aclosing`."""
+
+        self.close()
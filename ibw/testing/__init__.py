@@ -0,0 +1,6 @@
+"""Tools for testing and benchmarking code that uses the library without a
+live, logged in Client Portal Gateway."""
+
+from .gateway import EndpointBehavior
+from .gateway import LocalGateway
+from .streaming import LocalStreamingGateway
@@ -0,0 +1,417 @@
+"""Measures the overhead of the library against a `LocalGateway`.
+
+Every endpoint family of `IBClient` is called through the local stand-in at a
+given concurrency, and the latency percentiles, throughput, client CPU time
+and allocations per request are reported, so transport, parsing and caching
+changes can be compared on the same machine.
+
+Usage:
+----
+    $ python -m ibw.testing.benchmark --families market_data orders --requests 500 --concurrency 16
+"""
+
+import argparse
+import itertools
+import json
+import math
+import threading
+import time
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from ibw.client import IBClient
+from ibw.response_cache import ResponseCache
+from ibw.testing.gateway import LocalGateway
+from ibw.testing.gateway import load_sample
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+CONIDS = ['265598', '8314', '272093', '4815747', '76792991']
+
+SNAPSHOT_FIELDS = ['31', '55', '84', '85', '86', '88', '7295', '7296']
+
+MUTUAL_FUND_CONID = '12068'
+
+
+def _order(account_id: str) -> Dict:
+    order = dict(load_sample('orders/limit_orders.jsonc')[0])
+    order['acctId'] = account_id
+    return order
+
+
+# Each family is a list of calls, made in turn by the benchmark.
+FAMILIES: Dict[str, List[Callable[[IBClient], object]]] = {
+    'session': [
+        lambda client: client.tickle(),
+        lambda client: client.validate(),
+        lambda client: client.is_authenticated(check=True)
+    ],
+    'accounts': [
+        lambda client: client.server_accounts(),
+        lambda client: client.server_account_pnl(),
+        lambda client: client.portfolio_accounts(),
+        lambda client: client.portfolio_account_info(account_id=client.account),
+        lambda client: client.portfolio_account_summary(account_id=client.account),
+        lambda client: client.portfolio_account_ledger(account_id=client.account)
+    ],
+    'portfolio': [
+        lambda client: client.portfolio_account_allocation(account_id=client.account),
+        lambda client: client.portfolio_account_positions(account_id=client.account, page_id=0),
+        lambda client: client.portfolio_account_position(account_id=client.account, conid=CONIDS[0]),
+        lambda client: client.portfolio_positions(conid=CONIDS[0])
+    ],
+    'market_data': [
+        lambda client: client.market_data(conids=CONIDS, since=None, fields=SNAPSHOT_FIELDS),
+        lambda client: client.market_data_history(conid=CONIDS[0], period='1d', bar='5min')
+    ],
+    'contracts': [
+        lambda client: client.symbol_search(symbol='AAPL'),
+        lambda client: client.contract_details(conid=CONIDS[0]),
+        lambda client: client.contracts_definitions(conids=CONIDS),
+        lambda client: client.futures_search(symbols=['ES']),
+        lambda client: client.symbols_search_list(symbols=['AAPL', 'MSFT'])
+    ],
+    'scanner': [
+        lambda client: client.get_scanners(),
+        lambda client: client.run_scanner(instrument='STK', scanner_type='TOP_PERC_GAIN', location='STK.US.MAJOR')
+    ],
+    'fundamentals': [
+        lambda client: client._fundamentals_summary(conid=CONIDS[0]),
+        lambda client: client._fundamentals_financials(conid=CONIDS[0], financial_statement='income'),
+        lambda client: client._fundamentals_key_ratios(conid=CONIDS[0]),
+        lambda client: client._fundamentals_dividends(conid=CONIDS[0]),
+        lambda client: client._fundamentals_esg(conid=CONIDS[0])
+    ],
+    'data': [
+        lambda client: client._data_news(conid=CONIDS[0]),
+        lambda client: client._data_ratings(conid=CONIDS[0]),
+        lambda client: client._data_events(conid=CONIDS[0]),
+        lambda client: client._data_ownership(conid=CONIDS[0]),
+        lambda client: client._data_competitors(conid=CONIDS[0]),
+        lambda client: client._data_analyst_forecast(conid=CONIDS[0])
+    ],
+    'mutual_funds': [
+        lambda client: client.mutual_funds_portfolios_and_fees(conid=MUTUAL_FUND_CONID),
+        lambda client: client.mutual_funds_performance(
+            conid=MUTUAL_FUND_CONID, risk_period='1Y', yield_period='1Y', statistic_period='1Y'
+        )
+    ],
+    'notifications': [
+        lambda client: client.get_unread_messages(),
+        lambda client: client.get_subscriptions(),
+        lambda client: client.change_subscriptions_status(type_code='BA', enable=True),
+        lambda client: client.subscriptions_disclaimer(type_code='BA'),
+        lambda client: client.mark_subscriptions_disclaimer(type_code='BA'),
+        lambda client: client.subscriptions_delivery_options()
+    ],
+    'customer': [
+        lambda client: client.customer_info()
+    ],
+    'orders': [
+        lambda client: client.get_live_orders(),
+        lambda client: client.trades(),
+        lambda client: client.place_order(account_id=client.account, order=_order(client.account)),
+        lambda client: client.place_order_scenario(account_id=client.account, order=_order(client.account)),
+        lambda client: client.modify_order(account_id=client.account, customer_order_id='1001', order=_order(client.account)),
+        lambda client: client.delete_order(account_id=client.account, customer_order_id='1001')
+    ]
+}
+
+
+def percentile(values: List[float], share: float) -> float:
+    """Returns a percentile of sorted values, by the nearest rank.
+
+    Arguments:
+    ----
+    values {List[float]} -- The values, sorted.
+
+    share {float} -- The percentile, between 0 and 1.
+
+    Returns:
+    ----
+    {float} -- The percentile, `0.0` if there are no values.
+    """
+
+    if not values:
+        return 0.0
+
+    rank = max(1, int(math.ceil(share * len(values))))
+
+    return values[rank - 1]
+
+
+def benchmark_family(client: IBClient, calls: List[Callable[[IBClient], object]], requests: int,
+                     concurrency: int, trace_allocations: bool = True) -> Dict:
+    """Calls the endpoints of a family and measures them.
+
+    The requests are spread over `concurrency` threads. The CPU time is the
+    time spent by the calling thread, so it's the client's own cost, without
+    the stand-in's. Allocations are measured in a separate, sequential pass,
+    as tracing them slows every request down.
+
+    Arguments:
+    ----
+    client {IBClient} -- A client of the stand-in.
+
+    calls {List[Callable]} -- The calls of the family, made in turn.
+
+    requests {int} -- The number of requests to make.
+
+    concurrency {int} -- The number of requests in flight at once.
+
+    Keyword Arguments:
+    ----
+    trace_allocations {bool} -- Measure the memory allocated per request. (default: {True})
+
+    Returns:
+    ----
+    {Dict} -- The requests made, the errors, the p50 and p99 latency and
+        mean CPU time in milliseconds, the requests per second and the
+        bytes a request's result holds and the peak bytes allocated
+        while making it.
+    """
+
+    latencies = []
+    cpu_times = []
+    errors = []
+    lock = threading.Lock()
+    counter = itertools.count()
+
+    def worker() -> None:
+        while True:
+            number = next(counter)
+            if number >= requests:
+                return
+
+            call = calls[number % len(calls)]
+
+            cpu_start = time.thread_time()
+            start = time.perf_counter()
+            try:
+                call(client)
+            except Exception as error:
+                with lock:
+                    errors.append(error)
+                continue
+
+            latency = time.perf_counter() - start
+            cpu_time = time.thread_time() - cpu_start
+
+            with lock:
+                latencies.append(latency)
+                cpu_times.append(cpu_time)
+
+    # Warm up the connections, and the cache if there is one.
+    for call in calls:
+        try:
+            call(client)
+        except Exception:
+            pass
+
+    start = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for future in [executor.submit(worker) for _ in range(concurrency)]:
+            future.result()
+
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+
+    result = {
+        'requests': requests,
+        'errors': len(errors),
+        'p50_ms': percentile(latencies, 0.50) * 1000.0,
+        'p99_ms': percentile(latencies, 0.99) * 1000.0,
+        'requests_per_second': len(latencies) / elapsed if elapsed else 0.0,
+        'cpu_ms_per_request': sum(cpu_times) / len(cpu_times) * 1000.0 if cpu_times else 0.0,
+        'allocated_bytes_per_request': None,
+        'peak_bytes_per_request': None
+    }
+
+    if trace_allocations:
+        result.update(_measure_allocations(client=client, calls=calls, requests=min(requests, 50)))
+
+    return result
+
+
+def _measure_allocations(client: IBClient, calls: List[Callable[[IBClient], object]], requests: int) -> Dict:
+    """Returns the mean bytes still held after a request and the mean peak during one."""
+
+    already_tracing = tracemalloc.is_tracing()
+    if not already_tracing:
+        tracemalloc.start()
+
+    retained = 0
+    peaks = 0
+    made = 0
+
+    try:
+        for number in range(requests):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+
+            try:
+                result = calls[number % len(calls)](client)
+            except Exception:
+                continue
+
+            current, peak = tracemalloc.get_traced_memory()
+            del result
+
+            retained += max(0, current - before)
+            peaks += max(0, peak - before)
+            made += 1
+    finally:
+        if not already_tracing:
+            tracemalloc.stop()
+
+    return {
+        'allocated_bytes_per_request': retained / made if made else 0.0,
+        'peak_bytes_per_request': peaks / made if made else 0.0
+    }
+
+
+def run_benchmark(families: List[str] = None, requests_per_family: int = 200, concurrency: int = 8,
+                  latency: float = 0.0, transport_config: TransportConfig = None,
+                  trace_allocations: bool = True, gateway: LocalGateway = None) -> Dict[str, Dict]:
+    """Benchmarks endpoint families against a `LocalGateway`.
+
+    Keyword Arguments:
+    ----
+    families {List[str]} -- The families to run, the keys of `FAMILIES`. (default: {every family})
+
+    requests_per_family {int} -- The requests made per family. (default: {200})
+
+    concurrency {int} -- The number of requests in flight at once. (default: {8})
+
+    latency {float} -- The seconds the stand-in waits before answering, to
+        model the round trip to a real gateway. (default: {0.0})
+
+    transport_config {TransportConfig} -- The transport under test. The
+        client side rate limiter is off by default, as it would measure the
+        limits rather than the library. (default: {None})
+
+    trace_allocations {bool} -- Measure the memory allocated per request. (default: {True})
+
+    gateway {LocalGateway} -- A running stand-in to use, one is started if `None`. (default: {None})
+
+    Returns:
+    ----
+    {Dict[str, Dict]} -- The results of `benchmark_family`, by family.
+    """
+
+    families = families or list(FAMILIES.keys())
+
+    unknown = [family for family in families if family not in FAMILIES]
+    if unknown:
+        raise ValueError('Unknown endpoint families: {}'.format(', '.join(unknown)))
+
+    if transport_config is None:
+        transport_config = TransportConfig(rate_limit=False, pool_maxsize=max(16, concurrency))
+
+    own_gateway = gateway is None
+    if own_gateway:
+        gateway = LocalGateway().start()
+
+    try:
+        if latency:
+            gateway.configure(latency=latency)
+
+        transport = IBTransport(config=transport_config)
+        client = IBClient(
+            username='BENCHMARK',
+            account=gateway.account_id,
+            host=gateway.host,
+            port=gateway.port,
+            transport=transport
+        )
+
+        results = {}
+        for family in families:
+            results[family] = benchmark_family(
+                client=client,
+                calls=FAMILIES[family],
+                requests=requests_per_family,
+                concurrency=concurrency,
+                trace_allocations=trace_allocations
+            )
+
+        transport.close()
+    finally:
+        if own_gateway:
+            gateway.stop()
+
+    return results
+
+
+def format_results(results: Dict[str, Dict]) -> str:
+    """Formats the results of `run_benchmark` as a table."""
+
+    header = '{:<14}{:>9}{:>8}{:>10}{:>10}{:>10}{:>11}{:>12}{:>12}'.format(
+        'family', 'requests', 'errors', 'p50 ms', 'p99 ms', 'req/s', 'cpu ms/req', 'alloc B/req', 'peak B/req'
+    )
+
+    lines = [header, '-' * len(header)]
+    for family, result in results.items():
+        lines.append('{:<14}{:>9}{:>8}{:>10.2f}{:>10.2f}{:>10.0f}{:>11.3f}{:>12}{:>12}'.format(
+            family,
+            result['requests'],
+            result['errors'],
+            result['p50_ms'],
+            result['p99_ms'],
+            result['requests_per_second'],
+            result['cpu_ms_per_request'],
+            _bytes(result['allocated_bytes_per_request']),
+            _bytes(result['peak_bytes_per_request'])
+        ))
+
+    return '\n'.join(lines)
+
+
+def _bytes(value: float) -> str:
+    return '-' if value is None else '{:.0f}'.format(value)
+
+
+def main(argv: List[str] = None) -> Dict[str, Dict]:
+    parser = argparse.ArgumentParser(description='Benchmarks the IBClient endpoints against a local gateway stand-in.')
+    parser.add_argument('--families', nargs='+', choices=list(FAMILIES.keys()), help='The endpoint families to run.')
+    parser.add_argument('--requests', type=int, default=200, help='The requests made per family.')
+    parser.add_argument('--concurrency', type=int, default=8, help='The requests in flight at once.')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds the stand-in waits before answering.')
+    parser.add_argument('--rate-limit', action='store_true', help='Throttle requests client side.')
+    parser.add_argument('--cache', action='store_true', help='Serve reference endpoints from a response cache.')
+    parser.add_argument('--no-coalesce', action='store_true', help="Don't coalesce identical requests.")
+    parser.add_argument('--no-allocations', action='store_true', help="Don't measure allocations.")
+    parser.add_argument('--json', action='store_true', help='Print the results as JSON.')
+    arguments = parser.parse_args(argv)
+
+    transport_config = TransportConfig(
+        rate_limit=arguments.rate_limit,
+        pool_maxsize=max(16, arguments.concurrency),
+        coalesce=not arguments.no_coalesce,
+        response_cache=ResponseCache() if arguments.cache else None
+    )
+
+    results = run_benchmark(
+        families=arguments.families,
+        requests_per_family=arguments.requests,
+        concurrency=arguments.concurrency,
+        latency=arguments.latency,
+        transport_config=transport_config,
+        trace_allocations=not arguments.no_allocations
+    )
+
+    if arguments.json:
+        print(json.dumps(results, indent=4))
+    else:
+        print(format_results(results))
+
+    return results
+
+
+if __name__ == '__main__':
+    main()
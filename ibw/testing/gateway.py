@@ -0,0 +1,954 @@
+import datetime
+import json
+import pathlib
+import random
+import re
+import ssl
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from ibw.rate_limit import TokenBucket
+
+# A self-signed certificate for `localhost` and `127.0.0.1`, for tests only.
+CERTIFICATE_PATH = pathlib.Path(__file__).parent.joinpath('gateway.pem')
+
+SAMPLES_FOLDER = pathlib.Path(__file__).parents[2].joinpath('samples')
+
+DEFAULT_ACCOUNT = 'DU1234567'
+
+# The contract IDs of a few well known symbols, others get a made up one.
+KNOWN_CONIDS = {
+    'AAPL': 265598, 'MSFT': 272093, 'FB': 107113386, 'SOXL': 61856227, 'TNA': 50721436,
+    'SPY': 756733, 'QQQ': 320227571, 'ES': 11004968
+}
+
+
+def strip_comments(text: str) -> str:
+    """Removes the `//` comments of a JSONC document, leaving strings untouched."""
+
+    output = []
+    in_string = False
+    escaped = False
+    index = 0
+
+    while index < len(text):
+        char = text[index]
+
+        if in_string:
+            output.append(char)
+            if escaped:
+                escaped = False
+            elif char == '\\':
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+            output.append(char)
+        elif text.startswith('//', index):
+            newline = text.find('\n', index)
+            index = len(text) if newline == -1 else newline
+            continue
+        else:
+            output.append(char)
+
+        index += 1
+
+    return ''.join(output)
+
+
+def load_sample(name: str, samples_folder: pathlib.Path = None) -> Any:
+    """Loads a canned payload from the `samples` folder.
+
+    Arguments:
+    ----
+    name {str} -- The path relative to the samples folder, e.g.
+        `responses/ratios.json`. JSONC files may contain comments.
+
+    Keyword Arguments:
+    ----
+    samples_folder {pathlib.Path} -- The samples folder. (default: {SAMPLES_FOLDER})
+
+    Returns:
+    ----
+    {Any} -- The decoded payload.
+    """
+
+    path = pathlib.Path(samples_folder or SAMPLES_FOLDER).joinpath(name)
+    text = path.read_text(encoding='utf-8')
+
+    if path.suffix == '.jsonc':
+        text = strip_comments(text)
+
+    return json.loads(text)
+
+
+class EndpointBehavior():
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 500, rate_limit: float = None, burst: int = None,
+                 retry_after: float = None) -> None:
+        """Initalizes a new instance of the EndpointBehavior Object.
+
+        How the stand-in answers the requests of an endpoint.
+
+        Keyword Arguments:
+        ----
+        latency {float} -- Seconds to wait before answering. (default: {0.0})
+
+        jitter {float} -- Up to this many extra seconds, drawn at random. (default: {0.0})
+
+        error_rate {float} -- The share of requests answered with
+            `error_status`, between 0 and 1. (default: {0.0})
+
+        error_status {int} -- The status of the simulated errors. (default: {500})
+
+        rate_limit {float} -- Requests per second allowed before answering
+            with a 429, no limit if `None`. (default: {None})
+
+        burst {int} -- The requests allowed at once by the limit. (default: {1})
+
+        retry_after {float} -- The `Retry-After` sent with a 429, defaults to
+            the time until the next request is allowed. (default: {None})
+        """
+
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.bucket = TokenBucket(rate=rate_limit, capacity=burst) if rate_limit else None
+
+
+class GatewayRequest():
+
+    def __init__(self, method: str, path: str, params: Dict[str, str], body: Any, match: re.Match) -> None:
+        """A request received by the stand-in, as handed to the route handlers.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        path {str} -- The path relative to `/v1/portal/` or `/v1/api/`.
+
+        params {Dict[str, str]} -- The query string parameters.
+
+        body {Any} -- The decoded JSON body, `None` if there is none.
+
+        match {re.Match} -- The match of the route pattern.
+        """
+
+        self.method = method
+        self.path = path
+        self.params = params
+        self.body = body
+        self.match = match
+
+
+Handler = Callable[[GatewayRequest], Any]
+
+
+class LocalGateway():
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, tls: bool = True,
+                 account_id: str = DEFAULT_ACCOUNT, samples_folder: str = None) -> None:
+        """Initalizes a new instance of the LocalGateway Object.
+
+        A local stand-in for the Client Portal Gateway's `/v1/portal` API. It
+        answers every endpoint of `IBClient` with the canned payloads of the
+        `samples` folder, or payloads shaped like the gateway's, and can be
+        told to be slow, to fail or to throttle, endpoint by endpoint. It
+        doesn't need a login, so it's meant for tests and benchmarks.
+
+        Keyword Arguments:
+        ----
+        host {str} -- The interface to listen on. (default: {'127.0.0.1'})
+
+        port {int} -- The port to listen on, a free one if `0`. (default: {0})
+
+        tls {bool} -- Serve HTTPS with a bundled self-signed certificate,
+            like the real gateway. (default: {True})
+
+        account_id {str} -- The account the stand-in pretends to hold. (default: {'DU1234567'})
+
+        samples_folder {str} -- The folder of the canned payloads. (default: {SAMPLES_FOLDER})
+
+        Usage:
+        ----
+            >>> with LocalGateway() as gateway:
+                    gateway.configure(r'^iserver/marketdata/', latency=0.05, error_rate=0.1)
+                    ib_client = IBClient(username='USER', account=gateway.account_id, host=gateway.host, port=gateway.port)
+                    ib_client.market_data(conids=['265598'], since=None, fields=['31'])
+        """
+
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.account_id = account_id
+        self.samples_folder = pathlib.Path(samples_folder or SAMPLES_FOLDER)
+
+        self._routes: List[Tuple[str, re.Pattern, Handler]] = []
+        self._behaviors: List[Tuple[str, re.Pattern, EndpointBehavior]] = []
+        self._samples: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+        self._order_id = 1000
+
+        # The `(message_id, text)` questions asked before an order is accepted, and the suppressed ones.
+        self.order_questions: List[Tuple[str, str]] = []
+        self.suppressed_questions = set()
+        self._replies: Dict[str, Tuple[int, int]] = {}
+
+        self._server = None
+        self._thread = None
+
+        self.requests = 0
+        self.statuses: Dict[int, int] = {}
+
+        self._add_default_routes()
+
+    @property
+    def url(self) -> str:
+        """The root URL of the stand-in, e.g. `https://127.0.0.1:5000`."""
+
+        return '{scheme}://{host}:{port}'.format(
+            scheme='https' if self.tls else 'http',
+            host=self.host,
+            port=self.port
+        )
+
+    def route(self, method: str, pattern: str, handler: Handler) -> None:
+        """Answers an endpoint with a custom handler.
+
+        Routes added later take precedence, so this also replaces the
+        default payload of an endpoint.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method, or `*` for any.
+
+        pattern {str} -- A regex matched against the path relative to `/v1/portal/`.
+
+        handler {Callable} -- Receives a `GatewayRequest` and returns the JSON
+            payload, or a `(status, payload)` tuple.
+        """
+
+        with self._lock:
+            self._routes.insert(0, (method, re.compile(pattern), handler))
+
+    def handler(self, method: str, path: str) -> Handler:
+        """Returns the handler answering a request, e.g. to wrap or restore a default payload.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        path {str} -- The path relative to `/v1/portal/`, e.g. `iserver/secdef/info`.
+
+        Returns:
+        ----
+        {Callable} -- The handler, `None` if no route matches.
+        """
+
+        route = self._find(self._routes, method=method, path=path)
+
+        return route[0] if route is not None else None
+
+    def configure(self, pattern: str = r'.*', method: str = '*', **behavior) -> EndpointBehavior:
+        """Sets the latency, errors and throttling of the matching endpoints.
+
+        Behaviors configured later take precedence.
+
+        Keyword Arguments:
+        ----
+        pattern {str} -- A regex matched against the path relative to
+            `/v1/portal/`, every endpoint by default. (default: {r'.*'})
+
+        method {str} -- The HTTP method, or `*` for any. (default: {'*'})
+
+        **behavior -- The arguments of `EndpointBehavior`.
+
+        Returns:
+        ----
+        {EndpointBehavior} -- The behavior.
+        """
+
+        endpoint_behavior = EndpointBehavior(**behavior)
+
+        with self._lock:
+            self._behaviors.insert(0, (method, re.compile(pattern), endpoint_behavior))
+
+        return endpoint_behavior
+
+    def reset(self) -> None:
+        """Forgets every configured behavior and the request counters."""
+
+        with self._lock:
+            self._behaviors.clear()
+            self.requests = 0
+            self.statuses.clear()
+
+    def start(self) -> 'LocalGateway':
+        """Starts serving on a background thread."""
+
+        gateway = self
+
+        class _RequestHandler(_GatewayRequestHandler):
+            pass
+
+        _RequestHandler.gateway = gateway
+
+        self._server = ThreadingHTTPServer((self.host, self.port), _RequestHandler)
+        self._server.daemon_threads = True
+
+        if self.tls:
+            context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            context.load_cert_chain(certfile=str(CERTIFICATE_PATH))
+            self._server.socket = context.wrap_socket(self._server.socket, server_side=True)
+
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever, name='ibw-local-gateway', daemon=True)
+        self._thread.start()
+
+        return self
+
+    def stop(self) -> None:
+        """Stops serving."""
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'LocalGateway':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def sample(self, name: str) -> Any:
+        """Returns a canned payload, loading it on first use."""
+
+        payload = self._samples.get(name)
+        if payload is None:
+            payload = load_sample(name=name, samples_folder=self.samples_folder)
+            self._samples[name] = payload
+
+        return payload
+
+    def handle(self, method: str, target: str, body: bytes) -> Tuple[int, Dict, bytes]:
+        """Answers a request.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method.
+
+        target {str} -- The request target, path and query string.
+
+        body {bytes} -- The raw request body.
+
+        Returns:
+        ----
+        {Tuple[int, Dict, bytes]} -- The status, the extra headers and the body.
+        """
+
+        split = urllib.parse.urlsplit(target)
+
+        # The clients sometimes build paths with a double slash.
+        path = re.sub(r'/+', '/', split.path)
+        path = re.sub(r'^/v1/(portal|api)/', '', path).lstrip('/')
+        params = dict(urllib.parse.parse_qsl(split.query, keep_blank_values=True))
+
+        status, headers, payload = self._respond(method=method, path=path, params=params, body=body)
+
+        with self._lock:
+            self.requests += 1
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+
+        return status, headers, json.dumps(payload).encode('utf-8')
+
+    def _respond(self, method: str, path: str, params: Dict, body: bytes) -> Tuple[int, Dict, Any]:
+        """Applies the endpoint's behavior and runs its handler."""
+
+        behavior = self._find(self._behaviors, method=method, path=path)
+
+        if behavior is not None:
+            behavior = behavior[0]
+
+            if behavior.bucket is not None:
+                with self._lock:
+                    now = time.monotonic()
+                    wait = behavior.bucket.wait_time(now=now)
+                    if wait <= 0:
+                        behavior.bucket.consume(now=now)
+
+                if wait > 0:
+                    retry_after = behavior.retry_after if behavior.retry_after is not None else wait
+                    return 429, {'Retry-After': '{:.3f}'.format(retry_after)}, {'error': 'Too Many Requests'}
+
+            delay = behavior.latency + (random.uniform(0.0, behavior.jitter) if behavior.jitter else 0.0)
+            if delay > 0:
+                time.sleep(delay)
+
+            if behavior.error_rate and random.random() < behavior.error_rate:
+                return behavior.error_status, {}, {'error': 'Simulated error', 'statusCode': behavior.error_status}
+
+        route = self._find(self._routes, method=method, path=path)
+        if route is None:
+            return 404, {}, {'error': 'Resource not found: {}'.format(path)}
+
+        handler, match = route
+
+        try:
+            decoded = json.loads(body) if body else None
+        except ValueError:
+            return 400, {}, {'error': 'Bad Request: invalid JSON'}
+
+        result = handler(GatewayRequest(method=method, path=path, params=params, body=decoded, match=match))
+
+        if isinstance(result, tuple):
+            return result[0], {}, result[1]
+
+        return 200, {}, result
+
+    def _find(self, entries: List[Tuple[str, re.Pattern, Any]], method: str, path: str) -> Tuple[Any, re.Match]:
+        """Returns the first entry matching the request and its match."""
+
+        with self._lock:
+            entries = list(entries)
+
+        for entry_method, pattern, value in entries:
+            if entry_method != '*' and entry_method != method:
+                continue
+            match = pattern.search(path)
+            if match:
+                return value, match
+
+        return None
+
+    def _next_order_id(self) -> str:
+        with self._lock:
+            self._order_id += 1
+            return str(self._order_id)
+
+    def _add_default_routes(self) -> None:
+        """Registers the payloads of every `IBClient` endpoint."""
+
+        account = r'[^/]+'
+
+        routes = [
+            # Session.
+            ('*', r'^tickle$', self._tickle),
+            ('*', r'^sso/validate$', lambda request: {'USER_ID': 1, 'USER_NAME': 'paperuser', 'RESULT': True}),
+            ('*', r'^iserver/auth/status$', self._auth_status),
+            ('*', r'^iserver/reauthenticate$', lambda request: {'message': 'triggered'}),
+            ('*', r'^logout$', lambda request: {'confirmed': True}),
+
+            # Accounts.
+            ('GET', r'^iserver/accounts$', self._server_accounts),
+            ('POST', r'^iserver/account$', lambda request: {'set': True, 'acctId': request.params.get('acctId')}),
+            ('GET', r'^iserver/account/pnl/partitioned$', self._pnl),
+            ('GET', r'^portfolio/(sub)?accounts$', lambda request: [self._account()]),
+            ('GET', r'^portfolio/{}/meta$'.format(account), lambda request: self._account()),
+            ('GET', r'^portfolio/{}/summary$'.format(account), self._summary),
+            ('GET', r'^portfolio/{}/ledger$'.format(account), self._ledger),
+            ('*', r'^portfolio/({}/)?allocation$'.format(account), self._allocation),
+            ('GET', r'^portfolio/{}/positions/\d+$'.format(account), lambda request: self._positions()),
+            ('GET', r'^portfolio/{}/position/(\d+)$'.format(account), self._position),
+            ('GET', r'^portfolio/positions/(\d+)$', lambda request: {self.account_id: self._position(request)}),
+            ('POST', r'^portfolio/{}/positions/invalidate$'.format(account), lambda request: {'message': 'success'}),
+            ('GET', r'^ibcust/entity/info$', lambda request: [{'entityType': 'INDIVIDUAL', 'name': 'Paper Trader'}]),
+
+            # Market data.
+            ('GET', r'^iserver/marketdata/snapshot$', self._snapshot),
+            ('GET', r'^iserver/marketdata/history$', self._history),
+
+            # Contracts.
+            ('POST', r'^iserver/secdef/search$', self._secdef_search),
+            ('GET', r'^iserver/contract/(\d+)/info$', self._contract_info),
+            ('POST', r'^trsrv/secdef$', self._secdef),
+            ('GET', r'^iserver/secdef/strikes$', self._strikes),
+            ('GET', r'^iserver/secdef/info$', self._secdef_info),
+            ('GET', r'^trsrv/futures$', self._futures),
+            ('GET', r'^trsrv/stocks$', self._stocks),
+
+            # Orders.
+            ('GET', r'^iserver/account/orders$', self._live_orders),
+            ('GET', r'^iserver/account/trades$', self._trades),
+            ('POST', r'^iserver/account/{}/order/whatif$'.format(account), self._what_if),
+            ('POST', r'^iserver/account/{}/orders?$'.format(account), self._place_orders),
+            ('POST', r'^iserver/account/{}/order/([^/]+)$'.format(account), self._modify_order),
+            ('DELETE', r'^iserver/account/{}/order/([^/]+)$'.format(account), self._delete_order),
+            ('POST', r'^iserver/reply/([^/]+)$', self._reply),
+            ('POST', r'^iserver/questions/suppress$', self._suppress),
+            ('POST', r'^iserver/questions/suppress/reset$', self._reset_suppressed),
+
+            # Scanners.
+            ('GET', r'^iserver/scanner/params$', lambda request: self.sample('responses/scanner-params.json')),
+            ('POST', r'^iserver/scanner/run$', lambda request: self.sample('responses/scanner-run.jsonc')[1]),
+
+            # Fundamentals.
+            ('GET', r'^iserver/fundamentals/\d+/summary$', lambda request: self.sample('responses/widgets-prices.json')),
+            ('GET', r'^tws\.proxy/fundamentals/financials/\d+$', self._financials),
+            ('GET', r'^fundamentals/landing/\d+$', self._landing),
+            ('GET', r'^fundamentals/mf_profile_and_fees/\d+$', lambda request: {'objective': '', 'fees': []}),
+            ('GET', r'^fundamentals/mf_performance/\d+$', lambda request: {'cumulative': [], 'annualized': []}),
+
+            # Notifications.
+            ('GET', r'^fyi/unreadnumber$', lambda request: {'BN': 0}),
+            ('*', r'^fyi/settings(/[^/]+)?$', lambda request: [] if request.method == 'GET' else {'V': 1, 'T': 10}),
+            ('*', r'^fyi/disclaimer/[^/]+$', lambda request: {'DC': '', 'FC': ''}),
+            ('GET', r'^fyi/deliveryoptions$', lambda request: {'M': 1, 'E': []})
+        ]
+
+        for method, pattern, handler in reversed(routes):
+            self.route(method=method, pattern=pattern, handler=handler)
+
+    def _tickle(self, request: GatewayRequest) -> Dict:
+        return {
+            'session': 'b2e3b6a1f0c94c7e9c8d3b7c7a1d2e3f',
+            'ssoExpires': 460000,
+            'collission': False,
+            'userId': 1,
+            'iserver': {'authStatus': {'authenticated': True, 'competing': False, 'connected': True}}
+        }
+
+    def _auth_status(self, request: GatewayRequest) -> Dict:
+        return {'authenticated': True, 'competing': False, 'connected': True, 'message': '', 'fail': ''}
+
+    def _server_accounts(self, request: GatewayRequest) -> Dict:
+        return {
+            'accounts': [self.account_id],
+            'aliases': {self.account_id: self.account_id},
+            'selectedAccount': self.account_id
+        }
+
+    def _account(self) -> Dict:
+        return {
+            'id': self.account_id,
+            'accountId': self.account_id,
+            'accountVan': self.account_id,
+            'accountTitle': 'Paper Trader',
+            'displayName': self.account_id,
+            'accountAlias': None,
+            'currency': 'USD',
+            'type': 'DEMO',
+            'tradingType': 'STKNOPT',
+            'faclient': False,
+            'covestor': False,
+            'parent': {}
+        }
+
+    def _pnl(self, request: GatewayRequest) -> Dict:
+        return {
+            'upnl': {
+                '{}.Core'.format(self.account_id): {
+                    'rowType': 1, 'dpl': 0.0, 'nl': 100000.0, 'upl': 0.0, 'el': 100000.0, 'mv': 0.0
+                }
+            }
+        }
+
+    def _summary(self, request: GatewayRequest) -> Dict:
+        summary = {}
+        for key, amount in (('netliquidation', 100000.0), ('totalcashvalue', 95000.0),
+                            ('buyingpower', 400000.0), ('grosspositionvalue', 5000.0)):
+            summary[key] = {
+                'amount': amount, 'currency': 'USD', 'isNull': False,
+                'timestamp': int(time.time() * 1000), 'value': None, 'severity': 0
+            }
+        return summary
+
+    def _ledger(self, request: GatewayRequest) -> Dict:
+        ledger = {
+            'commoditymarketvalue': 0.0, 'futuremarketvalue': 0.0, 'settledcash': 95000.0,
+            'exchangerate': 1, 'sessionid': 1, 'cashbalance': 95000.0, 'corporatebondsmarketvalue': 0.0,
+            'netliquidationvalue': 100000.0, 'stockmarketvalue': 5000.0, 'currency': 'USD',
+            'timestamp': int(time.time())
+        }
+        return {'USD': ledger, 'BASE': dict(ledger, currency='BASE')}
+
+    def _allocation(self, request: GatewayRequest) -> Dict:
+        return {
+            'assetClass': {'long': {'STK': 5000.0, 'CASH': 95000.0}, 'short': {}},
+            'sector': {'long': {'Technology': 5000.0}, 'short': {}},
+            'group': {'long': {'Computers': 5000.0}, 'short': {}}
+        }
+
+    def _positions(self) -> List[Dict]:
+        return [
+            {
+                'acctId': self.account_id, 'conid': 265598, 'contractDesc': 'AAPL', 'assetClass': 'STK',
+                'position': 10.0, 'mktPrice': 150.0, 'mktValue': 1500.0, 'currency': 'USD',
+                'avgCost': 140.0, 'avgPrice': 140.0, 'realizedPnl': 0.0, 'unrealizedPnl': 100.0
+            },
+            {
+                'acctId': self.account_id, 'conid': 8314, 'contractDesc': 'IBM', 'assetClass': 'STK',
+                'position': 25.0, 'mktPrice': 140.0, 'mktValue': 3500.0, 'currency': 'USD',
+                'avgCost': 130.0, 'avgPrice': 130.0, 'realizedPnl': 0.0, 'unrealizedPnl': 250.0
+            }
+        ]
+
+    def _position(self, request: GatewayRequest) -> List[Dict]:
+        conid = int(request.match.group(request.match.lastindex))
+        return [position for position in self._positions() if position['conid'] == conid]
+
+    def _snapshot(self, request: GatewayRequest) -> List[Dict]:
+        conids = [conid for conid in request.params.get('conids', '').split(',') if conid]
+        fields = [field for field in request.params.get('fields', '').split(',') if field]
+        now = int(time.time() * 1000)
+
+        quotes = []
+        for conid in conids:
+            values = quote_values(conid=conid)
+
+            quote = {'conid': int(conid) if conid.isdigit() else conid, 'conidEx': conid, '_updated': now, 'server_id': 'q0'}
+            for field in fields or ['31', '84', '86']:
+                quote[field] = values.get(field, '')
+            quotes.append(quote)
+
+        return quotes
+
+    def _history(self, request: GatewayRequest) -> Dict:
+        conid = request.params.get('conid', '0')
+        bar = request.params.get('bar', '5min')
+        period = request.params.get('period', '1d')
+
+        bar_seconds = _duration(bar, default=300)
+        points = max(1, min(1000, _duration(period, default=86400) // bar_seconds))
+
+        price = _price(conid=conid)
+        end = _start_time(request.params.get('startTime')) or int(time.time())
+        end = end // bar_seconds * bar_seconds
+        data = []
+        for index in range(points):
+            timestamp = end - (points - index) * bar_seconds
+            close = price + ((timestamp // bar_seconds * 7919) % 100 - 50) / 100.0
+            data.append({
+                'o': round(close - 0.05, 2), 'c': round(close, 2), 'h': round(close + 0.1, 2),
+                'l': round(close - 0.1, 2), 'v': 1000 + timestamp // bar_seconds % 1000,
+                't': timestamp * 1000
+            })
+
+        return {
+            'symbol': 'SYM{}'.format(conid), 'text': 'SYM{}'.format(conid), 'priceFactor': 100,
+            'startTime': data[0]['t'], 'high': '', 'low': '', 'timePeriod': period, 'barLength': bar_seconds,
+            'mdAvailability': 'S', 'mktDataDelay': 0, 'outsideRth': False, 'volumeFactor': 1,
+            'priceDisplayRule': 1, 'priceDisplayValue': '2', 'negativeCapable': False,
+            'messageVersion': 2, 'data': data, 'points': len(data) - 1, 'travelTime': 1
+        }
+
+    def _secdef_search(self, request: GatewayRequest) -> List[Dict]:
+        symbol = (request.body or {}).get('symbol', 'AAPL').upper()
+        months = _option_months()
+        return [{
+            'conid': symbol_conid(symbol), 'companyHeader': '{} - NASDAQ'.format(symbol), 'companyName': symbol,
+            'symbol': symbol, 'description': 'NASDAQ', 'restricted': None, 'fop': None,
+            'opt': ';'.join(_third_friday(month) for month in months), 'war': None,
+            'sections': [{'secType': 'STK'}, {'secType': 'OPT', 'months': ';'.join(months), 'exchange': 'SMART'}]
+        }]
+
+    def _contract_info(self, request: GatewayRequest) -> Dict:
+        conid = request.match.group(1)
+        return {
+            'conid': int(conid), 'symbol': conid_symbol(conid), 'company_name': 'COMPANY {}'.format(conid),
+            'exchange': 'NASDAQ', 'currency': 'USD', 'instrument_type': 'STK', 'local_symbol': conid_symbol(conid),
+            'trading_class': 'NMS', 'valid_exchanges': 'SMART,NASDAQ,ARCA', 'allow_sell_long': False,
+            'is_zero_commission_security': False, 'r_t_h': True, 'con_id': int(conid)
+        }
+
+    def _secdef(self, request: GatewayRequest) -> Dict:
+        conids = (request.body or {}).get('conids', [])
+        return {
+            'secdef': [
+                {'conid': int(conid), 'currency': 'USD', 'name': 'COMPANY {}'.format(conid),
+                 'assetClass': 'STK', 'ticker': conid_symbol(conid), 'listingExchange': 'NASDAQ'}
+                for conid in conids
+            ]
+        }
+
+    def _strikes(self, request: GatewayRequest) -> Dict:
+        center = round(_price(request.params.get('conid', '0')) / 5.0) * 5
+        strikes = [float(center + offset) for offset in range(-25, 30, 5)]
+        return {'call': strikes, 'put': strikes}
+
+    def _secdef_info(self, request: GatewayRequest) -> List[Dict]:
+        conid = request.params.get('conid', '0')
+        maturity = _third_friday(request.params.get('month', _option_months()[0]))
+        strike = float(request.params.get('strike', 0))
+        rights = [request.params['right']] if request.params.get('right') else ['C', 'P']
+
+        return [
+            {'conid': option_conid(conid, maturity, strike, right), 'symbol': conid_symbol(conid), 'secType': 'OPT',
+             'exchange': request.params.get('exchange', 'SMART'), 'right': right, 'strike': strike, 'currency': 'USD',
+             'maturityDate': maturity, 'multiplier': '100', 'tradingClass': conid_symbol(conid)}
+            for right in rights
+        ]
+
+    def _futures(self, request: GatewayRequest) -> Dict:
+        symbols = [symbol for symbol in request.params.get('symbols', '').split(',') if symbol]
+        return {
+            symbol: [
+                {'symbol': symbol, 'conid': 495512550 + month, 'underlyingConid': 11004968,
+                 'expirationDate': 20230317 + month * 300, 'ltd': 20230316 + month * 300}
+                for month in range(4)
+            ]
+            for symbol in symbols
+        }
+
+    def _stocks(self, request: GatewayRequest) -> Dict:
+        symbols = [symbol for symbol in request.params.get('symbols', '').split(',') if symbol]
+        return {
+            symbol: [{
+                'name': '{} INC'.format(symbol), 'chineseName': '', 'assetClass': 'STK',
+                'contracts': [{'conid': symbol_conid(symbol), 'exchange': 'NASDAQ', 'isUS': True}]
+            }]
+            for symbol in symbols
+        }
+
+    def _live_orders(self, request: GatewayRequest) -> Dict:
+        orders = []
+        for number, order in enumerate(self.sample('orders/limit_orders.jsonc') + self.sample('orders/market_orders.jsonc')):
+            orders.append({
+                'acct': self.account_id, 'conid': order['conid'], 'orderId': 1000 + number,
+                'cashCcy': 'USD', 'sizeAndFills': '0/{}'.format(order['quantity']),
+                'orderDesc': '{} {} {}'.format(order['side'], order['quantity'], order['orderType']),
+                'ticker': 'SYM{}'.format(order['conid']), 'secType': 'STK', 'listingExchange': 'NASDAQ',
+                'remainingQuantity': float(order['quantity']), 'filledQuantity': 0.0,
+                'status': 'Submitted', 'origOrderType': order['orderType'], 'orderType': order['orderType'],
+                'side': order['side'], 'price': order.get('price'), 'timeInForce': order['tif'],
+                'lastExecutionTime_r': int(time.time() * 1000), 'order_ref': order['cOID']
+            })
+        return {'orders': orders, 'snapshot': True}
+
+    def _trades(self, request: GatewayRequest) -> List[Dict]:
+        return [{
+            'execution_id': '0000e0d5.5f8e0f2e.01.01', 'symbol': 'AAPL', 'side': 'B', 'order_description': 'Bot 10 @ 150.00',
+            'trade_time': '20230101-15:30:00', 'trade_time_r': int(time.time() * 1000), 'size': '10',
+            'price': '150.00', 'exchange': 'NASDAQ', 'commission': '1.00', 'net_amount': 1500.0,
+            'account': self.account_id, 'conid': '265598', 'sec_type': 'STK'
+        }]
+
+    def _place_orders(self, request: GatewayRequest) -> List[Dict]:
+        body = request.body or {}
+        orders = body.get('orders', [body]) if isinstance(body, dict) else body
+        return self._ask(index=0, count=len(orders))
+
+    def _ask(self, index: int, count: int) -> List[Dict]:
+        """Asks the next question that isn't suppressed, or accepts the orders."""
+
+        for position in range(index, len(self.order_questions)):
+            message_id, text = self.order_questions[position]
+            if message_id in self.suppressed_questions:
+                continue
+
+            reply_id = '{:08x}-{:04x}'.format(zlib.crc32(text.encode('utf-8')), random.getrandbits(16))
+            with self._lock:
+                self._replies[reply_id] = (position + 1, count)
+
+            return [{'id': reply_id, 'message': [text], 'isSuppressed': False, 'messageIds': [message_id]}]
+
+        return [
+            {'order_id': self._next_order_id(), 'order_status': 'Submitted', 'encrypt_message': '1'}
+            for _ in range(count)
+        ]
+
+    def _what_if(self, request: GatewayRequest) -> Dict:
+        return {
+            'amount': {'amount': '1,500.00 USD', 'commission': '1.00 USD', 'total': '1,501.00 USD'},
+            'equity': {'current': '100,000', 'change': '-1', 'after': '99,999'},
+            'initial': {'current': '0', 'change': '375', 'after': '375'},
+            'maintenance': {'current': '0', 'change': '375', 'after': '375'},
+            'warn': None, 'error': None
+        }
+
+    def _modify_order(self, request: GatewayRequest) -> List[Dict]:
+        return [{'order_id': request.match.group(1), 'order_status': 'Submitted', 'encrypt_message': '1'}]
+
+    def _delete_order(self, request: GatewayRequest) -> Dict:
+        return {'order_id': request.match.group(1), 'msg': 'Request was submitted', 'conid': -1, 'account': self.account_id}
+
+    def _reply(self, request: GatewayRequest) -> List[Dict]:
+        with self._lock:
+            pending = self._replies.pop(request.match.group(1), None)
+
+        if pending is None:
+            return [{'order_id': self._next_order_id(), 'order_status': 'Submitted', 'encrypt_message': '1'}]
+
+        if not (request.body or {}).get('confirmed'):
+            return {'error': 'The order was not confirmed.'}
+
+        return self._ask(index=pending[0], count=pending[1])
+
+    def _suppress(self, request: GatewayRequest) -> Dict:
+        with self._lock:
+            self.suppressed_questions.update((request.body or {}).get('messageIds') or [])
+        return {'status': 'submitted'}
+
+    def _reset_suppressed(self, request: GatewayRequest) -> Dict:
+        with self._lock:
+            self.suppressed_questions.clear()
+        return {'status': 'submitted'}
+
+    def _financials(self, request: GatewayRequest) -> Any:
+        statement = request.params.get('type', 'income')
+        if statement.startswith('balance'):
+            return self.sample('responses/financials-balance-sheet.json')
+        elif statement.startswith('cash'):
+            return self.sample('responses/financials-cashflow.json')
+        return self.sample('responses/financials-income.json')
+
+    def _landing(self, request: GatewayRequest) -> Any:
+        widgets = {
+            'key_ratios': 'responses/ratios.json',
+            'dividends': 'responses/fundamentals-dividends.json',
+            'esg': 'responses/fundamentals-esg.json',
+            'news': 'responses/widgets-news.json',
+            'ratings': 'responses/widgets-analyst-ratings.json',
+            'analyst_forecast': 'responses/widgets-analyst-forecasts.json'
+        }
+        return self.sample(widgets.get(request.params.get('widgets'), 'responses/widgets-all.json'))
+
+
+class _GatewayRequestHandler(BaseHTTPRequestHandler):
+    """Hands every request to the `LocalGateway` it belongs to."""
+
+    protocol_version = 'HTTP/1.1'
+    gateway: LocalGateway = None
+
+    # The headers and the body are written separately, without this every
+    # keep-alive response waits out a delayed ACK.
+    disable_nagle_algorithm = True
+
+    def _reply(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        body = self.rfile.read(length) if length else b''
+
+        status, headers, content = self.gateway.handle(method=self.command, target=self.path, body=body)
+
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(content)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(content)
+
+    do_GET = _reply
+    do_POST = _reply
+    do_PUT = _reply
+    do_DELETE = _reply
+
+    def log_message(self, *args):
+        pass
+
+
+def quote_values(conid: str) -> Dict[str, str]:
+    """Returns made up values of the common market data fields of a contract.
+
+    Arguments:
+    ----
+    conid {str} -- The contract ID.
+
+    Returns:
+    ----
+    {Dict[str, str]} -- The last price, symbol, bid, bid size, ask, ask size,
+        open and prior close, by field ID.
+    """
+
+    price = _price(conid=conid)
+
+    return {
+        '31': '{:.2f}'.format(price),
+        '55': 'SYM{}'.format(conid),
+        '84': '{:.2f}'.format(price - 0.01),
+        '85': '100',
+        '86': '{:.2f}'.format(price + 0.01),
+        '88': '200',
+        '7295': '{:.2f}'.format(price * 0.99),
+        '7296': '{:.2f}'.format(price * 0.995)
+    }
+
+
+def symbol_conid(symbol: str) -> int:
+    """The contract ID the stand-in gives a stock symbol."""
+
+    symbol = symbol.upper()
+    return KNOWN_CONIDS.get(symbol, 100000000 + zlib.crc32(symbol.encode('utf-8')) % 100000000)
+
+
+def conid_symbol(conid: str) -> str:
+    """The stock symbol the stand-in gives a contract ID."""
+
+    for symbol, known in KNOWN_CONIDS.items():
+        if known == int(conid):
+            return symbol
+
+    return 'SYM{}'.format(conid)
+
+
+def option_conid(conid: str, maturity: str, strike: float, right: str) -> int:
+    """The contract ID the stand-in gives an option."""
+
+    key = '{}:{}:{:g}:{}'.format(conid, maturity, float(strike), right)
+    return 600000000 + zlib.crc32(key.encode('utf-8')) % 100000000
+
+
+def _option_months(count: int = 2) -> List[str]:
+    """The option months the stand-in lists, e.g. `['JAN23', 'FEB23']`, starting next month."""
+
+    today = datetime.date.today()
+    months = []
+
+    for offset in range(1, count + 1):
+        year, month = divmod(today.month - 1 + offset, 12)
+        months.append(datetime.date(today.year + year, month + 1, 1).strftime('%b%y').upper())
+
+    return months
+
+
+def _third_friday(month: str) -> str:
+    """The monthly expiration of an option month, `YYYYMMDD`."""
+
+    first = datetime.datetime.strptime(month, '%b%y')
+    return (first + datetime.timedelta(days=(4 - first.weekday()) % 7 + 14)).strftime('%Y%m%d')
+
+
+def _price(conid: str) -> float:
+    """A stable made up price for a contract."""
+
+    digits = ''.join(char for char in str(conid) if char.isdigit()) or '0'
+    return 10.0 + int(digits) % 490
+
+
+def _duration(value: str, default: int) -> int:
+    """Converts a gateway period or bar, e.g. `5min`, `1h`, `1d`, `1w`, `1m` or `1y`, to seconds."""
+
+    match = re.match(r'^(\d+)\s*(min|h|d|w|m|y)$', value or '')
+    if not match:
+        return default
+
+    units = {'min': 60, 'h': 3600, 'd': 86400, 'w': 604800, 'm': 2592000, 'y': 31536000}
+    return int(match.group(1)) * units[match.group(2)]
+
+
+def _start_time(value: str) -> int:
+    """Converts a `startTime` of the history endpoint, e.g. `20230101-16:00:00` in UTC, to seconds."""
+
+    if not value:
+        return None
+
+    try:
+        parsed = datetime.datetime.strptime(value, '%Y%m%d-%H:%M:%S')
+    except ValueError:
+        return None
+
+    return int(parsed.replace(tzinfo=datetime.timezone.utc).timestamp())
@@ -0,0 +1,265 @@
+import asyncio
+import json
+import ssl
+import threading
+import time
+from typing import Dict
+from typing import List
+
+from ibw.testing.gateway import CERTIFICATE_PATH
+from ibw.testing.gateway import quote_values
+
+try:
+    import aiohttp
+    from aiohttp import web
+except ImportError:
+    aiohttp = None
+    web = None
+
+
+class LocalStreamingGateway():
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0, tls: bool = True,
+                 tick_interval: float = None, username: str = 'TEST') -> None:
+        """Initalizes a new instance of the LocalStreamingGateway Object.
+
+        A local stand-in for the gateway's `/v1/api/ws` WebSocket. It accepts
+        `smd` and `umd` messages, answers every subscription with a first
+        tick, and pushes a tick whenever `publish` is called, or every
+        `tick_interval` seconds. `drop_connections` closes every socket, as
+        a gateway restart would.
+
+        Keyword Arguments:
+        ----
+        host {str} -- The interface to listen on. (default: {'127.0.0.1'})
+
+        port {int} -- The port to listen on, a free one if `0`. (default: {0})
+
+        tls {bool} -- Serve `wss` with the bundled self-signed certificate. (default: {True})
+
+        tick_interval {float} -- Seconds between two ticks of every subscribed
+            contract, no automatic ticks if `None`. (default: {None})
+
+        username {str} -- The user announced when a socket opens. (default: {'TEST'})
+
+        Usage:
+        ----
+            >>> with LocalStreamingGateway(tick_interval=0.1) as gateway:
+                    stream = MarketDataStream(url=gateway.url)
+        """
+
+        if aiohttp is None:
+            raise ImportError(
+                'The streaming stand-in requires `aiohttp`, install it with `pip install aiohttp`.'
+            )
+
+        self.host = host
+        self.port = port
+        self.tls = tls
+        self.tick_interval = tick_interval
+        self.username = username
+
+        # socket -> {conid: fields}
+        self._sockets: Dict[web.WebSocketResponse, Dict[str, List[str]]] = {}
+
+        self._loop = None
+        self._thread = None
+        self._runner = None
+        self._ticker = None
+        self._started = threading.Event()
+
+        self.connections = 0
+        self.subscribes = 0
+        self.unsubscribes = 0
+        self.heartbeats = 0
+        self.sessions: List[str] = []
+
+    @property
+    def url(self) -> str:
+        """The WebSocket URL, e.g. `wss://127.0.0.1:5000/v1/api/ws`."""
+
+        return '{scheme}://{host}:{port}/v1/api/ws'.format(
+            scheme='wss' if self.tls else 'ws',
+            host=self.host,
+            port=self.port
+        )
+
+    @property
+    def subscriptions(self) -> Dict[str, List[str]]:
+        """The contracts subscribed to on any socket and their fields."""
+
+        subscriptions = {}
+        for socket_subscriptions in list(self._sockets.values()):
+            subscriptions.update(socket_subscriptions)
+
+        return subscriptions
+
+    def start(self) -> 'LocalStreamingGateway':
+        """Starts serving on a background thread with its own event loop."""
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name='ibw-local-streaming-gateway', daemon=True)
+        self._thread.start()
+
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+
+        return self
+
+    def stop(self) -> None:
+        """Closes every socket and stops serving."""
+
+        if self._loop is None:
+            return
+
+        asyncio.run_coroutine_threadsafe(self._stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> 'LocalStreamingGateway':
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.stop()
+
+    def publish(self, conid: str, values: Dict[str, str] = None) -> int:
+        """Pushes a tick to every socket subscribed to a contract.
+
+        Arguments:
+        ----
+        conid {str} -- The contract ID.
+
+        Keyword Arguments:
+        ----
+        values {Dict[str, str]} -- The field values to send, made up ones of
+            the subscribed fields if `None`. (default: {None})
+
+        Returns:
+        ----
+        {int} -- The number of sockets the tick was sent to.
+        """
+
+        return asyncio.run_coroutine_threadsafe(self._publish(conid=str(conid), values=values), self._loop).result()
+
+    def drop_connections(self) -> None:
+        """Closes every open socket, the subscriptions are forgotten."""
+
+        asyncio.run_coroutine_threadsafe(self._close_sockets(), self._loop).result()
+
+    def stats(self) -> Dict:
+        """Returns the connections, subscriptions and heartbeats received."""
+
+        return {
+            'open_sockets': len(self._sockets),
+            'connections': self.connections,
+            'subscribes': self.subscribes,
+            'unsubscribes': self.unsubscribes,
+            'heartbeats': self.heartbeats,
+            'subscriptions': len(self.subscriptions)
+        }
+
+    async def _start(self) -> None:
+        application = web.Application()
+        application.router.add_get('/v1/api/ws', self._handle)
+
+        self._runner = web.AppRunner(application)
+        await self._runner.setup()
+
+        ssl_context = None
+        if self.tls:
+            ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+            ssl_context.load_cert_chain(certfile=str(CERTIFICATE_PATH))
+
+        site = web.TCPSite(self._runner, host=self.host, port=self.port, ssl_context=ssl_context)
+        await site.start()
+
+        self.port = self._runner.addresses[0][1]
+
+        if self.tick_interval:
+            self._ticker = asyncio.ensure_future(self._tick())
+
+    async def _stop(self) -> None:
+        if self._ticker is not None:
+            self._ticker.cancel()
+
+        await self._close_sockets()
+        await self._runner.cleanup()
+
+    async def _close_sockets(self) -> None:
+        for socket in list(self._sockets):
+            await socket.close()
+
+    async def _handle(self, request) -> 'web.WebSocketResponse':
+        socket = web.WebSocketResponse(autoping=True)
+        await socket.prepare(request)
+
+        self._sockets[socket] = {}
+        self.connections += 1
+
+        try:
+            await socket.send_str(json.dumps({'topic': 'system', 'success': self.username, 'isFT': False, 'isPaper': True}))
+            await socket.send_str(json.dumps({'topic': 'sts', 'args': {'authenticated': True, 'competing': False}}))
+
+            async for message in socket:
+                if message.type == aiohttp.WSMsgType.TEXT:
+                    await self._receive(socket=socket, data=message.data)
+        finally:
+            self._sockets.pop(socket, None)
+
+        return socket
+
+    async def _receive(self, socket: 'web.WebSocketResponse', data: str) -> None:
+        if data == 'tic':
+            self.heartbeats += 1
+            await socket.send_str(json.dumps({'topic': 'tic', 'alive': True, 'lastAccessed': int(time.time() * 1000)}))
+
+        elif data.startswith('smd+'):
+            _, conid, arguments = data.split('+', 2)
+            fields = json.loads(arguments).get('fields', [])
+            self._sockets[socket][conid] = fields
+            self.subscribes += 1
+            await self._send_tick(socket=socket, conid=conid, values=None)
+
+        elif data.startswith('umd+'):
+            conid = data.split('+', 2)[1]
+            self._sockets[socket].pop(conid, None)
+            self.unsubscribes += 1
+
+        elif data.startswith('{'):
+            session = json.loads(data).get('session')
+            if session:
+                self.sessions.append(session)
+
+    async def _publish(self, conid: str, values: Dict[str, str]) -> int:
+        sent = 0
+        for socket, subscriptions in list(self._sockets.items()):
+            if conid in subscriptions:
+                await self._send_tick(socket=socket, conid=conid, values=values)
+                sent += 1
+
+        return sent
+
+    async def _send_tick(self, socket: 'web.WebSocketResponse', conid: str, values: Dict[str, str]) -> None:
+        if values is None:
+            made_up = quote_values(conid=conid)
+            values = {field: made_up.get(field, '') for field in self._sockets[socket].get(conid, [])}
+
+        tick = {
+            'server_id': 'q0',
+            'conidEx': conid,
+            'conid': int(conid) if conid.isdigit() else conid,
+            '_updated': int(time.time() * 1000),
+            '6119': 'q0',
+            'topic': 'smd+{}'.format(conid)
+        }
+        tick.update(values)
+
+        if not socket.closed:
+            await socket.send_str(json.dumps(tick))
+
+    async def _tick(self) -> None:
+        while True:
+            await asyncio.sleep(self.tick_interval)
+            for conid in list(self.subscriptions):
+                await self._publish(conid=conid, values=None)
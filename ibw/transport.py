@@ -0,0 +1,556 @@
+import ssl
+import threading
+import time
+from typing import Dict
+
+import requests
+import urllib3
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import InsecureRequestWarning
+
+from . import json_codec
+from . import request_log
+from .exceptions import IBConnectionError
+from .exceptions import parse_retry_after
+from .rate_limit import RateLimiter
+from .resilience import NO_RETRY
+from .resilience import CircuitBreaker
+from .resilience import RetryRules
+from .response_cache import ResponseCache
+from .single_flight import SingleFlight
+
+urllib3.disable_warnings(category=InsecureRequestWarning)
+
+
+class TransportConfig():
+
+    def __init__(self, pool_connections: int = 4, pool_maxsize: int = 16,
+                 pool_block: bool = False, keep_alive: bool = True,
+                 tls_session_reuse: bool = True, verify: bool = False,
+                 timeout: float = 30.0, rate_limit: bool = True,
+                 rate_limiter: RateLimiter = None, retry: bool = True,
+                 retry_rules: RetryRules = None, fail_fast: bool = True,
+                 circuit_breaker: CircuitBreaker = None, coalesce: bool = True,
+                 response_cache: ResponseCache = None) -> None:
+        """Initalizes a new instance of the TransportConfig Object.
+
+        Arguments:
+        ----
+        pool_connections {int} -- The number of per-host connection pools to
+            cache. The Client Portal Gateway is normally a single host, so a
+            small number is enough. (default: {4})
+
+        pool_maxsize {int} -- The maximum number of connections kept alive
+            for a single host. (default: {16})
+
+        pool_block {bool} -- If `True`, requests wait for a free connection
+            once `pool_maxsize` is reached instead of opening a throwaway
+            one. (default: {False})
+
+        keep_alive {bool} -- If `False`, every request is sent with
+            `Connection: close`. (default: {True})
+
+        tls_session_reuse {bool} -- If `True`, new connections to a host
+            resume the TLS session of a previous connection, which skips
+            the full handshake. (default: {True})
+
+        verify {bool} -- Verify the gateway certificate. The gateway ships
+            with a self-signed certificate. (default: {False})
+
+        timeout {float} -- Default timeout in seconds. (default: {30.0})
+
+        rate_limit {bool} -- If `True`, requests are throttled client side to
+            the gateway's limits, with orders served first. (default: {True})
+
+        rate_limiter {RateLimiter} -- The limiter to use, pass the same one to
+            several transports to share the limits. Defaults to a limiter
+            with the gateway's documented limits. (default: {None})
+
+        retry {bool} -- If `True`, transient failures are retried with a
+            jittered exponential backoff. Only idempotent requests are
+            retried, orders never are. (default: {True})
+
+        retry_rules {RetryRules} -- The per endpoint retry policies. Defaults
+            to three retries of GET requests and of the read-only POST
+            endpoints. (default: {None})
+
+        fail_fast {bool} -- If `True`, a circuit breaker stops sending
+            requests for a while after repeated server or connection
+            errors. (default: {True})
+
+        circuit_breaker {CircuitBreaker} -- The breaker to use. Defaults to
+            one opening after 5 consecutive failures for 30 seconds.
+            (default: {None})
+
+        coalesce {bool} -- If `True`, identical GET requests made while one
+            is in flight wait for it and share its result instead of
+            sending their own. (default: {True})
+
+        response_cache {ResponseCache} -- Keeps the responses of slow
+            changing reference endpoints, pass the same one to several
+            transports to share it. Nothing is cached if `None`. (default: {None})
+        """
+
+        self.pool_connections = pool_connections
+        self.pool_maxsize = pool_maxsize
+        self.pool_block = pool_block
+        self.keep_alive = keep_alive
+        self.tls_session_reuse = tls_session_reuse
+        self.verify = verify
+        self.timeout = timeout
+        self.rate_limit = rate_limit
+        self.rate_limiter = rate_limiter
+        self.retry = retry
+        self.retry_rules = retry_rules
+        self.fail_fast = fail_fast
+        self.circuit_breaker = circuit_breaker
+        self.coalesce = coalesce
+        self.response_cache = response_cache
+
+    def create_rate_limiter(self) -> RateLimiter:
+        """Returns the limiter a transport should use, `None` if disabled."""
+
+        if not self.rate_limit:
+            return None
+
+        return self.rate_limiter or RateLimiter()
+
+    def create_retry_rules(self) -> RetryRules:
+        """Returns the retry policies a transport should use, `None` if disabled."""
+
+        if not self.retry:
+            return None
+
+        return self.retry_rules or RetryRules()
+
+    def create_circuit_breaker(self) -> CircuitBreaker:
+        """Returns the breaker a transport should use, `None` if disabled."""
+
+        if not self.fail_fast:
+            return None
+
+        return self.circuit_breaker or CircuitBreaker()
+
+
+class BufferedResponse():
+
+    def __init__(self, status_code: int, headers: Dict, url: str, content: bytes) -> None:
+        """Initalizes a new instance of the BufferedResponse Object.
+
+        A fully read response, exposing the members of `requests.Response`
+        the clients rely on so both transports share one code path.
+
+        Arguments:
+        ----
+        status_code {int} -- The HTTP status code.
+
+        headers {Dict} -- The response headers.
+
+        url {str} -- The final URL of the request.
+
+        content {bytes} -- The raw response body.
+        """
+
+        self.status_code = status_code
+        self.headers = headers
+        self.url = url
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json_codec.loads(self.content)
+
+
+def retry_after(response) -> float:
+    """Returns the seconds a response asks to wait, `None` if it doesn't say."""
+
+    return parse_retry_after(response.headers.get('Retry-After'))
+
+
+class _SessionCachingSocket(ssl.SSLSocket):
+    """An SSL socket that hands its TLS session back to the context on close.
+
+    With TLS 1.3 the session ticket arrives after the handshake, so the
+    session is only worth keeping once the connection has been used.
+    """
+
+    def _real_close(self):
+        peer = getattr(self, '_tls_peer', None)
+        if peer is not None and self._sslobj is not None:
+            session = self.session
+            if session is not None:
+                self.context.tls_sessions[peer] = session
+        super()._real_close()
+
+
+class _SessionReuseContext(ssl.SSLContext):
+    """An SSL context that resumes the last TLS session for each peer."""
+
+    sslsocket_class = _SessionCachingSocket
+
+    def wrap_socket(self, sock, *args, **kwargs):
+
+        # Key the sessions by the peer address, the gateway is often
+        # addressed by IP which means there is no server hostname.
+        try:
+            peer = sock.getpeername()[:2]
+        except OSError:
+            peer = None
+
+        if peer is not None and kwargs.get('session') is None:
+            kwargs['session'] = self.tls_sessions.get(peer)
+
+        ssl_sock = super().wrap_socket(sock, *args, **kwargs)
+        ssl_sock._tls_peer = peer
+
+        if ssl_sock.session_reused:
+            self.tls_resumed += 1
+        else:
+            self.tls_handshakes += 1
+
+        return ssl_sock
+
+
+def _create_ssl_context(config: TransportConfig) -> ssl.SSLContext:
+    """Builds the SSL context shared by every connection of a transport.
+
+    Arguments:
+    ----
+    config {TransportConfig} -- The transport configuration.
+
+    Returns:
+    ----
+    {ssl.SSLContext} -- The SSL context.
+    """
+
+    if config.tls_session_reuse:
+        context = _SessionReuseContext(ssl.PROTOCOL_TLS_CLIENT)
+        context.tls_sessions = {}
+        context.tls_resumed = 0
+        context.tls_handshakes = 0
+    else:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+
+    if config.verify:
+        context.load_default_certs()
+    else:
+        context.check_hostname = False
+        context.verify_mode = ssl.CERT_NONE
+
+    return context
+
+
+class _PooledAdapter(HTTPAdapter):
+    """A `HTTPAdapter` that hands a shared SSL context to its pools."""
+
+    def __init__(self, config: TransportConfig, **kwargs) -> None:
+        self.ssl_context = _create_ssl_context(config=config)
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs['ssl_context'] = self.ssl_context
+        return super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+
+
+class IBTransport():
+
+    def __init__(self, config: TransportConfig = None) -> None:
+        """Initalizes a new instance of the IBTransport Object.
+
+        The transport owns a `requests.Session` with a pool of keep-alive
+        connections, so repeated calls to the gateway reuse the same TCP
+        connection and TLS session instead of paying for a new handshake
+        on every request.
+
+        Keyword Arguments:
+        ----
+        config {TransportConfig} -- The pool configuration. (default: {None})
+
+        Usage:
+        ----
+            >>> transport = IBTransport(
+                config=TransportConfig(pool_maxsize=32)
+            )
+            >>> response = transport.request(
+                method='GET',
+                url='https://localhost:5000/v1/portal/iserver/accounts'
+            )
+        """
+
+        self.config = config or TransportConfig()
+
+        self._adapter = _PooledAdapter(
+            config=self.config,
+            pool_connections=self.config.pool_connections,
+            pool_maxsize=self.config.pool_maxsize,
+            pool_block=self.config.pool_block
+        )
+
+        self.session = requests.Session()
+        self.session.mount('https://', self._adapter)
+        self.session.mount('http://', self._adapter)
+
+        if not self.config.keep_alive:
+            self.session.headers['Connection'] = 'close'
+
+        self.rate_limiter = self.config.create_rate_limiter()
+        self.retry_rules = self.config.create_retry_rules()
+        self.circuit_breaker = self.config.create_circuit_breaker()
+        self.single_flight = SingleFlight() if self.config.coalesce else None
+        self.response_cache = self.config.response_cache
+
+        self._lock = threading.Lock()
+        self._requests_sent = 0
+
+    def request(self, method: str, url: str, headers: Dict = None,
+                params: dict = None, json: dict = None,
+                timeout: float = None) -> requests.Response:
+        """Sends a request through the connection pool.
+
+        Connection errors and transient statuses are retried after a
+        backoff, as the endpoint's `RetryPolicy` allows. Once the retries
+        are used up the last response is returned, or the last connection
+        error raised as an `IBConnectionError`. Responses kept by the response cache are returned
+        without a round trip.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method, one of ['GET','POST','DELETE','PUT'].
+
+        url {str} -- The full URL of the request.
+
+        Keyword Arguments:
+        ----
+        headers {Dict} -- The request headers. (default: {None})
+
+        params {dict} -- The query string parameters. (default: {None})
+
+        json {dict} -- The JSON payload. (default: {None})
+
+        timeout {float} -- Overrides the configured timeout. (default: {None})
+
+        Raises:
+        ----
+        IBCircuitOpenError -- The circuit breaker is open.
+
+        IBConnectionError -- The gateway couldn't be reached.
+
+        Returns:
+        ----
+        {requests.Response} -- The response object.
+        """
+
+        # Reference data is served from the cache while it's fresh.
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.key_for(method=method, url=url, params=params, json=json)
+            content = self.response_cache.get(cache_key) if cache_key is not None else None
+            if content is not None:
+                return BufferedResponse(
+                    status_code=200,
+                    headers={'Content-Type': 'application/json'},
+                    url=url,
+                    content=content
+                )
+
+        policy = NO_RETRY
+        if self.retry_rules is not None:
+            policy = self.retry_rules.policy_for(method=method, url=url)
+
+        attempt = 0
+
+        while True:
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request(url=url)
+
+            try:
+                response = self._send(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    timeout=timeout
+                )
+            except requests.RequestException as error:
+                self._record_outcome(status_code=None)
+                if not policy.should_retry(method=method, attempt=attempt):
+                    raise IBConnectionError(str(error), url=url) from error
+                delay = policy.backoff(attempt=attempt)
+            except Exception:
+                # Anything else still settles a half-open trial.
+                self._record_outcome(status_code=None)
+                raise
+            else:
+                self._record_outcome(status_code=response.status_code)
+                wait = self._throttled(method=method, url=url, response=response)
+                if not policy.should_retry(method=method, attempt=attempt, status_code=response.status_code):
+                    if cache_key is not None and response.ok:
+                        self.response_cache.put(key=cache_key, content=response.content)
+                    return response
+                delay = policy.backoff(attempt=attempt, retry_after=wait)
+
+            attempt += 1
+            time.sleep(delay)
+
+    def _send(self, method: str, url: str, headers: Dict, params: dict,
+              json: dict, timeout: float) -> requests.Response:
+        """Sends a single attempt of a request."""
+
+        # Wait for our turn, orders jump ahead of queued market data.
+        permit = None
+        if self.rate_limiter is not None:
+            permit = self.rate_limiter.acquire(method=method, url=url)
+
+        with self._lock:
+            self._requests_sent += 1
+
+        start = time.perf_counter()
+
+        try:
+            response = self.session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=params,
+                json=json,
+                verify=self.config.verify,
+                timeout=timeout or self.config.timeout
+            )
+        finally:
+            if permit is not None:
+                self.rate_limiter.release(permit)
+
+        request_log.log_request(
+            method=method,
+            url=url,
+            status_code=response.status_code,
+            elapsed=time.perf_counter() - start,
+            size=len(response.content)
+        )
+
+        return response
+
+    def _record_outcome(self, status_code: int = None) -> None:
+        """Tells the circuit breaker how an attempt went.
+
+        Only server errors and connection errors, `status_code` of `None`,
+        count against the gateway. A 4xx is the caller's problem.
+        """
+
+        if self.circuit_breaker is None:
+            return
+
+        if status_code is None or status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _throttled(self, method: str, url: str, response) -> float:
+        """Returns the response's `Retry-After`, holding back its rate class on a 429."""
+
+        wait = retry_after(response)
+
+        if response.status_code == 429 and self.rate_limiter is not None:
+            self.rate_limiter.penalize(method=method, url=url, seconds=wait or 1.0)
+
+        return wait
+
+    def pool_stats(self) -> Dict:
+        """Returns usage statistics for the connection pools.
+
+        Returns:
+        ----
+        {Dict} -- The number of requests sent, the full and resumed TLS
+            handshakes, for each host the number of connections opened, the
+            requests they served and the idle connections in the pool, the
+            requests queued by the rate limiter, the breaker state, the
+            requests saved by coalescing and the cache hits and misses.
+        """
+
+        pools = {}
+        pool_manager = self._adapter.poolmanager
+
+        for key in pool_manager.pools.keys():
+            pool = pool_manager.pools.get(key)
+            if pool is None:
+                continue
+
+            # The pool queue is padded with `None` placeholders.
+            idle = [conn for conn in list(pool.pool.queue) if conn is not None] if pool.pool else []
+
+            pools['{}://{}:{}'.format(key.key_scheme, key.key_host, key.key_port)] = {
+                'connections_opened': pool.num_connections,
+                'requests': pool.num_requests,
+                'idle_connections': len(idle),
+                'maxsize': pool.pool.maxsize if pool.pool is not None else 0
+            }
+
+        context = self._adapter.ssl_context
+
+        return {
+            'requests_sent': self._requests_sent,
+            'tls_handshakes': getattr(context, 'tls_handshakes', None),
+            'tls_sessions_resumed': getattr(context, 'tls_resumed', None),
+            'pools': pools,
+            'rate_limits': self.rate_limiter.stats() if self.rate_limiter is not None else None,
+            'circuit_breaker': self.circuit_breaker.stats() if self.circuit_breaker is not None else None,
+            'coalescing': self.single_flight.stats() if self.single_flight is not None else None,
+            'response_cache': self.response_cache.stats() if self.response_cache is not None else None
+        }
+
+    def close(self) -> None:
+        """Closes the session and every pooled connection."""
+
+        self.session.close()
+
+
+_transports: Dict[str, IBTransport] = {}
+_transports_lock = threading.Lock()
+
+
+def get_transport(gateway_path: str, config: TransportConfig = None) -> IBTransport:
+    """Returns the transport shared by every client of a gateway.
+
+    The first call for a gateway creates the transport, later calls return
+    the same object so `IBClient`, `IBAccounts`, `IBMarket` and `IBOrder`
+    instances all draw from one connection pool.
+
+    Arguments:
+    ----
+    gateway_path {str} -- The gateway root, e.g. `https://localhost:5000`.
+
+    Keyword Arguments:
+    ----
+    config {TransportConfig} -- The configuration used if the transport
+        does not exist yet. (default: {None})
+
+    Returns:
+    ----
+    {IBTransport} -- The shared transport.
+    """
+
+    with _transports_lock:
+        transport = _transports.get(gateway_path)
+        if transport is None:
+            transport = IBTransport(config=config)
+            _transports[gateway_path] = transport
+
+    return transport
+
+
+def close_transports() -> None:
+    """Closes and forgets every shared transport."""
+
+    with _transports_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
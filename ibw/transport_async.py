@@ -0,0 +1,305 @@
+import asyncio
+import time
+from typing import Dict
+
+from . import request_log
+from .exceptions import IBConnectionError
+from .resilience import NO_RETRY
+from .single_flight import AsyncSingleFlight
+from .transport import BufferedResponse
+from .transport import TransportConfig
+from .transport import _create_ssl_context
+from .transport import retry_after
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class AsyncIBTransport():
+
+    def __init__(self, config: TransportConfig = None, max_concurrency: int = 100) -> None:
+        """Initalizes a new instance of the AsyncIBTransport Object.
+
+        The asyncio counterpart of `IBTransport`. It holds one `aiohttp`
+        session with a pool of keep-alive connections, and caps the number
+        of requests in flight so a large fan out queues on the event loop
+        instead of overwhelming the gateway.
+
+        Keyword Arguments:
+        ----
+        config {TransportConfig} -- The pool configuration. (default: {None})
+
+        max_concurrency {int} -- The maximum number of requests in flight
+            at once. (default: {100})
+        """
+
+        if aiohttp is None:
+            raise ImportError(
+                'The asyncio transport requires `aiohttp`, install it with `pip install aiohttp`.'
+            )
+
+        self.config = config or TransportConfig()
+        self.max_concurrency = max_concurrency
+
+        self.rate_limiter = self.config.create_rate_limiter()
+        self.retry_rules = self.config.create_retry_rules()
+        self.circuit_breaker = self.config.create_circuit_breaker()
+        self.single_flight = AsyncSingleFlight() if self.config.coalesce else None
+        self.response_cache = self.config.response_cache
+
+        self._session = None
+        self._semaphore = None
+        self._requests_sent = 0
+        self._in_flight = 0
+
+    def _ensure_session(self) -> None:
+        """Creates the session on the running event loop."""
+
+        if self._session is not None and not self._session.closed:
+            return
+
+        ssl_context = _create_ssl_context(config=self.config)
+
+        connector = aiohttp.TCPConnector(
+            limit=self.config.pool_maxsize,
+            limit_per_host=self.config.pool_maxsize,
+            ssl=ssl_context,
+            force_close=not self.config.keep_alive
+        )
+
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=self.config.timeout)
+        )
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+
+    @staticmethod
+    def _prepare_params(params: dict) -> dict:
+        """Converts the parameters the same way `requests` does.
+
+        `aiohttp` only accepts strings, so booleans and numbers are turned
+        into strings and `None` values are dropped.
+
+        Arguments:
+        ----
+        params {dict} -- The query string parameters.
+
+        Returns:
+        ----
+        {dict} -- The cleaned parameters.
+        """
+
+        if params is None:
+            return None
+
+        return {
+            key: str(value) for key, value in params.items() if value is not None
+        }
+
+    async def request(self, method: str, url: str, headers: Dict = None,
+                      params: dict = None, json: dict = None,
+                      timeout: float = None) -> BufferedResponse:
+        """Sends a request through the connection pool.
+
+        Waits for the rate limiter and then for a free concurrency slot. If
+        the calling task is cancelled, the slot and the connection are
+        released. Failed attempts are retried like `IBTransport.request`
+        does, sleeping on the event loop in between.
+
+        Arguments:
+        ----
+        method {str} -- The HTTP method, one of ['GET','POST','DELETE','PUT'].
+
+        url {str} -- The full URL of the request.
+
+        Keyword Arguments:
+        ----
+        headers {Dict} -- The request headers. (default: {None})
+
+        params {dict} -- The query string parameters. (default: {None})
+
+        json {dict} -- The JSON payload. (default: {None})
+
+        timeout {float} -- Overrides the configured timeout. (default: {None})
+
+        Returns:
+        ----
+        {BufferedResponse} -- The fully read response.
+        """
+
+        self._ensure_session()
+
+        request_timeout = None
+        if timeout is not None:
+            request_timeout = aiohttp.ClientTimeout(total=timeout)
+
+        # Reference data is served from the cache while it's fresh.
+        cache_key = None
+        if self.response_cache is not None:
+            cache_key = self.response_cache.key_for(method=method, url=url, params=params, json=json)
+            content = self.response_cache.get(cache_key) if cache_key is not None else None
+            if content is not None:
+                return BufferedResponse(
+                    status_code=200,
+                    headers={'Content-Type': 'application/json'},
+                    url=url,
+                    content=content
+                )
+
+        policy = NO_RETRY
+        if self.retry_rules is not None:
+            policy = self.retry_rules.policy_for(method=method, url=url)
+
+        attempt = 0
+
+        while True:
+
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.before_request(url=url)
+
+            try:
+                response = await self._attempt(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    timeout=request_timeout
+                )
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self._record_outcome(status_code=None)
+                if not policy.should_retry(method=method, attempt=attempt):
+                    raise IBConnectionError(str(error) or type(error).__name__, url=url) from error
+                delay = policy.backoff(attempt=attempt)
+            except asyncio.CancelledError:
+                if self.circuit_breaker is not None:
+                    self.circuit_breaker.release_trial()
+                raise
+            except Exception:
+                # Anything else still settles a half-open trial.
+                self._record_outcome(status_code=None)
+                raise
+            else:
+                self._record_outcome(status_code=response.status_code)
+                wait = self._throttled(method=method, url=url, response=response)
+                if not policy.should_retry(method=method, attempt=attempt, status_code=response.status_code):
+                    if cache_key is not None and response.ok:
+                        self.response_cache.put(key=cache_key, content=response.content)
+                    return response
+                delay = policy.backoff(attempt=attempt, retry_after=wait)
+
+            attempt += 1
+            await asyncio.sleep(delay)
+
+    async def _attempt(self, method: str, url: str, headers: Dict, params: dict,
+                       json: dict, timeout) -> BufferedResponse:
+        """Sends a single attempt of a request."""
+
+        # Take a concurrency slot first, so at most `max_concurrency`
+        # coroutines wait on the rate limiter, then wait for our turn,
+        # orders jump ahead of queued market data.
+        async with self._semaphore:
+
+            permit = None
+            if self.rate_limiter is not None:
+                permit = await self.rate_limiter.acquire_async(method=method, url=url)
+
+            try:
+                return await self._send(
+                    method=method,
+                    url=url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    timeout=timeout
+                )
+            finally:
+                if permit is not None:
+                    self.rate_limiter.release(permit)
+
+    def _record_outcome(self, status_code: int = None) -> None:
+        """Tells the circuit breaker how an attempt went."""
+
+        if self.circuit_breaker is None:
+            return
+
+        if status_code is None or status_code >= 500:
+            self.circuit_breaker.record_failure()
+        else:
+            self.circuit_breaker.record_success()
+
+    def _throttled(self, method: str, url: str, response: BufferedResponse) -> float:
+        """Returns the response's `Retry-After`, holding back its rate class on a 429."""
+
+        wait = retry_after(response)
+
+        if response.status_code == 429 and self.rate_limiter is not None:
+            self.rate_limiter.penalize(method=method, url=url, seconds=wait or 1.0)
+
+        return wait
+
+    async def _send(self, method: str, url: str, headers: Dict, params: dict,
+                    json: dict, timeout) -> BufferedResponse:
+        """Sends the request, `_attempt` holds a concurrency slot."""
+
+        self._requests_sent += 1
+        self._in_flight += 1
+        start = time.perf_counter()
+
+        try:
+            async with self._session.request(
+                method=method,
+                url=url,
+                headers=headers,
+                params=self._prepare_params(params=params),
+                json=json,
+                timeout=timeout
+            ) as response:
+                content = await response.read()
+
+                request_log.log_request(
+                    method=method,
+                    url=url,
+                    status_code=response.status,
+                    elapsed=time.perf_counter() - start,
+                    size=len(content)
+                )
+
+                return BufferedResponse(
+                    status_code=response.status,
+                    headers=response.headers,
+                    url=str(response.url),
+                    content=content
+                )
+        finally:
+            self._in_flight -= 1
+
+    def pool_stats(self) -> Dict:
+        """Returns usage statistics for the transport.
+
+        Returns:
+        ----
+        {Dict} -- The number of requests sent, the requests in flight, the
+            configured limits, the requests queued by the rate limiter, the
+            breaker state, the requests saved by coalescing and the cache
+            hits and misses.
+        """
+
+        return {
+            'requests_sent': self._requests_sent,
+            'in_flight': self._in_flight,
+            'max_concurrency': self.max_concurrency,
+            'pool_maxsize': self.config.pool_maxsize,
+            'rate_limits': self.rate_limiter.stats() if self.rate_limiter is not None else None,
+            'circuit_breaker': self.circuit_breaker.stats() if self.circuit_breaker is not None else None,
+            'coalescing': self.single_flight.stats() if self.single_flight is not None else None,
+            'response_cache': self.response_cache.stats() if self.response_cache is not None else None
+        }
+
+    async def close(self) -> None:
+        """Closes the session and every pooled connection."""
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
@@ -0,0 +1,171 @@
+"""Generates `ibw/fields.py` from the column catalog in `samples/responses/sample_column_ids.jsonc`.
+
+Run it again whenever the catalog changes:
+
+    python resources/generate_fields.py
+"""
+
+import pathlib
+import pprint
+import re
+import sys
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from ibw.testing.gateway import load_sample  # noqa: E402
+
+CATALOG = 'responses/sample_column_ids.jsonc'
+OUTPUT = ROOT.joinpath('ibw', 'fields.py')
+
+# Snapshot fields the gateway documents but the catalog doesn't list.
+EXTRA_FIELDS = [
+    (58, 'TEXT', 'Text', 'TEXT'),
+    (75, 'UNREALIZED_PNL_RAW', 'Unrealized P&L Raw', 'NUMBER'),
+    (6004, 'EXCHANGE', 'Exchange', 'TEXT'),
+    (6008, 'CONID', 'Contract ID', 'INTEGER'),
+    (6072, 'MONTHS', 'Months', 'TEXT'),
+    (6073, 'REGULAR_EXPIRY', 'Regular Expiry', 'TEXT'),
+    (6119, 'MARKER', 'Marker for market data delivery method', 'TEXT'),
+    (6457, 'UNDERLYING_CONID', 'Underlying Contract ID', 'INTEGER'),
+    (6508, 'SERVICE_PARAMS', 'Service Params', 'TEXT'),
+    (6509, 'MARKET_DATA_AVAILABILITY', 'Market Data Availability', 'TEXT'),
+    (7051, 'COMPANY_NAME', 'Company Name', 'TEXT'),
+    (7086, 'OPTION_PUT_CALL_VOLUME', 'Put/Call Volume', 'NUMBER'),
+    (7094, 'CONID_EXCHANGE', 'Contract ID and Exchange', 'TEXT'),
+    (7184, 'CAN_BE_TRADED', 'Can Be Traded', 'INTEGER'),
+    (7219, 'CONTRACT_DESCRIPTION', 'Contract Description', 'TEXT'),
+    (7220, 'CONTRACT_DESCRIPTION_2', 'Contract Description', 'TEXT'),
+    (7221, 'LISTING_EXCHANGE', 'Listing Exchange', 'TEXT'),
+    (7283, 'OPTION_IMPLIED_VOL_PCT', 'Option Implied Vol. %', 'PERCENT'),
+    (7284, 'HISTORICAL_VOL_30D_PCT', 'Hist. Vol. (30d) %', 'PERCENT'),
+    (7291, 'EPS', 'EPS', 'NUMBER'),
+    (7700, 'PROBABILITY_MAX_RETURN', 'Probability of Max Return', 'NUMBER'),
+    (7702, 'PROBABILITY_MAX_LOSS', 'Probability of Max Loss', 'NUMBER'),
+    (7741, 'PRIOR_CLOSE', 'Prior Close', 'PRICE'),
+    (7762, 'VOLUME_LONG', 'Volume Long', 'SIZE'),
+    (7768, 'HAS_TRADING_PERMISSIONS', 'Has Trading Permissions', 'TEXT'),
+    (7920, 'DAILY_PNL_RAW', 'Daily P&L Raw', 'NUMBER'),
+    (7921, 'COST_BASIS_RAW', 'Cost Basis Raw', 'NUMBER')
+]
+
+# Prices can be sent with a `C` (prior close) or `H` (halted) prefix.
+PRICES = {
+    'LAST', 'BID', 'ASK', 'HIGH', 'LOW', 'OPEN', 'CLOSE', 'MARK_PRICE', 'MID', 'VWAP',
+    'UNDERLYING_PRICE', 'AVG_PRICE', 'HIGH_52_WEEK', 'LOW_52_WEEK', 'CHANGE',
+    'REAL_CHANGE_SINCE_OPEN', 'SPREAD', 'EMA_20', 'EMA_50', 'EMA_100', 'EMA_200'
+}
+
+# Sizes and volumes can be sent with a `K`, `M` or `B` suffix.
+SIZE_PATTERN = re.compile(r'SIZE|VOLUME|MKT_CAP|SHARES|OPEN_INTEREST|TOT_NET_ASST|MARKET_VALUE|COST_BASIS')
+
+TEXT_GROUPS = {'G-3', 'G27', 'G48', 'G49'}
+TEXT_PATTERN = re.compile(
+    r'DATE|EXCH|TYPE|CLASS|NAME|CATEGORY|CATEG|FAMILY|STATUS|INDUSTRY|CURRENCY|RATING|COUNTRIES|'
+    r'FOCUS|SCHEME|CODE|EVENT$|EARNINGS$|MEETING$|SHORTABLE$|IN_THE_MONEY|OPTIMAL_ACTION|'
+    r'LIQUIDATE_LAST|BM_INDEX|ASSET_UNIV|CLOSED|CLSD_|ELIG|NO_TX_FEES|CLASSIFICATION|INSTRUMENT'
+)
+NUMERIC_IN_TEXT_GROUPS = {'MULTIPLIER', 'DAYS_TO_LTD', 'TOT_EXP_RATIO', 'MIN_INIT_PUR', 'PROJ_YIELD',
+                          'YIELD_1YR', 'YIELD_TO_MATURITY', 'AVG_QUALITY', 'DIV_YIELD_WGT_AVG',
+                          'GRWTH_ANN_3YR', 'GRWTH_ANN_5YR', 'GRWTH_ANN_10YR', 'SHRT_TRM_REDEMP'}
+
+
+def value_type(column: dict) -> str:
+    """Infers how the values of a column are sent."""
+
+    identifier = column['id']
+    groups = set(column.get('groups') or [])
+
+    if identifier in PRICES:
+        return 'PRICE'
+    if identifier in NUMERIC_IN_TEXT_GROUPS:
+        return 'NUMBER'
+    if '%' in column['name'] or identifier.endswith('_PCT') or 'PERCENT' in identifier:
+        return 'PERCENT'
+    if TEXT_PATTERN.search(identifier) or (groups & TEXT_GROUPS and not identifier.startswith('LDR_')):
+        return 'TEXT'
+    if SIZE_PATTERN.search(identifier):
+        return 'SIZE'
+
+    return 'NUMBER'
+
+
+def member_name(identifier: str) -> str:
+    """Turns a catalog ID into a valid enum member name."""
+
+    name = re.sub(r'[^0-9A-Za-z]+', '_', identifier).strip('_').upper()
+
+    if name[0].isdigit():
+        name = 'FIELD_' + name
+
+    return name
+
+
+def generate() -> str:
+    catalog = load_sample(CATALOG)
+
+    columns = {}
+    for column in catalog['selected_columns'] + catalog['available_columns']:
+        columns.setdefault(column['fix_tag'], column)
+
+    fields = []
+    for fix_tag, column in sorted(columns.items()):
+        fields.append((str(fix_tag), member_name(column['id']), column['name'].strip(),
+                       value_type(column), tuple(column.get('groups') or [])))
+
+    for fix_tag, identifier, name, kind in EXTRA_FIELDS:
+        if fix_tag not in columns:
+            fields.append((str(fix_tag), identifier, name, kind, ()))
+
+    fields.sort(key=lambda field: int(field[0]))
+
+    groups = {group['id']: group['name'] for group in catalog['groups']}
+
+    lines = [
+        '"""The market data fields of the snapshot and streaming endpoints.',
+        '',
+        'This file is generated by `resources/generate_fields.py` from',
+        '`samples/responses/sample_column_ids.jsonc`, do not edit it by hand.',
+        '"""',
+        '',
+        'import enum',
+        'from typing import Dict',
+        'from typing import Tuple',
+        '',
+        '',
+        'class FieldType(enum.Enum):',
+        '    """How the values of a field are sent."""',
+        '',
+        "    TEXT = 'text'",
+        "    INTEGER = 'integer'",
+        "    NUMBER = 'number'",
+        "    PRICE = 'price'",
+        "    PERCENT = 'percent'",
+        "    SIZE = 'size'",
+        '',
+        '',
+        'class Field(str, enum.Enum):',
+        '    """The market data fields, the value of each member is its fix tag."""',
+        ''
+    ]
+
+    for fix_tag, identifier, _, _, _ in fields:
+        lines.append("    {} = '{}'".format(identifier, fix_tag))
+
+    lines += ['', '', '# fix tag -> (name, value type, groups)', 'FIELD_INFO: Dict[str, Tuple[str, FieldType, Tuple[str, ...]]] = {']
+
+    for index, (fix_tag, _, name, kind, field_groups) in enumerate(fields):
+        separator = ',' if index < len(fields) - 1 else ''
+        lines.append("    '{}': ({!r}, FieldType.{}, {!r}){}".format(fix_tag, name, kind, field_groups, separator))
+
+    lines += ['}', '', '# group id -> name', 'GROUPS: Dict[str, str] = {']
+    group_lines = pprint.pformat(groups, indent=4, width=120)[1:-1].splitlines()
+    lines += ['    ' + line.strip() for line in group_lines]
+    lines += ['}', '']
+
+    return '\n'.join(lines)
+
+
+if __name__ == '__main__':
+    OUTPUT.write_text(generate(), encoding='utf-8')
+    print('Wrote {}'.format(OUTPUT))
@@ -0,0 +1,150 @@
+"""Unit test module for the on-disk bar store."""
+
+import datetime
+import tempfile
+import unittest
+from unittest import TestCase
+from unittest import mock
+
+from ibw.client import IBClient
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+START = datetime.datetime(2022, 1, 1)
+END = datetime.datetime(2022, 3, 1)
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class InteractiveBrokersBarStore(TestCase):
+
+    """Will perform a unit test for the on-disk bar store."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a store in a temporary folder."""
+
+        from ibw.bar_store import BarStore
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+        self.store = BarStore(root=self.folder.name, client=self.client)
+
+    def test_ranges(self):
+        """Ensure ranges are merged and the uncovered parts are found."""
+
+        from ibw.bar_store import merge_ranges
+        from ibw.bar_store import subtract_ranges
+
+        self.assertEqual(merge_ranges([(5, 8), (0, 2), (2, 4), (7, 9)]), [(0, 4), (5, 9)])
+        self.assertEqual(subtract_ranges(0, 10, [(2, 4), (6, 8)]), [(0, 2), (4, 6), (8, 10)])
+        self.assertEqual(subtract_ranges(3, 7, [(0, 10)]), [])
+
+    def test_warm_start(self):
+        """Ensure a second `get` of the same range reads the files without any request."""
+
+        cold = self.store.get(conids=['265598'], bar='1h', start=START, end=END)
+        requests = self.gateway.requests
+
+        warm = self.store.get(conids=['265598'], bar='1h', start=START, end=END)
+
+        self.assertEqual(self.gateway.requests, requests)
+        self.assertIsInstance(warm['265598'].close, np.memmap)
+        self.assertEqual(len(warm['265598']), 59 * 24)
+        np.testing.assert_array_equal(warm['265598'].close, cold['265598'].close)
+
+    def test_tail_and_backfill(self):
+        """Ensure only the missing tail is requested and older bars are merged in order."""
+
+        self.store.get(conids=['265598'], bar='1h', start=START, end=END)
+
+        end = END.replace(tzinfo=datetime.timezone.utc).timestamp()
+        missing = self.store.missing(conid='265598', bar='1h', start=START, end=end + 86400)
+        self.assertEqual(missing, [(end, end + 86400)])
+
+        requests = self.gateway.requests
+        self.store.get(conids=['265598'], bar='1h', start=START, end=datetime.datetime(2022, 3, 2))
+        self.assertEqual(self.gateway.requests, requests + 1)
+
+        bars = self.store.get(conids=['265598'], bar='1h', start=datetime.datetime(2021, 12, 1), end=datetime.datetime(2022, 3, 2))
+
+        self.assertEqual(len(bars['265598']), 91 * 24)
+        self.assertEqual(set(np.diff(bars['265598'].time).tolist()), {3600 * 1000})
+        self.assertEqual(len(self.store.coverage(conid='265598', bar='1h')), 1)
+
+    def test_failed_ranges_are_retried(self):
+        """Ensure a range that failed is left uncovered and downloaded by the next `get`."""
+
+        self.gateway.configure(r'^iserver/marketdata/history$', error_rate=1.0)
+        bars = self.store.get(conids=['265598'], bar='1d', start=START, end=END)
+
+        self.assertEqual(len(bars['265598']), 0)
+        self.assertEqual(self.store.coverage(conid='265598', bar='1d'), [])
+
+        self.gateway.reset()
+        bars = self.store.get(conids=['265598'], bar='1d', start=START, end=END)
+
+        self.assertEqual(len(bars['265598']), 59)
+
+    def test_interrupted_append(self):
+        """Ensure bytes written after the last committed bar are ignored and overwritten."""
+
+        self.store.get(conids=['265598'], bar='1d', start=START, end=END)
+
+        with open(self.store.path(conid='265598', bar='1d').joinpath('close'), 'ab') as file:
+            file.write(b'\x00' * 12)
+
+        self.assertEqual(len(self.store.load(conid='265598', bar='1d')), 59)
+
+        bars = self.store.get(conids=['265598'], bar='1d', start=START, end=datetime.datetime(2022, 3, 3))
+        self.assertEqual(len(bars['265598']), 61)
+        self.assertFalse(np.isnan(bars['265598'].close).any())
+
+    def test_interrupted_rewrite(self):
+        """Ensure a rewrite that fails before `meta.json` is saved leaves the series as it was."""
+
+        self.store.get(conids=['265598'], bar='1d', start=START, end=END)
+        before = self.store.load(conid='265598', bar='1d')
+        close = np.array(before.close)
+
+        with mock.patch.object(self.store, '_save_meta', side_effect=OSError('Disk full.')):
+            with self.assertRaises(OSError):
+                self.store.get(conids=['265598'], bar='1d', start=datetime.datetime(2021, 12, 1), end=END)
+
+        after = self.store.load(conid='265598', bar='1d')
+        self.assertEqual(len(after), 59)
+        np.testing.assert_array_equal(after.close, close)
+
+        bars = self.store.get(conids=['265598'], bar='1d', start=datetime.datetime(2021, 12, 1), end=END)
+        self.assertEqual(len(bars['265598']), 90)
+        self.assertEqual(set(np.diff(bars['265598'].time).tolist()), {86400 * 1000})
+
+        folder = self.store.path(conid='265598', bar='1d')
+        self.assertEqual(sorted(child.name for child in folder.iterdir() if child.name.startswith('close')), ['close.1'])
+        np.testing.assert_array_equal(before.close, close)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in and remove the store."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+        self.folder.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Unit test module for the asyncio client.
+
+Runs a small local HTTP server and drives the client's endpoints through it.
+"""
+
+import asyncio
+import contextlib
+import io
+import json
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest import TestCase
+
+from ibw.testing.gateway import LocalGateway
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        if 'slow' in self.path:
+            time.sleep(0.2)
+
+        body = json.dumps({'method': self.command, 'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        self.rfile.read(length)
+        self._reply()
+
+    def log_message(self, *args):
+        pass
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class InteractiveBrokersAsyncClient(TestCase):
+
+    """Will perform a unit test for the asyncio client."""
+
+    def setUp(self) -> None:
+        """Start the local server and create the client."""
+
+        from ibw.client_async import AsyncIBClient
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.ibw_client = AsyncIBClient(
+            username='PAPER_USERNAME',
+            account='PAPER_ACCOUNT',
+            client_gateway_path='clientportal.beta.gw',
+            max_concurrency=4
+        )
+        self.ibw_client.ib_gateway_path = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def test_endpoints_return_awaitables(self):
+        """Ensure the endpoints keep their names and can be awaited."""
+
+        async def run():
+            async with self.ibw_client as client:
+                return await asyncio.gather(
+                    client.portfolio_accounts(),
+                    client.market_data(conids=['265598'], since=None, fields=['31', '84']),
+                    client.symbol_search(symbol='AAPL')
+                )
+
+        accounts, quotes, search = asyncio.run(run())
+
+        self.assertEqual(accounts['path'], '/v1/portal/portfolio/accounts')
+        self.assertIn('conids=265598', quotes['path'])
+        self.assertEqual(search['method'], 'POST')
+
+    def test_bounded_concurrency(self):
+        """Ensure no more than `max_concurrency` requests are in flight."""
+
+        async def run():
+            async with self.ibw_client as client:
+                start = time.perf_counter()
+                await asyncio.gather(
+                    *[client.contract_details(conid='slow{}'.format(i)) for i in range(8)]
+                )
+                return time.perf_counter() - start
+
+        # Eight 200ms requests, four at a time, take at least two rounds.
+        self.assertGreaterEqual(asyncio.run(run()), 0.4)
+
+    def test_cancellation(self):
+        """Ensure a cancelled request releases its slot."""
+
+        async def run():
+            async with self.ibw_client as client:
+                task = asyncio.ensure_future(client.contract_details(conid='slow'))
+                await asyncio.sleep(0.05)
+                task.cancel()
+                with self.assertRaises(asyncio.CancelledError):
+                    await task
+                return client.transport.pool_stats()
+
+        self.assertEqual(asyncio.run(run())['in_flight'], 0)
+
+    def test_identical_requests_are_coalesced(self):
+        """Ensure identical GETs in flight share one request and one result."""
+
+        async def run():
+            async with self.ibw_client as client:
+                results = await asyncio.gather(
+                    *[client.contract_details(conid='slow') for _ in range(5)]
+                )
+                return results, client.transport.pool_stats()
+
+        results, stats = asyncio.run(run())
+
+        self.assertEqual(stats['requests_sent'], 1)
+        self.assertEqual(stats['coalescing']['coalesced'], 4)
+        self.assertTrue(all(result is results[0] for result in results))
+
+    def tearDown(self) -> None:
+        """Stop the local server."""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class InteractiveBrokersAsyncClientSession(TestCase):
+
+    """Will perform a unit test for the asyncio client's session set up."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create the client."""
+
+        from ibw.client_async import AsyncIBClient
+
+        self.gateway = LocalGateway().start()
+        self.ibw_client = AsyncIBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port
+        )
+
+    def test_create_session(self):
+        """Ensure the session is created without blocking the event loop."""
+
+        async def run():
+            async with self.ibw_client as client:
+                ticks = 0
+
+                async def tick():
+                    nonlocal ticks
+                    while True:
+                        ticks += 1
+                        await asyncio.sleep(0)
+
+                ticker = asyncio.ensure_future(tick())
+                created = await client.create_session()
+                ticker.cancel()
+
+                return created, ticks
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            created, ticks = asyncio.run(run())
+
+        self.assertTrue(created)
+        self.assertTrue(self.ibw_client.authenticated)
+        self.assertGreater(ticks, 0)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+"""Unit test module for the client start up.
+
+Makes sure creating a client doesn't resolve host names or download the gateway.
+"""
+
+import time
+import unittest
+from unittest import TestCase
+from unittest import mock
+
+from ibw import client_utils
+from ibw.authorization import IBClient as IBAuthorizationClient
+from ibw.client import IBClient
+from ibw.market import IBMarket
+
+
+class InteractiveBrokersStartup(TestCase):
+
+    """Will perform a unit test for the client start up."""
+
+    def setUp(self) -> None:
+        """Forget any host looked up by an earlier test."""
+
+        client_utils.resolve_localhost.cache_clear()
+
+    def test_construction_is_offline(self):
+        """Ensure no DNS lookup or download happens in the constructors."""
+
+        with mock.patch('socket.gethostbyname') as gethostbyname, \
+                mock.patch('ibw.clientportal.ClientPortal.download_and_extract') as download:
+            IBClient(username='PAPER_USERNAME', account='PAPER_ACCOUNT', client_gateway_path='/missing')
+            IBClient(username='PAPER_USERNAME', account='PAPER_ACCOUNT')
+            IBAuthorizationClient(username='PAPER_USERNAME', account='PAPER_ACCOUNT')
+            IBMarket()
+
+        gethostbyname.assert_not_called()
+        download.assert_not_called()
+
+    def test_construction_is_fast(self):
+        """Ensure a client takes well under a millisecond to create."""
+
+        start = time.perf_counter()
+        for _ in range(1000):
+            IBClient(username='PAPER_USERNAME', account='PAPER_ACCOUNT', host='127.0.0.1')
+        elapsed = (time.perf_counter() - start) / 1000
+
+        self.assertLess(elapsed, 0.001)
+
+    def test_host_is_resolved_once(self):
+        """Ensure the host is looked up on first use and then reused."""
+
+        with mock.patch('socket.gethostbyname', return_value='10.0.0.7') as gethostbyname:
+            first = IBMarket()
+            second = IBClient(username='PAPER_USERNAME', account='PAPER_ACCOUNT')
+
+            self.assertEqual(first.ib_gateway_path, 'https://10.0.0.7:5000')
+            self.assertEqual(second.login_gateway_path, 'https://10.0.0.7:5000/sso/Login?forwardTo=22&RL=1&ip2loc=on')
+
+        self.assertEqual(gethostbyname.call_count, 1)
+
+    def test_explicit_host_and_port(self):
+        """Ensure an explicit gateway address is used as is."""
+
+        with mock.patch('socket.gethostbyname') as gethostbyname:
+            market = IBMarket(host='gateway.internal', port=5001)
+            self.assertEqual(market.ib_gateway_path, 'https://gateway.internal:5001')
+
+        gethostbyname.assert_not_called()
+
+    def test_provision_gateway(self):
+        """Ensure the gateway is only downloaded when asked and missing."""
+
+        with mock.patch('ibw.clientportal.ClientPortal.download_and_extract') as download:
+            client = IBClient(username='PAPER_USERNAME', account='PAPER_ACCOUNT', client_gateway_path='/missing')
+            client.provision_gateway()
+
+        download.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,113 @@
+"""Unit test module for the local contract master."""
+
+import pathlib
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.contract_master import Contract
+from ibw.contract_master import ContractMaster
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class InteractiveBrokersContractMaster(TestCase):
+
+    """Will perform a unit test for the local contract master."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a master saved in a temporary folder."""
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.folder.name).joinpath('contracts.json')
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+        self.master = ContractMaster(client=self.client, path=self.path)
+
+    def test_only_misses_go_to_the_gateway(self):
+        """Ensure symbols are searched once and then answered locally."""
+
+        for symbol in ['FB', 'SOXL', 'TNA']:
+            self.master.resolve(symbol)
+
+        self.assertEqual(self.gateway.requests, 3)
+
+        self.assertEqual(self.master.resolve('fb').conid, 107113386)
+        self.assertEqual(self.master.resolve('SOXL').conid, 61856227)
+        self.assertEqual(self.master.contract(50721436).symbol, 'TNA')
+        self.assertEqual(self.gateway.requests, 3)
+
+        self.assertEqual(self.master.stats()['hits'], 3)
+
+    def test_bulk_refresh_and_lookups(self):
+        """Ensure stocks and futures are added in bulk and found by key, prefix and fuzzy search."""
+
+        self.master.refresh_stocks(symbols=['AAPL', 'MSFT', 'SPY'])
+        self.master.refresh_futures(symbols=['ES'])
+        self.assertEqual(self.gateway.requests, 2)
+
+        self.assertEqual([contract.conid for contract in self.master.lookup('AAPL', sec_type='STK', exchange='NASDAQ')], [265598])
+        self.assertEqual(self.master.lookup('AAPL', exchange='NYSE'), [])
+        self.assertEqual(len(self.master.lookup('ES', sec_type='FUT')), 4)
+        self.assertEqual(self.master.lookup('ES', sec_type='FUT')[0].underlying_conid, 11004968)
+
+        self.assertEqual([contract.symbol for contract in self.master.prefix('m')], ['MSFT'])
+        self.assertEqual([contract.symbol for contract in self.master.prefix('AAPL INC', names=True)], ['AAPL'])
+        self.assertEqual([contract.symbol for contract in self.master.fuzzy('APPL')], ['AAPL'])
+
+    def test_persistence(self):
+        """Ensure a saved master answers lookups without a client."""
+
+        self.master.refresh_stocks(symbols=['AAPL', 'MSFT'])
+
+        loaded = ContractMaster(path=self.path)
+
+        self.assertEqual(len(loaded), 2)
+        self.assertEqual(loaded.resolve('MSFT'), self.master.resolve('MSFT'))
+        self.assertIsNone(loaded.resolve('UNKNOWN'))
+
+    def test_refresh_definitions(self):
+        """Ensure stale contracts are refreshed with their definitions."""
+
+        self.master.add([Contract(conid=272093, symbol='MSFT', updated=time.time() - 7200)])
+        self.master.add([Contract(conid=265598, symbol='AAPL')])
+
+        refreshed = self.master.refresh_definitions(max_age=3600)
+
+        self.assertEqual([contract.conid for contract in refreshed], [272093])
+        self.assertEqual(self.master.contract(272093).currency, 'USD')
+        self.assertEqual(self.master.contract(272093).exchange, 'NASDAQ')
+
+    def test_miss_ttl(self):
+        """Ensure a symbol the gateway doesn't know isn't searched again."""
+
+        self.gateway.route('POST', r'^iserver/secdef/search$', lambda request: [])
+
+        self.assertIsNone(self.master.resolve('NOPE'))
+        self.assertIsNone(self.master.resolve('NOPE'))
+        self.assertEqual(self.gateway.requests, 1)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in and remove the master."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+        self.folder.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+"""Unit test module for the bulk contract resolver."""
+
+import asyncio
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.contract_resolver import BulkResolver
+from ibw.contract_resolver import chunk
+from ibw.contract_resolver import unique_conids
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.testing.gateway import conid_symbol
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# The largest chunk the stand-in accepts in the splitting test.
+ACCEPTED_CHUNK = 30
+
+
+class InteractiveBrokersContractResolver(TestCase):
+
+    """Will perform a unit test for the bulk contract resolver."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a client talking to it."""
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+
+    def test_chunking(self):
+        """Ensure contract IDs are deduplicated in order and split in chunks."""
+
+        self.assertEqual(unique_conids(['3', 1, 3, 2, '1']), [3, 1, 2])
+        self.assertEqual(chunk([1, 2, 3, 4, 5], 2), [[1, 2], [3, 4], [5]])
+
+    def test_definitions(self):
+        """Ensure a long list with duplicates is resolved in a few chunked requests."""
+
+        conids = list(range(1, 1001)) + list(range(1, 501)) + [265598]
+
+        resolver = BulkResolver(client=self.client, chunk_size=200)
+        definitions = resolver.definitions(conids=conids)
+
+        self.assertEqual(len(definitions), 1001)
+        self.assertEqual(definitions[265598]['ticker'], 'AAPL')
+        self.assertEqual(definitions[10]['conid'], 10)
+        self.assertEqual(self.gateway.requests, 6)
+        self.assertEqual(resolver.stats(), {'requests': 6, 'splits': 0, 'errors': 0})
+
+    def test_rejected_chunks_are_split(self):
+        """Ensure a chunk the gateway rejects is halved until it is accepted."""
+
+        def secdef(request):
+            conids = (request.body or {}).get('conids') or []
+            if len(conids) > ACCEPTED_CHUNK:
+                return 400, {'error': 'Too many contracts.'}
+            return {'secdef': [{'conid': int(conid), 'ticker': conid_symbol(int(conid))} for conid in conids]}
+
+        self.gateway.route('POST', r'^trsrv/secdef$', secdef)
+
+        resolver = BulkResolver(client=self.client, chunk_size=100)
+        definitions = resolver.definitions(conids=range(1, 201))
+
+        self.assertEqual(sorted(definitions), list(range(1, 201)))
+        self.assertGreater(resolver.stats()['splits'], 0)
+        self.assertEqual(resolver.failures, {})
+
+    def test_streaming(self):
+        """Ensure definitions are yielded chunk by chunk, before the rest arrive."""
+
+        resolver = BulkResolver(client=self.client, chunk_size=10, max_workers=1)
+        stream = resolver.iter_definitions(conids=range(1, 101))
+
+        first = [next(stream) for _ in range(10)]
+        self.assertEqual(sorted(conid for conid, _ in first), list(range(1, 11)))
+        self.assertLess(self.gateway.requests, 10)
+
+        stream.close()
+
+    def test_details(self):
+        """Ensure details are requested once per distinct contract."""
+
+        resolver = BulkResolver(client=self.client, max_workers=4)
+        details = resolver.details(conids=[265598, 272093, '265598', 756733])
+
+        self.assertEqual(sorted(details), [265598, 272093, 756733])
+        self.assertEqual(resolver.stats()['requests'], 3)
+
+    @unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+    def test_definitions_async(self):
+        """Ensure the asyncio variant resolves the same contracts."""
+
+        from ibw.client_async import AsyncIBClient
+
+        client = AsyncIBClient(username='TEST', account=self.gateway.account_id, host=self.gateway.host, port=self.gateway.port)
+
+        async def resolve():
+            async with client:
+                return await BulkResolver(client=client, chunk_size=25).definitions_async(conids=range(1, 101))
+
+        definitions = asyncio.run(resolve())
+
+        self.assertEqual(sorted(definitions), list(range(1, 101)))
+        self.assertEqual(self.gateway.requests, 4)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,143 @@
+"""Unit test module for the market data field registry and decoders."""
+
+import unittest
+from unittest import TestCase
+
+from ibw import field_decoders
+from ibw.client import IBClient
+from ibw.fields import FIELD_INFO
+from ibw.fields import Field
+from ibw.fields import FieldType
+from ibw.quote_table import FLAG_HALTED
+from ibw.quote_table import FLAG_PRIOR_CLOSE
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class InteractiveBrokersFields(TestCase):
+
+    """Will perform a unit test for the market data field registry and decoders."""
+
+    def test_registry(self):
+        """Ensure the generated registry knows the common fields and their types."""
+
+        self.assertEqual(Field.LAST.value, '31')
+        self.assertEqual(Field.BID.value, '84')
+        self.assertEqual(FIELD_INFO['31'][1], FieldType.PRICE)
+        self.assertEqual(FIELD_INFO['55'][1], FieldType.TEXT)
+        self.assertEqual(FIELD_INFO['7295'][1], FieldType.PRICE)
+
+        for member in Field:
+            self.assertIn(member.value, FIELD_INFO)
+
+    def test_field_ids_and_validation(self):
+        """Ensure members, numbers and names are accepted, unlisted numbers pass and unknown names are rejected."""
+
+        self.assertEqual(field_decoders.field_ids([Field.LAST, 84, '86']), ['31', '84', '86'])
+        self.assertEqual(field_decoders.validate_fields([Field.LAST, '84', 'bid', '7741']), ['31', '84', '84', '7741'])
+
+        with self.assertLogs('ibw.field_decoders', level='WARNING') as logs:
+            self.assertEqual(field_decoders.validate_fields(['31', 99999]), ['31', '99999'])
+        self.assertIn('99999', logs.output[0])
+
+        with self.assertRaises(ValueError) as context:
+            field_decoders.validate_fields(['31', 'NOT_A_FIELD'])
+        self.assertIn('NOT_A_FIELD', str(context.exception))
+
+    def test_decode_message(self):
+        """Ensure values are decoded by type and price prefixes are flagged."""
+
+        message = {
+            'conid': 265598,
+            '_updated': 1700000000000,
+            '31': 'C150.25',
+            '84': 'H150.20',
+            '86': '150.30',
+            '55': 'AAPL',
+            '7762': '1.2M',
+            '83': '1.25%'
+        }
+
+        decoded = field_decoders.decode_message(message=message)
+
+        self.assertEqual(decoded['conid'], 265598)
+        self.assertEqual(decoded['_updated'], 1700000000000)
+        self.assertEqual(decoded['31'], 150.25)
+        self.assertEqual(decoded['84'], 150.20)
+        self.assertEqual(decoded['86'], 150.30)
+        self.assertEqual(decoded['55'], 'AAPL')
+        self.assertEqual(decoded['7762'], 1200000.0)
+        self.assertEqual(decoded['83'], 1.25)
+        self.assertEqual(decoded['_flags'], {'31': FLAG_PRIOR_CLOSE, '84': FLAG_HALTED})
+
+        named = field_decoders.decode_message(message={'31': '1.5', '55': 'AAPL'}, names=True)
+        self.assertEqual(named, {'LAST': 1.5, 'INSTRUMENT': 'AAPL'})
+
+        self.assertEqual(field_decoders.decode_message(message={'31': 'N/A'}), {'31': 'N/A'})
+
+
+class InteractiveBrokersFieldsClient(TestCase):
+
+    """Will perform a unit test for the field checks of `market_data`."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a client of it."""
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+
+    def test_fields_are_validated_before_the_request(self):
+        """Ensure an unknown name raises without sending a request."""
+
+        with self.assertRaises(ValueError):
+            self.client.market_data(conids=['265598'], since=None, fields=['31', 'NOT_A_FIELD'])
+
+        self.assertEqual(self.gateway.requests, 0)
+
+    def test_unlisted_numeric_fields_are_sent(self):
+        """Ensure a numeric field missing from the registry still reaches the gateway."""
+
+        snapshot = self.gateway.handler('GET', 'iserver/marketdata/snapshot')
+        sent = []
+
+        def handler(request):
+            sent.append(request.params['fields'])
+            return snapshot(request)
+
+        self.gateway.route('GET', r'^iserver/marketdata/snapshot$', handler)
+
+        self.assertNotIn('99999', FIELD_INFO)
+
+        with self.assertLogs('ibw.field_decoders', level='WARNING'):
+            self.client.market_data(conids=['265598'], since=None, fields=['31', '7741', '99999'])
+
+        self.assertEqual(sent, ['31,7741,99999'])
+
+    def test_members_and_decoding(self):
+        """Ensure `Field` members are sent as fix tags and responses can be decoded."""
+
+        quotes = self.client.market_data(conids=['265598'], since=None, fields=[Field.LAST, Field.INSTRUMENT], decode=True)
+
+        self.assertIsInstance(quotes[0]['31'], float)
+        self.assertIsInstance(quotes[0]['55'], str)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
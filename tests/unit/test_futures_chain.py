@@ -0,0 +1,113 @@
+"""Unit test module for the futures chain index."""
+
+import datetime
+import pathlib
+import tempfile
+import time
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.futures_chain import FuturesChain
+from ibw.futures_chain import business_days_before
+from ibw.futures_chain import to_day
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class InteractiveBrokersFuturesChain(TestCase):
+
+    """Will perform a unit test for the futures chain index."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a chain saved in a temporary folder."""
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.folder.name).joinpath('futures.json')
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+        self.chains = FuturesChain(client=self.client, path=self.path)
+
+    def test_dates(self):
+        """Ensure dates are normalized and business days skip weekends."""
+
+        self.assertEqual(to_day('2023-03-17'), 20230317)
+        self.assertEqual(to_day(datetime.date(2023, 3, 17)), 20230317)
+        self.assertEqual(to_day(20230317), 20230317)
+
+        # 2023-03-16 is a Thursday, five business days before is the Thursday before.
+        self.assertEqual(business_days_before(20230316, 5), 20230309)
+
+    def test_queries(self):
+        """Ensure front month, next expiration and the active contract are found."""
+
+        self.chains.prefetch(['ES', 'NQ'])
+        self.assertEqual(self.gateway.requests, 1)
+
+        self.assertEqual(self.chains.front('ES', on='2023-01-10').expiry, 20230317)
+        self.assertEqual(self.chains.front('ES', on='2023-03-16').expiry, 20230317)
+        self.assertEqual(self.chains.front('ES', on='2023-03-17').expiry, 20230617)
+        self.assertIsNone(self.chains.front('ES', on='2024-01-01'))
+
+        self.assertEqual(self.chains.next_after('ES', '2023-03-17').expiry, 20230617)
+        self.assertEqual(self.chains.next_after('NQ', 20230101).expiry, 20230317)
+
+        self.assertEqual(self.chains.roll_date('ES', on='2023-01-10'), 20230309)
+        self.assertEqual(self.chains.active('ES', on='2023-03-08').expiry, 20230317)
+        self.assertEqual(self.chains.active('ES', on='2023-03-09').expiry, 20230617)
+
+        self.assertEqual(len(self.chains.chain('ES', on='2023-07-01')), 2)
+        self.assertEqual(self.gateway.requests, 1)
+
+    def test_roll_calendar(self):
+        """Ensure rolls pair consecutive contracts between two dates."""
+
+        calendar = self.chains.roll_calendar('ES', start='2023-01-01', end='2023-09-30')
+
+        # The September contract's last trading day is a Saturday.
+
+        self.assertEqual(
+            [(day, current.expiry, following.expiry) for day, current, following in calendar],
+            [(20230309, 20230317, 20230617), (20230609, 20230617, 20230917), (20230911, 20230917, 20231217)]
+        )
+
+    def test_daily_refresh_and_persistence(self):
+        """Ensure a saved chain is reused the same day and searched again when stale."""
+
+        self.chains.front('ES', on='2023-01-10')
+        self.assertTrue(self.path.exists())
+
+        reloaded = FuturesChain(client=self.client, path=self.path)
+        self.assertEqual(reloaded.front('ES', on='2023-01-10').conid, 495512550)
+        self.assertEqual(self.gateway.requests, 1)
+
+        stale = FuturesChain(client=self.client, path=self.path, refresh_interval=0.0)
+        stale.front('ES', on='2023-01-10')
+        self.assertEqual(self.gateway.requests, 2)
+
+        offline = FuturesChain(path=self.path)
+        self.assertEqual(offline.stats(), {'chains': 1, 'contracts': 4, 'requests': 0})
+        self.assertLess(time.time() - offline._updated['ES'], 60)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in and remove the saved chains."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+        self.folder.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
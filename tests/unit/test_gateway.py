@@ -0,0 +1,132 @@
+"""Unit test module for the local gateway stand-in and the benchmark.
+
+Runs the stand-in over HTTPS and makes sure the client's endpoints are answered,
+and that configured latency, errors and throttling are applied.
+"""
+
+import time
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.exceptions import IBRateLimitError
+from ibw.exceptions import IBServerError
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.benchmark import FAMILIES
+from ibw.testing.benchmark import run_benchmark
+from ibw.testing.gateway import LocalGateway
+from ibw.testing.gateway import strip_comments
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class InteractiveBrokersLocalGateway(TestCase):
+
+    """Will perform a unit test for the local gateway stand-in."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a client of it."""
+
+        self.gateway = LocalGateway().start()
+        self.transport = IBTransport(
+            config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+        )
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=self.transport
+        )
+
+    def test_endpoints_are_answered(self):
+        """Ensure the endpoints are served over HTTPS with sample payloads."""
+
+        self.assertTrue(self.gateway.url.startswith('https://'))
+
+        self.assertEqual(self.client.server_accounts()['accounts'], [self.gateway.account_id])
+
+        quotes = self.client.market_data(conids=['265598', '8314'], since=None, fields=['31', '84'])
+        self.assertEqual([quote['conid'] for quote in quotes], [265598, 8314])
+        self.assertIn('31', quotes[0])
+        self.assertIn('_updated', quotes[0])
+
+        history = self.client.market_data_history(conid='265598', period='1d', bar='1h')
+        self.assertEqual(len(history['data']), 24)
+
+        self.assertIsInstance(self.client._fundamentals_dividends(conid='265598'), dict)
+        self.assertTrue(self.client.get_live_orders()['orders'])
+
+    def test_configured_errors_and_latency(self):
+        """Ensure configured errors and latency are applied to the matching endpoints only."""
+
+        self.gateway.configure(r'^portfolio/accounts$', error_rate=1.0, error_status=503)
+        self.gateway.configure(r'^tickle$', latency=0.1)
+
+        with self.assertRaises(IBServerError) as context:
+            self.client.portfolio_accounts()
+        self.assertEqual(context.exception.status_code, 503)
+
+        start = time.perf_counter()
+        self.client.tickle()
+        self.assertGreaterEqual(time.perf_counter() - start, 0.1)
+
+        self.assertEqual(self.gateway.statuses[503], 1)
+
+    def test_throttling(self):
+        """Ensure requests over the configured rate are answered with a 429 and a Retry-After."""
+
+        self.gateway.configure(r'^iserver/marketdata/snapshot$', rate_limit=1.0, burst=1, retry_after=2)
+
+        self.client.market_data(conids=['265598'], since=None, fields=['31'])
+
+        with self.assertRaises(IBRateLimitError) as context:
+            self.client.market_data(conids=['265598'], since=None, fields=['31'])
+        self.assertEqual(context.exception.retry_after, 2.0)
+
+    def test_strip_comments(self):
+        """Ensure JSONC comments are removed but not inside strings."""
+
+        self.assertEqual(
+            strip_comments('[\n// comment\n{"url": "https://example.com"}]'),
+            '[\n\n{"url": "https://example.com"}]'
+        )
+
+    def test_benchmark(self):
+        """Ensure the benchmark reports every metric of the families it runs."""
+
+        results = run_benchmark(
+            families=['session', 'market_data'],
+            requests_per_family=20,
+            concurrency=4,
+            gateway=self.gateway
+        )
+
+        self.assertEqual(set(results.keys()), {'session', 'market_data'})
+
+        for result in results.values():
+            self.assertEqual(result['errors'], 0)
+            self.assertGreater(result['requests_per_second'], 0)
+            self.assertGreaterEqual(result['p99_ms'], result['p50_ms'])
+            self.assertGreater(result['cpu_ms_per_request'], 0)
+            self.assertGreater(result['peak_bytes_per_request'], 0)
+
+    def test_benchmark_covers_every_family(self):
+        """Ensure every endpoint family runs against the stand-in without errors."""
+
+        results = run_benchmark(requests_per_family=8, concurrency=2, gateway=self.gateway, trace_allocations=False)
+
+        self.assertEqual(set(results.keys()), set(FAMILIES.keys()))
+        self.assertTrue({'data', 'mutual_funds', 'notifications', 'customer'} <= set(results.keys()))
+        self.assertEqual({family: result['errors'] for family, result in results.items() if result['errors']}, {})
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.transport.close()
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,104 @@
+"""Unit test module for the option pricing and greeks engine."""
+
+import unittest
+from unittest import TestCase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class InteractiveBrokersGreeks(TestCase):
+
+    """Will perform a unit test for the option pricing and greeks engine."""
+
+    def test_prices_and_greeks(self):
+        """Ensure prices and greeks match the textbook values and finite differences."""
+
+        from ibw.greeks import greeks
+        from ibw.greeks import price
+
+        self.assertAlmostEqual(float(price(100, 100, 1.0, 0.2, 'C', rate=0.05)), 10.4506, places=4)
+        self.assertAlmostEqual(float(price(100, 100, 1.0, 0.2, 'Put', rate=0.05)), 5.5735, places=4)
+
+        values = greeks(100, 100, 1.0, 0.2, 'C', rate=0.05)
+        self.assertAlmostEqual(float(values['delta']), 0.6368, places=4)
+        self.assertAlmostEqual(float(values['gamma']), 0.01876, places=5)
+        self.assertAlmostEqual(float(values['vega']), 37.524, places=3)
+        self.assertAlmostEqual(float(values['theta']), -6.414, places=3)
+
+        step = 1e-4
+        for model, dividend in (('black_scholes', 0.02), ('black76', 0.0)):
+            for right in ('C', 'P'):
+                def value(underlying=100.0, time=0.5, volatility=0.3):
+                    return float(price(underlying, 95, time, volatility, right, rate=0.04, dividend=dividend, model=model))
+
+                values = greeks(100.0, 95, 0.5, 0.3, right, rate=0.04, dividend=dividend, model=model)
+
+                self.assertAlmostEqual(float(values['delta']), (value(100 + step) - value(100 - step)) / (2 * step), places=4)
+                self.assertAlmostEqual(float(values['vega']), (value(volatility=0.3 + step) - value(volatility=0.3 - step)) / (2 * step), places=3)
+                self.assertAlmostEqual(float(values['theta']), -(value(time=0.5 + step) - value(time=0.5 - step)) / (2 * step), places=3)
+
+    def test_implied_volatility(self):
+        """Ensure volatilities are recovered at once, and impossible prices give NaN."""
+
+        from ibw.greeks import implied_volatility
+        from ibw.greeks import price
+
+        generator = np.random.default_rng(7)
+        strike = generator.uniform(70, 130, 5000)
+        time = generator.uniform(0.05, 2.0, 5000)
+        volatility = generator.uniform(0.1, 1.0, 5000)
+        right = np.where(generator.random(5000) < 0.5, 'C', 'P')
+
+        prices = price(100.0, strike, time, volatility, right, rate=0.03)
+        solved = implied_volatility(prices, 100.0, strike, time, right, rate=0.03)
+
+        np.testing.assert_allclose(solved, volatility, atol=1e-5)
+
+        impossible = implied_volatility([0.5, 150.0, np.nan], 100.0, [50.0, 100.0, 100.0], 1.0, 'C')
+        self.assertTrue(np.isnan(impossible).all())
+
+    def test_surface_from_quotes(self):
+        """Ensure a chain's volatilities come from the mids in a quote table."""
+
+        from ibw.greeks import price
+        from ibw.greeks import surface
+        from ibw.greeks import year_fractions
+        from ibw.options_chain import OptionChain
+        from ibw.quote_table import QuoteTable
+
+        now = np.datetime64('2023-01-02T21:00')
+        chain = OptionChain.from_contracts(conid=1, symbol='XYZ', contracts=[
+            (20230120, 95.0, 'C', 11), (20230120, 95.0, 'P', 12),
+            (20230120, 105.0, 'C', 13), (20230217, 105.0, 'P', 14)
+        ])
+
+        time = year_fractions(chain.expiries, now=now)
+        quotes = [{'conid': 1, '84': '99.95', '86': '100.05'}]
+        expected = {11: (0, 95.0, 'C', 0.25), 12: (0, 95.0, 'P', 0.3), 13: (0, 105.0, 'C', 0.35), 14: (1, 105.0, 'P', 0.4)}
+
+        for conid, (row, strike, right, volatility) in expected.items():
+            mid = float(price(100.0, strike, time[row], volatility, right))
+            quotes.append({'conid': conid, '84': str(mid - 0.000001), '86': str(mid + 0.000001)})
+
+        table = QuoteTable(fields=['31', '84', '86'])
+        table.update(quotes)
+
+        result = surface(chain, table=table, now=now)
+
+        self.assertAlmostEqual(result.underlying, 100.0)
+        self.assertAlmostEqual(result.volatility[0, 0, 0], 0.25, places=4)
+        self.assertAlmostEqual(result.volatility[1, 1, 1], 0.4, places=4)
+        self.assertTrue(np.isnan(result.volatility[1, 0, 0]))
+        self.assertGreater(result.delta[0, 0, 0], 0.5)
+        self.assertLess(result.delta[0, 0, 1], 0.0)
+
+        frame = result.to_frame()
+        self.assertEqual(sorted(frame['conid'].tolist()), [11, 12, 13, 14])
+
+
+if __name__ == '__main__':
+    unittest.main()
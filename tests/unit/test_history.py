@@ -0,0 +1,136 @@
+"""Unit test module for the bulk history downloader."""
+
+import datetime
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class InteractiveBrokersHistory(TestCase):
+
+    """Will perform a unit test for the bulk history downloader."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a client of it."""
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+
+    def test_windows(self):
+        """Ensure a range is split into windows of at most 1000 bars, laid out backwards."""
+
+        from ibw.history import parse_duration
+        from ibw.history import windows
+
+        requests = windows(start=0, end=10 * 86400, bar='5min')
+        self.assertEqual(requests[0], ('19700111-00:00:00', '3d'))
+        self.assertEqual(requests[-1], ('19700102-00:00:00', '1d'))
+        self.assertEqual(sum(parse_duration(period) for _, period in requests), 10 * 86400)
+
+        self.assertEqual([period for _, period in windows(start=0, end=86400, bar='1min')], ['8h', '8h', '8h'])
+
+        with self.assertRaises(ValueError):
+            parse_duration('5 seconds')
+
+    def test_stitching(self):
+        """Ensure overlapping responses are sorted, deduplicated and clipped to the range."""
+
+        from ibw.history import Bars
+
+        responses = [
+            {'data': [{'t': 3000, 'o': 3, 'h': 3, 'l': 3, 'c': 3, 'v': 30}, {'t': 4000, 'o': 4, 'h': 4, 'l': 4, 'c': 4, 'v': 40}]},
+            {'data': [{'t': 1000, 'o': 1, 'h': 1, 'l': 1, 'c': 1, 'v': 10}, {'t': 3000, 'o': 3, 'h': 3, 'l': 3, 'c': 3, 'v': 30}]},
+            None
+        ]
+
+        bars = Bars.from_responses(conid='1', bar='1min', responses=responses, start=1, end=4)
+
+        self.assertEqual(bars.time.tolist(), [1000, 3000])
+        self.assertEqual(bars.close.tolist(), [1.0, 3.0])
+        self.assertEqual(bars.volume.tolist(), [10.0, 30.0])
+        self.assertTrue(bars.close.flags['C_CONTIGUOUS'])
+
+    def test_download(self):
+        """Ensure every contract gets contiguous bars and the concurrency limit is kept."""
+
+        from ibw.history import HistoryDownloader
+
+        handler = self.gateway._history
+        lock = threading.Lock()
+        in_flight = [0, 0]
+
+        def history(request):
+            with lock:
+                in_flight[0] += 1
+                in_flight[1] = max(in_flight[1], in_flight[0])
+            try:
+                time.sleep(0.01)
+                return handler(request)
+            finally:
+                with lock:
+                    in_flight[0] -= 1
+
+        self.gateway.route('GET', r'^iserver/marketdata/history$', history)
+
+        downloader = HistoryDownloader(client=self.client, max_concurrent=3)
+        bars = downloader.download(
+            conids=['265598', '8314'],
+            bar='1h',
+            start=datetime.datetime(2022, 1, 1),
+            end=datetime.datetime(2023, 1, 1)
+        )
+
+        self.assertEqual(set(bars.keys()), {'265598', '8314'})
+        self.assertEqual(downloader.stats(), {'requests': 18, 'errors': 0})
+        self.assertLessEqual(in_flight[1], 3)
+
+        series = bars['265598']
+        self.assertEqual(len(series), 365 * 24)
+        self.assertEqual(set(np.diff(series.time).tolist()), {3600 * 1000})
+        self.assertEqual(str(series.datetimes[0]), '2022-01-01T00:00:00.000')
+
+    def test_failures(self):
+        """Ensure a failed window is reported without losing the others."""
+
+        from ibw.history import HistoryDownloader
+
+        self.gateway.configure(r'^iserver/marketdata/history$', error_rate=1.0, error_status=500)
+
+        downloader = HistoryDownloader(client=self.client)
+        bars = downloader.download(conids=['265598'], bar='1d', period='1y')
+
+        self.assertEqual(len(bars['265598']), 0)
+        self.assertEqual(downloader.stats()['errors'], 1)
+        self.assertEqual(downloader.failures[0][0], '265598')
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+"""Unit test module for the JSON decoding.
+
+Decodes the sample responses in every supported format.
+"""
+
+import json
+import pathlib
+import unittest
+from unittest import TestCase
+from unittest import mock
+
+from ibw import json_codec
+
+
+class InteractiveBrokersJsonCodec(TestCase):
+
+    """Will perform a unit test for the JSON decoding."""
+
+    def setUp(self) -> None:
+        """Load the sample dividends response."""
+
+        file_path = pathlib.Path(__file__).parents[2].joinpath(
+            'samples/responses/fundamentals-dividends.json'
+        )
+        self.content = file_path.read_bytes()
+        self.expected = json.loads(self.content)
+
+    def test_json_format(self):
+        """Ensure the default format decodes the whole body."""
+
+        data = json_codec.decode_response(content=self.content)
+        self.assertEqual(data, self.expected)
+
+    def test_raw_format(self):
+        """Ensure the raw format returns the bytes untouched."""
+
+        data = json_codec.decode_response(content=self.content, response_format='raw')
+        self.assertIs(data, self.content)
+
+    def test_lazy_format(self):
+        """Ensure the lazy view matches the decoded body."""
+
+        for simdjson in (json_codec.simdjson, None):
+            with mock.patch.object(json_codec, 'simdjson', simdjson):
+                view = json_codec.decode_response(content=self.content, response_format='lazy')
+
+                self.assertIn('history', view)
+                self.assertEqual(view['next_dividend'], self.expected['next_dividend'])
+                self.assertEqual(view.get('missing', 'default'), 'default')
+                self.assertEqual(
+                    view.at_pointer('/industry_comparison'),
+                    self.expected['industry_comparison']
+                )
+                self.assertEqual(view.to_python(), self.expected)
+
+    def test_unknown_format(self):
+        """Ensure an unknown format is rejected."""
+
+        with self.assertRaises(ValueError):
+            json_codec.decode_response(content=self.content, response_format='xml')
+
+    def test_custom_decoder(self):
+        """Ensure a custom decoder is used and can be reset."""
+
+        json_codec.set_decoder(decoder=lambda content: 'decoded')
+        self.assertEqual(json_codec.decode_response(content=b'{}'), 'decoded')
+
+        json_codec.set_decoder()
+        self.assertEqual(json_codec.decode_response(content=b'{}'), {})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+"""Unit test module for the options chain builder."""
+
+import pathlib
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class InteractiveBrokersOptionsChain(TestCase):
+
+    """Will perform a unit test for the options chain builder."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create chains saved in a temporary folder."""
+
+        from ibw.options_chain import OptionsChains
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.root = pathlib.Path(self.folder.name)
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+        self.chains = OptionsChains(client=self.client, root=self.root, max_workers=4)
+
+    def test_build_and_slice(self):
+        """Ensure every month, strike and right is expanded into the array."""
+
+        chain = self.chains.chain('AAPL')
+
+        # One search, the strikes of two months and 11 strikes by 2 rights per month.
+        self.assertEqual(self.gateway.requests, 1 + 2 + 2 * 11 * 2)
+        self.assertEqual(chain.conids.shape, (2, 11, 2))
+        self.assertEqual(len(chain), 44)
+
+        expiry, strike, right, conid = chain.contracts()[5]
+        self.assertEqual(chain.contract(expiry=expiry, strike=strike, right=right), conid)
+        self.assertIsNone(chain.contract(expiry=expiry, strike=strike + 0.5, right=right))
+
+        puts = chain.near(price=float(chain.strikes[5]), count=4, right='Put')
+        self.assertEqual(puts.conids.shape, (2, 4, 1))
+        self.assertTrue(np.shares_memory(puts.conids, chain.conids))
+        self.assertEqual(puts.strikes.tolist(), chain.strikes[3:7].tolist())
+
+        first = chain.slice(end=int(chain.expiries[0]), low=float(chain.strikes[-2]))
+        self.assertEqual(first.conids.shape, (1, 2, 2))
+
+    def test_cache_and_incremental_refresh(self):
+        """Ensure a saved chain is reused, and a refresh only looks up new strikes."""
+
+        from ibw.options_chain import OptionsChains
+
+        chain = self.chains.chain('AAPL')
+        months = sorted(chain.months)
+        built = self.gateway.requests
+
+        self.assertIs(self.chains.chain('AAPL'), chain)
+        self.assertEqual(self.gateway.requests, built)
+
+        reloaded = OptionsChains(client=self.client, root=self.root)
+        self.assertEqual(reloaded.chain('AAPL').contracts(), chain.contracts())
+        self.assertEqual(reloaded.chain('AAPL', months=months).contracts(), chain.contracts())
+        self.assertEqual(self.gateway.requests, built)
+
+        listed = chain.strikes.tolist()[1:] + [1000.0]
+        self.gateway.route('GET', r'^iserver/secdef/strikes$', lambda request: {'call': listed, 'put': listed})
+
+        refreshed = reloaded.chain('AAPL', months=months, refresh=True)
+
+        # The strikes of two months, then the new strike of both rights in both months.
+        self.assertEqual(self.gateway.requests, built + 2 + 4)
+        self.assertEqual(refreshed.strikes.tolist(), listed)
+        self.assertEqual(len(refreshed), 44)
+
+    def test_failed_lookups_are_retried(self):
+        """Ensure a month with failed lookups stays stale and is completed next time."""
+
+        info = self.gateway.handler('GET', 'iserver/secdef/info')
+
+        self.gateway.route('GET', r'^iserver/secdef/info$', lambda request: (400, {'error': 'Unavailable.'}))
+        chain = self.chains.chain('MSFT')
+
+        self.assertEqual(len(chain), 0)
+        self.assertEqual(chain.months, {})
+        self.assertEqual(self.chains.stats()['errors'], 44)
+
+        self.gateway.route('GET', r'^iserver/secdef/info$', info)
+        self.assertEqual(len(self.chains.chain('MSFT')), 44)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in and remove the saved chains."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+        self.folder.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,171 @@
+"""Unit test module for the live order book."""
+
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.order_book import OrderBook
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class InteractiveBrokersOrderBook(TestCase):
+
+    """Will perform a unit test for the live order book."""
+
+    def setUp(self) -> None:
+        """Start the stand-in and create a book polling it."""
+
+        self.gateway = LocalGateway().start()
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+        self.book = OrderBook(client=self.client)
+
+    def _fill(self, order_id: int) -> None:
+        """Make the stand-in report an order as filled from now on."""
+
+        live_orders = self.gateway.handler('GET', 'iserver/account/orders')
+
+        def handler(request):
+            response = live_orders(request)
+            for order in response['orders']:
+                if order['orderId'] == order_id:
+                    order.update(status='Filled', filledQuantity=order['remainingQuantity'], remainingQuantity=0.0)
+            return response
+
+        self.gateway.route('GET', r'^iserver/account/orders$', handler)
+
+    def test_poll_and_lookups(self):
+        """Ensure a poll fills every index, and an unchanged poll reports nothing."""
+
+        events = self.book.poll()
+        count = len(self.book)
+
+        self.assertGreater(count, 1)
+        self.assertEqual(len(events), count)
+        self.assertTrue(all(event.is_new for event in events))
+
+        order = self.book.get(1000)
+        self.assertIs(self.book.by_coid(order['order_ref']), order)
+        self.assertIn(order, self.book.for_conid(order['conid']))
+        self.assertIn(1000, self.book)
+        self.assertEqual(len(self.book.with_status('Submitted')), count)
+        self.assertEqual(len(self.book.open_orders()), count)
+
+        self.assertEqual(self.book.poll(), [])
+        self.assertEqual(self.book.stats()['unchanged'], count)
+
+    def test_only_transitions_are_reported(self):
+        """Ensure subscribers only hear about the order that changed, and the indexes follow it."""
+
+        heard = []
+        filled = []
+
+        self.book.poll()
+        self.book.subscribe(heard.append)
+        self.book.subscribe(filled.append, statuses=['Filled'])
+
+        self._fill(1001)
+        events = self.book.poll()
+
+        self.assertEqual(len(events), 1)
+        self.assertEqual(heard, events)
+        self.assertEqual(filled, events)
+
+        event = events[0]
+        self.assertEqual((event.order_id, event.previous, event.status), ('1001', 'Submitted', 'Filled'))
+        self.assertTrue(event.is_transition)
+        self.assertEqual(set(event.changed), {'status', 'filledQuantity', 'remainingQuantity'})
+
+        self.assertEqual([order['orderId'] for order in self.book.with_status('Filled')], [1001])
+        self.assertNotIn(self.book.get(1001), self.book.open_orders())
+        self.assertEqual(len(self.book.open_orders()), len(self.book) - 1)
+
+        self.assertEqual(self.book.poll(), [])
+        self.assertEqual(len(filled), 1)
+
+    def test_streaming_updates_are_merged(self):
+        """Ensure partial `sor` messages are merged into polled orders and new ones are added."""
+
+        heard = []
+
+        self.book.poll()
+        self.book.subscribe(heard.append)
+
+        self.book.on_message({'topic': 'smd+265598', 'args': [{'orderId': 1000, 'status': 'Filled'}]})
+        self.assertEqual(heard, [])
+
+        self.book.on_message({'topic': 'sor', 'args': [
+            {'orderId': 1000, 'status': 'PendingCancel'},
+            {'orderId': 1000, 'status': 'PendingCancel'},
+            {'orderId': 9000, 'conid': 265598, 'status': 'PreSubmitted', 'cOID': 'stream-1'}
+        ]})
+
+        self.assertEqual([(event.order_id, event.previous, event.status) for event in heard], [
+            ('1000', 'Submitted', 'PendingCancel'), ('9000', None, 'PreSubmitted')
+        ])
+
+        order = self.book.get(1000)
+        self.assertEqual(order['status'], 'PendingCancel')
+        self.assertEqual(order['acct'], self.gateway.account_id)
+        self.assertEqual(self.book.by_coid('stream-1')['orderId'], 9000)
+        self.assertIn(self.book.get(9000), self.book.for_conid('265598'))
+
+    def test_late_client_order_id(self):
+        """Ensure untracked fields arriving later are merged and indexed without an event."""
+
+        heard = []
+        self.book.subscribe(heard.append)
+
+        self.book.update([{'orderId': 1, 'status': 'Submitted'}])
+        self.assertEqual(self.book.update([{'orderId': 1, 'status': 'Submitted', 'order_ref': 'late-1', 'conid': 8314}]), [])
+
+        self.assertEqual(len(heard), 1)
+        self.assertEqual(self.book.by_coid('late-1')['orderId'], 1)
+        self.assertEqual([order['orderId'] for order in self.book.for_conid(8314)], [1])
+
+        self.book.update([{'orderId': 1, 'order_ref': 'late-2'}])
+        self.assertIsNone(self.book.by_coid('late-1'))
+        self.assertEqual(self.book.by_coid('late-2')['orderId'], 1)
+        self.assertEqual(self.book.stats()['unchanged'], 2)
+
+    def test_failing_subscriber(self):
+        """Ensure a failing subscriber doesn't stop the book or the other subscribers."""
+
+        heard = []
+
+        def fail(event):
+            raise RuntimeError('Subscriber failed.')
+
+        self.book.subscribe(fail)
+        self.book.subscribe(heard.append)
+
+        with self.assertLogs('ibw.order_book', level='ERROR'):
+            events = self.book.poll()
+
+        self.assertEqual(heard, events)
+
+        self.book.unsubscribe(fail)
+        self.book.clear()
+        self.assertEqual(len(self.book), 0)
+        self.assertIsNone(self.book.by_coid(events[0].order['order_ref']))
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
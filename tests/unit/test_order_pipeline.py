@@ -0,0 +1,160 @@
+"""Unit test module for the order submission pipeline."""
+
+import unittest
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.order_pipeline import ACKNOWLEDGED
+from ibw.order_pipeline import FAILED
+from ibw.order_pipeline import REJECTED
+from ibw.order_pipeline import ConfirmRules
+from ibw.order_pipeline import OrderPipeline
+from ibw.resilience import NO_RETRY
+from ibw.resilience import RetryRules
+from ibw.testing.gateway import LocalGateway
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+ORDER = {'conid': 265598, 'secType': '265598:STK', 'orderType': 'LMT', 'price': 150.0, 'side': 'BUY', 'quantity': 1}
+
+QUESTIONS = [
+    ('o163', 'The following order exceeds the price percentage limit. Are you sure you want to submit this order?'),
+    ('o354', 'You are submitting an order without market data. Are you sure you want to submit this order?')
+]
+
+
+class InteractiveBrokersOrderPipeline(TestCase):
+
+    """Will perform a unit test for the order submission pipeline."""
+
+    def setUp(self) -> None:
+        """Start the stand-in, asking two questions per order, and create a client talking to it."""
+
+        self.gateway = LocalGateway().start()
+        self.gateway.order_questions = list(QUESTIONS)
+
+        self.client = IBClient(
+            username='TEST',
+            account=self.gateway.account_id,
+            host=self.gateway.host,
+            port=self.gateway.port,
+            transport=IBTransport(
+                config=TransportConfig(rate_limit=False, retry_rules=RetryRules(default=NO_RETRY))
+            )
+        )
+
+    def test_confirm_rules(self):
+        """Ensure the first matching rule decides, and every message must be confirmed."""
+
+        rules = ConfirmRules(rules=[('^o163$', True), ('market data', True), ('^o451$', False)])
+
+        self.assertTrue(rules.confirm_for('o163'))
+        self.assertTrue(rules.confirm_for('o999', text='An order without market data.'))
+        self.assertFalse(rules.confirm_for('o451'))
+        self.assertFalse(rules.confirm_for('o1'))
+        self.assertFalse(rules.confirm({'id': '1', 'message': ['a', 'b'], 'messageIds': ['o163', 'o451']}))
+
+    def test_questions_are_answered(self):
+        """Ensure every question is confirmed by the rules until the order is acknowledged."""
+
+        pipeline = OrderPipeline(client=self.client, rules=ConfirmRules(default=True))
+        ticket = pipeline.submit(ORDER)
+
+        self.assertEqual(ticket.state, ACKNOWLEDGED)
+        self.assertEqual(len(ticket.order_ids), 1)
+        self.assertEqual(ticket.questions, [(['o163'], True), (['o354'], True)])
+        self.assertEqual(ticket.round_trips, 3)
+        self.assertGreater(ticket.time_to_ack, 0.0)
+
+    def test_declined_questions_reject_the_order(self):
+        """Ensure a question the rules don't confirm is declined and the order rejected."""
+
+        pipeline = OrderPipeline(client=self.client, rules=ConfirmRules(rules=[('^o163$', True)]))
+        ticket = pipeline.submit(ORDER)
+
+        self.assertEqual(ticket.state, REJECTED)
+        self.assertEqual(ticket.questions, [(['o163'], True), (['o354'], False)])
+        self.assertIn('without market data', ticket.error)
+        self.assertEqual(ticket.order_ids, [])
+
+    def test_single_message_question(self):
+        """Ensure a question sent as one string is declined with its whole text."""
+
+        text = 'You are about to submit an order outside regular trading hours.'
+        self.gateway.route('POST', r'^iserver/account/[^/]+/order$', lambda request: [{'id': 'q1', 'message': text, 'messageIds': ['o999']}])
+
+        ticket = OrderPipeline(client=self.client).submit(ORDER)
+
+        self.assertEqual(ticket.state, REJECTED)
+        self.assertEqual(ticket.error, 'Declined: {}'.format(text))
+
+    def test_concurrent_suppression(self):
+        """Ensure workers racing on the same confirmed questions suppress each one once."""
+
+        suppress = self.gateway.handler('POST', 'iserver/questions/suppress')
+        sent = []
+
+        def record(request):
+            sent.extend(request.body['messageIds'])
+            return suppress(request)
+
+        self.gateway.route('POST', r'^iserver/questions/suppress$', record)
+
+        pipeline = OrderPipeline(client=self.client, rules=ConfirmRules(default=True), suppress_confirmed=True, max_workers=8)
+        tickets = pipeline.submit_many([dict(ORDER, cOID='order-{}'.format(index)) for index in range(16)])
+
+        self.assertTrue(all(ticket.state == ACKNOWLEDGED for ticket in tickets))
+        self.assertEqual(sorted(sent), ['o163', 'o354'])
+
+    def test_suppression(self):
+        """Ensure suppressed questions cost no round trips."""
+
+        pipeline = OrderPipeline(client=self.client, suppress=['o163'], rules=ConfirmRules(default=True),
+                                 suppress_confirmed=True)
+
+        first = pipeline.submit(ORDER)
+        second = pipeline.submit(ORDER)
+
+        self.assertEqual(self.gateway.suppressed_questions, {'o163', 'o354'})
+        self.assertEqual(first.round_trips, 2)
+        self.assertEqual(second.round_trips, 1)
+        self.assertEqual(second.questions, [])
+        self.assertEqual(pipeline.stats()['suppressed'], ['o163', 'o354'])
+
+    def test_concurrent_submission(self):
+        """Ensure many orders and order groups are driven at once and reported."""
+
+        pipeline = OrderPipeline(client=self.client, rules=ConfirmRules(default=True), max_workers=8)
+        orders = [dict(ORDER, cOID='order-{}'.format(index)) for index in range(20)] + [[ORDER, ORDER]]
+
+        tickets = pipeline.submit_many(orders)
+
+        self.assertEqual([ticket.order for ticket in tickets], orders)
+        self.assertTrue(all(ticket.state == ACKNOWLEDGED for ticket in tickets))
+        self.assertEqual(len(tickets[-1].order_ids), 2)
+        self.assertEqual(len({order_id for ticket in tickets for order_id in ticket.order_ids}), 22)
+
+        stats = pipeline.stats()
+        self.assertEqual(stats['states'][ACKNOWLEDGED], 21)
+        self.assertEqual(stats['questions'], 42)
+        self.assertLessEqual(stats['ack_p50'], stats['ack_max'])
+
+    def test_failures(self):
+        """Ensure a request that fails leaves the ticket failed, not raised."""
+
+        self.gateway.route('POST', r'^iserver/account/[^/]+/order$', lambda request: (401, {'error': 'Not authenticated.'}))
+
+        ticket = OrderPipeline(client=self.client).submit(ORDER)
+
+        self.assertEqual(ticket.state, FAILED)
+        self.assertIsNotNone(ticket.error)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.client.transport.close()
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Unit test module for the columnar quote table."""
+
+import math
+import unittest
+from unittest import TestCase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class InteractiveBrokersQuoteTable(TestCase):
+
+    """Will perform a unit test for the columnar quote table."""
+
+    def test_parse_prices(self):
+        """Ensure prefixes, suffixes and missing values are parsed with their flags."""
+
+        from ibw import quote_table
+
+        values, flags = quote_table.parse_prices(['150.25', 'C149.80', 'H12.5', '1.2K', '3.45M', '1,234.5', '', None, 'N/A'])
+
+        np.testing.assert_allclose(values[:6], [150.25, 149.80, 12.5, 1200.0, 3450000.0, 1234.5])
+        self.assertTrue(np.isnan(values[6:]).all())
+
+        self.assertEqual(flags[0], 0)
+        self.assertEqual(flags[1], quote_table.FLAG_PRIOR_CLOSE)
+        self.assertEqual(flags[2], quote_table.FLAG_HALTED)
+        self.assertEqual(flags[6], quote_table.FLAG_MISSING)
+        self.assertEqual(flags[7], quote_table.FLAG_MISSING)
+        self.assertEqual(flags[8], quote_table.FLAG_INVALID)
+
+    def test_update_and_select(self):
+        """Ensure partial updates are merged and read back as arrays."""
+
+        from ibw.quote_table import FLAG_MISSING
+        from ibw.quote_table import FLAG_PRIOR_CLOSE
+        from ibw.quote_table import QuoteTable
+
+        table = QuoteTable(fields=['31', '84', '86'], capacity=2)
+
+        table.update([
+            {'conid': 265598, '_updated': 1, '31': 'C150.00', '84': '149.99', '86': '150.01'},
+            {'conid': 8314, '_updated': 1, '31': '140.00'},
+            {'conid': 4815747, '_updated': 1, '84': '1.00'}
+        ])
+        table.update([{'conid': 265598, '_updated': 2, '31': '151.00'}])
+
+        self.assertEqual(len(table), 3)
+        self.assertGreaterEqual(table.capacity, 3)
+        self.assertEqual(table.get('265598', '31'), 151.0)
+        self.assertEqual(table.get('265598', '84'), 149.99)
+        self.assertEqual(table.updated[table.rows['265598']], 2)
+
+        values, flags = table.select(conids=['8314', '265598', 'unknown'], fields=['31', '86'], with_flags=True)
+        self.assertEqual(values.shape, (3, 2))
+        self.assertEqual(values[0, 0], 140.0)
+        self.assertTrue(math.isnan(values[0, 1]))
+        self.assertEqual(flags[0, 1], FLAG_MISSING)
+        self.assertEqual(values[1, 1], 150.01)
+        self.assertTrue(np.isnan(values[2]).all())
+
+        self.assertEqual(table.flags[table.rows['265598'], table.columns['31']], 0)
+        table.update([{'conid': 265598, '31': 'C150.50'}])
+        self.assertEqual(table.flags[table.rows['265598'], table.columns['31']], FLAG_PRIOR_CLOSE)
+
+    def test_remove(self):
+        """Ensure removing a contract keeps the conid to row map consistent."""
+
+        from ibw.quote_table import QuoteTable
+
+        table = QuoteTable(fields=['31'])
+        table.update([{'conid': conid, '31': str(conid)} for conid in (1, 2, 3)])
+
+        table.remove(['1'])
+
+        self.assertNotIn('1', table)
+        self.assertEqual(sorted(table.conids), ['2', '3'])
+        self.assertEqual(table.get('3', '31'), 3.0)
+        np.testing.assert_array_equal(np.sort(table.column('31')), [2.0, 3.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
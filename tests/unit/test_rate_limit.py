@@ -0,0 +1,185 @@
+"""Unit test module for the rate limiter.
+
+Checks the endpoint classes, the token buckets and the priority order.
+"""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import TestCase
+
+from ibw.rate_limit import RateClass
+from ibw.rate_limit import RateLimiter
+from ibw.rate_limit import TokenBucket
+
+GATEWAY = 'https://localhost:5000/v1/portal/'
+
+
+class InteractiveBrokersRateLimit(TestCase):
+
+    """Will perform a unit test for the rate limiter."""
+
+    def test_classify(self):
+        """Ensure endpoints map to the expected classes."""
+
+        limiter = RateLimiter()
+
+        self.assertEqual(limiter.classify('POST', GATEWAY + 'iserver/account/U123/order').name, 'orders')
+        self.assertEqual(limiter.classify('POST', GATEWAY + 'iserver/account/U123/orders').name, 'orders')
+        self.assertEqual(limiter.classify('DELETE', GATEWAY + 'iserver/account/U123/order/42').name, 'orders')
+        self.assertEqual(limiter.classify('GET', GATEWAY + 'iserver/account/orders').name, 'live_orders')
+        self.assertEqual(limiter.classify('GET', GATEWAY + 'iserver/marketdata/snapshot').name, 'snapshot')
+        self.assertEqual(limiter.classify('GET', GATEWAY + 'fundamentals/landing/265598').name, 'fundamentals')
+        self.assertEqual(limiter.classify('GET', GATEWAY + 'portfolio/U123/summary').name, 'default')
+
+    def test_token_bucket(self):
+        """Ensure the bucket refills at its rate."""
+
+        bucket = TokenBucket(rate=10.0, capacity=1.0)
+        now = time.monotonic()
+
+        self.assertEqual(bucket.wait_time(now=now), 0.0)
+        bucket.consume(now=now)
+        self.assertAlmostEqual(bucket.wait_time(now=now), 0.1, places=2)
+
+        bucket.drain(now=now, seconds=2.0)
+        self.assertAlmostEqual(bucket.wait_time(now=now), 2.0, places=2)
+
+    def test_class_rate(self):
+        """Ensure a class bucket throttles its own endpoints only."""
+
+        limiter = RateLimiter(
+            global_rate=1000.0,
+            classes=[RateClass(name='slow', rate=5.0, burst=1.0), RateClass(name='default')],
+            rules=[('*', r'^slow$', 'slow')]
+        )
+
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.release(limiter.acquire(method='GET', url=GATEWAY + 'slow'))
+        self.assertGreaterEqual(time.monotonic() - start, 0.35)
+
+        start = time.monotonic()
+        for _ in range(3):
+            limiter.release(limiter.acquire(method='GET', url=GATEWAY + 'fast'))
+        self.assertLess(time.monotonic() - start, 0.1)
+
+    def test_orders_preempt_market_data(self):
+        """Ensure a queued order is served before queued snapshots."""
+
+        limiter = RateLimiter(global_rate=20.0, global_burst=1.0)
+        limiter.release(limiter.acquire(method='GET', url=GATEWAY + 'iserver/accounts'))
+
+        served = []
+
+        def request(method, endpoint, name):
+            permit = limiter.acquire(method=method, url=GATEWAY + endpoint)
+            served.append(name)
+            limiter.release(permit)
+
+        threads = [
+            threading.Thread(target=request, args=('GET', 'iserver/marketdata/snapshot', 'snapshot'))
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+
+        # Let the snapshots queue up before the order arrives.
+        time.sleep(0.01)
+        order = threading.Thread(target=request, args=('POST', 'iserver/account/U123/order', 'order'))
+        order.start()
+
+        for thread in threads + [order]:
+            thread.join()
+
+        self.assertLessEqual(served.index('order'), 1)
+
+    def test_max_concurrent(self):
+        """Ensure a class never has more requests in flight than allowed."""
+
+        limiter = RateLimiter(
+            global_rate=1000.0,
+            classes=[RateClass(name='history', max_concurrent=2), RateClass(name='default')],
+            rules=[('*', r'^history$', 'history')]
+        )
+
+        active = []
+        peak = []
+        lock = threading.Lock()
+
+        def request():
+            permit = limiter.acquire(method='GET', url=GATEWAY + 'history')
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+            limiter.release(permit)
+
+        threads = [threading.Thread(target=request) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(max(peak), 2)
+
+    def test_async_waiters_are_woken(self):
+        """Ensure queued coroutines are served in priority order without polling."""
+
+        limiter = RateLimiter(global_rate=50.0, global_burst=1.0)
+        served = []
+
+        async def request(method, endpoint, name):
+            permit = await limiter.acquire_async(method=method, url=GATEWAY + endpoint)
+            served.append(name)
+            limiter.release(permit)
+
+        async def run():
+            snapshots = [
+                asyncio.ensure_future(request('GET', 'iserver/marketdata/snapshot', 'snapshot'))
+                for _ in range(1000)
+            ]
+            await asyncio.sleep(0)
+            order = asyncio.ensure_future(request('POST', 'iserver/account/U123/order', 'order'))
+
+            await asyncio.sleep(0.1)
+            for task in snapshots[5:]:
+                task.cancel()
+
+            await asyncio.gather(*snapshots, order, return_exceptions=True)
+
+        start = time.process_time()
+        asyncio.run(run())
+
+        # The 1000 coroutines cost nothing while they wait for their turn.
+        self.assertLess(time.process_time() - start, 0.5)
+        self.assertLessEqual(served.index('order'), 1)
+        self.assertEqual(limiter.stats(), {'queued': {}, 'in_flight': {}})
+
+    def test_async_release_wakes_waiters(self):
+        """Ensure a release hands the slot straight to the next coroutine."""
+
+        limiter = RateLimiter(
+            global_rate=1000.0,
+            classes=[RateClass(name='history', max_concurrent=1), RateClass(name='default')],
+            rules=[('*', r'^history$', 'history')]
+        )
+
+        async def request():
+            permit = await limiter.acquire_async(method='GET', url=GATEWAY + 'history')
+            await asyncio.sleep(0.01)
+            limiter.release(permit)
+
+        async def run():
+            start = time.monotonic()
+            await asyncio.gather(*[request() for _ in range(10)])
+            return time.monotonic() - start
+
+        self.assertLess(asyncio.run(run()), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
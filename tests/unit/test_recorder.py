@@ -0,0 +1,134 @@
+"""Unit test module for the market data recorder and replay."""
+
+import pathlib
+import tempfile
+import time
+import unittest
+import zlib
+from unittest import TestCase
+from unittest import mock
+
+from ibw.recorder import KIND_SNAPSHOT
+from ibw.recorder import KIND_TICK
+from ibw.recorder import MarketDataRecorder
+from ibw.recorder import RecordingReader
+from ibw.recorder import replay
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+ORIGIN = 1700000000 * 10 ** 9
+MILLISECOND = 10 ** 6
+
+
+class InteractiveBrokersRecorder(TestCase):
+
+    """Will perform a unit test for the market data recorder and replay."""
+
+    def setUp(self) -> None:
+        """Record a small session in a temporary folder."""
+
+        self.folder = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.folder.name).joinpath('session.ibwrec')
+
+        with MarketDataRecorder(path=self.path, block_size=10) as recorder:
+            recorder.record_snapshot(
+                [{'conid': 265598, '31': '150.25'}, {'conid': 8314, '31': '95.10'}], timestamp=ORIGIN
+            )
+            for index in range(50):
+                recorder.record(
+                    message={'topic': 'smd+265598', '31': str(150 + index)},
+                    kind=KIND_TICK,
+                    timestamp=ORIGIN + (index + 1) * MILLISECOND
+                )
+
+    def test_index_and_filters(self):
+        """Ensure records are read back in order, filtered by time, contract and kind."""
+
+        with RecordingReader(self.path) as reader:
+            self.assertEqual(len(reader), 52)
+            self.assertEqual(len(reader.blocks), 6)
+            self.assertEqual(reader.conids(), [8314, 265598])
+            self.assertEqual(reader.start, ORIGIN)
+
+            records = list(reader.records())
+            self.assertEqual([record.timestamp for record in records], sorted(record.timestamp for record in records))
+            self.assertEqual(records[0].message, {'conid': 265598, '31': '150.25'})
+            self.assertEqual(records[0].kind, KIND_SNAPSHOT)
+
+            self.assertEqual([record.message for record in reader.records(conids=['8314'])], [{'conid': 8314, '31': '95.10'}])
+            self.assertEqual(len(list(reader.records(kinds=[KIND_TICK]))), 50)
+            self.assertEqual(len(list(reader.records(start=ORIGIN + 41 * MILLISECOND))), 10)
+
+    def test_queries_only_read_their_blocks(self):
+        """Ensure time and contract queries only decompress the blocks they need, even out of order."""
+
+        with MarketDataRecorder(path=self.path) as recorder:
+            recorder.record(message={'conid': 1, '31': '1'}, timestamp=ORIGIN - MILLISECOND)
+            recorder.flush()
+            recorder.record(message={'conid': 2, '31': '2'}, timestamp=ORIGIN + 100 * MILLISECOND)
+
+        with RecordingReader(self.path) as reader, mock.patch('ibw.recorder.zlib.decompress', wraps=zlib.decompress) as decompress:
+            self.assertEqual(reader.start, ORIGIN - MILLISECOND)
+            self.assertEqual(reader.end, ORIGIN + 100 * MILLISECOND)
+
+            self.assertEqual(len(list(reader.records(start=ORIGIN + 41 * MILLISECOND, end=ORIGIN + 49 * MILLISECOND))), 8)
+            self.assertEqual(decompress.call_count, 1)
+
+            self.assertEqual([record.conid for record in reader.records(end=ORIGIN)], [1])
+            self.assertEqual(decompress.call_count, 2)
+
+            self.assertEqual([record.conid for record in reader.records(conids=[2, 8314])], [8314, 2])
+            self.assertEqual(decompress.call_count, 4)
+
+    def test_appending_after_a_crash(self):
+        """Ensure a block cut short is dropped when the log is opened again."""
+
+        with open(self.path, 'ab') as file:
+            file.write(b'BLK1' + b'\x00' * 10)
+
+        with MarketDataRecorder(path=self.path) as recorder:
+            recorder.record(message={'conid': 1, '31': '1'}, timestamp=ORIGIN + 10 ** 9)
+
+        with RecordingReader(self.path) as reader:
+            self.assertEqual(len(reader), 53)
+            self.assertEqual(list(reader.records(conids=[1]))[0].message, {'conid': 1, '31': '1'})
+
+    def test_replay_speed(self):
+        """Ensure replay keeps the recorded pace divided by the speed."""
+
+        received = []
+
+        with RecordingReader(self.path) as reader:
+            started = time.perf_counter()
+            result = replay(reader, callbacks=[received.append], speed=0.5)
+            elapsed = time.perf_counter() - started
+
+        self.assertEqual(result['records'], 52)
+        self.assertEqual(len(received), 52)
+        self.assertGreaterEqual(elapsed, 0.1)
+
+    @unittest.skipIf(np is None, 'numpy is not installed')
+    def test_replay_into_a_table(self):
+        """Ensure a replay can feed a quote table as fast as possible."""
+
+        from ibw.quote_table import QuoteTable
+
+        table = QuoteTable(fields=['31'])
+
+        with RecordingReader(self.path) as reader:
+            replay(reader, table=table, speed=None, kinds=[KIND_SNAPSHOT])
+
+        self.assertEqual(table.get('265598', '31'), 150.25)
+        self.assertEqual(table.get('8314', '31'), 95.10)
+
+    def tearDown(self) -> None:
+        """Remove the recording."""
+
+        self.folder.cleanup()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Unit test module for the request logging.
+
+Makes sure request records are only built when logging is enabled.
+"""
+
+import logging
+import pathlib
+import tempfile
+import unittest
+from unittest import TestCase
+
+from ibw import request_log
+
+
+class _Capture(logging.Handler):
+
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class InteractiveBrokersRequestLog(TestCase):
+
+    """Will perform a unit test for the request logging."""
+
+    def setUp(self) -> None:
+        """Attach a capturing handler."""
+
+        self.capture = _Capture()
+        request_log.logger.addHandler(self.capture)
+        request_log.logger.setLevel(logging.DEBUG)
+
+    def test_import_does_not_configure_root_logger(self):
+        """Ensure importing the library leaves the root logger alone."""
+
+        import ibw.client_base
+        file_handlers = [
+            handler for handler in logging.getLogger().handlers
+            if isinstance(handler, logging.FileHandler) and handler.baseFilename.endswith('app.log')
+        ]
+        self.assertEqual(file_handlers, [])
+
+    def test_disabled_logger_skips_records(self):
+        """Ensure nothing is recorded when the logger is disabled."""
+
+        request_log.logger.setLevel(logging.INFO)
+        request_log.log_request('GET', 'https://localhost:5000/v1/portal/tickle', 200, 0.01, 10)
+        self.assertEqual(self.capture.records, [])
+
+    def test_structured_record(self):
+        """Ensure the record carries endpoint, status, latency and size."""
+
+        request_log.log_request('GET', 'https://localhost:5000/v1/portal/iserver/accounts?x=1', 200, 0.25, 512)
+        record = self.capture.records[0]
+
+        self.assertEqual(record.endpoint, '/v1/portal/iserver/accounts')
+        self.assertEqual(record.status, 200)
+        self.assertEqual(record.latency_ms, 250.0)
+        self.assertEqual(record.size, 512)
+
+    def test_sampling(self):
+        """Ensure a zero sample rate drops every record."""
+
+        request_log.set_sample_rate(0.0)
+        for _ in range(10):
+            request_log.log_request('GET', 'https://localhost:5000/v1/portal/tickle', 200, 0.01, 10)
+        self.assertEqual(self.capture.records, [])
+
+        with self.assertRaises(ValueError):
+            request_log.set_sample_rate(1.5)
+
+    def test_background_file_logging(self):
+        """Ensure records reach the rotating file through the listener."""
+
+        with tempfile.TemporaryDirectory() as folder:
+            file_path = pathlib.Path(folder).joinpath('ibw.log')
+            request_log.enable_request_logging(filename=str(file_path))
+            request_log.log_request('POST', 'https://localhost:5000/v1/portal/tickle', 200, 0.01, 10)
+            request_log.disable_request_logging()
+
+            self.assertIn('POST /v1/portal/tickle 200', file_path.read_text())
+
+    def tearDown(self) -> None:
+        """Restore the logger."""
+
+        request_log.set_sample_rate(1.0)
+        request_log.logger.removeHandler(self.capture)
+        request_log.logger.setLevel(logging.NOTSET)
+
+
+if __name__ == '__main__':
+    unittest.main()
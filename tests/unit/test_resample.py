@@ -0,0 +1,112 @@
+"""Unit test module for bar resampling and time alignment."""
+
+import unittest
+from unittest import TestCase
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+MINUTE = 60 * 1000
+HOUR = 60 * MINUTE
+
+
+def make_bars(conid: str, time: list, close: list, volume: list = None):
+    from ibw.history import Bars
+
+    close = np.asarray(close, dtype=np.float64)
+    return Bars(
+        conid=conid,
+        bar='5min',
+        time=np.asarray(time, dtype=np.int64),
+        open=close - 0.5,
+        high=close + 1.0,
+        low=close - 1.0,
+        close=close,
+        volume=np.asarray(volume if volume is not None else [1.0] * len(close), dtype=np.float64)
+    )
+
+
+@unittest.skipIf(np is None, 'numpy is not installed')
+class InteractiveBrokersResample(TestCase):
+
+    """Will perform a unit test for bar resampling and time alignment."""
+
+    def test_resample(self):
+        """Ensure OHLCV and VWAP of coarser bars are derived from finer ones."""
+
+        from ibw.resample import resample
+
+        time = [0, 5 * MINUTE, 55 * MINUTE, HOUR, HOUR + 5 * MINUTE, 3 * HOUR]
+        bars = make_bars('1', time=time, close=[10, 12, 11, 20, 22, 30], volume=[1, 3, 0, 2, 2, 5])
+
+        hourly = resample(bars=bars, bar='1h')
+
+        self.assertEqual(hourly.time.tolist(), [0, HOUR, 3 * HOUR])
+        self.assertEqual(hourly.open.tolist(), [9.5, 19.5, 29.5])
+        self.assertEqual(hourly.high.tolist(), [13.0, 23.0, 31.0])
+        self.assertEqual(hourly.low.tolist(), [9.0, 19.0, 29.0])
+        self.assertEqual(hourly.close.tolist(), [11.0, 22.0, 30.0])
+        self.assertEqual(hourly.volume.tolist(), [4.0, 4.0, 5.0])
+        np.testing.assert_allclose(hourly.vwap, [(10 * 1 + 12 * 3) / 4.0, 21.0, 30.0])
+
+        daily = resample(bars=hourly, bar='1d')
+        self.assertEqual(daily.volume.tolist(), [13.0])
+        np.testing.assert_allclose(daily.vwap, [(46 + 84 + 150) / 13.0])
+
+    def test_calendar_buckets(self):
+        """Ensure weeks start on Monday and months are calendar months."""
+
+        from ibw.resample import bucket_times
+
+        # 2023-01-04, a Wednesday, and 2023-02-15.
+        time = np.array(['2023-01-04T10:00', '2023-02-15T10:00'], dtype='datetime64[ms]').astype(np.int64)
+
+        weeks = bucket_times(time=time, bar='1w').astype('datetime64[ms]')
+        months = bucket_times(time=time, bar='1m').astype('datetime64[ms]')
+
+        self.assertEqual(str(weeks[0]), '2023-01-02T00:00:00.000')
+        self.assertEqual(str(months[0]), '2023-01-01T00:00:00.000')
+        self.assertEqual(str(months[1]), '2023-02-01T00:00:00.000')
+
+    def test_align(self):
+        """Ensure contracts are aligned on a common index with the fill rules."""
+
+        from ibw.resample import align
+
+        first = make_bars('1', time=[0, HOUR, 2 * HOUR, 3 * HOUR], close=[1, 2, 3, 4])
+        second = make_bars('2', time=[HOUR, 3 * HOUR], close=[20, 40])
+
+        outer = align({'1': first, '2': second})
+        self.assertEqual(outer.index.astype(np.int64).tolist(), [0, HOUR, 2 * HOUR, 3 * HOUR])
+        np.testing.assert_array_equal(outer.column('2'), [np.nan, 20, np.nan, 40])
+
+        filled = align([first, second], fill='ffill')
+        np.testing.assert_array_equal(filled.column('2'), [np.nan, 20, 20, 40])
+
+        inner = align([first, second], how='inner')
+        self.assertEqual(inner.values.tolist(), [[2.0, 20.0], [4.0, 40.0]])
+
+        volumes = align([first, second], field='volume', fill='zero')
+        self.assertEqual(volumes.column('2').tolist(), [0.0, 1.0, 0.0, 1.0])
+
+        limited = align([first, make_bars('3', time=[0], close=[7])], fill='ffill', limit=1)
+        np.testing.assert_array_equal(limited.column('3'), [7, 7, np.nan, np.nan])
+
+        # A custom index between bar times takes the last bar at or before each time.
+        half_hours = [HOUR // 2, HOUR + HOUR // 2, 2 * HOUR + HOUR // 2, 4 * HOUR]
+        as_of = align([first, second], fill='ffill', index=half_hours)
+        self.assertEqual(as_of.column('1').tolist(), [1.0, 2.0, 3.0, 4.0])
+        self.assertEqual(as_of.column('2').tolist()[1:], [20.0, 20.0, 40.0])
+        self.assertTrue(np.isnan(as_of.column('2')[0]))
+
+        limited = align([second], fill='ffill', limit=1, index=half_hours)
+        np.testing.assert_array_equal(limited.column('2'), [np.nan, 20, np.nan, 40])
+
+        with self.assertRaises(ValueError):
+            align([first], fill='backward')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,193 @@
+"""Unit test module for retries, the circuit breaker and the typed errors.
+
+Runs a small local HTTP server that fails on demand.
+"""
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest import TestCase
+
+from ibw import exceptions
+from ibw.resilience import CircuitBreaker
+from ibw.resilience import RetryPolicy
+from ibw.resilience import RetryRules
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def _reply(self):
+        server = self.server
+        with server.lock:
+            server.hits += 1
+            status, headers = server.statuses.pop(0) if server.statuses else (200, {})
+
+        body = json.dumps({'error': 'failed'} if status >= 400 else {'ok': True}).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._reply()
+
+    def do_POST(self):
+        self._reply()
+
+    def log_message(self, *args):
+        pass
+
+
+class InteractiveBrokersResilience(TestCase):
+
+    """Will perform a unit test for retries and the circuit breaker."""
+
+    def setUp(self) -> None:
+        """Start the local server."""
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.hits = 0
+        self.server.statuses = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.root = 'http://127.0.0.1:{}/v1/portal/'.format(self.server.server_address[1])
+
+    def _transport(self, **kwargs) -> IBTransport:
+        """Returns a transport with near instant backoff."""
+
+        rules = RetryRules(default=RetryPolicy(max_retries=3, backoff_base=0.001))
+        return IBTransport(config=TransportConfig(rate_limit=False, retry_rules=rules, **kwargs))
+
+    def test_retries_transient_errors(self):
+        """Ensure a GET is retried until it succeeds."""
+
+        self.server.statuses = [(503, {}), (500, {})]
+        transport = self._transport()
+
+        response = transport.request(method='GET', url=self.root + 'iserver/accounts')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.server.hits, 3)
+        transport.close()
+
+    def test_orders_are_not_retried(self):
+        """Ensure an order is sent exactly once."""
+
+        self.server.statuses = [(503, {})]
+        transport = self._transport()
+
+        response = transport.request(method='POST', url=self.root + 'iserver/account/U1234/orders')
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(self.server.hits, 1)
+        transport.close()
+
+    def test_respects_retry_after(self):
+        """Ensure the backoff is at least the `Retry-After` of the gateway."""
+
+        policy = RetryPolicy(backoff_base=0.001)
+        self.assertGreaterEqual(policy.backoff(attempt=0, retry_after=2.0), 2.0)
+        self.assertLessEqual(policy.backoff(attempt=10), policy.backoff_max)
+        self.assertEqual(exceptions.parse_retry_after('3'), 3.0)
+        self.assertIsNone(exceptions.parse_retry_after('soon'))
+
+    def test_circuit_breaker(self):
+        """Ensure the breaker opens, fails fast and recovers."""
+
+        self.server.statuses = [(500, {})] * 2
+        transport = self._transport(
+            retry=False,
+            circuit_breaker=CircuitBreaker(failure_threshold=2, recovery_timeout=0.05)
+        )
+        url = self.root + 'iserver/accounts'
+
+        transport.request(method='GET', url=url)
+        transport.request(method='GET', url=url)
+
+        with self.assertRaises(exceptions.IBCircuitOpenError):
+            transport.request(method='GET', url=url)
+        self.assertEqual(self.server.hits, 2)
+
+        threading.Event().wait(0.1)
+        self.assertEqual(transport.request(method='GET', url=url).status_code, 200)
+        self.assertEqual(transport.pool_stats()['circuit_breaker']['state'], CircuitBreaker.CLOSED)
+        transport.close()
+
+    def test_failed_trial_reopens(self):
+        """Ensure a trial failing with any error opens the breaker again instead of blocking it."""
+
+        self.server.statuses = [(500, {})]
+        transport = self._transport(
+            retry=False,
+            circuit_breaker=CircuitBreaker(failure_threshold=1, recovery_timeout=0.05)
+        )
+        url = self.root + 'iserver/accounts'
+
+        transport.request(method='GET', url=url)
+        threading.Event().wait(0.1)
+
+        send = transport._send
+
+        def fail(**kwargs):
+            raise ValueError('Unexpected.')
+
+        transport._send = fail
+        with self.assertRaises(ValueError):
+            transport.request(method='GET', url=url)
+        self.assertEqual(transport.pool_stats()['circuit_breaker']['state'], CircuitBreaker.OPEN)
+
+        transport._send = send
+        threading.Event().wait(0.1)
+        self.assertEqual(transport.request(method='GET', url=url).status_code, 200)
+        transport.close()
+
+    def test_connection_errors_are_typed(self):
+        """Ensure an unreachable gateway raises an `IBConnectionError` once the retries are used up."""
+
+        self.server.shutdown()
+        self.server.server_close()
+        transport = self._transport()
+
+        with self.assertRaises(exceptions.IBConnectionError) as context:
+            transport.request(method='GET', url=self.root + 'iserver/accounts')
+
+        self.assertIsInstance(context.exception, exceptions.IBHTTPError)
+        self.assertIsNone(context.exception.status_code)
+        transport.close()
+
+    def test_typed_errors(self):
+        """Ensure failed responses map to typed errors carrying the body."""
+
+        self.server.statuses = [(429, {'Retry-After': '7'}), (401, {})]
+        transport = self._transport(retry=False)
+        url = self.root + 'iserver/accounts'
+
+        error = exceptions.from_response(url=url, response=transport.request(method='GET', url=url))
+        self.assertIsInstance(error, exceptions.IBRateLimitError)
+        self.assertEqual(error.retry_after, 7.0)
+        self.assertEqual(error.body, {'error': 'failed'})
+
+        error = exceptions.from_response(url=url, response=transport.request(method='GET', url=url))
+        self.assertIsInstance(error, exceptions.IBAuthenticationError)
+        self.assertEqual(error.status_code, 401)
+        transport.close()
+
+    def tearDown(self) -> None:
+        """Stop the local server."""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
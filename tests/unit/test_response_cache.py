@@ -0,0 +1,144 @@
+"""Unit test module for the response cache.
+
+Runs a small local HTTP server and makes sure reference lookups are only sent once.
+"""
+
+import atexit
+import json
+import os
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest import TestCase
+
+from ibw.response_cache import ResponseCache
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits += 1
+
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class InteractiveBrokersResponseCache(TestCase):
+
+    """Will perform a unit test for the response cache."""
+
+    def setUp(self) -> None:
+        """Start the local server."""
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.hits = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.root = 'http://127.0.0.1:{}/v1/portal/'.format(self.server.server_address[1])
+
+    def _transport(self, cache: ResponseCache) -> IBTransport:
+        return IBTransport(config=TransportConfig(rate_limit=False, response_cache=cache))
+
+    def test_reference_lookups_are_cached(self):
+        """Ensure contract details are fetched once and other endpoints every time."""
+
+        cache = ResponseCache()
+        transport = self._transport(cache=cache)
+
+        for _ in range(3):
+            response = transport.request(method='GET', url=self.root + 'iserver/contract/265598/info')
+            self.assertEqual(response.json(), {'path': '/v1/portal/iserver/contract/265598/info'})
+
+        for _ in range(2):
+            transport.request(method='GET', url=self.root + 'iserver/accounts')
+
+        self.assertEqual(self.server.hits, 3)
+        self.assertEqual(cache.stats()['hits'], 2)
+        self.assertEqual(cache.stats()['misses'], 1)
+        transport.close()
+
+    def test_rules_match_query_parameters(self):
+        """Ensure only the slow moving fundamentals widgets are cached."""
+
+        cache = ResponseCache()
+        url = 'https://localhost:5000/v1/portal/fundamentals/landing/265598'
+
+        self.assertIsNotNone(cache.key_for(method='GET', url=url, params={'widgets': 'dividends'}))
+        self.assertIsNone(cache.key_for(method='GET', url=url, params={'widgets': 'news', 'lang': 'en'}))
+
+    def test_ttl_and_lru_eviction(self):
+        """Ensure entries expire and the least recently used are evicted."""
+
+        cache = ResponseCache(rules=[('GET', r'^a/', 0.05)], max_entries=2)
+
+        keys = [cache.key_for(method='GET', url='/v1/portal/a/{}'.format(i)) for i in range(3)]
+        cache.put(key=keys[0], content=b'0')
+        cache.put(key=keys[1], content=b'1')
+        cache.get(key=keys[0])
+        cache.put(key=keys[2], content=b'2')
+
+        self.assertEqual(cache.get(key=keys[0]), b'0')
+        self.assertIsNone(cache.get(key=keys[1]))
+        self.assertEqual(cache.stats()['evictions'], 1)
+
+        time.sleep(0.06)
+        self.assertIsNone(cache.get(key=keys[0]))
+        self.assertEqual(cache.stats()['expirations'], 1)
+
+    def test_invalidate(self):
+        """Ensure entries can be dropped by pattern."""
+
+        cache = ResponseCache()
+        for conid in ('265598', '8314'):
+            key = cache.key_for(method='GET', url='/v1/portal/iserver/contract/{}/info'.format(conid))
+            cache.put(key=key, content=b'{}')
+
+        self.assertEqual(cache.invalidate(pattern=r'^iserver/contract/8314/'), 1)
+        self.assertEqual(cache.stats()['entries'], 1)
+
+        cache.clear()
+        self.assertEqual(cache.stats()['entries'], 0)
+
+    def test_persistence(self):
+        """Ensure the cache survives a restart."""
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'responses.json')
+
+            cache = ResponseCache(path=path)
+            key = cache.key_for(method='POST', url='/v1/portal/trsrv/secdef', json={'conids': [265598]})
+            cache.put(key=key, content=b'{"secdef": []}')
+            cache.save()
+
+            restarted = ResponseCache(path=path)
+            self.assertEqual(restarted.get(key=key), b'{"secdef": []}')
+
+            # Don't write to the temporary directory once it's gone.
+            atexit.unregister(cache.save)
+            atexit.unregister(restarted.save)
+
+    def tearDown(self) -> None:
+        """Stop the local server."""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,149 @@
+"""Unit test module for the single-flight request coalescing.
+
+Runs a small local HTTP server and makes identical requests at the same time.
+"""
+
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest import TestCase
+
+from ibw.client import IBClient
+from ibw.client_base import IBBase
+from ibw.single_flight import SingleFlight
+from ibw.single_flight import request_key
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits += 1
+
+        time.sleep(0.2)
+
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class InteractiveBrokersSingleFlight(TestCase):
+
+    """Will perform a unit test for the single-flight request coalescing."""
+
+    def setUp(self) -> None:
+        """Start the local server and create the client."""
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.hits = 0
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.transport = IBTransport(config=TransportConfig(rate_limit=False))
+        self.ibw_client = IBBase(transport=self.transport, host='127.0.0.1')
+        self.ibw_client.ib_gateway_path = 'http://127.0.0.1:{}'.format(self.server.server_address[1])
+
+    def _call(self, conids: str):
+        return self.ibw_client._make_request(
+            endpoint='iserver/marketdata/snapshot',
+            req_type='GET',
+            params={'conids': conids, 'fields': '31'}
+        )
+
+    def test_identical_requests_share_one_call(self):
+        """Ensure identical GETs in flight share one request and one result."""
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(lambda _: self._call(conids='265598'), range(5)))
+
+        self.assertEqual(self.server.hits, 1)
+        self.assertTrue(all(result is results[0] for result in results))
+        self.assertEqual(self.transport.pool_stats()['coalescing']['coalesced'], 4)
+
+    def test_different_requests_are_not_shared(self):
+        """Ensure requests with other parameters are sent on their own."""
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(self._call, ['265598', '8314']))
+
+        self.assertEqual(self.server.hits, 2)
+
+    def test_clients_share_calls(self):
+        """Ensure the same GET from an `IBBase` client and an `IBClient` on one transport is sent once."""
+
+        client = IBClient(username='TEST', account='TEST', transport=self.transport, host='127.0.0.1')
+        client.ib_gateway_path = self.ibw_client.ib_gateway_path
+
+        def client_call():
+            return client._make_request(
+                endpoint='iserver/marketdata/snapshot',
+                req_type='GET',
+                params={'fields': '31', 'conids': '265598'}
+            )
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            results = [pool.submit(self._call, '265598'), pool.submit(client_call)]
+            results = [result.result() for result in results]
+
+        self.assertEqual(self.server.hits, 1)
+        self.assertIs(results[0], results[1])
+
+    def test_errors_are_shared(self):
+        """Ensure every waiting caller sees the error of the shared call."""
+
+        group = SingleFlight()
+        started = threading.Event()
+
+        def fail():
+            started.set()
+            time.sleep(0.1)
+            raise ValueError('gateway down')
+
+        def follow():
+            started.wait()
+            return group.do(key='key', function=fail)
+
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            leader = pool.submit(group.do, 'key', fail)
+            follower = pool.submit(follow)
+
+            with self.assertRaises(ValueError):
+                leader.result()
+            with self.assertRaises(ValueError):
+                follower.result()
+
+        self.assertEqual(group.stats(), {'calls': 1, 'coalesced': 1, 'in_flight': 0})
+
+    def test_request_key_ignores_parameter_order(self):
+        """Ensure the key doesn't depend on the order of the parameters."""
+
+        self.assertEqual(
+            request_key(method='GET', url='/a', params={'a': 1, 'b': 2}),
+            request_key(method='GET', url='/a', params={'b': 2, 'a': 1})
+        )
+
+    def tearDown(self) -> None:
+        """Stop the local server."""
+
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,128 @@
+"""Unit test module for the snapshot poller.
+
+Uses a fake client that behaves like the snapshot endpoint: the first request of
+a contract only primes it, and later requests only return what changed.
+"""
+
+import threading
+import unittest
+from unittest import TestCase
+
+from ibw.snapshot import SnapshotPoller
+
+
+class _FakeMarket():
+    """Answers `market_data` like the gateway's snapshot endpoint."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.calls = []
+        self.primed = set()
+        self.clock = 1000
+        # conid -> {field: (value, updated)}
+        self.values = {}
+
+    def set(self, conid: str, field: str, value: str) -> None:
+        with self.lock:
+            self.clock += 1
+            self.values.setdefault(conid, {})[field] = (value, self.clock)
+
+    def market_data(self, conids, since, fields):
+        with self.lock:
+            self.calls.append((list(conids), since))
+
+            response = []
+            for conid in conids:
+                if conid not in self.primed:
+                    self.primed.add(conid)
+                    response.append({'conid': int(conid), 'conidEx': conid})
+                    continue
+
+                changed = {
+                    field: value for field, (value, updated) in self.values.get(conid, {}).items()
+                    if field in fields and (since is None or updated > since)
+                }
+                if changed:
+                    updated = max(updated for _, updated in self.values[conid].values())
+                    response.append(dict(changed, conid=int(conid), _updated=updated))
+
+            return response
+
+
+class InteractiveBrokersSnapshotPoller(TestCase):
+
+    """Will perform a unit test for the snapshot poller."""
+
+    def setUp(self) -> None:
+        """Create the fake client and the poller."""
+
+        self.market = _FakeMarket()
+        self.conids = [str(conid) for conid in range(250)]
+
+        for conid in self.conids:
+            self.market.set(conid, '31', '10.00')
+            self.market.set(conid, '84', '9.99')
+
+        self.poller = SnapshotPoller(client=self.market, conids=self.conids, fields=['31', '84'], batch_size=100)
+
+    def test_chunking_and_priming(self):
+        """Ensure contracts are requested in batches and primed before they're read."""
+
+        self.assertEqual(self.poller.prime(delay=0.0), [])
+
+        # One round primes, the second returns the fields.
+        self.assertEqual(len(self.market.calls), 6)
+        self.assertTrue(all(len(conids) <= 100 for conids, _ in self.market.calls))
+        self.assertTrue(all(since is None for _, since in self.market.calls))
+
+        self.assertEqual(self.poller.get('42')['31'], '10.00')
+        self.assertEqual(len(self.poller.quotes()), 250)
+
+    def test_since_cursors_and_delta_merge(self):
+        """Ensure later polls use the cursors and only merge what changed."""
+
+        self.poller.prime(delay=0.0)
+        before = self.poller.get('7')
+
+        self.market.set('7', '31', '10.50')
+        self.market.calls.clear()
+
+        self.assertEqual(self.poller.poll(), 1)
+        self.assertTrue(all(since is not None for _, since in self.market.calls))
+
+        after = self.poller.get('7')
+        self.assertEqual(after['31'], '10.50')
+        self.assertEqual(after['84'], '9.99')
+
+        # Quotes are replaced, never changed while they're read.
+        self.assertEqual(before['31'], '10.00')
+
+        self.assertEqual(self.poller.poll(), 0)
+
+    def test_added_contracts_are_primed(self):
+        """Ensure contracts added later are requested without a cursor."""
+
+        self.poller.prime(delay=0.0)
+        self.market.set('9999', '31', '1.00')
+        self.poller.add(['9999'])
+
+        self.market.calls.clear()
+        self.poller.poll()
+
+        self.assertIn((['9999'], None), self.market.calls)
+        self.assertFalse(self.poller.is_primed('9999'))
+
+        self.poller.poll()
+        self.assertEqual(self.poller.get('9999')['31'], '1.00')
+
+        self.poller.remove(['9999'])
+        self.assertIsNone(self.poller.get('9999'))
+
+    def tearDown(self) -> None:
+        """Stop the poller."""
+
+        self.poller.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
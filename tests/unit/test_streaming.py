@@ -0,0 +1,162 @@
+"""Unit test module for the market data stream.
+
+Runs the local WebSocket stand-in and makes sure subscriptions, ticks, heartbeats
+and reconnects work.
+"""
+
+import asyncio
+import unittest
+from unittest import TestCase
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+
+async def _next_tick(iterator, conid: int) -> dict:
+    """Returns the next tick of a contract."""
+
+    while True:
+        tick = await asyncio.wait_for(iterator.__anext__(), timeout=5)
+        if tick['conid'] == conid:
+            return tick
+
+
+@unittest.skipIf(aiohttp is None, 'aiohttp is not installed')
+class InteractiveBrokersMarketDataStream(TestCase):
+
+    """Will perform a unit test for the market data stream."""
+
+    def setUp(self) -> None:
+        """Start the stand-in."""
+
+        from ibw.testing.streaming import LocalStreamingGateway
+
+        self.gateway = LocalStreamingGateway().start()
+
+    def _stream(self, **kwargs):
+        from ibw.streaming import MarketDataStream
+
+        return MarketDataStream(url=self.gateway.url, session='SESSION', reconnect_delay=0.05, **kwargs)
+
+    def test_subscribe_and_receive_ticks(self):
+        """Ensure subscribed ticks reach both the callbacks and the iterators."""
+
+        received = []
+
+        async def run():
+            async with self._stream() as stream:
+                stream.add_callback(received.append)
+                iterator = stream.__aiter__()
+
+                await stream.wait_connected(timeout=5)
+                await stream.subscribe(conids=['265598'], fields=['31', '84'])
+
+                first = await _next_tick(iterator, 265598)
+
+                await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: self.gateway.publish('265598', {'31': '151.25'})
+                )
+                second = await _next_tick(iterator, 265598)
+
+                await stream.unsubscribe(conids=['265598'])
+                await asyncio.sleep(0.1)
+
+                return first, second, stream.authenticated
+
+        first, second, authenticated = asyncio.run(run())
+
+        from ibw.testing.gateway import quote_values
+
+        self.assertEqual(first['31'], quote_values('265598')['31'])
+        self.assertIn('84', first)
+        self.assertNotIn('86', first)
+        self.assertEqual(second['31'], '151.25')
+        self.assertEqual(len(received), 2)
+        self.assertTrue(authenticated)
+        self.assertEqual(self.gateway.sessions, ['SESSION'])
+        self.assertEqual(self.gateway.unsubscribes, 1)
+        self.assertEqual(self.gateway.subscriptions, {})
+
+    def test_resubscribe_after_reconnect(self):
+        """Ensure subscriptions are sent again when the socket reconnects."""
+
+        async def run():
+            async with self._stream() as stream:
+                iterator = stream.__aiter__()
+
+                await stream.wait_connected(timeout=5)
+                await stream.subscribe(conids=['8314'], fields=['31'])
+                await _next_tick(iterator, 8314)
+
+                await asyncio.get_running_loop().run_in_executor(None, self.gateway.drop_connections)
+
+                # The stand-in answers the new subscription with a first tick.
+                await _next_tick(iterator, 8314)
+
+                return stream.stats()
+
+        stats = asyncio.run(run())
+
+        self.assertEqual(stats['reconnects'], 1)
+        self.assertEqual(self.gateway.connections, 2)
+        self.assertEqual(self.gateway.subscriptions, {})
+        self.assertEqual(self.gateway.subscribes, 2)
+
+    def test_left_loops_stop_receiving_ticks(self):
+        """Ensure a loop left by `break`, a cancellation or `aclose` unregisters its queue."""
+
+        async def run():
+            async with self._stream() as stream:
+                await stream.wait_connected(timeout=5)
+                await stream.subscribe(conids=['265598'], fields=['31'])
+
+                async for tick in stream:
+                    break
+
+                registered = [len(stream._queues)]
+
+                async def consume():
+                    async for tick in stream:
+                        pass
+
+                task = asyncio.ensure_future(consume())
+                await asyncio.sleep(0.05)
+                registered.append(len(stream._queues))
+
+                task.cancel()
+                await asyncio.gather(task, return_exceptions=True)
+                registered.append(len(stream._queues))
+
+                iterator = stream.ticks_iterator()
+                registered.append(len(stream._queues))
+                await iterator.aclose()
+                registered.append(len(stream._queues))
+
+                return registered
+
+        self.assertEqual(asyncio.run(run()), [0, 1, 0, 1, 0])
+
+    def test_heartbeat(self):
+        """Ensure `tic` messages are sent to keep the socket alive."""
+
+        async def run():
+            async with self._stream(heartbeat_interval=0.05) as stream:
+                await stream.wait_connected(timeout=5)
+                await asyncio.sleep(0.3)
+                return stream.stats()
+
+        stats = asyncio.run(run())
+
+        self.assertGreaterEqual(stats['heartbeats'], 2)
+        self.assertGreaterEqual(self.gateway.heartbeats, 2)
+
+    def tearDown(self) -> None:
+        """Stop the stand-in."""
+
+        self.gateway.stop()
+
+
+if __name__ == '__main__':
+    unittest.main()
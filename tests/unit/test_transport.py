@@ -0,0 +1,89 @@
+"""Unit test module for the pooled transport.
+
+Runs a small local HTTP server and makes sure requests share connections.
+"""
+
+import json
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+from unittest import TestCase
+
+from ibw.transport import IBTransport
+from ibw.transport import TransportConfig
+from ibw.transport import get_transport
+
+
+class _Handler(BaseHTTPRequestHandler):
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = json.dumps({'path': self.path}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json;charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class InteractiveBrokersTransport(TestCase):
+
+    """Will perform a unit test for the pooled transport."""
+
+    def setUp(self) -> None:
+        """Start the local server."""
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = 'http://127.0.0.1:{}/v1/portal/iserver/accounts'.format(self.server.server_address[1])
+
+    def test_reuses_connection(self):
+        """Ensure sequential requests go over a single connection."""
+
+        transport = IBTransport()
+        for _ in range(5):
+            self.assertEqual(transport.request(method='GET', url=self.url).status_code, 200)
+
+        stats = transport.pool_stats()
+        pool = list(stats['pools'].values())[0]
+
+        self.assertEqual(stats['requests_sent'], 5)
+        self.assertEqual(pool['connections_opened'], 1)
+        self.assertEqual(pool['requests'], 5)
+        transport.close()
+
+    def test_pool_size_is_configurable(self):
+        """Ensure the pool size is passed to the connection pool."""
+
+        transport = IBTransport(config=TransportConfig(pool_maxsize=3))
+        transport.request(method='GET', url=self.url)
+
+        pool = list(transport.pool_stats()['pools'].values())[0]
+        self.assertEqual(pool['maxsize'], 3)
+        transport.close()
+
+    def test_shared_transport(self):
+        """Ensure clients of the same gateway share one transport."""
+
+        first = get_transport(gateway_path='https://127.0.0.1:5000')
+        second = get_transport(gateway_path='https://127.0.0.1:5000')
+        other = get_transport(gateway_path='https://127.0.0.1:5001')
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, other)
+
+    def tearDown(self) -> None:
+        """Stop the local server."""
+
+        self.server.shutdown()
+        self.server.server_close()
+
+
+if __name__ == '__main__':
+    unittest.main()